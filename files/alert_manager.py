@@ -87,10 +87,20 @@ class AlertManager:
             alerts.append(entry)
         return alerts
 
-    def check_oi_spike(self, current_walls: pd.DataFrame) -> list[str]:
-        """Alert if OI at any wall strike changes > spike_pct vs prior load."""
+    def check_oi_spike(
+        self,
+        current_walls: pd.DataFrame,
+        prior_walls: Optional[pd.DataFrame] = None,
+    ) -> list[str]:
+        """
+        Alert if OI at any wall strike changes > spike_pct vs prior load.
+        prior_walls (e.g. from yesterday's stored chain) is the baseline
+        until this session has a load of its own.
+        """
         alerts = []
         prior = st.session_state.get(self.PRIOR_WALLS_KEY)
+        if prior is None and prior_walls is not None and not prior_walls.empty:
+            prior = prior_walls[["Strike", "Total_OI"]]
         if prior is None or current_walls is None or current_walls.empty:
             st.session_state[self.PRIOR_WALLS_KEY] = (
                 current_walls[["Strike", "Total_OI"]].copy() if current_walls is not None else None
@@ -184,13 +194,14 @@ class AlertManager:
         max_pain: Optional[float],
         signal_label: Optional[str],
         strike_step: float = 10.0,
+        prior_walls: Optional[pd.DataFrame] = None,
     ) -> list[str]:
         """Run all checks in one call; return combined alert list."""
         alerts = []
         if matched_df is not None:
             alerts += self.check_deal_scores(matched_df)
         if walls_df is not None:
-            alerts += self.check_oi_spike(walls_df)
+            alerts += self.check_oi_spike(walls_df, prior_walls)
         if pcr is not None:
             alerts += self.check_pcr_crossover(pcr)
         if max_pain is not None:
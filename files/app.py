@@ -357,12 +357,18 @@ def run_compute_pipeline(
         score_threshold=st.session_state["score_alert_threshold"],
         oi_spike_pct=st.session_state["oi_spike_pct"],
     )
+    prior_walls = None
+    if st.session_state.get(AlertManager.PRIOR_WALLS_KEY) is None:
+        prior_chain = dm.load_prior_day_chain(symbol)
+        if prior_chain is not None:
+            prior_walls = OptionsWallCalculator(prior_chain).consolidate_walls()
     alert_mgr.run_all_checks(
         matched_df=matched_df,
         walls_df=walls_df,
         pcr=pcr_data["pcr_oi"],
         max_pain=max_pain,
         signal_label=composite["label"],
+        prior_walls=prior_walls,
     )
 
     st.session_state["last_refresh"] = time.time()
@@ -1404,7 +1410,6 @@ with tabs[4]:
             bulk_results = dm.download_watchlist_chains(
                 symbols=watchlist,
                 max_workers=3,
-                inter_symbol_delay=1.5,
                 progress_callback=_dl_progress,
             )
 
@@ -2027,7 +2032,7 @@ with tabs[6]:
 
     if len(history) < 2:
         st.info(
-            "📁 Need at least 2 days of options data in ./data/options/ for historical comparison. Demo data shown below."
+            "📁 Need at least 2 days of options data (./data/options/ or stored snapshots) for historical comparison. Demo data shown below."
         )
 
         # Generate synthetic history for demo
@@ -2099,6 +2104,18 @@ with tabs[6]:
                     key="hist_mp_migrate2",
                 )
 
+            # Intraday PCR from today's stored snapshots
+            intraday = dm.intraday_pcr(symbol)
+            if len(intraday) >= 2:
+                st.plotly_chart(
+                    cb.pcr_trend_chart(
+                        intraday.reset_index(drop=True),
+                        [t.strftime("%H:%M") for t in intraday.index],
+                    ),
+                    use_container_width=True,
+                    key="hist_pcr_intraday",
+                )
+
             # New OI built today
             st.markdown("### 🆕 New OI Built Today (>10% increase)")
             merged = walls_today[["Strike", "Total_OI"]].merge(
@@ -0,0 +1,211 @@
+"""
+ChainStore — on-disk option-chain snapshots for the history tab and alerts.
+
+One compressed .npz per symbol × snapshot, all expiries together:
+
+    data/chain_store/{SYMBOL}/{ts_ms}.npz
+
+Chains are stored in DataManager's long format (one row per strike × type).
+Expiry and OptionType are dictionary-encoded (unique values + int32 codes);
+numeric columns keep their own dtypes. Each snapshot is written to a temp
+file and renamed into place, so a reader never sees half a snapshot.
+
+The snapshot timestamps of a symbol are listed from disk once and then kept
+in memory; writes and prunes update them. Snapshots older than keep_days are
+pruned by the first write of the process and then once a day.
+
+Reads:
+    store.latest("NIFTY")                  → (datetime, chain) | None
+    store.as_of("NIFTY", yesterday_close)  → (datetime, chain) | None
+    store.pcr_trend("NIFTY", t0, t1)       → PCR per snapshot
+"""
+
+from __future__ import annotations
+import os
+import time
+import bisect
+import logging
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL = 300.0  # seconds between stored snapshots of one symbol
+DEFAULT_KEEP_DAYS = 30
+PRUNE_EVERY = 86400.0  # seconds between automatic prunes
+
+_CODED = ("Expiry", "OptionType", "Symbol")  # string columns stored as codes
+
+TimeLike = Union[datetime.datetime, pd.Timestamp, str, float, int]
+
+
+def _to_ms(ts: TimeLike) -> int:
+    """Epoch milliseconds; naive datetimes / strings are local time."""
+    if isinstance(ts, (int, float)):
+        return int(ts * 1000)
+    if isinstance(ts, str):
+        ts = pd.Timestamp(ts)
+    if isinstance(ts, pd.Timestamp):
+        ts = ts.to_pydatetime()
+    return int(ts.timestamp() * 1000)
+
+
+def _from_ms(ms: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ms / 1000)
+
+
+class ChainStore:
+    """Snapshot store rooted at one directory. Safe for concurrent threads in one process."""
+
+    def __init__(
+        self,
+        root: str,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        keep_days: float = DEFAULT_KEEP_DAYS,
+    ):
+        self.root = root
+        self.min_interval = min_interval
+        self.keep_days = keep_days
+        self._lock = threading.RLock()
+        self._stamps: dict[str, list[int]] = {}  # symbol → sorted ts_ms
+        self._last_prune = 0.0
+
+    # ─── paths / index ────────────────────────────────────────────────────────
+
+    def _path(self, symbol: str, ts_ms: int) -> str:
+        return os.path.join(self.root, symbol, f"{ts_ms}.npz")
+
+    def _index(self, symbol: str) -> list[int]:
+        """Sorted snapshot timestamps of symbol. Caller holds the lock."""
+        if symbol not in self._stamps:
+            d = os.path.join(self.root, symbol)
+            names = os.listdir(d) if os.path.isdir(d) else []
+            self._stamps[symbol] = sorted(
+                int(n[:-4]) for n in names if n.endswith(".npz") and n[:-4].isdigit()
+            )
+        return self._stamps[symbol]
+
+    # ─── write ────────────────────────────────────────────────────────────────
+
+    def write(
+        self,
+        symbol: str,
+        chain: pd.DataFrame,
+        ts: Optional[TimeLike] = None,
+        force: bool = False,
+    ) -> Optional[datetime.datetime]:
+        """
+        Store one chain as a snapshot. Returns its timestamp, or None when
+        skipped — empty chain, or one was stored less than min_interval ago
+        (unless force). Runs prune() first when the last one was over
+        PRUNE_EVERY ago.
+        """
+        if chain is None or chain.empty or "Strike" not in chain:
+            return None
+        symbol = symbol.upper()
+        ts_ms = _to_ms(time.time() if ts is None else ts)
+
+        with self._lock:
+            if time.time() - self._last_prune >= PRUNE_EVERY:
+                self.prune()
+            stamps = self._index(symbol)
+            if not force and stamps and 0 <= ts_ms - stamps[-1] < self.min_interval * 1000:
+                return None
+
+            arrays = {}
+            for col in chain.columns:
+                if col in _CODED:
+                    values, codes = np.unique(chain[col].to_numpy(dtype=str), return_inverse=True)
+                    arrays[f"__values_{col}"] = values
+                    arrays[col] = codes.astype(np.int32)
+                elif pd.api.types.is_numeric_dtype(chain[col]):
+                    arrays[col] = chain[col].to_numpy()
+            path = self._path(symbol, ts_ms)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, path)
+            if ts_ms not in stamps:
+                bisect.insort(stamps, ts_ms)
+        return _from_ms(ts_ms)
+
+    # ─── read ─────────────────────────────────────────────────────────────────
+
+    def _read(self, symbol: str, ts_ms: int) -> pd.DataFrame:
+        with np.load(self._path(symbol, ts_ms)) as z:
+            cols = {}
+            for k in z.files:
+                if k.startswith("__values_"):
+                    continue
+                cols[k] = z[f"__values_{k}"][z[k]] if f"__values_{k}" in z.files else z[k]
+        return pd.DataFrame(cols)
+
+    def snapshots(self, symbol: str) -> list[datetime.datetime]:
+        """Timestamps of every stored snapshot of symbol, oldest first."""
+        with self._lock:
+            return [_from_ms(t) for t in self._index(symbol.upper())]
+
+    def _pick(self, symbol: str, upto_ms: Optional[int]) -> Optional[tuple]:
+        symbol = symbol.upper()
+        with self._lock:
+            stamps = self._index(symbol)
+            i = len(stamps) if upto_ms is None else bisect.bisect_right(stamps, upto_ms)
+            if i == 0:
+                return None
+            return _from_ms(stamps[i - 1]), self._read(symbol, stamps[i - 1])
+
+    def latest(self, symbol: str) -> Optional[tuple[datetime.datetime, pd.DataFrame]]:
+        """Most recent snapshot as (timestamp, chain), or None."""
+        return self._pick(symbol, None)
+
+    def as_of(
+        self, symbol: str, ts: TimeLike
+    ) -> Optional[tuple[datetime.datetime, pd.DataFrame]]:
+        """The chain as last stored at or before ts, or None."""
+        return self._pick(symbol, _to_ms(ts))
+
+    def pcr_trend(self, symbol: str, t0: TimeLike, t1: TimeLike) -> pd.Series:
+        """Put/call OI ratio per snapshot (all expiries) over [t0, t1]."""
+        symbol = symbol.upper()
+        lo, hi = _to_ms(t0), _to_ms(t1)
+        out = {}
+        with self._lock:
+            for ts_ms in [t for t in self._index(symbol) if lo <= t <= hi]:
+                oi = self._read(symbol, ts_ms).groupby("OptionType")["OpenInterest"].sum()
+                ce = oi.get("CE", 0)
+                out[_from_ms(ts_ms)] = oi.get("PE", 0) / ce if ce else np.nan
+        return pd.Series(out, dtype=float, name="PCR")
+
+    # ─── housekeeping ─────────────────────────────────────────────────────────
+
+    def prune(self, keep_days: Optional[float] = None) -> int:
+        """
+        Delete snapshots older than keep_days (default: the store's), and
+        symbol directories left empty. Returns files removed.
+        """
+        keep_days = self.keep_days if keep_days is None else keep_days
+        cutoff = _to_ms(time.time() - keep_days * 86400)
+        removed = 0
+        with self._lock:
+            self._last_prune = time.time()
+            if not os.path.isdir(self.root):
+                return 0
+            for sym in os.listdir(self.root):
+                d = os.path.join(self.root, sym)
+                if not os.path.isdir(d):
+                    continue
+                for name in os.listdir(d):
+                    stem = name.split(".")[0]
+                    if stem.isdigit() and int(stem) < cutoff:
+                        os.remove(os.path.join(d, name))
+                        removed += name.endswith(".npz")
+                self._stamps.pop(sym, None)
+                if not os.listdir(d):
+                    os.rmdir(d)
+        if removed:
+            logger.info("chain_store: pruned %d snapshots older than %g days", removed, keep_days)
+        return removed
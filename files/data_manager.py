@@ -15,6 +15,9 @@ import pandas as pd
 from pathlib import Path
 from typing import Optional, Tuple
 
+from chain_store import ChainStore
+from nse_pool import NSEPool, get_nse_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,11 +26,9 @@ logger = logging.getLogger(__name__)
 NSE_BULK_URL = "https://archives.nseindia.com/content/equities/bulk.csv"
 NSE_BLOCK_URL = "https://archives.nseindia.com/content/equities/block.csv"
 
-# Option chain v3 API (working as of 2025)
-NSE_OC_CONTRACT_INFO = (
-    "https://www.nseindia.com/api/option-chain-contract-info?symbol={symbol}"
-)
-NSE_OC_V3_URL = "https://www.nseindia.com/api/option-chain-v3?type={oc_type}&symbol={symbol}&expiry={expiry}"
+# Option chain v3 API (working as of 2025) — paths on the shared NSEPool (nse_pool.py)
+NSE_OC_CONTRACT_INFO = "/api/option-chain-contract-info?symbol={symbol}"
+NSE_OC_V3_URL = "/api/option-chain-v3?type={oc_type}&symbol={symbol}&expiry={expiry}"
 NSE_OC_REFERER = "https://www.nseindia.com/option-chain"
 
 # Index symbols → type=Indices; everything else → type=Equities
@@ -49,6 +50,8 @@ NSE_HEADERS = {
     "Referer": NSE_OC_REFERER,
 }
 
+NSE_EXPIRY_WORKERS = 3
+
 
 class DataManager:
     """
@@ -62,8 +65,14 @@ class DataManager:
         options_folder: str = "./data/options",
         deals_folder: str = "./data/deals",
         price_folder: str = "./data/price",
+        nse_pool: Optional[NSEPool] = None,
+        chain_store: Optional[ChainStore] = None,
     ):
         self.data_folder = Path(data_folder)
+        # Process-wide NSE session unless one is injected (tests: a stub server)
+        self.nse = nse_pool or get_nse_pool()
+        # Intraday chain snapshots (OI change, PCR trend, prior-day baseline)
+        self.chains = chain_store or ChainStore(str(self.data_folder / "chain_store"))
         self.options_folder = Path(options_folder)
         self.deals_folder = Path(deals_folder)
         self.price_folder = Path(price_folder)
@@ -152,9 +161,11 @@ class DataManager:
 
         Flow (proven working pattern):
           1. GET /option-chain page with allow_redirects=False → grabs session cookies
+             (once per process via the shared NSEPool; refreshed when stale)
           2. GET /api/option-chain-contract-info → full expiry date list
-          3. GET /api/option-chain-v3 for EVERY expiry (sequential, rate-limited)
+          3. GET /api/option-chain-v3 for EVERY expiry (concurrent, rate-limited)
           4. Merge all expiries → save to ./data/options/{SYMBOL}_options_{DATE}.csv
+             and add a snapshot to the chain store
 
         Returns (DataFrame, status_message).
         """
@@ -162,16 +173,9 @@ class DataManager:
         self.last_download_errors = []
         self.last_download_success = []
 
+        # Step 2 — expiry list (shared session: warms cookies only if stale)
         try:
-            session, header, cookies = self._make_nse_session()
-        except Exception as e:
-            err = f"NSE session init failed: {e}"
-            self.last_download_errors.append(err)
-            return None, err
-
-        # Step 2 — expiry list
-        try:
-            expiries = self._get_expiry_dates(session, header, cookies, symbol)
+            expiries = self._get_expiry_dates(symbol)
         except Exception as e:
             err = f"Could not fetch expiry list for {symbol}: {e}"
             self.last_download_errors.append(err)
@@ -185,21 +189,25 @@ class DataManager:
         chain_type = "Indices" if symbol in NSE_INDEX_SYMBOLS else "Equities"
         logger.info(f"{symbol} ({chain_type}): {len(expiries)} expiries")
 
-        # Step 3 — fetch each expiry (sequential + 0.4 s delay = ~150 req/min, well within NSE limit)
+        # Step 3 — fetch expiries concurrently; the client's token bucket keeps
+        # the combined request rate within NSE's limit
+        from concurrent.futures import ThreadPoolExecutor
+
         all_rows: list[dict] = []
         failed: list[str] = []
-        for expiry in expiries:
-            try:
-                raw = self._fetch_chain_for_expiry(
-                    session, header, cookies, symbol, expiry, chain_type
-                )
-                rows = self._rows_from_chain(raw, symbol, expiry)
-                all_rows.extend(rows)
-                logger.debug(f"  {symbol} {expiry}: {len(rows)} legs")
-            except Exception as e:
-                failed.append(f"{expiry}: {e}")
-                logger.warning(f"  Failed {symbol} {expiry}: {e}")
-            time.sleep(0.4)  # polite rate limit
+        with ThreadPoolExecutor(max_workers=NSE_EXPIRY_WORKERS) as pool:
+            futures = [
+                pool.submit(self._fetch_chain_for_expiry, symbol, expiry, chain_type)
+                for expiry in expiries
+            ]
+            for expiry, future in zip(expiries, futures):
+                try:
+                    rows = self._rows_from_chain(future.result(), symbol, expiry)
+                    all_rows.extend(rows)
+                    logger.debug(f"  {symbol} {expiry}: {len(rows)} legs")
+                except Exception as e:
+                    failed.append(f"{expiry}: {e}")
+                    logger.warning(f"  Failed {symbol} {expiry}: {e}")
 
         if not all_rows:
             err = f"No data parsed for {symbol}. Failures: {failed[:3]}"
@@ -211,6 +219,10 @@ class DataManager:
         today_str = datetime.date.today().strftime("%Y%m%d")
         save_path = self.options_folder / f"{symbol}_options_{today_str}.csv"
         df.to_csv(save_path, index=False)
+        try:
+            self.chains.write(symbol, df)
+        except Exception as e:  # never fail a download over the snapshot
+            logger.warning(f"Snapshot of {symbol} not stored: {e}")
 
         msg = (
             f"{symbol}: {len(df):,} rows, {len(expiries)-len(failed)}/{len(expiries)} expiries"
@@ -228,21 +240,20 @@ class DataManager:
         self,
         symbols: list[str],
         max_workers: int = 3,
-        inter_symbol_delay: float = 1.5,
+        inter_symbol_delay: float = 0.0,
         progress_callback=None,
     ) -> dict[str, Tuple[Optional[pd.DataFrame], str]]:
         """
         Download options chains for a list of symbols concurrently.
 
         Uses ThreadPoolExecutor with `max_workers` parallel threads.
-        Each thread has its own NSE session (separate cookie jar).
-        A per-symbol delay staggers session creation to avoid simultaneous
-        cookie requests triggering NSE rate limiting.
+        All threads share self.nse's warmed session, and its token bucket
+        paces every request, so no start-time staggering is needed.
 
         Args:
             symbols:              List of NSE symbols.
-            max_workers:          Parallel threads (keep ≤ 4 to stay under NSE rate limit).
-            inter_symbol_delay:   Seconds to stagger thread start times.
+            max_workers:          Parallel threads.
+            inter_symbol_delay:   Optional extra seconds to stagger thread starts.
             progress_callback:    Optional fn(symbol, status, completed, total).
 
         Returns:
@@ -260,12 +271,15 @@ class DataManager:
         def _worker(
             sym: str, stagger_idx: int
         ) -> Tuple[str, Optional[pd.DataFrame], str]:
-            # Stagger session creation so not all threads hammer NSE simultaneously
-            time.sleep(stagger_idx * inter_symbol_delay)
+            if inter_symbol_delay:
+                time.sleep(stagger_idx * inter_symbol_delay)
             dm = DataManager(
+                data_folder=str(self.data_folder),
                 options_folder=str(self.options_folder),
                 deals_folder=str(self.deals_folder),
                 price_folder=str(self.price_folder),
+                nse_pool=self.nse,
+                chain_store=self.chains,
             )
             df, msg = dm.download_options_chain(sym)
             return sym, df, msg
@@ -321,65 +335,18 @@ class DataManager:
                 df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
         return df
 
-    # ─── working NSE session (Firefox headers + allow_redirects=False) ──────────
-
-    def _make_nse_session(self) -> tuple:
-        """
-        Build a requests.Session with NSE cookies.
-        Key: use allow_redirects=False on the Referer page — this is what makes
-        NSE hand over the real session cookie instead of a bot-detection redirect.
-        Returns (session, cookies_dict).
-        """
-        session = requests.Session()
-        header = {
-            "Host": "www.nseindia.com",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:82.0) "
-                "Gecko/20100101 Firefox/82.0"
-            ),
-            "Accept": (
-                "text/html,application/xhtml+xml,application/xml;"
-                "q=0.9,image/webp,*/*;q=0.8"
-            ),
-            "Accept-Language": "en-US,en;q=0.5",
-            "Connection": "keep-alive",
-            "Referer": "https://www.nseindia.com/option-chain",
-        }
-        resp = session.get(
-            header["Referer"],
-            headers=header,
-            allow_redirects=False,
-            timeout=15,
-        )
-        cookies = dict(resp.cookies)
-        return session, header, cookies
+    # ─── NSE option-chain endpoints (via the shared NSEPool) ──────────────────
 
-    def _get_expiry_dates(
-        self, session, header: dict, cookies: dict, symbol: str
-    ) -> list[str]:
+    def _get_expiry_dates(self, symbol: str) -> list[str]:
         """
         Fetch all expiry dates for a symbol via the contract-info endpoint.
         Returns list of expiry date strings e.g. ["27-Mar-2025", "03-Apr-2025", ...]
         """
-        url = (
-            f"https://www.nseindia.com/api/option-chain-contract-info"
-            f"?symbol={symbol}"
-        )
-        resp = session.get(
-            url,
-            headers=header,
-            cookies=cookies,
-            allow_redirects=False,
-            timeout=15,
-        )
-        data = resp.json()
+        data = self.nse.get_json(NSE_OC_CONTRACT_INFO.format(symbol=symbol), timeout=15)
         return data.get("expiryDates", [])
 
     def _fetch_chain_for_expiry(
         self,
-        session,
-        header: dict,
-        cookies: dict,
         symbol: str,
         expiry: str,
         chain_type: str = "Indices",
@@ -389,18 +356,8 @@ class DataManager:
         chain_type: "Indices" for index symbols, "Equities" for stocks.
         Returns raw list of row dicts.
         """
-        url = (
-            f"https://www.nseindia.com/api/option-chain-v3"
-            f"?type={chain_type}&symbol={symbol}&expiry={expiry}"
-        )
-        resp = session.get(
-            url,
-            headers=header,
-            cookies=cookies,
-            allow_redirects=False,
-            timeout=20,
-        )
-        data = resp.json()
+        url = NSE_OC_V3_URL.format(oc_type=chain_type, symbol=symbol, expiry=expiry)
+        data = self.nse.get_json(url, timeout=20)
         return data.get("data", []) or data.get("records", {}).get("data", []) or []
 
     @staticmethod
@@ -838,16 +795,36 @@ class DataManager:
     def load_all_options_history(
         self, symbol: str, max_days: int = 10
     ) -> dict[datetime.date, pd.DataFrame]:
-        """Load all available options CSVs for a symbol (up to max_days)."""
-        files = self.scan_options_files(symbol)[:max_days]
-        history = {}
-        for f in files:
+        """
+        One chain per day for the newest max_days days: the day's options CSV,
+        or else the day's last stored snapshot.
+        """
+        csvs = {}
+        for f in self.scan_options_files(symbol):
             m = re.search(r"_(\d{8})\.csv$", f.name)
             if m:
-                d = datetime.datetime.strptime(m.group(1), "%Y%m%d").date()
-                history[d] = pd.read_csv(f)
+                csvs.setdefault(datetime.datetime.strptime(m.group(1), "%Y%m%d").date(), f)
+        snaps = {ts.date(): ts for ts in self.chains.snapshots(symbol)}  # last per day
+
+        history = {}
+        for d in sorted(csvs.keys() | snaps.keys(), reverse=True)[:max_days]:
+            if d in csvs:
+                history[d] = pd.read_csv(csvs[d])
+            else:
+                history[d] = self.chains.as_of(symbol, snaps[d])[1]
         return history
 
+    def load_prior_day_chain(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Last stored snapshot from before today (long format), or None."""
+        midnight = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        snap = self.chains.as_of(symbol, midnight - datetime.timedelta(microseconds=1))
+        return None if snap is None else snap[1]
+
+    def intraday_pcr(self, symbol: str) -> pd.Series:
+        """Put/call OI ratio of each of today's stored snapshots."""
+        midnight = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        return self.chains.pcr_trend(symbol, midnight, datetime.datetime.now())
+
     # ─── demo data generation ─────────────────────────────────────────────────
 
     def _generate_demo_options(self, symbol: str = "SBIN") -> pd.DataFrame:
@@ -17,13 +17,21 @@ Key levels derived from GEX:
   - GEX Zero Cross   : same as HVL, key inflection
 
 Per-expiry analysis surfaces which expiry is driving the most gamma pressure.
+
+Results are memoised by chain content: an unchanged chain (same spot and
+parameters) returns the cached GEXResult, and when only some expiries
+changed only those are recomputed. See _GEXMemo below.
 """
 
 from __future__ import annotations
+import datetime
+import hashlib
 import math
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Optional
 
 
@@ -46,10 +54,21 @@ def _bs_gamma(S: float, K: float, T: float, r: float, sigma: float) -> float:
         return 0.0
 
 
+def _bs_gamma_vec(
+    S: float, K: np.ndarray, T: float, r: float, sigma: np.ndarray
+) -> np.ndarray:
+    """_bs_gamma over arrays of strikes / IVs; 0 wherever the scalar returns 0."""
+    if T <= 0 or S <= 0:
+        return np.zeros(len(K))
+    with np.errstate(all="ignore"):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
+        pdf_d1 = np.exp(-0.5 * d1**2) / math.sqrt(2 * math.pi)
+        g = pdf_d1 / (S * sigma * math.sqrt(T))
+    return np.where((sigma <= 0) | (K <= 0) | ~np.isfinite(g), 0.0, g)
+
+
 def _days_to_expiry(expiry_str: str) -> float:
     """Parse NSE expiry date string and return calendar days as float."""
-    import datetime
-
     today = datetime.date.today()
     for fmt in ("%d-%b-%Y", "%d-%b-%y", "%Y-%m-%d", "%d/%m/%Y"):
         try:
@@ -175,6 +194,66 @@ NSE_LOT_SIZES: dict[str, int] = {
 DEFAULT_LOT_SIZE = 500
 
 
+# ─── memo cache ───────────────────────────────────────────────────────────────
+
+
+class _GEXMemo:
+    """
+    Process-wide LRU memo shared by every GEXCalculator instance, so it
+    survives Streamlit reruns (which build a new calculator each time).
+
+    Two levels, both keyed by a content hash — never by object identity:
+      results   chain hash + spot/params/today → GEXResult
+      expiries  one expiry's (Strike, OptionType, OI, IV) + T/params → ExpiryGEX
+
+    Cached GEXResults and strikes_df frames are shared: treat them as read-only.
+    """
+
+    def __init__(self, max_results: int = 32, max_expiries: int = 512):
+        self.max_results = max_results
+        self.max_expiries = max_expiries
+        self.results: OrderedDict = OrderedDict()
+        self.expiries: OrderedDict = OrderedDict()
+        self.hits = {"results": 0, "expiries": 0}
+        self.misses = {"results": 0, "expiries": 0}
+        self._lock = threading.Lock()
+
+    def get(self, level: str, key):
+        store = getattr(self, level)
+        with self._lock:
+            if key in store:
+                store.move_to_end(key)
+                self.hits[level] += 1
+                return store[key]
+            self.misses[level] += 1
+            return None
+
+    def put(self, level: str, key, value) -> None:
+        store = getattr(self, level)
+        limit = self.max_results if level == "results" else self.max_expiries
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > limit:
+                store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.results.clear()
+            self.expiries.clear()
+            self.hits = {"results": 0, "expiries": 0}
+            self.misses = {"results": 0, "expiries": 0}
+
+
+GEX_MEMO = _GEXMemo()
+
+
+def _frame_hash(df: pd.DataFrame) -> str:
+    h = hashlib.sha1(str(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
 # ─── main calculator ──────────────────────────────────────────────────────────
 
 
@@ -189,6 +268,9 @@ class GEXCalculator:
         calc = GEXCalculator(options_df, symbol="NIFTY", spot=22000)
         result = calc.compute()
         # result.first_expiry, result.highest_gex_expiry, result.all_strikes, ...
+
+    compute() is memoised in GEX_MEMO by chain content; pass use_cache=False
+    to force a fresh computation.
     """
 
     RISK_FREE = 0.065  # RBI repo rate proxy
@@ -202,6 +284,7 @@ class GEXCalculator:
         risk_free: float = RISK_FREE,
         min_iv: float = 0.01,  # floor IV to avoid BS blowup
         max_dte_days: int = 120,  # ignore LEAPs / very far expiries
+        use_cache: bool = True,
     ):
         self.options_df = options_df.copy()
         self.symbol = symbol.upper()
@@ -210,6 +293,10 @@ class GEXCalculator:
         self.risk_free = risk_free
         self.min_iv = min_iv
         self.max_dte = max_dte_days
+        self.use_cache = use_cache
+
+    def _params(self) -> tuple:
+        return (self.spot, self.risk_free, self.lot_size, self.min_iv)
 
     def _infer_spot(self) -> float:
         """Estimate spot from UnderlyingValue column or ATM strike."""
@@ -227,6 +314,19 @@ class GEXCalculator:
         return 0.0
 
     def compute(self) -> GEXResult:
+        if not self.use_cache:
+            return self._compute()
+        key = (
+            self.symbol, self._params(), self.max_dte,
+            datetime.date.today(), _frame_hash(self.options_df),
+        )
+        result = GEX_MEMO.get("results", key)
+        if result is None:
+            result = self._compute()
+            GEX_MEMO.put("results", key, result)
+        return result
+
+    def _compute(self) -> GEXResult:
         df = self._prepare()
         if df.empty:
             return GEXResult(
@@ -248,28 +348,11 @@ class GEXCalculator:
             if dte_days > self.max_dte:
                 continue
 
-            strike_gex = self._compute_strike_gex(grp, dte_years)
-            if strike_gex.empty:
+            exp = self._expiry_gex(str(expiry), grp, dte_years, dte_days)
+            if exp is None:
                 continue
-
-            total_abs = float(strike_gex["Net_GEX"].abs().sum())
-            net = float(strike_gex["Net_GEX"].sum())
-            total_abs_gex += total_abs
-
-            cr, ps, hvl = self._key_levels(strike_gex)
-
-            expiry_results.append(
-                ExpiryGEX(
-                    expiry=str(expiry),
-                    dte_days=dte_days,
-                    strikes_df=strike_gex,
-                    total_gex=total_abs,
-                    net_gex=net,
-                    call_resistance=cr,
-                    put_support=ps,
-                    hvl=hvl,
-                )
-            )
+            total_abs_gex += exp.total_gex
+            expiry_results.append(exp)
 
         # Sort by DTE ascending
         expiry_results.sort(key=lambda e: e.dte_days)
@@ -294,6 +377,37 @@ class GEXCalculator:
 
     # ── internal helpers ───────────────────────────────────────────────────────
 
+    def _expiry_gex(
+        self, expiry: str, grp: pd.DataFrame, dte_years: float, dte_days: int
+    ) -> Optional[ExpiryGEX]:
+        """One expiry's ExpiryGEX, reused from GEX_MEMO if its chain is unchanged."""
+        key = None
+        if self.use_cache:
+            cols = grp[["Strike", "OptionType", "OpenInterest", "IV"]]
+            key = (expiry, dte_years, self._params(), _frame_hash(cols))
+            cached = GEX_MEMO.get("expiries", key)
+            if cached is not None:
+                # Fresh container: compute() sets gex_pct_of_total per result
+                return replace(cached) if cached is not False else None
+
+        strike_gex = self._compute_strike_gex(grp, dte_years)
+        exp = None
+        if not strike_gex.empty:
+            cr, ps, hvl = self._key_levels(strike_gex)
+            exp = ExpiryGEX(
+                expiry=expiry,
+                dte_days=dte_days,
+                strikes_df=strike_gex,
+                total_gex=float(strike_gex["Net_GEX"].abs().sum()),
+                net_gex=float(strike_gex["Net_GEX"].sum()),
+                call_resistance=cr,
+                put_support=ps,
+                hvl=hvl,
+            )
+        if key is not None:
+            GEX_MEMO.put("expiries", key, replace(exp) if exp is not None else False)
+        return exp
+
     def _prepare(self) -> pd.DataFrame:
         df = self.options_df.copy()
         for col in ["Strike", "OpenInterest", "IV"]:
@@ -319,7 +433,62 @@ class GEXCalculator:
         return df.reset_index(drop=True)
 
     def _compute_strike_gex(self, grp: pd.DataFrame, T: float) -> pd.DataFrame:
-        """Compute net GEX per strike for one expiry group."""
+        """Compute net GEX per strike for one expiry group (one array pass)."""
+        S = self.spot
+        r = self.risk_free
+        L = self.lot_size
+
+        if grp.empty:
+            return pd.DataFrame()
+
+        # Strike × {CE, PE}: summed OI, mean IV (min_iv where a side is absent)
+        strikes, inv = np.unique(grp["Strike"].to_numpy(dtype=float), return_inverse=True)
+        oi = grp["OpenInterest"].to_numpy(dtype=float)
+        iv = grp["IV"].to_numpy(dtype=float)
+        opt = grp["OptionType"].to_numpy()
+
+        def _side(opt_type: str) -> tuple[np.ndarray, np.ndarray]:
+            m = opt == opt_type
+            n = len(strikes)
+            count = np.bincount(inv[m], minlength=n)
+            side_oi = np.bincount(inv[m], weights=oi[m], minlength=n)
+            iv_sum = np.bincount(inv[m], weights=iv[m], minlength=n)
+            side_iv = np.full(n, self.min_iv)
+            np.divide(iv_sum, count, out=side_iv, where=count > 0)
+            return side_oi, side_iv
+
+        ce_oi, ce_iv = _side("CE")
+        pe_oi, pe_iv = _side("PE")
+
+        ce_gamma = _bs_gamma_vec(S, strikes, T, r, ce_iv)
+        pe_gamma = _bs_gamma_vec(S, strikes, T, r, pe_iv)
+
+        # GEX convention: dealers short calls (long gamma) → positive
+        #                 dealers long puts  (short gamma) → negative
+        # ÷1e6 gives M-range values (avoids G/T prefix on axis)
+        gex_call = +ce_gamma * ce_oi * L * S * S / 1e6
+        gex_put = -pe_gamma * pe_oi * L * S * S / 1e6
+
+        df = pd.DataFrame(
+            {
+                "Strike": strikes,
+                "GEX_Call": gex_call,
+                "GEX_Put": gex_put,
+                "Net_GEX": gex_call + gex_put,
+                "CE_OI": ce_oi,
+                "PE_OI": pe_oi,
+                "CE_IV": ce_iv * 100,
+                "PE_IV": pe_iv * 100,
+                "CE_Gamma": ce_gamma,
+                "PE_Gamma": pe_gamma,
+            }
+        )
+        # Cumulative GEX profile (sorted by strike desc → top to bottom like the chart)
+        df["Cumulative_GEX"] = df["Net_GEX"].cumsum()
+        return df
+
+    def _compute_strike_gex_per_row(self, grp: pd.DataFrame, T: float) -> pd.DataFrame:
+        """Reference per-strike _compute_strike_gex() — kept for parity tests."""
         S = self.spot
         r = self.risk_free
         L = self.lot_size
@@ -337,9 +506,6 @@ class GEXCalculator:
             ce_gamma = _bs_gamma(S, float(strike), T, r, ce_iv)
             pe_gamma = _bs_gamma(S, float(strike), T, r, pe_iv)
 
-            # GEX convention: dealers short calls (long gamma) → positive
-            #                 dealers long puts  (short gamma) → negative
-            # ÷1e6 gives M-range values (avoids G/T prefix on axis)
             gex_call = +ce_gamma * ce_oi * L * S * S / 1e6
             gex_put = -pe_gamma * pe_oi * L * S * S / 1e6
 
@@ -362,7 +528,6 @@ class GEXCalculator:
             return pd.DataFrame()
 
         df = pd.DataFrame(rows).sort_values("Strike").reset_index(drop=True)
-        # Cumulative GEX profile (sorted by strike desc → top to bottom like the chart)
         df["Cumulative_GEX"] = df["Net_GEX"].cumsum()
         return df
 
@@ -401,12 +566,12 @@ class GEXCalculator:
         cumsum = df_asc["Net_GEX"].cumsum().values
         strikes = df_asc["Strike"].values
         hvl = None
-        for i in range(1, len(cumsum)):
-            if cumsum[i - 1] * cumsum[i] <= 0:
-                # Linear interpolation between bracketing strikes
-                w = abs(cumsum[i - 1]) / (abs(cumsum[i - 1]) + abs(cumsum[i]) + 1e-12)
-                hvl = float(strikes[i - 1] * (1 - w) + strikes[i] * w)
-                break
+        cross = np.flatnonzero(cumsum[:-1] * cumsum[1:] <= 0)
+        if len(cross):
+            i = cross[0] + 1
+            # Linear interpolation between bracketing strikes
+            w = abs(cumsum[i - 1]) / (abs(cumsum[i - 1]) + abs(cumsum[i]) + 1e-12)
+            hvl = float(strikes[i - 1] * (1 - w) + strikes[i] * w)
 
         return cr, ps, hvl
 
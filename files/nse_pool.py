@@ -0,0 +1,160 @@
+"""
+NSEPool — one warmed NSE session shared by every DataManager in the process.
+
+Cookies come from the option-chain page fetched with allow_redirects=False
+(the proven pattern) and are refreshed only when older than cookie_ttl or
+when NSE answers 401/403 / HTML. Every request — warm-ups included — takes
+a token from one bucket, so concurrent expiry and watchlist downloads
+together stay under NSE's rate limit.
+
+get_json() re-warms and retries once on stale cookies; the status of the
+retry is checked too, so an error page is never parsed as data.
+
+base_url is configurable so tests can point the pool at a local stub
+server (tests/test_data_manager.py).
+"""
+
+from __future__ import annotations
+import time
+import logging
+import threading
+import requests
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+NSE_BASE_URL = "https://www.nseindia.com"
+
+NSE_HEADERS = {
+    "Host": "www.nseindia.com",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:82.0) Gecko/20100101 Firefox/82.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+    "Referer": f"{NSE_BASE_URL}/option-chain",
+}
+
+# Shared limits — all DataManager instances / threads combined
+NSE_RATE_PER_SEC = 3.0
+NSE_BURST = 3
+NSE_COOKIE_TTL = 240.0  # seconds before the warm-up cookies are refreshed
+
+
+class TokenBucket:
+    """`rate` tokens/s, at most `burst` banked; acquire() sleeps outside the lock."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0 or burst < 1:
+            raise ValueError("TokenBucket needs rate > 0 and burst >= 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def _stale(resp: requests.Response) -> bool:
+    """401/403, or an HTML page instead of JSON → NSE no longer accepts our cookies."""
+    if resp.status_code in (401, 403):
+        return True
+    return resp.status_code in (200, 302) and resp.text.lstrip().startswith("<")
+
+
+class NSEPool:
+    """Shared NSE session + cookie cache + rate limiter."""
+
+    def __init__(
+        self,
+        base_url: str = NSE_BASE_URL,
+        rate: float = NSE_RATE_PER_SEC,
+        burst: int = NSE_BURST,
+        cookie_ttl: float = NSE_COOKIE_TTL,
+        pool_size: int = 6,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cookie_ttl = cookie_ttl
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cookies: Optional[dict] = None
+        self._cookies_at = 0.0
+        self._lock = threading.Lock()
+        self.warmups = 0  # cookie warm-ups performed (tests / diagnostics)
+
+    def cookies(self) -> dict:
+        """Current cookies, warming the session first if absent or expired."""
+        with self._lock:
+            if self._cookies is None or time.monotonic() - self._cookies_at > self.cookie_ttl:
+                self.bucket.acquire()
+                resp = self.session.get(
+                    f"{self.base_url}/option-chain",
+                    headers=NSE_HEADERS,
+                    allow_redirects=False,  # do NOT follow redirects
+                    timeout=15,
+                )
+                self._cookies = dict(resp.cookies)  # resp.cookies, NOT session.cookies
+                self._cookies_at = time.monotonic()
+                self.warmups += 1
+                logger.debug("NSE session warmed (%d cookies)", len(self._cookies))
+            return self._cookies
+
+    def invalidate(self, used: Optional[dict] = None) -> None:
+        """
+        Drop the cookies so the next request re-warms. With `used`, only if
+        they are still the ones that failed — concurrent threads that all hit
+        a 403 trigger one warm-up, not one each.
+        """
+        with self._lock:
+            if used is None or self._cookies is used:
+                self._cookies = None
+
+    def get_json(self, path: str, timeout: float = 20):
+        """
+        Throttled GET of an NSE API path. Stale cookies → one re-warm and
+        retry; any non-200 or HTML answer after that raises.
+        """
+        for attempt in (1, 2):
+            cookies = self.cookies()
+            self.bucket.acquire()
+            resp = self.session.get(
+                f"{self.base_url}{path}",
+                headers=NSE_HEADERS,
+                cookies=cookies,
+                allow_redirects=False,
+                timeout=timeout,
+            )
+            if attempt == 1 and _stale(resp):
+                logger.info("NSE cookies rejected (HTTP %d) — re-warming", resp.status_code)
+                self.invalidate(cookies)
+                continue
+            resp.raise_for_status()
+            if resp.status_code != 200 or _stale(resp):
+                raise ValueError(f"NSE answered HTTP {resp.status_code} / HTML for {path}")
+            return resp.json()
+
+
+_POOL: Optional[NSEPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_nse_pool() -> NSEPool:
+    """Process-wide NSEPool shared by every DataManager."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = NSEPool()
+        return _POOL
@@ -0,0 +1,66 @@
+"""
+tests/test_chain_store.py
+─────────────────────────
+Offline tests for the option-chain snapshot store (chain_store.py).
+
+Run (from files/):
+    pytest tests/test_chain_store.py -v
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import time
+
+import pandas as pd
+
+from chain_store import ChainStore
+
+
+def _chain(oi=10.0, expiries=("02-Jan-2025", "09-Jan-2025")):
+    rows = [
+        {"Symbol": "SBIN", "Strike": 100.0 + k, "Expiry": exp, "OptionType": t,
+         "OpenInterest": oi + k * (2 if t == "PE" else 1), "IV": 20.0}
+        for exp in expiries for k in range(3) for t in ("CE", "PE")
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_round_trip_and_throttle(tmp_path):
+    store = ChainStore(str(tmp_path), min_interval=300)
+    chain = _chain()
+    assert store.write("sbin", chain) is not None
+    assert store.write("SBIN", _chain(oi=99.0)) is None  # within min_interval
+
+    _, got = store.latest("SBIN")
+    assert list(got.columns) == list(chain.columns)
+    pd.testing.assert_frame_equal(got, chain, check_dtype=False)
+
+
+def test_as_of_and_pcr_trend(tmp_path):
+    store = ChainStore(str(tmp_path))
+    now = datetime.datetime.now().replace(microsecond=0)
+    store.write("SBIN", _chain(oi=10.0), ts=now - datetime.timedelta(hours=2))
+    store.write("SBIN", _chain(oi=50.0), ts=now)
+
+    ts, prior = store.as_of("SBIN", now - datetime.timedelta(hours=1))
+    assert ts == now - datetime.timedelta(hours=2)
+    assert prior["OpenInterest"].min() == 10.0
+    assert store.as_of("SBIN", now - datetime.timedelta(days=1)) is None
+
+    pcr = store.pcr_trend("SBIN", now - datetime.timedelta(days=1), now)
+    assert len(pcr) == 2 and (pcr > 1).all()
+
+
+def test_prune_removes_old_snapshots_and_empty_dirs(tmp_path):
+    store = ChainStore(str(tmp_path), keep_days=30)
+    old = time.time() - 40 * 86400
+    store.write("SBIN", _chain(), ts=old)
+    store.write("INFY", _chain(), ts=old)
+    store.write("SBIN", _chain(), ts=time.time())
+
+    assert store.prune() == 2
+    assert len(store.snapshots("SBIN")) == 1
+    assert store.latest("INFY") is None
+    assert not os.path.exists(tmp_path / "INFY")
@@ -0,0 +1,170 @@
+"""
+tests/test_data_manager.py
+──────────────────────────
+Offline tests for DataManager's NSE option-chain download against a local
+stub NSE server, through the shared NSEPool (nse_pool.py).
+
+The stub answers 403 to API calls without a cookie it issued, like NSE
+does, and can be told to fail particular expiries.
+
+Run (from files/):
+    pytest tests/test_data_manager.py -v
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from data_manager import DataManager
+from nse_pool import NSEPool
+
+
+class _StubNSE:
+    def __init__(self, expiries=("02-Jan-2025", "09-Jan-2025", "30-Jan-2025")):
+        self.expiries = list(expiries)
+        self.lock = threading.Lock()
+        self.valid: set[str] = set()
+        self.warmups = 0
+        self.failing: dict[str, int] = {}  # expiry → HTTP status it always answers
+
+
+def _handler(stub: _StubNSE):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, headers=()):
+            data = body.encode()
+            self.send_response(code)
+            for k, v in headers:
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/option-chain":
+                with stub.lock:
+                    stub.warmups += 1
+                    token = f"tok{stub.warmups}"
+                    stub.valid.add(token)
+                self._send(200, "<html>option chain</html>", [("Set-Cookie", f"nsit={token}")])
+                return
+
+            cookie = self.headers.get("Cookie", "")
+            tokens = {c.split("=", 1)[1] for c in cookie.split("; ") if c.startswith("nsit=")}
+            with stub.lock:
+                authorised = bool(tokens & stub.valid)
+            if not authorised:
+                self._send(403, "<html>Access Denied</html>")
+                return
+
+            if url.path == "/api/option-chain-contract-info":
+                self._send(200, json.dumps({"expiryDates": stub.expiries}))
+            elif url.path == "/api/option-chain-v3":
+                status = stub.failing.get(q["expiry"])
+                if status:
+                    self._send(status, "<html>error</html>")
+                    return
+                strike0 = 100 * (stub.expiries.index(q["expiry"]) + 1)
+                rows = [
+                    {
+                        "strikePrice": strike0 + k,
+                        "CE": {"openInterest": 10 + k, "impliedVolatility": 20.0,
+                               "underlyingValue": 150.0},
+                        "PE": {"openInterest": 20 + k, "impliedVolatility": 22.0},
+                    }
+                    for k in range(3)
+                ]
+                self._send(200, json.dumps({"data": rows}))
+            else:
+                self._send(404, "{}")
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    state = _StubNSE()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _manager(stub, tmp_path, **kw):
+    client = kw.pop("client", None) or NSEPool(base_url=stub.base_url, rate=100.0, burst=10)
+    return DataManager(
+        data_folder=str(tmp_path),
+        options_folder=str(tmp_path / "options"),
+        deals_folder=str(tmp_path / "deals"),
+        price_folder=str(tmp_path / "price"),
+        nse_pool=client,
+    )
+
+
+def test_download_merges_every_expiry(stub, tmp_path):
+    dm = _manager(stub, tmp_path)
+    df, msg = dm.download_options_chain("sbin")
+    assert len(df) == 3 * 3 * 2  # expiries × strikes × CE/PE
+    assert set(df["Expiry"]) == set(stub.expiries)
+    assert "3/3 expiries" in msg and dm.last_download_errors == []
+    assert len(list((tmp_path / "options").glob("SBIN_options_*.csv"))) == 1
+    assert stub.warmups == 1
+
+
+def test_stale_cookies_rewarm_and_error_status_is_a_failure(stub, tmp_path):
+    dm = _manager(stub, tmp_path)
+    dm.download_options_chain("SBIN")
+    stub.valid.clear()  # NSE drops the session
+    stub.failing = {stub.expiries[1]: 500}
+
+    df, msg = dm.download_options_chain("SBIN")
+    assert stub.warmups == 2  # one shared re-warm, not one per expiry
+    assert set(df["Expiry"]) == {stub.expiries[0], stub.expiries[2]}
+    assert "2/3 expiries (1 failed)" in msg
+
+    # 403 again after the re-warm: the retry's status is checked too
+    stub.failing = {stub.expiries[2]: 403}
+    df, msg = dm.download_options_chain("SBIN")
+    assert set(df["Expiry"]) == set(stub.expiries[:2])
+    assert "2/3 expiries (1 failed)" in msg
+
+
+def test_watchlist_threads_share_one_client(stub, tmp_path):
+    dm = _manager(stub, tmp_path)
+    results = dm.download_watchlist_chains(["SBIN", "INFY", "TCS"], max_workers=3)
+    assert all(df is not None for df, _ in results.values())
+    assert stub.warmups == 1
+
+
+def test_download_is_snapshotted_and_fills_history(stub, tmp_path):
+    dm = _manager(stub, tmp_path)
+    df, _ = dm.download_options_chain("SBIN")
+    ts, _ = dm.chains.latest("SBIN")
+    assert ts.date() == datetime.date.today()
+
+    # A stored chain from yesterday, with no CSV for that day
+    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+    dm.chains.write("SBIN", df.assign(OpenInterest=df["OpenInterest"] * 2), ts=yesterday, force=True)
+
+    history = dm.load_all_options_history("SBIN")
+    assert sorted(history) == [yesterday.date(), datetime.date.today()]
+    prior = dm.load_prior_day_chain("SBIN")
+    key = ["Expiry", "Strike", "OptionType"]
+    got = prior.sort_values(key).reset_index(drop=True)
+    want = df.sort_values(key).reset_index(drop=True)
+    assert (got["OpenInterest"] == want["OpenInterest"] * 2).all()
+    assert (got[key] == want[key]).all().all()
+
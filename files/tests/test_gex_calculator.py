@@ -0,0 +1,94 @@
+"""
+tests/test_gex_calculator.py
+────────────────────────────
+Offline tests for gex_calculator.py: the vectorised per-strike GEX against
+the per-strike reference loop, and the GEX_MEMO result / expiry caches.
+
+Run (from files/):
+    pytest tests/test_gex_calculator.py -v
+"""
+
+from __future__ import annotations
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gex_calculator import GEX_MEMO, GEXCalculator, _days_to_expiry
+
+SPOT = 800.0
+
+
+def _chain(n_expiries: int = 4, seed: int = 3) -> pd.DataFrame:
+    """Synthetic multi-expiry chain: duplicate rows, one-sided strikes, % IVs."""
+    rng = np.random.RandomState(seed)
+    today = datetime.date.today()
+    rows = []
+    for e in range(n_expiries):
+        expiry = (today + datetime.timedelta(days=7 + 28 * e)).strftime("%d-%b-%Y")
+        for strike in np.arange(600.0, 1000.0 + 1, 10.0):
+            for opt in ("CE", "PE"):
+                if (opt == "CE" and strike < 640) or (opt == "PE" and strike > 960):
+                    continue  # one-sided wings → min_iv default on the other side
+                for _ in range(1 + (strike % 50 == 0)):  # duplicate rows at round strikes
+                    rows.append({
+                        "Expiry": expiry, "Strike": strike, "OptionType": opt,
+                        "OpenInterest": float(rng.randint(0, 50_000)),
+                        "IV": float(rng.uniform(10, 40)),
+                    })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_memo():
+    GEX_MEMO.clear()
+    yield
+    GEX_MEMO.clear()
+
+
+def test_vectorised_strike_gex_matches_per_strike_loop():
+    calc = GEXCalculator(_chain(), symbol="SBIN", spot=SPOT, use_cache=False)
+    df = calc._prepare()
+    for expiry, grp in df.groupby("Expiry"):
+        T = _days_to_expiry(str(expiry))
+        pd.testing.assert_frame_equal(
+            calc._compute_strike_gex(grp, T),
+            calc._compute_strike_gex_per_row(grp, T),
+            check_exact=False, rtol=1e-12,
+        )
+    assert calc._compute_strike_gex(df.iloc[:0], 0.1).empty
+
+
+def test_unchanged_chain_is_a_result_hit():
+    chain = _chain()
+    first = GEXCalculator(chain, symbol="SBIN", spot=SPOT).compute()
+    # New calculator over an equal (not identical) frame, as on a Streamlit rerun
+    second = GEXCalculator(chain.copy(), symbol="SBIN", spot=SPOT).compute()
+    assert second is first
+    assert GEX_MEMO.hits["results"] == 1 and GEX_MEMO.misses["results"] == 1
+
+    # Spot is part of the key
+    other = GEXCalculator(chain, symbol="SBIN", spot=SPOT + 5).compute()
+    assert other is not first and GEX_MEMO.misses["results"] == 2
+
+
+def test_changed_expiry_is_the_only_one_recomputed():
+    chain = _chain()
+    GEXCalculator(chain, symbol="SBIN", spot=SPOT).compute()
+    n_expiries = chain["Expiry"].nunique()
+    assert GEX_MEMO.misses["expiries"] == n_expiries
+
+    changed = chain.copy()
+    last = changed["Expiry"] == changed["Expiry"].iloc[-1]
+    changed.loc[last, "OpenInterest"] += 1_000
+    got = GEXCalculator(changed, symbol="SBIN", spot=SPOT).compute()
+    assert GEX_MEMO.misses["expiries"] == n_expiries + 1
+    assert GEX_MEMO.hits["expiries"] == n_expiries - 1
+
+    want = GEXCalculator(changed, symbol="SBIN", spot=SPOT, use_cache=False).compute()
+    assert [e.expiry for e in got.expiries] == [e.expiry for e in want.expiries]
+    for g, w in zip(got.expiries, want.expiries):
+        assert (g.net_gex, g.hvl, g.gex_pct_of_total) == (w.net_gex, w.hvl, w.gex_pct_of_total)
+    pd.testing.assert_frame_equal(got.all_strikes, want.all_strikes)
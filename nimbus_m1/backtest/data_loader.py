@@ -4,20 +4,31 @@ backtest/data_loader.py
 Historical OHLCV data management for backtesting.
 
 Supports:
-  - yfinance download with local parquet cache
+  - yfinance download with an incremental local parquet cache
   - Synthetic data generation for offline testing
-  - Batch loading of NIFTY100 universe
+  - Concurrent, rate-limited batch loading of NIFTY100 universe
   - Clean timezone-normalized output
 
 Cache: data/backtest_cache/ (parquet files, one per symbol)
+
+The cache is never thrown away for age. A later call downloads only the
+tail since the last cached bar, starting _OVERLAP_BARS bars earlier; the
+overlapping closes must match the cached ones, otherwise a split or
+dividend re-adjustment has rewritten history and the whole series is
+re-downloaded. Writes go to a temp file + os.replace, so an interrupted
+run never leaves a torn parquet. A JSON sidecar records how far back the
+cached history was requested and when the tail was last checked.
 """
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
-from typing import Optional
+from typing import Callable, Optional
 
 import numpy as np
 import pandas as pd
@@ -28,6 +39,9 @@ _CACHE_DIR = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "..", "data", "backtest_cache"
 )
 
+_OVERLAP_BARS = 5  # cached bars re-downloaded with each tail to check adjustments
+_ADJ_RTOL = 1e-4  # relative close mismatch that counts as a split / re-adjustment
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CACHE I/O
@@ -39,28 +53,84 @@ def _cache_path(symbol: str, interval: str = "1d") -> str:
     return os.path.join(_CACHE_DIR, f"{symbol}_{interval}.parquet")
 
 
+def _meta_path(symbol: str, interval: str = "1d") -> str:
+    return _cache_path(symbol, interval)[: -len(".parquet")] + ".json"
+
+
 def _load_cache(symbol: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+    """Cached bars regardless of age (the caller tops them up), or None."""
     path = _cache_path(symbol, interval)
     if not os.path.exists(path):
         return None
     try:
         df = pd.read_parquet(path)
-        age_days = (date.today() - df.index[-1].date()).days if len(df) > 0 else 999
-        if age_days > 3:
-            logger.info("Cache stale for %s (%dd old)", symbol, age_days)
-            return None
-        return df
+        return df if len(df) > 0 else None
     except Exception as exc:
         logger.warning("Cache read failed %s: %s", symbol, exc)
         return None
 
 
-def _save_cache(df: pd.DataFrame, symbol: str, interval: str = "1d"):
+def _load_meta(symbol: str, interval: str = "1d") -> dict:
+    try:
+        with open(_meta_path(symbol, interval)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _atomic_write(path: str, write) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _save_meta(meta: dict, symbol: str, interval: str = "1d"):
+    def _dump(tmp):
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+
     try:
-        path = _cache_path(symbol, interval)
-        df.to_parquet(path)
+        _atomic_write(_meta_path(symbol, interval), _dump)
+    except Exception as exc:
+        logger.warning("Cache meta write failed %s: %s", symbol, exc)
+
+
+def _save_cache(df: pd.DataFrame, symbol: str, interval: str = "1d", meta: Optional[dict] = None):
+    try:
+        _atomic_write(_cache_path(symbol, interval), df.to_parquet)
     except Exception as exc:
         logger.warning("Cache write failed %s: %s", symbol, exc)
+        return
+    if meta is not None:
+        _save_meta(meta, symbol, interval)
+
+
+def _merge_tail(cached: pd.DataFrame, fresh: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Append a freshly downloaded tail to the cached series.
+
+    fresh starts inside the cached range. Closes on the overlapping dates —
+    excluding the last cached bar, which may have been a partial intraday
+    bar — must agree within _ADJ_RTOL. Returns None when they do not (or
+    when there is no overlap to check), meaning history must be refetched.
+    """
+    if fresh.empty:
+        return cached
+    overlap = cached.index[:-1].intersection(fresh.index)
+    if len(overlap) == 0 and len(cached) > 1:
+        return None
+    if len(overlap) and not np.allclose(
+        fresh.loc[overlap, "Close"].to_numpy(float),
+        cached.loc[overlap, "Close"].to_numpy(float),
+        rtol=_ADJ_RTOL, atol=0.0,
+    ):
+        return None
+    head = cached[cached.index < fresh.index[0]]
+    return pd.concat([head, fresh])
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -78,61 +148,147 @@ def _yf_ticker(symbol: str) -> str:
     return mapping.get(symbol, f"{symbol}.NS")
 
 
-def download_history(
+class DownloadError(RuntimeError):
+    """
+    A symbol could not be downloaded. fallback holds cached bars that are
+    still usable (or None); retryable is False when retrying cannot help.
+    """
+
+    def __init__(self, message: str, fallback: Optional[pd.DataFrame] = None,
+                 retryable: bool = True):
+        super().__init__(message)
+        self.fallback = fallback
+        self.retryable = retryable
+
+
+def _fetch(ticker: str, start: str, interval: str, limiter=None) -> pd.DataFrame:
+    """yf.download → clean OHLCV (tz-naive index, positive closes)."""
+    import yfinance as yf
+
+    if limiter is not None:
+        limiter.acquire()
+    raw = yf.download(
+        tickers=ticker, start=start, interval=interval,
+        auto_adjust=True, progress=False,
+    )
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = raw.columns.get_level_values(0)
+    raw.columns = [str(c).strip().title().replace(" ", "_") for c in raw.columns]
+    raw = raw.rename(columns={"Adj_Close": "Close"})
+
+    # Normalize index
+    raw.index = pd.to_datetime(raw.index)
+    if hasattr(raw.index, "tz") and raw.index.tz is not None:
+        raw.index = raw.index.tz_localize(None)
+
+    df = raw[["Open", "High", "Low", "Close", "Volume"]].copy()
+    return df[df["Close"] > 0].dropna(subset=["Close"])
+
+
+def _history(
     symbol: str,
-    years: int = 3,
-    interval: str = "1d",
-    use_cache: bool = True,
-) -> pd.DataFrame:
+    years: int,
+    interval: str,
+    use_cache: bool,
+    limiter=None,
+) -> tuple[pd.DataFrame, dict]:
     """
-    Download historical OHLCV for a symbol.
+    download_history() without the error swallowing.
 
-    Returns a clean DataFrame with columns: Open, High, Low, Close, Volume
-    Index: DatetimeIndex (timezone-naive, IST-aligned)
+    Returns (bars, info) where info = {"source": "cache" | "tail" | "full",
+    "bytes": size of the bars downloaded}. Raises DownloadError.
     """
-    if use_cache:
-        cached = _load_cache(symbol, interval)
-        if cached is not None:
-            logger.debug("Cache hit: %s (%d bars)", symbol, len(cached))
-            return cached
+    today = date.today().isoformat()
+    start = (date.today() - timedelta(days=years * 365)).isoformat()
+
+    cached = _load_cache(symbol, interval) if use_cache else None
+    meta = _load_meta(symbol, interval) if cached is not None else {}
+    if cached is not None and meta.get("start", cached.index[0].date().isoformat()) > start:
+        logger.info("Cache for %s starts after %s — full download", symbol, start)
+        cached = None
+    stored = cached
+    if cached is not None:
+        cached = cached[cached.index >= start]  # an earlier call may have asked for more years
+    if cached is not None and meta.get("checked") == today:
+        logger.debug("Cache hit: %s (%d bars)", symbol, len(cached))
+        return cached, {"source": "cache", "bytes": 0}
 
     try:
-        import yfinance as yf
+        import yfinance  # noqa: F401
     except ImportError:
-        logger.warning("yfinance not installed — returning empty DataFrame")
-        return pd.DataFrame()
+        if cached is not None:
+            return cached, {"source": "cache", "bytes": 0}
+        raise DownloadError("yfinance not installed", retryable=False)
 
     ticker = _yf_ticker(symbol)
-    start = (date.today() - timedelta(days=years * 365)).isoformat()
 
     try:
-        raw = yf.download(
-            tickers=ticker, start=start, interval=interval,
-            auto_adjust=True, progress=False,
-        )
-        if isinstance(raw.columns, pd.MultiIndex):
-            raw.columns = raw.columns.get_level_values(0)
-        raw.columns = [str(c).strip().title().replace(" ", "_") for c in raw.columns]
-        raw = raw.rename(columns={"Adj_Close": "Close"})
+        if cached is not None:
+            tail_from = cached.index[max(len(cached) - _OVERLAP_BARS, 0)]
+            fresh = _fetch(ticker, tail_from.date().isoformat(), interval, limiter)
+            if fresh.empty:
+                # The tail re-requests _OVERLAP_BARS cached bars, so an empty
+                # answer is a failed download (yfinance returns an empty frame
+                # rather than raising), not "no new bars". `checked` is left
+                # alone so the next call retries.
+                raise DownloadError(f"{symbol}: no data returned for the tail", fallback=cached)
+            merged = _merge_tail(cached, fresh)
+            info = {"source": "tail", "bytes": int(fresh.memory_usage().sum())}
+            if merged is not None:
+                # Keep only the requested years, so the cache does not grow forever
+                merged = merged[merged.index >= start]
+                meta = {"start": start, "checked": today}
+                if merged.equals(stored):
+                    _save_meta(meta, symbol, interval)  # nothing new since last bar
+                else:
+                    _save_cache(merged, symbol, interval, meta)
+                logger.debug("Topped up %s: %d new bars", symbol, len(merged) - len(cached))
+                return merged, info
+            logger.info("Adjustment break in %s overlap — refreshing full history", symbol)
+
+        df = _fetch(ticker, start, interval, limiter)
+    except DownloadError:
+        raise
+    except Exception as exc:
+        raise DownloadError(f"{symbol}: {exc}", fallback=cached) from exc
 
-        # Normalize index
-        raw.index = pd.to_datetime(raw.index)
-        if hasattr(raw.index, "tz") and raw.index.tz is not None:
-            raw.index = raw.index.tz_localize(None)
+    if df.empty:
+        raise DownloadError(f"{symbol}: no data returned", fallback=cached)
+    if use_cache:
+        _save_cache(df, symbol, interval, {"start": start, "checked": today})
+    logger.info("Downloaded %s: %d bars (%s to %s)",
+                symbol, len(df), df.index[0].date(), df.index[-1].date())
+    return df, {"source": "full", "bytes": int(df.memory_usage().sum())}
 
-        df = raw[["Open", "High", "Low", "Close", "Volume"]].copy()
-        df = df[df["Close"] > 0].dropna(subset=["Close"])
 
-        if not df.empty and use_cache:
-            _save_cache(df, symbol, interval)
+def download_history(
+    symbol: str,
+    years: int = 3,
+    interval: str = "1d",
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Download historical OHLCV for a symbol.
 
-        logger.info("Downloaded %s: %d bars (%s to %s)",
-                     symbol, len(df), df.index[0].date(), df.index[-1].date())
-        return df
+    With use_cache, an existing cache that reaches back far enough is topped
+    up with only the missing tail (at most once per day) and trimmed to the
+    last `years`; a failed overlap check or too-short history triggers a
+    full re-download. A failed tail download returns the stale cache and
+    is retried on the next call.
 
-    except Exception as exc:
-        logger.error("Download failed %s: %s", symbol, exc)
-        return pd.DataFrame()
+    Returns a clean DataFrame with columns: Open, High, Low, Close, Volume
+    Index: DatetimeIndex (timezone-naive, IST-aligned)
+    """
+    try:
+        return _history(symbol, years, interval, use_cache)[0]
+    except DownloadError as exc:
+        if exc.retryable:
+            logger.error("Download failed %s", exc)
+        else:
+            logger.warning("%s — returning empty DataFrame", exc)
+        return exc.fallback if exc.fallback is not None else pd.DataFrame()
 
 
 def download_batch(
@@ -140,19 +296,130 @@ def download_batch(
     years: int = 3,
     interval: str = "1d",
     use_cache: bool = True,
+    workers: int = 4,
+    rate: float = 2.0,
+    retries: int = 3,
+    backoff: float = 1.0,
+    progress_cb: Optional[Callable[[dict], None]] = None,
 ) -> dict[str, pd.DataFrame]:
-    """Download OHLCV for multiple symbols. Returns {symbol: DataFrame}."""
-    result = {}
-    for i, sym in enumerate(symbols):
-        df = download_history(sym, years, interval, use_cache)
-        if not df.empty:
-            result[sym] = df
-        if (i + 1) % 10 == 0:
-            logger.info("Batch progress: %d/%d", i + 1, len(symbols))
-    logger.info("Batch complete: %d/%d symbols loaded", len(result), len(symbols))
+    """
+    Download OHLCV for multiple symbols. Returns {symbol: DataFrame}.
+
+    Symbols run on a pool of `workers` threads. Every yf.download call takes
+    a token from one bucket (`rate` calls/s across all workers); cache hits
+    take none. A failed symbol is retried up to `retries` times, sleeping
+    backoff × 2^n between attempts. Symbols that still fail are left out of
+    the result (or served from stale cache), so the batch returns partial
+    results rather than raising.
+
+    progress_cb(event) is called from the calling thread once per symbol:
+        {"symbol", "ok", "source" (cache/tail/full/stale/failed), "attempts",
+         "latency_s", "bytes", "error", "done", "total"}
+    "bytes" is the in-memory size of the bars downloaded — yfinance does not
+    expose wire sizes.
+    """
+    from modules.rate_limit import TokenBucket
+
+    bucket = TokenBucket(rate=rate, burst=max(1, workers))
+    t0 = time.time()
+
+    def _one(sym: str) -> tuple[Optional[pd.DataFrame], dict]:
+        start = time.perf_counter()
+        event = {"symbol": sym, "attempts": 0, "error": None}
+        df = None
+        while True:
+            event["attempts"] += 1
+            try:
+                df, info = _history(sym, years, interval, use_cache, limiter=bucket)
+                event.update(info)
+                break
+            except Exception as exc:
+                event["error"] = str(exc)
+                retryable = getattr(exc, "retryable", True)
+                if not retryable or event["attempts"] > retries:
+                    df = getattr(exc, "fallback", None)
+                    event.update(source="stale" if df is not None else "failed", bytes=0)
+                    break
+                time.sleep(backoff * 2 ** (event["attempts"] - 1))
+        event["ok"] = df is not None and not df.empty
+        event["latency_s"] = round(time.perf_counter() - start, 3)
+        return df, event
+
+    loaded: dict[str, pd.DataFrame] = {}
+    events: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_one, sym): sym for sym in dict.fromkeys(symbols)}
+        for done, fut in enumerate(as_completed(futures), 1):
+            df, event = fut.result()
+            event.update(done=done, total=len(futures))
+            events[event["symbol"]] = event
+            if event["ok"]:
+                loaded[event["symbol"]] = df
+            elif event["source"] == "failed":
+                logger.warning("Batch: %s failed after %d attempts: %s",
+                               event["symbol"], event["attempts"], event["error"])
+            if progress_cb:
+                progress_cb(event)
+            elif done % 10 == 0:
+                logger.info("Batch progress: %d/%d", done, len(futures))
+
+    result = {sym: loaded[sym] for sym in futures.values() if sym in loaded}
+    by_source = {}
+    for ev in events.values():
+        by_source[ev["source"]] = by_source.get(ev["source"], 0) + 1
+    logger.info(
+        "Batch complete: %d/%d symbols loaded in %.1fs (%s, %.1f KB downloaded)",
+        len(result), len(futures), time.time() - t0,
+        ", ".join(f"{k}={v}" for k, v in sorted(by_source.items())),
+        sum(ev.get("bytes", 0) for ev in events.values()) / 1024,
+    )
     return result
 
 
+def load_universe(
+    symbols: list[str],
+    years: int = 3,
+    interval: str = "1d",
+    warehouse: Optional[str] = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    download_batch(), optionally backed by a price warehouse directory.
+
+    A warehouse built today for a superset of `symbols` and at least `years`
+    of history is served as zero-copy memory-mapped views; otherwise the
+    universe is downloaded (incremental cache) and the warehouse rebuilt.
+    """
+    if not warehouse:
+        return download_batch(symbols, years, interval)
+
+    from backtest.price_warehouse import PriceWarehouse, build_warehouse
+
+    start = pd.Timestamp(date.today() - timedelta(days=years * 365))
+    try:
+        wh = PriceWarehouse(warehouse)
+        meta = wh.manifest.get("meta", {})
+        if (
+            wh.manifest.get("built") == date.today().isoformat()
+            and meta.get("interval") == interval
+            and meta.get("years", 0) >= years
+            and set(symbols) <= set(meta.get("requested", []))
+        ):
+            logger.info("Universe from warehouse %s (%d symbols)", warehouse, len(wh))
+            return {s: df.loc[start:] for s, df in wh.to_universe(symbols).items()}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    universe = download_batch(symbols, years, interval)
+    if not universe:
+        return universe
+    wh = build_warehouse(
+        universe, warehouse,
+        meta={"requested": list(symbols), "years": years, "interval": interval},
+    )
+    # Same window as the reuse path above, so every call today sees the same history
+    return {s: df.loc[start:] for s, df in wh.to_universe(list(universe)).items()}
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # SYNTHETIC DATA (for offline testing / CI)
 # ══════════════════════════════════════════════════════════════════════════════
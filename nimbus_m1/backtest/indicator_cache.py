@@ -0,0 +1,98 @@
+"""
+backtest/indicator_cache.py
+────────────────────────────
+LRU cache of indicator series shared across parameter-sweep combinations.
+
+A sweep grid has far fewer distinct indicator settings than combinations —
+the default run_sweep grid has hundreds of combos but only 9 Bollinger
+settings, 4 WR periods and one ADX(14) per symbol. evaluate_params() asks
+the cache for each series it needs; every distinct (symbol, indicator,
+params) is then computed once per sweep.
+
+Entries are dicts of read-only NumPy arrays. Eviction is least-recently-used,
+bounded by a byte budget rather than an entry count so long histories and
+wide universes behave the same way.
+
+Keys use the symbol name, not the data: scope one cache to one sweep over
+one universe.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_MB = 256
+
+
+class IndicatorCache:
+    """Byte-bounded LRU of {column: ndarray} keyed by (symbol, indicator, params)."""
+
+    def __init__(self, max_mb: float = DEFAULT_BUDGET_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries: OrderedDict[tuple, dict[str, np.ndarray]] = OrderedDict()
+        self._sizes: dict[tuple, int] = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        symbol: str,
+        indicator: str,
+        params: tuple,
+        compute: Callable[[], dict[str, np.ndarray]],
+    ) -> dict[str, np.ndarray]:
+        """Cached columns for the key, calling compute() on a miss."""
+        key = (symbol, indicator, params)
+        cols = self._entries.get(key)
+        if cols is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cols
+
+        self.misses += 1
+        cols = {}
+        for name, arr in compute().items():
+            arr = np.asarray(arr)
+            arr.setflags(write=False)  # shared by every combo that hits this key
+            cols[name] = arr
+        size = sum(a.nbytes for a in cols.values())
+        if size <= self.max_bytes:
+            self._entries[key] = cols
+            self._sizes[key] = size
+            self.nbytes += size
+            self._evict()
+        return cols
+
+    def _evict(self) -> None:
+        while self.nbytes > self.max_bytes and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self.nbytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def absorb(self, stats: dict) -> None:
+        """Add hit/miss/eviction counts reported by a worker process's cache."""
+        self.hits += stats.get("hits", 0)
+        self.misses += stats.get("misses", 0)
+        self.evictions += stats.get("evictions", 0)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "entries": len(self._entries),
+            "mb": round(self.nbytes / 1024 / 1024, 2),
+        }
@@ -31,11 +31,14 @@ from __future__ import annotations
 
 import logging
 import itertools
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
 import pandas as pd
 
+if TYPE_CHECKING:
+    from backtest.indicator_cache import IndicatorCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -103,6 +106,41 @@ def add_atr(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
 # ══════════════════════════════════════════════════════════════════════════════
 
 
+def _indicator_columns(
+    df: pd.DataFrame,
+    symbol: str,
+    cache: Optional["IndicatorCache"],
+    wr_period: int,
+    bb_period: int,
+    bb_std: float,
+    use_adx: bool,
+    use_rsi: bool,
+) -> dict[str, np.ndarray]:
+    """Indicator arrays evaluate_params reads, via the cache when one is given."""
+    from modules.indicators import add_bollinger, add_williams_r
+
+    def _bollinger():
+        bb = add_bollinger(df[["Close"]], period=bb_period, std_dev=bb_std)
+        return {c: bb[c].values for c in ("BB_Mid", "BB_Upper", "BB_Width")}
+
+    def _williams_r():
+        return {"WR": add_williams_r(df[["High", "Low", "Close"]], period=wr_period)["WR"].values}
+
+    specs = [
+        ("bollinger", (bb_period, bb_std), _bollinger),
+        ("williams_r", (wr_period,), _williams_r),
+    ]
+    if use_adx:
+        specs.append(("adx", (14,), lambda: {"ADX_14": add_adx(df, 14)["ADX_14"].values}))
+    if use_rsi:
+        specs.append(("rsi", (14,), lambda: {"RSI_14": add_rsi(df, 14)["RSI_14"].values}))
+
+    cols: dict[str, np.ndarray] = {}
+    for name, params, compute in specs:
+        cols.update(compute() if cache is None else cache.get(symbol, name, params, compute))
+    return cols
+
+
 def evaluate_params(
     df: pd.DataFrame,
     wr_period: int = 50,
@@ -115,6 +153,8 @@ def evaluate_params(
     rsi_oversold: float = 35.0,
     entry_mode: str = "momentum",  # "momentum" | "mean_revert" | "early_momentum"
     horizons: list[int] = None,
+    cache: Optional["IndicatorCache"] = None,
+    symbol: str = "",
 ) -> dict:
     """
     Evaluate a single parameter combination on one symbol's data.
@@ -124,36 +164,36 @@ def evaluate_params(
       early_momentum: WR just crossed above (wr_thresh+30) with bars_since <= 3
       mean_revert:    close < BB_Mid AND RSI < rsi_oversold
 
+    cache + symbol: reuse indicator series computed for earlier combos of the
+    same symbol (backtest/indicator_cache.py). Results are identical. The
+    cache is keyed by symbol, so passing one without a symbol is an error.
+
     Returns dict with stats per horizon.
     """
+    if cache is not None and not symbol:
+        raise ValueError("evaluate_params: cache needs a symbol to key its entries")
     if horizons is None:
         horizons = [3, 5, 10, 20]
 
-    from modules.indicators import add_bollinger, add_williams_r
-
-    # Apply indicators
-    tmp = df.copy()
-    tmp = add_bollinger(tmp, period=bb_period, std_dev=bb_std)
-    tmp = add_williams_r(tmp, period=wr_period)
-
-    if use_adx:
-        tmp = add_adx(tmp, 14)
-    if use_rsi:
-        tmp = add_rsi(tmp, 14)
-
     warmup = max(wr_period, bb_period) + 20
     max_horizon = max(horizons)
 
-    if len(tmp) < warmup + max_horizon + 30:
+    if len(df) < warmup + max_horizon + 30:
         return {}
 
-    closes = tmp["Close"].values
-    wr_vals = tmp["WR"].values if "WR" in tmp.columns else np.full(len(tmp), np.nan)
-    bb_mid = tmp["BB_Mid"].values if "BB_Mid" in tmp.columns else np.full(len(tmp), np.nan)
-    bb_upper = tmp["BB_Upper"].values if "BB_Upper" in tmp.columns else np.full(len(tmp), np.nan)
-    bb_width = tmp["BB_Width"].values if "BB_Width" in tmp.columns else np.full(len(tmp), np.nan)
-    adx_vals = tmp.get(f"ADX_14", pd.Series(np.full(len(tmp), np.nan))).values
-    rsi_vals = tmp.get(f"RSI_14", pd.Series(np.full(len(tmp), np.nan))).values
+    # Apply indicators
+    ind = _indicator_columns(
+        df, symbol, cache, wr_period, bb_period, bb_std, use_adx, use_rsi,
+    )
+    nan_col = np.full(len(df), np.nan)
+
+    closes = df["Close"].values
+    wr_vals = ind["WR"]
+    bb_mid = ind["BB_Mid"]
+    bb_upper = ind["BB_Upper"]
+    bb_width = ind["BB_Width"]
+    adx_vals = ind.get("ADX_14", nan_col)
+    rsi_vals = ind.get("RSI_14", nan_col)
 
     # Precompute WR cross detection for early_momentum
     wr_cross_thresh = wr_thresh + 30  # e.g., if thresh=-20, cross at -50+30=-20... 
@@ -161,9 +201,9 @@ def evaluate_params(
     early_cross_level = wr_thresh - 30  # e.g., if thresh=-20, cross at -50
 
     entries_by_half = {"in_sample": [], "out_of_sample": []}
-    mid_idx = warmup + (len(tmp) - warmup - max_horizon) * 6 // 10  # 60% split
+    mid_idx = warmup + (len(df) - warmup - max_horizon) * 6 // 10  # 60% split
 
-    for t in range(warmup, len(tmp) - max_horizon):
+    for t in range(warmup, len(df) - max_horizon):
         wr = wr_vals[t]
         close = closes[t]
         mid = bb_mid[t]
@@ -198,7 +238,7 @@ def evaluate_params(
         # Record forward returns
         fwd = {}
         for h in horizons:
-            if t + h < len(tmp):
+            if t + h < len(df):
                 fwd[h] = (closes[t + h] / close - 1) * 100
 
         half = "in_sample" if t < mid_idx else "out_of_sample"
@@ -244,64 +284,120 @@ def evaluate_params(
 # ══════════════════════════════════════════════════════════════════════════════
 
 
+_DEFAULT_GRID = {
+    "wr_period": [14, 20, 30, 50],
+    "wr_thresh": [-50, -40, -30, -20],
+    "bb_period": [15, 20, 25],
+    "bb_std": [1.0, 1.5, 2.0],
+    "entry_mode": ["momentum", "early_momentum", "mean_revert"],
+    "use_adx": [False, True],
+}
+
+
+def sweep_combos(param_grid: dict = None) -> list[dict]:
+    """All parameter combinations of the grid, minus nonsensical ones."""
+    if param_grid is None:
+        param_grid = _DEFAULT_GRID
+    keys = list(param_grid.keys())
+    combos = []
+    for combo in itertools.product(*[param_grid[k] for k in keys]):
+        params = dict(zip(keys, combo))
+        # Skip nonsensical combos
+        if params["entry_mode"] == "mean_revert" and params["wr_thresh"] > -30:
+            continue  # mean revert needs oversold, not momentum threshold
+        combos.append(params)
+    return combos
+
+
+def evaluate_combo(
+    df: pd.DataFrame,
+    params: dict,
+    cache: Optional["IndicatorCache"] = None,
+    symbol: str = "",
+) -> dict:
+    """evaluate_params() for one grid combination."""
+    return evaluate_params(
+        df,
+        wr_period=params["wr_period"],
+        wr_thresh=params["wr_thresh"],
+        bb_period=params["bb_period"],
+        bb_std=params["bb_std"],
+        use_adx=params["use_adx"],
+        entry_mode=params["entry_mode"],
+        cache=cache,
+        symbol=symbol,
+    )
+
+
 def run_sweep(
     universe: dict[str, pd.DataFrame],
     param_grid: dict = None,
     min_bars: int = 200,
+    workers: int = 1,
+    checkpoint: Optional[str] = None,
+    cache: Optional["IndicatorCache"] = None,
+    warehouse: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     Run parameter sweep across universe.
 
     Default grid tests 180 combinations per entry mode.
     Results are aggregated across all symbols.
-    """
-    if param_grid is None:
-        param_grid = {
-            "wr_period": [14, 20, 30, 50],
-            "wr_thresh": [-50, -40, -30, -20],
-            "bb_period": [15, 20, 25],
-            "bb_std": [1.0, 1.5, 2.0],
-            "entry_mode": ["momentum", "early_momentum", "mean_revert"],
-            "use_adx": [False, True],
-        }
-
-    # Generate all combinations
-    keys = list(param_grid.keys())
-    combos = list(itertools.product(*[param_grid[k] for k in keys]))
-    logger.info("Parameter sweep: %d combinations × %d symbols", len(combos), len(universe))
-
-    all_results = []
-
-    for ci, combo in enumerate(combos):
-        params = dict(zip(keys, combo))
-
-        # Skip nonsensical combos
-        if params["entry_mode"] == "mean_revert" and params["wr_thresh"] > -30:
-            continue  # mean revert needs oversold, not momentum threshold
 
-        # Aggregate across symbols
-        sym_entries = {"in_sample": [], "out_of_sample": []}
+    Args:
+        workers: >1 fans (combo, symbol) units out to a process pool
+                 (see backtest/sweep_executor.py)
+        checkpoint: JSONL path; finished units are appended as they complete
+                    and skipped when the same sweep is rerun
+        cache: IndicatorCache shared by all combos (a fresh one per sweep if
+               None); its hits/misses are logged at the end. Pool workers
+               each keep their own and report counts back into this one.
+        warehouse: price-warehouse directory the universe was loaded from;
+                   pool workers memory-map it instead of a shared-memory copy
+    """
+    from backtest.indicator_cache import IndicatorCache
 
-        for sym, df in universe.items():
-            if len(df) < min_bars:
-                continue
+    if cache is None:
+        cache = IndicatorCache()
+    combos = sweep_combos(param_grid)
+    symbols = [sym for sym, df in universe.items() if len(df) >= min_bars]
+    logger.info("Parameter sweep: %d combinations × %d symbols", len(combos), len(universe))
 
-            result = evaluate_params(
-                df,
-                wr_period=params["wr_period"],
-                wr_thresh=params["wr_thresh"],
-                bb_period=params["bb_period"],
-                bb_std=params["bb_std"],
-                use_adx=params["use_adx"],
-                entry_mode=params["entry_mode"],
+    if workers <= 1 and not checkpoint:
+        all_results = []
+        for ci, params in enumerate(combos):
+            for sym in symbols:
+                result = evaluate_combo(universe[sym], params, cache=cache, symbol=sym)
+                if result:
+                    all_results.append(result)
+
+            if (ci + 1) % 50 == 0:
+                logger.info("Sweep progress: %d/%d combinations", ci + 1, len(combos))
+    else:
+        from backtest.sweep_executor import iter_sweep
+
+        # Units finish in any order — restore serial (combo, symbol) order so
+        # the aggregation sums in the same order as the loop above
+        sym_pos = {sym: i for i, sym in enumerate(symbols)}
+        keyed = sorted(
+            ((ci, sym_pos[sym]), result)
+            for ci, sym, result in iter_sweep(
+                universe, combos, symbols, workers=workers, checkpoint=checkpoint,
+                cache=cache, warehouse=warehouse,
             )
+        )
+        all_results = [result for _, result in keyed if result]
 
-            if result:
-                all_results.append(result)
+    st = cache.stats()
+    logger.info(
+        "Indicator cache: %d hits / %d misses (%.1f%% hit rate), %d evictions, %.1f MB",
+        st["hits"], st["misses"], st["hit_rate"], st["evictions"], st["mb"],
+    )
+    return _aggregate(all_results)
 
-        if (ci + 1) % 50 == 0:
-            logger.info("Sweep progress: %d/%d combinations", ci + 1, len(combos))
 
+def _aggregate(all_results: list[dict]) -> pd.DataFrame:
+    """Average per-symbol results by parameter set, best OOS 10d Sharpe first."""
     if not all_results:
         return pd.DataFrame()
 
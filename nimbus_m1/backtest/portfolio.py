@@ -0,0 +1,325 @@
+"""
+backtest/portfolio.py
+─────────────────────
+Event-driven portfolio backtest of the dual-mode signal over a whole
+universe, sharing one pool of capital.
+
+simulate_universe() trades each symbol on its own and trade_summary()
+pools the results, so capital limits, overlapping positions and idle cash
+never show up. Here each symbol is a stream of daily BarEvents;
+heapq.merge over the streams gives one time-ordered queue, and each date
+is settled in order:
+
+  1. exits    dual_mode.check_exit on every held symbol with a bar today
+  2. entries  today's triggered signals, highest dual_score first, while
+              fewer than max_open positions are held. Notional is
+              equity / max_open × SIZING_WEIGHT[dual_sizing], capped by cash
+  3. mark     equity = cash + held shares at their latest close
+
+Streams read CHUNK bars of their symbol at a time, re-reading LOOKBACK
+bars of history ahead of each chunk so indicators match a full-history
+computation (to rolling-sum rounding). Only closes, exit flags and scored
+entry candidates are kept per chunk, so memory grows with symbols × CHUNK
+and not with history. A
+PriceWarehouse source is sliced straight off its memory map, so a
+500-symbol × 10-year universe is never materialised.
+
+    result = run_portfolio(PriceWarehouse("data/warehouse"), max_open=10)
+    result.equity                   # date-indexed equity curve
+    portfolio_summary(result)
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest.price_warehouse import PriceWarehouse
+from backtest.trade_simulator import Trade, trade_summary
+from modules import dual_mode as dm
+
+logger = logging.getLogger(__name__)
+
+# Fraction of a full slot (equity / max_open) per DualModeSignal.dual_sizing
+SIZING_WEIGHT = {"FULL": 1.0, "HALF": 0.5, "SKIP": 0.0}
+
+CHUNK = 500  # bars read per symbol at a time
+# History re-read ahead of each chunk: longer than every indicator warm-up
+# in dual_mode._compute_indicators (BBW_pctl 120 bars, HURST 121)
+LOOKBACK = 250
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EVENT STREAMS
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class BarEvent(NamedTuple):
+    """One symbol's daily bar. Carries what dual_mode.check_exit reads."""
+    date: pd.Timestamp
+    symbol: str
+    close: float
+    bbw_contracting: bool
+    above_sma: bool
+    signal: Optional[dm.DualModeSignal]  # scored entry signal, else None
+
+
+# read(lo, hi, lookback) → (OHLCV rows [lo - lookback, hi) without gaps,
+#                           number of those rows before lo)
+Reader = Callable[[int, int, int], tuple[pd.DataFrame, int]]
+
+
+def _frame_reader(df: pd.DataFrame) -> tuple[Reader, int]:
+    def read(lo, hi, lookback):
+        start = max(0, lo - lookback)
+        return df.iloc[start:hi], lo - start
+    return read, len(df)
+
+
+def _warehouse_reader(wh: PriceWarehouse, symbol: str) -> tuple[Reader, int]:
+    def read(lo, hi, lookback):
+        start = max(0, lo - lookback)
+        raw = wh.frame(symbol, keep_gaps=True, start=start, stop=hi)
+        bar = ~np.isnan(raw["Close"].to_numpy())
+        return raw[bar], int(bar[: lo - start].sum())
+    return read, wh.span(symbol)
+
+
+def symbol_events(
+    symbol: str,
+    read: Reader,
+    n_rows: int,
+    chunk: int = CHUNK,
+    lookback: int = LOOKBACK,
+) -> Iterator[BarEvent]:
+    """
+    BarEvents for one symbol's daily bars, in date order. A bar carries a
+    DualModeSignal exactly when compute_dual_mode() on the history up to
+    and including it would trigger an entry.
+    """
+    seen = 0  # bars yielded so far = history before the current bar
+    for lo in range(0, n_rows, chunk):
+        raw, n_hist = read(lo, min(lo + chunk, n_rows), lookback)
+        if len(raw) <= n_hist:
+            continue
+        ind = dm._compute_indicators(raw).iloc[n_hist:]
+        close = ind["Close"].to_numpy(dtype=float)
+        sma = np.nan_to_num(ind["SMA"].to_numpy(dtype=float), nan=0.0)
+        above = (sma > 0) & (close > sma)
+        contracting = np.nan_to_num(ind["BBW_slope"].to_numpy(dtype=float), nan=0.0) < 0
+        # compute_dual_mode's core test, with its NaN defaults (WR -100, MFI 50)
+        n_bars = seen + 1 + np.arange(len(ind))
+        core = (
+            (np.nan_to_num(ind["WR"].to_numpy(dtype=float), nan=-100.0) < dm.WR_THRESH)
+            & ~above & (sma > 0)
+            & (np.nan_to_num(ind["MFI"].to_numpy(dtype=float), nan=50.0) >= dm.MFI_MIN)
+            & (n_bars >= dm.MIN_DAILY_BARS)
+        )
+        hits = np.flatnonzero(core)
+        signals = {
+            int(i): dm.signal_from_row(
+                dm.DualModeSignal(symbol=symbol, segment="UNIFIED", mode="MR",
+                                  input_interval="1D", daily_bars_used=int(n_bars[i]),
+                                  data_sufficient=True),
+                row,
+            )
+            for i, row in zip(hits, ind.iloc[hits].to_dict("records"))
+        }
+        dates = ind.index.tolist()
+        del ind, raw
+        for i in range(len(close)):
+            if close[i] == close[i]:  # a NaN close is no bar
+                yield BarEvent(dates[i], symbol, float(close[i]), bool(contracting[i]),
+                               bool(above[i]), signals.get(i))
+        seen += len(close)
+
+
+def universe_events(
+    source: Union[dict[str, pd.DataFrame], PriceWarehouse],
+    symbols: Optional[list[str]] = None,
+    chunk: int = CHUNK,
+) -> Iterator[BarEvent]:
+    """Every symbol's BarEvents merged into one date-ordered stream."""
+    if isinstance(source, PriceWarehouse):
+        readers = {s: _warehouse_reader(source, s) for s in (symbols or source.symbols)
+                   if s in source}
+    else:
+        readers = {s: _frame_reader(source[s]) for s in (symbols or list(source))
+                   if s in source}
+    streams = [symbol_events(s, read, n, chunk) for s, (read, n) in readers.items()]
+    # Ties keep stream order, so a date's bars come in symbol order
+    return heapq.merge(*streams, key=lambda e: e.date)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PORTFOLIO ENGINE
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class _Position:
+    trade: Trade
+    shares: float
+    last: float
+    bars_held: int = 0
+
+
+@dataclass
+class PortfolioResult:
+    equity: pd.Series                 # date → cash + marked positions
+    exposure: pd.Series               # date → invested fraction of equity
+    trades: list[Trade]
+    capital: float
+    max_open: int
+    skipped: dict[str, int] = field(default_factory=dict)  # why signals were not taken
+
+
+def run_portfolio(
+    source: Union[dict[str, pd.DataFrame], PriceWarehouse],
+    max_open: int = 10,
+    capital: float = 1_000_000.0,
+    cost_bps: float = 10.0,
+    symbols: Optional[list[str]] = None,
+    chunk: int = CHUNK,
+) -> PortfolioResult:
+    """
+    Trade the dual-mode signal across source ({symbol: daily OHLCV} or a
+    PriceWarehouse) with shared capital. Fills are at the signal bar's
+    close; cost_bps is charged on each side. A symbol that exits cannot
+    re-enter on the same bar. Positions still open at the end are closed
+    at their last close as END_OF_DATA (the equity curve already marks
+    them there).
+    """
+    fee = cost_bps / 10_000
+    cash = float(capital)
+    held: dict[str, _Position] = {}
+    trades: list[Trade] = []
+    skipped = {"sizing": 0, "capacity": 0, "cash": 0}
+    dates, equity, exposure = [], [], []
+
+    def _close(sym: str, date, price: float, reason: str) -> float:
+        pos = held.pop(sym)
+        t = pos.trade
+        t.exit_date = date
+        t.exit_price = price
+        t.exit_reason = reason
+        t.hold_bars = pos.bars_held
+        t.pnl_pct = (price / t.entry_price - 1) * 100
+        trades.append(t)
+        return pos.shares * price * (1 - fee)
+
+    for date, day in itertools.groupby(universe_events(source, symbols, chunk),
+                                       key=lambda e: e.date):
+        day = list(day)
+
+        # ── 1. Exits ──────────────────────────────────────────────────────
+        exited = set()
+        for ev in day:
+            pos = held.get(ev.symbol)
+            if pos is None:
+                continue
+            pos.last = ev.close
+            pos.bars_held += 1
+            t = pos.trade
+            t.peak_price = max(t.peak_price, ev.close)
+            t.max_runup_pct = max(t.max_runup_pct, (ev.close / t.entry_price - 1) * 100)
+            t.max_drawdown_pct = min(t.max_drawdown_pct, (ev.close / t.peak_price - 1) * 100)
+            reason = dm.check_exit(ev, t.entry_price, pos.bars_held)
+            if reason:
+                cash += _close(ev.symbol, date, ev.close, reason)
+                exited.add(ev.symbol)
+
+        # ── 2. Entries (best score first) ─────────────────────────────────
+        candidates = sorted(
+            (ev for ev in day
+             if ev.signal is not None and ev.symbol not in held and ev.symbol not in exited),
+            key=lambda ev: -ev.signal.dual_score,
+        )
+        if candidates:
+            slot = (cash + sum(p.shares * p.last for p in held.values())) / max_open
+            for ev in candidates:
+                sig = ev.signal
+                weight = SIZING_WEIGHT.get(sig.dual_sizing, 0.0)
+                if weight <= 0:
+                    skipped["sizing"] += 1
+                    continue
+                if len(held) >= max_open:
+                    skipped["capacity"] += 1
+                    continue
+                notional = min(slot * weight, cash)
+                if notional <= 0 or ev.close <= 0:
+                    skipped["cash"] += 1
+                    continue
+                cash -= notional
+                held[ev.symbol] = _Position(
+                    trade=Trade(
+                        symbol=ev.symbol, entry_date=date, entry_price=ev.close,
+                        entry_signal=sig.entry_reason, sizing=sig.dual_sizing,
+                        peak_price=ev.close,
+                    ),
+                    shares=notional * (1 - fee) / ev.close,
+                    last=ev.close,
+                )
+
+        # ── 3. Mark to market ─────────────────────────────────────────────
+        invested = sum(p.shares * p.last for p in held.values())
+        dates.append(date)
+        equity.append(cash + invested)
+        exposure.append(invested / (cash + invested) if cash + invested > 0 else 0.0)
+
+    if held:
+        end = dates[-1]
+        for sym in list(held):
+            _close(sym, end, held[sym].last, "END_OF_DATA")
+
+    trades.sort(key=lambda t: (t.entry_date, t.symbol))
+    index = pd.DatetimeIndex(dates)
+    logger.info(
+        "Portfolio: %d dates, %d trades, final equity %.0f (skipped %s)",
+        len(dates), len(trades), equity[-1] if equity else capital, skipped,
+    )
+    return PortfolioResult(
+        equity=pd.Series(equity, index=index, name="equity", dtype=float),
+        exposure=pd.Series(exposure, index=index, name="exposure", dtype=float),
+        trades=trades,
+        capital=float(capital),
+        max_open=max_open,
+        skipped=skipped,
+    )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERFORMANCE METRICS
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def portfolio_summary(result: PortfolioResult) -> dict:
+    """Equity-curve metrics, plus trade_summary() of the trades taken."""
+    eq = result.equity
+    if eq.empty:
+        return {"n_days": 0, "trades": trade_summary(result.trades)}
+
+    rets = eq.pct_change().dropna()
+    years = len(eq) / 252
+    total = eq.iloc[-1] / result.capital
+    drawdown = (eq / eq.cummax() - 1) * 100
+    std = float(rets.std()) if len(rets) > 1 else 0.0
+
+    return {
+        "n_days": len(eq),
+        "final_equity": round(float(eq.iloc[-1]), 2),
+        "total_return_pct": round((total - 1) * 100, 2),
+        "cagr_pct": round((total ** (1 / years) - 1) * 100, 2) if years > 0 and total > 0 else 0,
+        "sharpe": round(float(rets.mean()) / std * np.sqrt(252), 2) if std > 0 else 0,
+        "max_drawdown": round(float(drawdown.min()), 2),
+        "avg_exposure_pct": round(float(result.exposure.mean()) * 100, 1),
+        "max_open": result.max_open,
+        "skipped": dict(result.skipped),
+        "trades": trade_summary(result.trades),
+    }
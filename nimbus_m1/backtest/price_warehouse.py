@@ -0,0 +1,220 @@
+"""
+backtest/price_warehouse.py
+────────────────────────────
+Columnar, memory-mapped OHLCV store for a whole universe.
+
+One directory holds aligned date × symbol arrays:
+
+    manifest.json   symbols, fields, per-symbol first/last bar, gap counts,
+                    build date + caller meta (data_loader.load_universe)
+    dates.npy       int64 datetime64 ticks, union of every symbol's dates
+    Open.npy …      float64 (n_dates, n_symbols), Fortran order, NaN = no bar
+
+Fortran order keeps each symbol's column contiguous on disk, so
+frame(symbol) is a zero-copy view over the mapped file, and window() slices
+a date range across all symbols without copying either. Processes that open
+the same warehouse share the OS page cache — sweep workers map the universe
+once instead of each holding it in RAM.
+
+Writes go to a sibling temp directory that is swapped in when complete.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+_DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "warehouse"
+)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BUILD
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def build_warehouse(
+    universe: dict[str, pd.DataFrame],
+    path: str = _DEFAULT_DIR,
+    fields: tuple[str, ...] = FIELDS,
+    meta: Optional[dict] = None,
+) -> "PriceWarehouse":
+    """
+    Write {symbol: OHLCV frame} as an aligned warehouse at path; return it
+    opened. meta (JSON-serialisable) is stored in the manifest as-is.
+    """
+    symbols = [s for s, df in universe.items() if len(df) > 0]
+    if not symbols:
+        raise ValueError("build_warehouse: universe is empty")
+
+    def _naive(idx) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(idx)
+        return idx.tz_localize(None) if idx.tz is not None else idx  # keep wall time
+
+    dates = pd.DatetimeIndex([])
+    for sym in symbols:
+        dates = dates.union(_naive(universe[sym].index))
+
+    tmp = path.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    np.save(os.path.join(tmp, "dates.npy"), dates.asi8)
+
+    bounds = {}
+    for field in fields:
+        block = np.lib.format.open_memmap(
+            os.path.join(tmp, f"{field}.npy"), mode="w+",
+            dtype=np.float64, shape=(len(dates), len(symbols)), fortran_order=True,
+        )
+        block[:] = np.nan
+        for j, sym in enumerate(symbols):
+            df = universe[sym]
+            if field not in df.columns:
+                continue
+            rows = dates.get_indexer(_naive(df.index))
+            block[rows, j] = df[field].to_numpy(dtype=np.float64)
+            if field == "Close":
+                first, last = int(rows.min()), int(rows.max())
+                bounds[sym] = {
+                    "first": first,
+                    "last": last,
+                    "gaps": int(last - first + 1 - len(rows)),
+                }
+        block.flush()
+        del block
+
+    manifest = {
+        "symbols": symbols,
+        "fields": list(fields),
+        "bounds": bounds,
+        "unit": dates.unit,
+        "built": date.today().isoformat(),
+        "meta": meta or {},
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    old = path.rstrip(os.sep) + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+    logger.info(
+        "Warehouse built: %d symbols × %d dates at %s", len(symbols), len(dates), path
+    )
+    return PriceWarehouse(path)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# READ
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class PriceWarehouse:
+    """
+    Read-only view of a built warehouse. Arrays are mapped on first use.
+
+    Usage:
+        wh = PriceWarehouse("data/warehouse")
+        df = wh.frame("SBIN")                       # zero-copy OHLCV view
+        closes = wh.window("2024-01-01", None)["Close"]   # dates × symbols
+    """
+
+    def __init__(self, path: str = _DEFAULT_DIR):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.symbols: list[str] = self.manifest["symbols"]
+        self.fields: list[str] = self.manifest["fields"]
+        self._col = {s: j for j, s in enumerate(self.symbols)}
+        self._blocks: dict[str, np.ndarray] = {}
+        self._dates: Optional[pd.DatetimeIndex] = None
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._col
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        if self._dates is None:
+            ticks = np.load(os.path.join(self.path, "dates.npy"), mmap_mode="r")
+            unit = self.manifest.get("unit", "ns")
+            self._dates = pd.DatetimeIndex(np.asarray(ticks).view(f"M8[{unit}]"))
+        return self._dates
+
+    def block(self, field: str) -> np.ndarray:
+        """The memory-mapped (n_dates, n_symbols) array for one field."""
+        if field not in self._blocks:
+            self._blocks[field] = np.load(
+                os.path.join(self.path, f"{field}.npy"), mmap_mode="r"
+            )
+        return self._blocks[field]
+
+    def span(self, symbol: str) -> int:
+        """Rows from the symbol's first to its last bar, gap rows included."""
+        b = self.manifest["bounds"][symbol]
+        return b["last"] - b["first"] + 1
+
+    def frame(
+        self,
+        symbol: str,
+        keep_gaps: bool = False,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        OHLCV for one symbol, from its first to its last bar — or rows
+        [start, stop) of that span (offsets count gap rows; see span()),
+        for reading a long history a chunk at a time.
+
+        Zero-copy unless the symbol has interior gaps (dates other symbols
+        traded on but it did not); those rows are dropped — a copy — unless
+        keep_gaps=True.
+        """
+        j = self._col[symbol]
+        b = self.manifest["bounds"][symbol]
+        last = b["last"] + 1 if stop is None else min(b["first"] + stop, b["last"] + 1)
+        rows = slice(b["first"] + start, last)
+        data = {f: self.block(f)[rows, j] for f in self.fields}
+        df = pd.DataFrame(data, index=self.dates[rows], copy=False)
+        if b["gaps"] and not keep_gaps:
+            df = df[~np.isnan(data["Close"])]
+        return df
+
+    def window(
+        self,
+        start=None,
+        end=None,
+        fields: Optional[list[str]] = None,
+    ) -> dict[str, pd.DataFrame]:
+        """{field: dates × symbols frame} for start <= date <= end, as views."""
+        dates = self.dates
+        lo = 0 if start is None else int(dates.searchsorted(pd.Timestamp(start), "left"))
+        hi = len(dates) if end is None else int(dates.searchsorted(pd.Timestamp(end), "right"))
+        return {
+            f: pd.DataFrame(
+                self.block(f)[lo:hi], index=dates[lo:hi], columns=self.symbols, copy=False
+            )
+            for f in (fields or self.fields)
+        }
+
+    def to_universe(self, symbols: Optional[list[str]] = None) -> dict[str, pd.DataFrame]:
+        """{symbol: frame(symbol)} — the dict-of-DataFrames the runners expect."""
+        return {s: self.frame(s) for s in (symbols or self.symbols) if s in self}
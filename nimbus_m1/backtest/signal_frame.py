@@ -0,0 +1,342 @@
+"""
+backtest/signal_frame.py
+─────────────────────────
+Vectorised, causal PriceSignals for every bar of a series in one pass.
+
+compute_price_signals(df.iloc[:t+1]) answers "what did the live pipeline see
+at bar T?" — but calling it for every T costs O(n²). Every quantity it reads
+is either a trailing rolling window or "the k-th last non-NaN value", so the
+same answers can be derived for all bars at once from full-series columns:
+
+  - BB / WR columns: pandas rolling ops are causal, value at T is identical
+    whether computed on history[:T+1] or the full series
+  - dropna().iloc[-k] lookups → compressed arrays indexed by running counts
+  - tail(N) windows → sliding windows over the compressed arrays
+
+compute_signal_frame() returns one row per bar with a column per PriceSignals
+field. Row T equals compute_price_signals(df.iloc[:T+1]) field-for-field
+(parity tested in tests/test_backtest.py).
+
+Scope: daily (or coarser) bars — one bar per calendar day, which is what the
+backtest data loader produces. Intraday frames resample partial days
+differently on every bar; supports_frame() returns False for them and callers
+fall back to the per-bar path.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from modules.indicators import (
+    PriceSignals,
+    add_mfi,
+    _MFI_RELIABLE_ADV_CR,
+)
+
+# Field order matches the PriceSignals dataclass
+SIGNAL_FIELDS = [
+    "daily_sma", "daily_bias", "daily_bias_pct",
+    "bb_position", "bb_pct", "position_state", "upper", "mid", "lower", "last_close",
+    "vol_state", "bb_width_pct", "bb_width_pctl",
+    "wr_value", "wr_in_momentum", "wr_trend", "wr_bars_since_cross50", "wr_phase",
+    "entry_valid", "bb_squeezing",
+    "adv_cr",
+    "mfi_value", "mfi_state", "mfi_diverge", "mfi_reliable",
+]
+
+# PriceSignals fields that are None (not NaN) when unavailable
+_OPTIONAL_FIELDS = ("daily_sma", "wr_value", "mfi_value")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PUBLIC API
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def supports_frame(df: pd.DataFrame) -> bool:
+    """True when df has at most one bar per calendar day (daily or coarser)."""
+    if df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+        return False
+    idx = df.index
+    if idx.tz is not None:
+        idx = idx.tz_convert(None)  # same day boundaries as _resample_daily
+    if not idx.is_monotonic_increasing:
+        return False
+    return idx.normalize().is_unique
+
+
+def compute_signal_frame(
+    price_df: pd.DataFrame,
+    wr_thresh: float = -20.0,
+    vol_lookback: int = 100,
+) -> pd.DataFrame:
+    """
+    PriceSignals for every bar of price_df, as a DataFrame.
+
+    price_df must already carry BB_* and WR columns (add_bollinger +
+    add_williams_r), exactly as compute_price_signals expects. Optional
+    fields (daily_sma, wr_value, mfi_value) are NaN where PriceSignals has None.
+
+    Raises ValueError if supports_frame(price_df) is False.
+    """
+    if not supports_frame(price_df):
+        raise ValueError("compute_signal_frame needs one bar per calendar day")
+
+    df = price_df
+    n = len(df)
+    out = pd.DataFrame(index=df.index)
+    if "BB_Upper" not in df.columns or "WR" not in df.columns:
+        for name in SIGNAL_FIELDS:
+            out[name] = getattr(PriceSignals(), name)
+        return out
+
+    close = df["Close"].to_numpy(dtype=float)
+    out["last_close"] = close
+
+    # ── Daily bias + MFI ──────────────────────────────────────────────────
+    _daily_block(df, close, out)
+
+    # ── BB signals ────────────────────────────────────────────────────────
+    upper = df["BB_Upper"].to_numpy(dtype=float)
+    lower = df["BB_Lower"].to_numpy(dtype=float)
+    mid = df["BB_Mid"].to_numpy(dtype=float)
+    if "BB_Pct" in df.columns:
+        bb_pct = df["BB_Pct"].to_numpy(dtype=float).copy()
+        bb_pct[bb_pct == 0] = 0.5  # `x or 0.5` in compute_price_signals
+    else:
+        bb_pct = np.full(n, 0.5)
+
+    out["upper"] = upper
+    out["mid"] = mid
+    out["lower"] = lower
+    out["bb_pct"] = bb_pct
+    out["bb_position"] = np.select(
+        [close >= upper, close >= mid, close >= lower],
+        ["above_upper", "riding", "below_mid"],
+        default="near_lower",
+    )
+    out["position_state"] = _position_states(close, upper, mid)
+
+    vol_state = np.full(n, "NORMAL", dtype=object)
+    bb_width_pct = np.zeros(n)
+    bb_width_pctl = np.full(n, 50.0)
+    if "BB_Width" in df.columns:
+        width = df["BB_Width"].to_numpy(dtype=float)
+        bb_width_pct = width * 100
+        valid = ~np.isnan(width)
+        vals = width[valid]
+        cnt = np.cumsum(valid)
+        for t in np.flatnonzero(cnt >= 20):
+            hi = cnt[t]
+            win = vals[max(0, hi - vol_lookback):hi]
+            pctl = float((win < width[t]).sum() / len(win) * 100)
+            bb_width_pctl[t] = pctl
+            if pctl <= 20:
+                vol_state[t] = "SQUEEZE"
+            elif pctl >= 80:
+                vol_state[t] = "EXPANDED"
+    out["vol_state"] = vol_state
+    out["bb_width_pct"] = bb_width_pct
+    out["bb_width_pctl"] = bb_width_pctl
+    out["bb_squeezing"] = vol_state == "SQUEEZE"
+
+    # ── Williams %R signals ───────────────────────────────────────────────
+    _wr_block(df["WR"].to_numpy(dtype=float), wr_thresh, out)
+
+    # ── ADV — 20-day average daily turnover Rs Cr ─────────────────────────
+    if "Volume" in df.columns:
+        turnover = close * pd.to_numeric(df["Volume"], errors="coerce").to_numpy(dtype=float)
+        adv = np.empty(n)
+        for t in range(n):
+            win = turnover[max(0, t - 19): t + 1]
+            ok = ~np.isnan(win)
+            cnt = ok.sum()
+            mean = np.where(ok, win, 0.0).sum() / cnt if cnt else np.nan
+            adv[t] = round(np.float64(mean) / 1e7, 2)
+        out["adv_cr"] = adv
+    else:
+        out["adv_cr"] = 0.0
+
+    # ── Combined entry gate ───────────────────────────────────────────────
+    out["entry_valid"] = out["wr_in_momentum"].to_numpy() & np.isin(
+        out["daily_bias"].to_numpy(), ["BULLISH", "NEUTRAL"]
+    )
+
+    return out[SIGNAL_FIELDS]
+
+
+def signals_at(frame: pd.DataFrame, t: int) -> PriceSignals:
+    """Rebuild the PriceSignals object for row t of a compute_signal_frame() result."""
+    return signal_records(frame.iloc[t: t + 1])[0]
+
+
+def signal_records(frame: pd.DataFrame) -> list[PriceSignals]:
+    """One PriceSignals per row of a compute_signal_frame() result (Python scalars)."""
+    columns = []
+    for name in SIGNAL_FIELDS:
+        vals = frame[name].tolist()
+        if name in _OPTIONAL_FIELDS:
+            vals = [None if v != v else v for v in vals]  # NaN → None
+        columns.append(vals)
+    return [PriceSignals(*row) for row in zip(*columns)]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PRIVATE HELPERS
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _nth_last(vals: np.ndarray, cnt: np.ndarray, k: int) -> np.ndarray:
+    """vals.iloc[-k] of the compressed series seen at each bar (NaN if too short)."""
+    pos = cnt - k
+    res = np.full(len(cnt), np.nan)
+    ok = pos >= 0
+    res[ok] = vals[pos[ok]]
+    return res
+
+
+def _daily_block(df: pd.DataFrame, close: np.ndarray, out: pd.DataFrame) -> None:
+    """daily_sma / daily_bias / MFI fields — mirrors the daily-resample block."""
+    n = len(df)
+    daily_sma = np.full(n, np.nan)
+    bias = np.full(n, "NEUTRAL", dtype=object)
+    bias_pct = np.zeros(n)
+    mfi_value = np.full(n, np.nan)
+    mfi_state = np.full(n, "NEUTRAL", dtype=object)
+    mfi_diverge = np.zeros(n, dtype=bool)
+    mfi_reliable = np.zeros(n, dtype=bool)
+
+    # One bar per day, so the daily resample of history[:T+1] is the prefix
+    # of valid-Close bars. Resample sums NaN volume to 0 and drops Close <= 0.
+    keep = df["Close"].notna().to_numpy() & (df["Close"].to_numpy(dtype=float) > 0)
+    cols = [c for c in ("Open", "High", "Low", "Close", "Volume") if c in df.columns]
+    daily = df.loc[keep, cols].copy()
+    if "Volume" in daily.columns:
+        daily["Volume"] = daily["Volume"].fillna(0)
+    n_daily = np.cumsum(keep)  # len(daily) as seen at each bar
+
+    active = n_daily >= 20
+    if active.any():
+        sma20 = daily["Close"].rolling(20).mean().to_numpy(dtype=float)
+        sma_t = _nth_last(sma20, n_daily, 1)
+        daily_sma = np.where(active, sma_t, np.nan)
+
+        has_sma = active & ~np.isnan(daily_sma) & (daily_sma != 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pct = (close - daily_sma) / daily_sma * 100
+        bias_pct = np.where(has_sma, pct, 0.0)
+        bias[has_sma & (close > daily_sma * 1.002)] = "BULLISH"
+        bias[has_sma & (close < daily_sma * 0.998)] = "BEARISH"
+
+        daily = add_mfi(daily, period=14)
+        if "MFI_14" in daily.columns:
+            mfi = daily["MFI_14"].to_numpy(dtype=float)
+            m_valid = ~np.isnan(mfi)
+            m_vals = mfi[m_valid]
+            # len(mfi_series) at each bar: valid MFI rows among the first n_daily rows
+            m_cum = np.concatenate([[0], np.cumsum(m_valid)])
+            m_cnt = m_cum[n_daily]
+
+            live = active & (m_cnt >= 3)
+            m1 = _nth_last(m_vals, m_cnt, 1)
+            m2 = _nth_last(m_vals, m_cnt, 2)
+            m3 = _nth_last(m_vals, m_cnt, 3)
+            m6 = _nth_last(m_vals, m_cnt, 6)
+
+            mfi_value = np.where(live, m1, np.nan)
+            state = np.select(
+                [m1 > 70, m1 > 55, m1 > 45, m1 > 30],
+                ["STRONG", "RISING", "NEUTRAL", "FALLING"],
+                default="WEAK",
+            )
+            mfi_state = np.where(live, state, "NEUTRAL").astype(object)
+
+            # compute_price_signals runs this block before adv_cr is filled in,
+            # so the reliability gate always sees the PriceSignals default.
+            mfi_reliable = live & (PriceSignals().adv_cr >= _MFI_RELIABLE_ADV_CR) & (m_cnt >= 10)
+
+            jump = (m_cnt >= 2) & (np.abs(m1 - m2) > 20)
+            d_close = daily["Close"].to_numpy(dtype=float)
+            prior_high = (
+                pd.Series(d_close).rolling(8).max().shift(1).to_numpy(dtype=float)
+            )
+            near_high = close >= _nth_last(prior_high, n_daily, 1) * 0.98
+            trending_down = (m1 < m3) & (m3 < m6)
+            mfi_diverge = (
+                live & (m_cnt >= 6) & (n_daily >= 9) & ~jump
+                & near_high & (m1 < m6) & trending_down
+            )
+
+    out["daily_sma"] = daily_sma
+    out["daily_bias"] = bias
+    out["daily_bias_pct"] = bias_pct
+    out["mfi_value"] = mfi_value
+    out["mfi_state"] = mfi_state
+    out["mfi_diverge"] = mfi_diverge
+    out["mfi_reliable"] = mfi_reliable
+
+
+def _position_states(close: np.ndarray, upper: np.ndarray, mid: np.ndarray) -> np.ndarray:
+    """Vectorised _position_state() for every bar."""
+    n = len(close)
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    prev_upper = np.concatenate([[np.nan], upper[:-1]])
+
+    # (Close >= BB_Mid) over the last 4 bars (fewer near the start)
+    above_mid = close >= mid
+    below = np.cumsum(~above_mid)
+    below_4 = below - np.concatenate([np.zeros(4, dtype=int), below[:-4]])[:n]
+    riding_4 = below_4 == 0
+
+    state = np.select(
+        [
+            np.arange(n) < 2,
+            np.isnan(upper) | np.isnan(mid),
+            close < mid,
+            (close < upper) & (prev_close >= prev_upper),
+            (close >= upper) | (above_mid & riding_4),
+        ],
+        ["UNKNOWN", "UNKNOWN", "MID_BAND_BROKEN", "FIRST_DIP", "RIDING_UPPER"],
+        default="CONSOLIDATING",
+    )
+    return state.astype(object)
+
+
+def _wr_block(wr: np.ndarray, wr_thresh: float, out: pd.DataFrame, level: float = -50.0) -> None:
+    """wr_* fields — mirrors the WR block and _bars_since_wr_cross()."""
+    n = len(wr)
+    valid = ~np.isnan(wr)
+    vals = wr[valid]
+    cnt = np.cumsum(valid)
+
+    last_wr = _nth_last(vals, cnt, 1)
+    prev_wr = np.where(cnt > 1, _nth_last(vals, cnt, 2), last_wr)
+    has = cnt > 0
+
+    in_mom = has & (last_wr >= wr_thresh)
+    diff = last_wr - prev_wr
+    trend = np.where(diff > 1, "rising", np.where(diff < -1, "falling", "flat"))
+    trend = np.where(has, trend, "flat").astype(object)
+
+    # Most recent upward cross of `level` within the trailing 50 valid values
+    k = np.arange(len(vals))
+    cross = np.zeros(len(vals), dtype=bool)
+    cross[1:] = (vals[1:] >= level) & (vals[:-1] < level)
+    last_cross = np.maximum.accumulate(np.where(cross, k, -1)) if len(vals) else k
+    lc = np.full(n, -1)
+    lc[has] = last_cross[cnt[has] - 1]
+    win_start = np.maximum(cnt - 50, 0)
+    bars_since = np.where(has & (lc >= win_start + 1), cnt - 1 - lc, 99)
+
+    phase = np.select(
+        [~in_mom, bars_since <= 3, bars_since <= 10],
+        ["NONE", "FRESH", "DEVELOPING"],
+        default="LATE",
+    ).astype(object)
+
+    out["wr_value"] = np.where(has, last_wr, np.nan)
+    out["wr_in_momentum"] = in_mom
+    out["wr_trend"] = trend
+    out["wr_bars_since_cross50"] = bars_since.astype(int)
+    out["wr_phase"] = phase
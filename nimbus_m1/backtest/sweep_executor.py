@@ -0,0 +1,341 @@
+"""
+backtest/sweep_executor.py
+───────────────────────────
+Parallel, resumable executor for param_sweep.run_sweep.
+
+Work unit = (combo, symbol) → one evaluate_params() call.
+
+  - Process pool: units fan out to worker processes, results stream back in
+    completion order.
+  - Shared memory: every symbol's OHLCV is packed ONCE into a single
+    multiprocessing.shared_memory block. Workers attach at start-up and
+    rebuild each frame from the block on first use — tasks only carry
+    (combo_idx, symbol), never DataFrames. When the universe came from a
+    price warehouse (backtest/price_warehouse.py), workers map that directory
+    instead and nothing is packed at all.
+  - Checkpoint: each finished unit is appended to a JSONL file. A rerun with
+    the same grid + universe skips units already on disk, so a crashed sweep
+    resumes where it stopped. A header fingerprint guards against resuming
+    with a different grid or different data.
+
+Results are order-independent: run_sweep sorts them back into serial
+(combo, symbol) order before aggregating, so rankings match the serial sweep.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from backtest.indicator_cache import IndicatorCache
+
+logger = logging.getLogger(__name__)
+
+_ALIGN = 8  # byte alignment of each packed column
+
+# Per-worker state (populated by _init_worker in each pool process)
+_WORKER: dict = {}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SHARED-MEMORY UNIVERSE
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _pack_universe(
+    universe: dict[str, pd.DataFrame],
+) -> tuple[shared_memory.SharedMemory, dict]:
+    """
+    Copy every symbol's numeric columns + index into one shared block.
+
+    Returns (shm, layout) where layout[symbol] describes where each column
+    lives: {"n": rows, "index": (offset, unit, tz) | None,
+            "columns": [(name, dtype, offset)]}.
+    """
+    layout = {}
+    arrays = []
+    offset = 0
+
+    def _reserve(arr: np.ndarray) -> int:
+        nonlocal offset
+        start = offset
+        arrays.append((start, arr))
+        offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+        return start
+
+    for sym, df in universe.items():
+        entry = {"n": len(df), "index": None, "columns": []}
+        if isinstance(df.index, pd.DatetimeIndex):
+            idx = df.index
+            tz = str(idx.tz) if idx.tz is not None else None
+            naive = idx.tz_convert(None) if tz else idx
+            entry["index"] = (_reserve(naive.asi8.copy()), naive.unit, tz)
+        for col in df.columns:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                logger.debug("%s: column %s not numeric — not shared", sym, col)
+                continue
+            arr = np.ascontiguousarray(df[col].to_numpy())
+            entry["columns"].append((col, arr.dtype.str, _reserve(arr)))
+        layout[sym] = entry
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for start, arr in arrays:
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=start)[:] = arr
+    return shm, layout
+
+
+def _unpack_symbol(buf, entry: dict) -> pd.DataFrame:
+    """Rebuild one symbol's DataFrame as views over the shared block."""
+    n = entry["n"]
+    data = {
+        name: np.ndarray((n,), dtype=np.dtype(dt), buffer=buf, offset=off)
+        for name, dt, off in entry["columns"]
+    }
+    index = None
+    if entry["index"] is not None:
+        off, unit, tz = entry["index"]
+        ticks = np.ndarray((n,), dtype=np.int64, buffer=buf, offset=off)
+        index = pd.DatetimeIndex(ticks.view(f"M8[{unit}]"))
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# WORKER
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _init_worker(
+    shm_name: Optional[str],
+    layout: dict,
+    combos: list[dict],
+    cache_mb: float,
+    warehouse: Optional[str] = None,
+) -> None:
+    from backtest.indicator_cache import IndicatorCache
+
+    if warehouse:
+        from backtest.price_warehouse import PriceWarehouse
+
+        _WORKER["warehouse"] = PriceWarehouse(warehouse)
+    else:
+        # Pool children share the parent's resource tracker, so attaching does
+        # not hand ownership over — the parent alone unlinks the block
+        _WORKER["shm"] = shared_memory.SharedMemory(name=shm_name)
+    _WORKER["layout"] = layout
+    _WORKER["combos"] = combos
+    _WORKER["frames"] = {}
+    _WORKER["cache"] = IndicatorCache(max_mb=cache_mb)
+
+
+def _worker_frame(symbol: str) -> pd.DataFrame:
+    frames = _WORKER["frames"]
+    if symbol not in frames:
+        if "warehouse" in _WORKER:
+            first, last = _WORKER["layout"][symbol]
+            frames[symbol] = _WORKER["warehouse"].frame(symbol).loc[first:last]
+        else:
+            frames[symbol] = _unpack_symbol(_WORKER["shm"].buf, _WORKER["layout"][symbol])
+    return frames[symbol]
+
+
+def _run_units(units: list[tuple[int, str]]) -> tuple[list[tuple[int, str, dict]], dict]:
+    """
+    Evaluate a batch of (combo_idx, symbol) units inside a worker.
+    Returns (results, indicator-cache counts accrued by this batch).
+    """
+    from backtest.param_sweep import evaluate_combo
+
+    cache = _WORKER["cache"]
+    before = (cache.hits, cache.misses, cache.evictions)
+    results = [
+        (ci, sym, evaluate_combo(_worker_frame(sym), _WORKER["combos"][ci],
+                                 cache=cache, symbol=sym))
+        for ci, sym in units
+    ]
+    delta = {
+        "hits": cache.hits - before[0],
+        "misses": cache.misses - before[1],
+        "evictions": cache.evictions - before[2],
+    }
+    return results, delta
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CHECKPOINT
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def sweep_fingerprint(
+    universe: dict[str, pd.DataFrame], combos: list[dict], symbols: list[str],
+) -> str:
+    """Stable hash of grid + symbol data; a checkpoint is only reused on match."""
+    h = hashlib.sha1()
+    h.update(json.dumps(combos, sort_keys=True, default=str).encode())
+    for sym in symbols:
+        df = universe[sym]
+        h.update(sym.encode())
+        h.update(str(list(df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _json_default(v):
+    if isinstance(v, (np.integer, np.floating, np.bool_)):
+        return v.item()
+    return str(v)
+
+
+def _load_checkpoint(path: str, fingerprint: str) -> dict[tuple[int, str], dict]:
+    """Completed units from a checkpoint file, or {} if absent / for another sweep."""
+    done: dict[tuple[int, str], dict] = {}
+    if not os.path.exists(path):
+        return done
+    try:
+        with open(path) as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("fingerprint") != fingerprint:
+                logger.warning("Checkpoint %s is for a different sweep — starting fresh", path)
+                return {}
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn final line from a crash
+                done[(rec["ci"], rec["symbol"])] = rec["result"]
+    except Exception as exc:
+        logger.warning("Checkpoint read failed %s: %s — starting fresh", path, exc)
+        return {}
+    return done
+
+
+def _open_checkpoint(path: str, fingerprint: str, done: dict):
+    """Rewrite header + completed units (dropping any torn line), open for append."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+        for (ci, sym), result in done.items():
+            f.write(json.dumps({"ci": ci, "symbol": sym, "result": result},
+                               default=_json_default) + "\n")
+    os.replace(tmp, path)
+    return open(path, "a")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EXECUTOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def iter_sweep(
+    universe: dict[str, pd.DataFrame],
+    combos: list[dict],
+    symbols: list[str],
+    workers: int = 1,
+    checkpoint: Optional[str] = None,
+    batch_size: int = 8,
+    cache: Optional["IndicatorCache"] = None,
+    warehouse: Optional[str] = None,
+) -> Iterator[tuple[int, str, dict]]:
+    """
+    Evaluate every (combo, symbol) unit; yield (combo_idx, symbol, result).
+
+    Units restored from the checkpoint are yielded first, then fresh units in
+    completion order. workers <= 1 runs in-process (still checkpointed).
+    cache is used directly in-process; pool workers keep their own cache
+    (same byte budget) and their hit/miss counts are absorbed into it.
+    warehouse: directory the universe was loaded from (PriceWarehouse
+    .to_universe); pool workers map it rather than a shared-memory copy.
+    """
+    from backtest.indicator_cache import IndicatorCache
+    from backtest.param_sweep import evaluate_combo
+
+    if cache is None:
+        cache = IndicatorCache()
+
+    done: dict[tuple[int, str], dict] = {}
+    ckpt = None
+    if checkpoint:
+        fp = sweep_fingerprint(universe, combos, symbols)
+        done = _load_checkpoint(checkpoint, fp)
+        ckpt = _open_checkpoint(checkpoint, fp, done)
+        if done:
+            logger.info("Resuming sweep: %d units restored from %s", len(done), checkpoint)
+
+    for (ci, sym), result in done.items():
+        yield ci, sym, result
+
+    pending = [
+        (ci, sym) for ci in range(len(combos)) for sym in symbols if (ci, sym) not in done
+    ]
+    total = len(pending)
+    logger.info("Sweep: %d units to run (%d workers)", total, max(workers, 1))
+
+    def _record(ci: int, sym: str, result: dict) -> None:
+        if ckpt is not None:
+            ckpt.write(json.dumps({"ci": ci, "symbol": sym, "result": result},
+                                  default=_json_default) + "\n")
+            ckpt.flush()
+
+    finished = 0
+    try:
+        if workers <= 1:
+            for ci, sym in pending:
+                result = evaluate_combo(universe[sym], combos[ci], cache=cache, symbol=sym)
+                _record(ci, sym, result)
+                finished += 1
+                if finished % 500 == 0:
+                    logger.info("Sweep progress: %d/%d units", finished, total)
+                yield ci, sym, result
+            return
+
+        if warehouse:
+            # Workers map the warehouse and trim to the parent's date range
+            shm = None
+            layout = {s: (universe[s].index[0], universe[s].index[-1]) for s in symbols}
+        else:
+            shm, layout = _pack_universe({s: universe[s] for s in symbols})
+        try:
+            batches = [pending[i: i + batch_size] for i in range(0, total, batch_size)]
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(shm and shm.name, layout, combos,
+                          cache.max_bytes / 1024 / 1024, warehouse),
+            ) as pool:
+                queue = iter(batches)
+                in_flight = set()
+                for batch in queue:
+                    in_flight.add(pool.submit(_run_units, batch))
+                    if len(in_flight) >= workers * 4:
+                        break
+                while in_flight:
+                    ready, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in ready:
+                        results, cache_delta = fut.result()
+                        cache.absorb(cache_delta)
+                        for ci, sym, result in results:
+                            _record(ci, sym, result)
+                            finished += 1
+                            yield ci, sym, result
+                        nxt = next(queue, None)
+                        if nxt is not None:
+                            in_flight.add(pool.submit(_run_units, nxt))
+                    if finished and finished % 500 < batch_size:
+                        logger.info("Sweep progress: %d/%d units", finished, total)
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+    finally:
+        if ckpt is not None:
+            ckpt.close()
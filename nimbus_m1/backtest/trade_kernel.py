@@ -0,0 +1,190 @@
+"""
+backtest/trade_kernel.py
+────────────────────────
+Single-position entry/exit loop shared by the run_* sweep scripts
+(run_walkforward, run_deep_sweep, run_full_sweep, run_etf_momentum).
+
+The scripts differ in WHEN they enter and WHICH exits they check, not in
+the loop itself, so each one splits its old per-bar loop in two:
+
+  - everything that depends only on bar t (entry filters, indicator exit
+    signals) becomes boolean arrays, computed with NumPy once per call;
+  - everything that depends on the open trade (bars held, entry price,
+    running peak) is checked here, bar by bar, in the caller's rule order.
+
+    rules   int array of exit rules in priority order — first hit wins and
+            its id is the trade's reason code
+    params  float array indexed by the P_* slots below
+
+Rules:
+    PT        ep > 0 and (cl/ep - 1)*100 >= params[P_PT]
+    STOP      ep > 0 and (cl/ep - 1)*100 <= -params[P_STOP]
+    TRAIL     atr[t] not NaN, peak > 0 and cl < peak - params[P_TRAIL]*atr[t]
+    MAX_HOLD  bars >= params[P_MAX]
+    SIGNAL    bars >= params[P_SIG_MIN] and sig[t]
+              (and (cl/ep - 1)*100 > params[P_SIG_PNL] unless that is NaN)
+    SIGNAL2   same with sig2, P_SIG2_MIN, P_SIG2_PNL
+
+The loop is compiled with Numba when it is installed (njit, on-disk cache);
+otherwise the same source runs as plain Python over lists, which is still
+far cheaper than the scripts' old loops since the entry checks are gone
+from it. NIMBUS_NO_JIT=1 forces the fallback. Both backends return the
+same trades — the float expressions are the scripts' own.
+
+    rules = [PT, SIGNAL, MAX_HOLD]
+    params = make_params(pt=3.0, max_hold=25, sig_min=5)
+    entries, exits, reasons = run_trades(close, entry, lo, hi, rules, params, sig=sig)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Exit rule ids (also the reason codes returned per trade)
+PT, STOP, TRAIL, MAX_HOLD, SIGNAL, SIGNAL2 = range(6)
+
+# Parameter vector slots
+P_PT, P_STOP, P_TRAIL, P_MAX, P_SIG_MIN, P_SIG_PNL, P_SIG2_MIN, P_SIG2_PNL = range(8)
+N_PARAMS = 8
+
+
+def make_params(
+    pt: Optional[float] = None,
+    stop: Optional[float] = None,
+    trail: Optional[float] = None,
+    max_hold: Optional[float] = None,
+    sig_min: float = 0,
+    sig_pnl: Optional[float] = None,
+    sig2_min: float = 0,
+    sig2_pnl: Optional[float] = None,
+) -> np.ndarray:
+    """Parameter vector for run_trades; None → NaN (slot unused / no gate)."""
+    vals = (pt, stop, trail, max_hold, sig_min, sig_pnl, sig2_min, sig2_pnl)
+    return np.array([np.nan if v is None else float(v) for v in vals])
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LOOP
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _trade_loop(close, entry, atr, sig, sig2, rules, params, lo, hi):
+    # NaN tests are written x != x so the source runs unchanged under Numba
+    # and as plain Python over lists.
+    cap = (hi - lo) // 2 + 1
+    out_entry = np.empty(cap, np.int64)
+    out_exit = np.empty(cap, np.int64)
+    out_reason = np.empty(cap, np.int64)
+    k = 0
+    in_t = False
+    eb = 0
+    ep = 0.0
+    peak = 0.0
+    for t in range(lo, hi):
+        cl = close[t]
+        if not in_t:
+            if entry[t]:
+                in_t = True
+                eb = t
+                ep = cl
+                peak = cl
+            continue
+
+        bars = t - eb
+        if cl > peak:
+            peak = cl
+        reason = -1
+        for r in rules:
+            hit = False
+            if r == PT:
+                hit = ep > 0 and (cl / ep - 1) * 100 >= params[P_PT]
+            elif r == STOP:
+                hit = ep > 0 and (cl / ep - 1) * 100 <= -params[P_STOP]
+            elif r == TRAIL:
+                a = atr[t]
+                hit = a == a and peak > 0 and cl < peak - params[P_TRAIL] * a
+            elif r == MAX_HOLD:
+                hit = bars >= params[P_MAX]
+            elif r == SIGNAL:
+                g = params[P_SIG_PNL]
+                hit = bars >= params[P_SIG_MIN] and sig[t] and (g != g or (cl / ep - 1) * 100 > g)
+            elif r == SIGNAL2:
+                g = params[P_SIG2_PNL]
+                hit = bars >= params[P_SIG2_MIN] and sig2[t] and (g != g or (cl / ep - 1) * 100 > g)
+            if hit:
+                reason = r
+                break
+        if reason >= 0:
+            out_entry[k] = eb
+            out_exit[k] = t
+            out_reason[k] = reason
+            k += 1
+            in_t = False
+    return out_entry[:k], out_exit[:k], out_reason[:k]
+
+
+try:
+    from numba import njit
+
+    _jit_loop = njit(cache=True)(_trade_loop)
+    HAVE_NUMBA = True
+except ImportError:
+    _jit_loop = None
+    HAVE_NUMBA = False
+
+# "numba" or "python"; switchable at runtime (benchmarks, tests)
+BACKEND = "numba" if HAVE_NUMBA and os.environ.get("NIMBUS_NO_JIT") != "1" else "python"
+
+
+def run_trades(
+    close: np.ndarray,
+    entry: np.ndarray,
+    lo: int,
+    hi: int,
+    rules,
+    params: np.ndarray,
+    atr: Optional[np.ndarray] = None,
+    sig: Optional[np.ndarray] = None,
+    sig2: Optional[np.ndarray] = None,
+    backend: Optional[str] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trades taken over bars [lo, hi) → (entry_bars, exit_bars, reason_codes).
+
+    One position at a time; a bar that closes a trade cannot open the next
+    one, and a trade still open at hi is discarded — like the scripts'
+    loops. Unused arrays (atr / sig / sig2) may be None.
+    """
+    n = len(close)
+    lo, hi = max(int(lo), 0), min(int(hi), n)
+    if hi <= lo:
+        empty = np.empty(0, np.int64)
+        return empty, empty, empty
+    close = np.asarray(close, np.float64)
+    entry = np.asarray(entry, np.bool_)
+    atr = np.full(n, np.nan) if atr is None else np.asarray(atr, np.float64)
+    sig = np.zeros(n, np.bool_) if sig is None else np.asarray(sig, np.bool_)
+    sig2 = np.zeros(n, np.bool_) if sig2 is None else np.asarray(sig2, np.bool_)
+    rules = np.asarray(rules, np.int64)
+    params = np.asarray(params, np.float64)
+
+    if (backend or BACKEND) == "numba" and _jit_loop is not None:
+        return _jit_loop(close, entry, atr, sig, sig2, rules, params, lo, hi)
+    return _trade_loop(
+        close.tolist(), entry.tolist(), atr.tolist(), sig.tolist(), sig2.tolist(),
+        rules.tolist(), params.tolist(), lo, hi,
+    )
+
+
+def entry_dates(index: pd.Index, bars: np.ndarray) -> list[str]:
+    """str(date) of each entry bar ("" for a non-datetime index), in one pass."""
+    if isinstance(index, pd.DatetimeIndex):
+        return [str(d) for d in index[bars].date]
+    return [""] * len(bars)
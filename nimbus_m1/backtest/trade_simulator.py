@@ -17,6 +17,10 @@ Exit rules (the revamped exit intelligence):
   6. MFI divergence:    reduce to 50% if mfi_diverge fires during trade
 
 Output: list of Trade objects with entry/exit details, P&L, hold time.
+
+FAST MODE (default): for daily data the per-bar PriceSignals are precomputed in
+one pass (backtest/signal_frame.py) and the entry/exit state machine walks plain
+NumPy arrays. Trades are identical to the per-bar path (incremental=False).
 """
 
 from __future__ import annotations
@@ -28,7 +32,8 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
-from modules.indicators import add_bollinger, add_williams_r, compute_price_signals
+from modules.indicators import add_price_indicators, compute_price_signals
+from backtest.signal_frame import compute_signal_frame, signal_records, supports_frame
 
 logger = logging.getLogger(__name__)
 
@@ -193,6 +198,7 @@ def simulate_trades(
     wr_thresh: float = -20.0,
     max_concurrent: int = 1,
     cooldown_bars: int = 3,
+    incremental: bool = True,
 ) -> list[Trade]:
     """
     Simulate trades on historical OHLCV using NIMBUS entry/exit rules.
@@ -203,31 +209,44 @@ def simulate_trades(
     Args:
         max_concurrent: max open positions (1 for single-symbol)
         cooldown_bars: bars to wait after an exit before re-entering
+        incremental: precompute all bars' signals in one pass (daily data);
+                     False re-runs compute_price_signals on every bar
     """
     warmup = max(bb_period, wr_period) + 30  # extra buffer for MFI
     if len(df) < warmup + 20:
         return []
 
     # Pre-compute indicators on full dataset for exit checks
-    full = df.copy()
-    full = add_bollinger(full, bb_period, bb_std)
-    full = add_williams_r(full, wr_period)
+    full = add_price_indicators(df, bb_period, bb_std, wr_period)
     full["ATR_14"] = _atr(full, 14)
 
+    closes = full["Close"].to_numpy(dtype=float)
+    bb_mids = full["BB_Mid"].to_numpy(dtype=float)
+    bb_uppers = full["BB_Upper"].to_numpy(dtype=float)
+    bb_widths = full["BB_Width"].to_numpy(dtype=float)
+    atrs = full["ATR_14"].to_numpy(dtype=float)
+
+    # Signals at bar T use ONLY history[:T+1] — either precomputed causally
+    # for every bar, or recomputed per bar by the live pipeline function
+    if incremental and supports_frame(full):
+        bar_signals = signal_records(compute_signal_frame(full, wr_thresh=wr_thresh))
+        signals_for = bar_signals.__getitem__
+    else:
+        def signals_for(bar: int):
+            return compute_price_signals(full.iloc[: bar + 1], wr_thresh=wr_thresh)
+
     trades: list[Trade] = []
     open_trade: Optional[Trade] = None
     last_exit_bar = -cooldown_bars - 1
 
     for bar in range(warmup, len(full)):
-        close = float(full.iloc[bar]["Close"])
-        bb_mid = float(full.iloc[bar].get("BB_Mid", close))
-        bb_upper = float(full.iloc[bar].get("BB_Upper", close))
-        bb_width_val = float(full.iloc[bar].get("BB_Width", 0))
-        atr_val = float(full.iloc[bar].get("ATR_14", 0))
+        close = float(closes[bar])
+        bb_mid = float(bb_mids[bar])
+        bb_upper = float(bb_uppers[bar])
+        bb_width_val = float(bb_widths[bar])
+        atr_val = float(atrs[bar])
 
-        # Compute signals using ONLY past data
-        hist = full.iloc[: bar + 1]
-        ps = compute_price_signals(hist, wr_thresh=wr_thresh)
+        ps = signals_for(bar)
 
         # ── EXIT CHECK ────────────────────────────────────────────────────
         if open_trade is not None:
@@ -309,7 +328,7 @@ def simulate_trades(
     # Close any remaining open trade at last bar
     if open_trade is not None:
         bar = len(full) - 1
-        close = float(full.iloc[bar]["Close"])
+        close = float(closes[bar])
         open_trade.exit_date = full.index[bar]
         open_trade.exit_price = close
         open_trade.exit_reason = "END_OF_DATA"
@@ -5,13 +5,23 @@ Entry point: logging → pyqtgraph config → QApplication → MainWindow.
 
 Logging is configured FIRST (before any other imports that might log).
 pyqtgraph global config is set BEFORE any ui/ imports (roadmap §0.1).
+
+    python main.py                # every tab built at startup
+    python main.py --fast-start   # or NIMBUS_FAST_START=1
+
+Fast start builds only the Dashboard, imports the other tabs on first show
+and holds every network call until the first window has painted. Startup
+cost is tracked by `python run_benchmark.py startup`.
 """
 
 from __future__ import annotations
 
 import os
 import sys
+import time
 import logging
+
+_T0 = time.perf_counter()
 from logging.handlers import RotatingFileHandler
 
 # ── Logging (roadmap §0.3 — first 10 lines after imports) ────────────────────
@@ -66,8 +76,11 @@ def _load_fonts():
 
 
 def main():
+    fast_start = "--fast-start" in sys.argv or os.environ.get("NIMBUS_FAST_START") == "1"
+    argv = [a for a in sys.argv if a != "--fast-start"]
+
     # High-DPI scaling (Qt6 does this by default, but be explicit)
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
     app.setApplicationName("NIMBUS")
     app.setOrganizationName("NIMBUS")
 
@@ -84,19 +97,27 @@ def main():
             "place .ttf files in assets/ for best rendering"
         )
 
-    # Verify modules/ imports cleanly (gate 0.2)
-    try:
-        from modules import analytics, indicators, data, scanner
+    # Verify modules/ imports cleanly (gate 0.2) — fast start imports lazily
+    if not fast_start:
+        try:
+            from modules import analytics, indicators, data, scanner
 
-        logger.info("modules/ imported successfully ✓")
-    except Exception as exc:
-        logger.error("modules/ import failed: %s", exc)
-        # Non-fatal — app still launches, but data pipeline won't work
+            logger.info("modules/ imported successfully ✓")
+        except Exception as exc:
+            logger.error("modules/ import failed: %s", exc)
+            # Non-fatal — app still launches, but data pipeline won't work
 
     # Launch main window
-    window = MainWindow()
+    window = MainWindow(fast_start=fast_start)
     window.show()
-    logger.info("MainWindow shown — Phase 0 gate open")
+    if fast_start:
+        app.processEvents()  # first paint before any network call
+        window.start_background_work()
+    logger.info(
+        "MainWindow shown in %.0f ms%s — Phase 0 gate open",
+        (time.perf_counter() - _T0) * 1000,
+        " (fast start)" if fast_start else "",
+    )
 
     sys.exit(app.exec())
 
@@ -358,9 +358,103 @@ def _parse_dte(expiry_str: str, today: datetime.date) -> int:
     return -1
 
 
+def _bs_gamma_vec(S: float, K: np.ndarray, T: np.ndarray, r: float, sigma: np.ndarray):
+    """_bs_gamma over arrays; 0.0 wherever the scalar version returns 0.0."""
+    if S <= 0:
+        return np.zeros(len(K))
+    with np.errstate(all="ignore"):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+        g = np.exp(-0.5 * d1**2) / (S * sigma * np.sqrt(2 * math.pi * T))
+    # math.log raises for K <= 0 (caught → 0.0); np.log gives -inf / nan there
+    return np.where((sigma <= 0) | (T <= 0) | (K <= 0), 0.0, g)
+
+
+def _num_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
 def _gex(
     df: pd.DataFrame, spot: float, lot_size: int, r: float = 0.065, max_dte: int = 90
 ) -> GEX:
+    """
+    Gamma exposure by strike / expiry, one array pass over the chain.
+    Expiry strings are parsed once per unique expiry, not once per row.
+    Same GEX as _gex_per_row() — the unrounded per-expiry nets can differ in
+    the last bit (numpy vs libm exp/log).
+    """
+    today = datetime.date.today()
+    n = len(df)
+    if n == 0:
+        return GEX(spot=spot)
+
+    if "Expiry" in df.columns:
+        codes, uniques = pd.factorize(df["Expiry"], use_na_sentinel=False)
+        dte_u = np.array([_parse_dte(str(e), today) for e in uniques], dtype=int)
+        dte = dte_u[codes]
+    else:
+        dte = np.full(n, _parse_dte("", today))
+    strike = df["Strike"].to_numpy(dtype=float)
+    live = (dte > 0) & (dte <= max_dte)
+
+    ce_iv, pe_iv = _num_col(df, "CE_IV"), _num_col(df, "PE_IV")
+    ce_iv = np.where(ce_iv > 1, ce_iv / 100, ce_iv)
+    pe_iv = np.where(pe_iv > 1, pe_iv / 100, pe_iv)
+    ce_oi, pe_oi = _num_col(df, "CE_OI"), _num_col(df, "PE_OI")
+
+    # Interleave (call, put) per row — the order the per-row loop appends in
+    iv = np.column_stack([ce_iv, pe_iv]).ravel()
+    oi = np.column_stack([ce_oi, pe_oi]).ravel()
+    keep = np.repeat(live, 2) & (iv > 0.01) & (oi > 0)
+    if not keep.any():
+        return GEX(spot=spot)
+
+    sign = np.tile([1.0, -1.0], n)[keep]
+    k = np.repeat(strike, 2)[keep]
+    d = np.repeat(dte, 2)[keep]
+    g = _bs_gamma_vec(spot, k, d / 365, r, iv[keep])
+    gex = (sign * g) * oi[keep] * lot_size * spot**2 / 1e6
+    gex[np.isnan(gex)] = 0.0  # NaN strike → NaN gamma; per-row pandas sums skip it
+
+    net = float(gex.sum())
+    abs_tot = float(np.abs(gex).sum())
+
+    # Cumulative GEX by ascending strike; HVL = first strike where it flips sign
+    has_k = ~np.isnan(k)
+    strikes, inv = np.unique(k[has_k], return_inverse=True)
+    cum = np.cumsum(np.bincount(inv, weights=gex[has_k], minlength=len(strikes)))
+    cross = np.flatnonzero(cum[:-1] * cum[1:] < 0)
+    hvl = float(strikes[cross[0] + 1]) if len(cross) else None
+
+    regime = (
+        "Negative"
+        if net < -abs_tot * 0.05
+        else "Positive" if net > abs_tot * 0.05 else "Neutral"
+    )
+
+    by_expiry = []
+    dtes, inv = np.unique(d, return_inverse=True)
+    for dte_val, exp_net in zip(dtes, np.bincount(inv, weights=gex)):
+        exp_net = float(exp_net)
+        exp_pct = abs(exp_net) / abs_tot * 100 if abs_tot else 0
+        exp_date = (today + datetime.timedelta(days=int(dte_val))).strftime("%d-%b")
+        by_expiry.append((exp_date, int(dte_val), exp_net, round(exp_pct, 1)))
+
+    return GEX(
+        net_gex=round(net, 0),
+        abs_gex=round(abs_tot, 0),
+        regime=regime,
+        hvl=hvl,
+        by_expiry=by_expiry,
+        spot=spot,
+    )
+
+
+def _gex_per_row(
+    df: pd.DataFrame, spot: float, lot_size: int, r: float = 0.065, max_dte: int = 90
+) -> GEX:
+    """Reference row-by-row _gex() — kept for parity tests and run_benchmark.py gex."""
     today = datetime.date.today()
     rows = []
     for _, row in df.iterrows():
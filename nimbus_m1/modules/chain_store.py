@@ -0,0 +1,323 @@
+"""
+modules/chain_store.py
+──────────────────────
+On-disk option-chain snapshots with point-in-time reads.
+
+Layout (one compressed .npz per symbol × expiry × snapshot):
+
+    data/chain_store/{SYMBOL}/index.json               committed snapshots
+    data/chain_store/{SYMBOL}/{EXPIRY}/strikes.npy     strike dictionary
+    data/chain_store/{SYMBOL}/{EXPIRY}/{ts_ms}.npz     one snapshot
+
+Strikes are dictionary-encoded: each expiry keeps an append-only array of
+the strikes it has seen and snapshots store int32 codes into it, next to
+the value columns (CE_OI, PE_IV, …) in their own dtypes. Codes never
+change once assigned, so old snapshots stay readable as the dictionary
+grows.
+
+A write stamps every expiry of the chain with the same ts_ms, so a
+snapshot is "all files named {ts_ms}.npz" — as_of() and range() never mix
+expiries fetched at different times. The snapshot's .npz files are all in
+place before index.json (ts_ms → expiries) is replaced to list it, and
+readers only look at the index, so a half-written snapshot is never seen.
+The index is cached in memory and re-read only when its mtime changes.
+
+Snapshots older than keep_days are pruned by the first write of the process
+and then once a day.
+
+Reads:
+    store.latest("NIFTY")                  → (datetime, chain) | None
+    store.as_of("NIFTY", yesterday_close)  → (datetime, chain) | None
+    store.range("NIFTY", t0, t1)           → long frame + "Snapshot" column
+
+Chains come back in download_options() shape (Strike, Expiry, …).
+Timestamps are local time, like datetime.now().
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "chain_store"
+)
+
+DEFAULT_MIN_INTERVAL = 300.0  # seconds between stored snapshots of one symbol
+DEFAULT_KEEP_DAYS = 30
+PRUNE_EVERY = 86400.0  # seconds between automatic prunes
+
+TimeLike = Union[datetime.datetime, pd.Timestamp, str, float, int]
+
+
+def _to_ms(ts: TimeLike) -> int:
+    """Epoch milliseconds; naive datetimes / strings are local time."""
+    if isinstance(ts, (int, float)):
+        return int(ts * 1000)
+    if isinstance(ts, str):
+        ts = pd.Timestamp(ts)
+    if isinstance(ts, pd.Timestamp):
+        ts = ts.to_pydatetime()
+    return int(ts.timestamp() * 1000)
+
+
+def _from_ms(ms: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ms / 1000)
+
+
+class ChainStore:
+    """Snapshot store rooted at one directory. Safe for concurrent writers in one process."""
+
+    def __init__(
+        self,
+        root: str = _DEFAULT_DIR,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        keep_days: float = DEFAULT_KEEP_DAYS,
+    ):
+        self.root = root
+        self.min_interval = min_interval
+        self.keep_days = keep_days
+        self._lock = threading.RLock()
+        self._last_write: dict[str, int] = {}
+        self._index: dict[str, tuple[int, dict[int, list[str]]]] = {}  # symbol → (mtime_ns, stamps)
+        self._last_prune = 0.0
+
+    # ── paths ─────────────────────────────────────────────────────────────────
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.upper())
+
+    def _index_path(self, symbol: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), "index.json")
+
+    def _expiries(self, symbol: str) -> list[str]:
+        d = self._symbol_dir(symbol)
+        if not os.path.isdir(d):
+            return []
+        return sorted(e for e in os.listdir(d) if os.path.isdir(os.path.join(d, e)))
+
+    # ── snapshot index ────────────────────────────────────────────────────────
+
+    def _scan(self, symbol: str) -> dict[int, list[str]]:
+        """{ts_ms: [expiry, …]} from the .npz files on disk (stores without an index)."""
+        out: dict[int, list[str]] = {}
+        for exp in self._expiries(symbol):
+            for name in os.listdir(os.path.join(self._symbol_dir(symbol), exp)):
+                if name.endswith(".npz") and name[:-4].isdigit():
+                    out.setdefault(int(name[:-4]), []).append(exp)
+        return out
+
+    def _stamps(self, symbol: str) -> dict[int, list[str]]:
+        """{ts_ms: [expiry, …]} for every committed snapshot of symbol. Caller holds the lock."""
+        symbol = symbol.upper()
+        path = self._index_path(symbol)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            if not os.path.isdir(self._symbol_dir(symbol)):
+                return {}
+            stamps = self._scan(symbol)  # written before the index existed
+            if stamps:
+                self._save_index(symbol, stamps)
+            return stamps
+        cached = self._index.get(symbol)
+        if cached is None or cached[0] != mtime:
+            with open(path) as f:
+                stamps = {int(k): v for k, v in json.load(f).items()}
+            cached = self._index[symbol] = (mtime, stamps)
+        return cached[1]
+
+    def _save_index(self, symbol: str, stamps: dict[int, list[str]]) -> None:
+        """Replace index.json — the commit point of writes and prunes."""
+        path = self._index_path(symbol)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({str(t): sorted(e) for t, e in sorted(stamps.items())}, f)
+        os.replace(tmp, path)
+        self._index[symbol.upper()] = (os.stat(path).st_mtime_ns, stamps)
+
+    # ── strike dictionary ─────────────────────────────────────────────────────
+
+    def _encode(self, exp_dir: str, strikes: np.ndarray) -> np.ndarray:
+        """Codes for strikes, appending unseen strikes to the dictionary."""
+        path = os.path.join(exp_dir, "strikes.npy")
+        known = np.load(path) if os.path.exists(path) else np.empty(0, np.float64)
+        new = np.setdiff1d(strikes, known)
+        if len(new):
+            known = np.concatenate([known, new])
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, known)
+            os.replace(tmp, path)
+        order = np.argsort(known, kind="stable")
+        return order[np.searchsorted(known, strikes, sorter=order)].astype(np.int32)
+
+    # ── write ─────────────────────────────────────────────────────────────────
+
+    def write(
+        self,
+        symbol: str,
+        chain: pd.DataFrame,
+        ts: Optional[TimeLike] = None,
+        force: bool = False,
+    ) -> Optional[datetime.datetime]:
+        """
+        Store one chain (all its expiries) as a snapshot. Returns its
+        timestamp, or None when skipped — empty chain, or a snapshot of this
+        symbol was stored less than min_interval ago (unless force).
+
+        Every expiry file is in place before the index lists the snapshot.
+        Runs prune() first when the last one was over PRUNE_EVERY ago.
+        """
+        if chain is None or chain.empty or "Expiry" not in chain or "Strike" not in chain:
+            return None
+        symbol = symbol.upper()
+        ts_ms = _to_ms(time.time() if ts is None else ts)
+
+        with self._lock:
+            if time.time() - self._last_prune >= PRUNE_EVERY:
+                self.prune()
+            stamps = self._stamps(symbol)
+            last = self._last_write.get(symbol)
+            if last is None:
+                last = max(stamps) if stamps else None
+            if not force and last is not None and 0 <= ts_ms - last < self.min_interval * 1000:
+                return None
+
+            value_cols = [
+                c for c in chain.columns
+                if c not in ("Strike", "Expiry") and pd.api.types.is_numeric_dtype(chain[c])
+            ]
+            written = []
+            for exp, part in chain.groupby("Expiry", sort=False):
+                exp_dir = os.path.join(self._symbol_dir(symbol), str(exp))
+                os.makedirs(exp_dir, exist_ok=True)
+                strikes = pd.to_numeric(part["Strike"], errors="coerce").to_numpy(np.float64)
+                keep = ~np.isnan(strikes)
+                arrays = {"__strike_codes": self._encode(exp_dir, strikes[keep])}
+                arrays.update({c: part[c].to_numpy()[keep] for c in value_cols})
+                path = os.path.join(exp_dir, f"{ts_ms}.npz")
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    np.savez_compressed(f, **arrays)
+                os.replace(tmp, path)
+                written.append(str(exp))
+            self._save_index(symbol, {**stamps, ts_ms: written})
+            self._last_write[symbol] = max(ts_ms, last or ts_ms)
+        return _from_ms(ts_ms)
+
+    # ── read ──────────────────────────────────────────────────────────────────
+
+    def _read(self, symbol: str, ts_ms: int, expiries: list[str]) -> pd.DataFrame:
+        frames = []
+        for exp in expiries:
+            exp_dir = os.path.join(self._symbol_dir(symbol), exp)
+            known = np.load(os.path.join(exp_dir, "strikes.npy"))
+            with np.load(os.path.join(exp_dir, f"{ts_ms}.npz")) as z:
+                cols = {"Strike": known[z["__strike_codes"]], "Expiry": exp}
+                cols.update({k: z[k] for k in z.files if k != "__strike_codes"})
+            frames.append(pd.DataFrame(cols))
+        return pd.concat(frames, ignore_index=True)
+
+    def _pick(self, symbol: str, upto_ms: Optional[int]) -> Optional[tuple]:
+        with self._lock:
+            stamps = self._stamps(symbol)
+            eligible = [t for t in stamps if upto_ms is None or t <= upto_ms]
+            if not eligible:
+                return None
+            ts_ms = max(eligible)
+            return _from_ms(ts_ms), self._read(symbol, ts_ms, sorted(stamps[ts_ms]))
+
+    def snapshots(self, symbol: str) -> list[datetime.datetime]:
+        """Timestamps of every stored snapshot of symbol, oldest first."""
+        with self._lock:
+            return [_from_ms(t) for t in sorted(self._stamps(symbol))]
+
+    def latest(self, symbol: str) -> Optional[tuple[datetime.datetime, pd.DataFrame]]:
+        """Most recent snapshot as (timestamp, chain), or None."""
+        return self._pick(symbol, None)
+
+    def as_of(
+        self, symbol: str, ts: TimeLike
+    ) -> Optional[tuple[datetime.datetime, pd.DataFrame]]:
+        """The chain as last stored at or before ts, or None."""
+        return self._pick(symbol, _to_ms(ts))
+
+    def range(self, symbol: str, t0: TimeLike, t1: TimeLike) -> pd.DataFrame:
+        """All snapshots with t0 <= timestamp <= t1, stacked, oldest first."""
+        lo, hi = _to_ms(t0), _to_ms(t1)
+        frames = []
+        with self._lock:
+            stamps = self._stamps(symbol)
+            for ts_ms in sorted(t for t in stamps if lo <= t <= hi):
+                df = self._read(symbol, ts_ms, sorted(stamps[ts_ms]))
+                df.insert(0, "Snapshot", _from_ms(ts_ms))
+                frames.append(df)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def pcr_trend(self, symbol: str, t0: TimeLike, t1: TimeLike) -> pd.Series:
+        """Put/call OI ratio per snapshot (all stored expiries) over [t0, t1]."""
+        hist = self.range(symbol, t0, t1)
+        if hist.empty:
+            return pd.Series(dtype=float, name="PCR")
+        oi = hist.groupby("Snapshot")[["PE_OI", "CE_OI"]].sum()
+        return (oi["PE_OI"] / oi["CE_OI"].replace(0, np.nan)).rename("PCR")
+
+    # ── housekeeping ──────────────────────────────────────────────────────────
+
+    def prune(self, keep_days: Optional[float] = None) -> int:
+        """
+        Delete snapshots older than keep_days (default: the store's). The
+        index drops them before their files go; an expiry directory left
+        without snapshots goes too, strike dictionary included. Returns
+        snapshot files removed.
+        """
+        keep_days = self.keep_days if keep_days is None else keep_days
+        cutoff = _to_ms(time.time() - keep_days * 86400)
+        removed = 0
+        with self._lock:
+            self._last_prune = time.time()
+            if not os.path.isdir(self.root):
+                return 0
+            for sym in os.listdir(self.root):
+                if not os.path.isdir(self._symbol_dir(sym)):
+                    continue
+                stamps = self._stamps(sym)
+                if any(t < cutoff for t in stamps):
+                    self._save_index(sym, {t: e for t, e in stamps.items() if t >= cutoff})
+                for exp in self._expiries(sym):
+                    exp_dir = os.path.join(self._symbol_dir(sym), exp)
+                    for name in os.listdir(exp_dir):
+                        stem = name[:-8] if name.endswith(".npz.tmp") else name[:-4]
+                        if name.endswith((".npz", ".npz.tmp")) and stem.isdigit() and int(stem) < cutoff:
+                            os.remove(os.path.join(exp_dir, name))
+                            removed += 1
+                    if not any(n.endswith(".npz") for n in os.listdir(exp_dir)):
+                        shutil.rmtree(exp_dir)  # expired contract: strikes.npy is dead weight
+        if removed:
+            logger.info("chain_store: pruned %d snapshot files older than %g days", removed, keep_days)
+        return removed
+
+
+_STORE: Optional[ChainStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_chain_store() -> ChainStore:
+    """Process-wide ChainStore at data/chain_store."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ChainStore()
+        return _STORE
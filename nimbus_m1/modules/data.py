@@ -17,6 +17,11 @@ Patch v5.1:
               403 blocked) before parsing body — cleaner error messages.
   FIX-RETRY: download_options() retries once on rate-limit (429/HTML) with
               a 10s back-off and fresh session, instead of failing immediately.
+
+Bulk prices:
+  get_prices_bulk() loads a whole universe in chunked multi-ticker
+  yf.download calls (one HTTP round per chunk instead of one per symbol);
+  _YF_FALLBACKS are retried, also batched, only for symbols that failed.
 """
 
 from __future__ import annotations
@@ -24,15 +29,18 @@ from __future__ import annotations
 import json
 import logging
 import os
+import threading
 import time
 import datetime
 from datetime import date, timedelta
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-import requests
 import pandas as pd
 import numpy as np
 
+if TYPE_CHECKING:  # requests is imported on first NSE call (startup time)
+    import requests
+
 # ── NSE constants ─────────────────────────────────────────────────────────────
 NSE_INDEX_SYMBOLS = {"NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "NIFTYNXT50"}
 
@@ -129,26 +137,15 @@ _NSE_HEADER = {
 # ══════════════════════════════════════════════════════════════════════════════
 
 
-def _make_nse_session() -> Tuple[requests.Session, dict]:
-    """
-    Build a requests.Session with NSE cookies.
-
-    CONFIRMED PATTERN:
-    1. GET option-chain page with allow_redirects=False
-       → NSE hands over real session cookies (not bot-detection redirect)
-    2. cookies = dict(resp.cookies)  ← from the RESPONSE, not session.cookies
-       These are different when allow_redirects=False.
-    3. Every subsequent API call also uses allow_redirects=False + same header.
-    """
-    session = requests.Session()
-    resp = session.get(
-        "https://www.nseindia.com/option-chain",
-        headers=_NSE_HEADER,
-        allow_redirects=False,  # ← critical: do NOT follow redirects
-        timeout=15,
-    )
-    cookies = dict(resp.cookies)  # ← resp.cookies, NOT session.cookies
-    return session, cookies
+# CONFIRMED PATTERN (implemented once, in modules/nse_client.NSEClient):
+# 1. GET option-chain page with allow_redirects=False
+#    → NSE hands over real session cookies (not bot-detection redirect)
+# 2. cookies = dict(resp.cookies)  ← from the RESPONSE, not session.cookies
+#    These are different when allow_redirects=False.
+# 3. Every subsequent API call also uses allow_redirects=False + same header.
+#
+# Every NSE API call goes through get_nse_client().get_json(), so the warmed
+# session, the re-warm on 403/HTML and the shared token bucket apply to all.
 
 
 def fetch_inav(symbol: str) -> Optional[float]:
@@ -162,16 +159,9 @@ def fetch_inav(symbol: str) -> Optional[float]:
     Returns iNAV as float, or None on any failure.
     """
     try:
-        session, cookies = _make_nse_session()
-        resp = session.get(
-            "https://www.nseindia.com/api/etf",
-            headers=_NSE_HEADER,
-            cookies=cookies,
-            allow_redirects=False,
-            timeout=15,
-        )
-        _assert_json(resp)
-        data = resp.json()
+        from modules.nse_client import get_nse_client
+
+        data = get_nse_client().get_json("/api/etf", timeout=15)
         rows = data if isinstance(data, list) else data.get("data", [])
 
         sym_upper = symbol.strip().upper()
@@ -193,41 +183,6 @@ def fetch_inav(symbol: str) -> Optional[float]:
         return None
 
 
-def _get_expiry_dates(
-    session: requests.Session, cookies: dict, symbol: str
-) -> list[str]:
-    url = f"https://www.nseindia.com/api/option-chain-contract-info" f"?symbol={symbol}"
-    resp = session.get(
-        url,
-        headers=_NSE_HEADER,
-        cookies=cookies,
-        allow_redirects=False,  # ← same pattern on every API call
-        timeout=15,
-    )
-    _assert_json(resp)
-    return resp.json().get("expiryDates", [])
-
-
-def _fetch_expiry(
-    session: requests.Session, cookies: dict, symbol: str, expiry: str
-) -> list[dict]:
-    chain_type = "Indices" if symbol in NSE_INDEX_SYMBOLS else "Equities"
-    url = (
-        f"https://www.nseindia.com/api/option-chain-v3"
-        f"?type={chain_type}&symbol={symbol}&expiry={expiry}"
-    )
-    resp = session.get(
-        url,
-        headers=_NSE_HEADER,
-        cookies=cookies,
-        allow_redirects=False,  # ← same pattern
-        timeout=20,
-    )
-    _assert_json(resp)
-    data = resp.json()
-    return data.get("data", []) or data.get("records", {}).get("data", []) or []
-
-
 def _assert_json(resp: requests.Response) -> None:
     """
     Raise a clear error if NSE returned an error status, HTML, or empty body.
@@ -275,35 +230,41 @@ def download_options(
     Download full options chain from NSE for up to max_expiries expiries.
     Returns (DataFrame, status_message).
 
+    Goes through the shared NSEClient (modules/nse_client.py): one warmed
+    session for the process, expiries fetched concurrently, every request
+    paced by a global token bucket. Each successful chain is also written
+    to the on-disk snapshot store (modules/chain_store.py).
+
     FIX-RETRY: On rate-limit (429 or HTML body), wait 10s, refresh session,
     and retry once before giving up. Covers the common case where the scanner
     hammers NSE quickly and the first symbol in a batch gets blocked.
     """
+    from modules.nse_client import get_nse_client
+
     _MAX_ATTEMPTS = 2
+    client = get_nse_client()
 
     for attempt in range(1, _MAX_ATTEMPTS + 1):
         try:
-            session, cookies = _make_nse_session()
-
-            expiries = _get_expiry_dates(session, cookies, symbol)
+            expiries = client.expiry_dates(symbol)
             if not expiries:
                 return None, f"No expiry dates returned for {symbol}"
 
-            expiries = expiries[:max_expiries]
-            frames = []
-
-            for i, exp in enumerate(expiries):
-                if progress_cb:
-                    progress_cb(f"{symbol} {exp} ({i+1}/{len(expiries)})")
-                rows = _fetch_expiry(session, cookies, symbol, exp)
-                if rows:
-                    frames.append(_parse_rows(rows, symbol, exp))
-                time.sleep(0.4)
+            chains = client.fetch_chains(
+                symbol, max_expiries, progress_cb=progress_cb, expiries=expiries
+            )
+            frames = [_parse_rows(rows, symbol, exp) for exp, rows in chains if rows]
 
             if not frames:
                 return None, "All expiries returned empty data"
 
             combined = pd.concat(frames, ignore_index=True)
+            try:
+                from modules.chain_store import get_chain_store
+
+                get_chain_store().write(symbol, combined)
+            except Exception as exc:  # never fail a download over the snapshot
+                logging.warning("download_options: snapshot of %s not stored: %s", symbol, exc)
             return combined, f"✓ {len(frames)} expiries downloaded for {symbol}"
 
         except ValueError as exc:
@@ -322,6 +283,7 @@ def download_options(
                     msg[:60],
                 )
                 time.sleep(10)
+                client.invalidate()
                 continue
             return None, f"NSE download failed: {exc}"
 
@@ -397,6 +359,16 @@ def _flatten_yf(raw: pd.DataFrame) -> pd.DataFrame:
     return raw
 
 
+def _clean_price_frame(raw: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Flatten + keep positive-close bars; None if fewer than 10 remain."""
+    raw = _flatten_yf(raw)
+    if raw.empty or "Close" not in raw.columns:
+        return None
+    raw = raw[raw["Close"] > 0].copy()
+    raw.index = pd.to_datetime(raw.index)
+    return raw if len(raw) >= 10 else None
+
+
 def get_price_daily(symbol: str, days: int = 365) -> Tuple[pd.DataFrame, str]:
     """
     Fetch daily OHLCV bars. Tries primary ticker, then fallbacks on failure.
@@ -418,18 +390,161 @@ def get_price_daily(symbol: str, days: int = 365) -> Tuple[pd.DataFrame, str]:
                 tickers=t, start=start, interval="1d",
                 auto_adjust=True, progress=False, timeout=15,
             )
-            raw = _flatten_yf(raw)
-            if not raw.empty and "Close" in raw.columns:
-                raw = raw[raw["Close"] > 0].copy()
-                raw.index = pd.to_datetime(raw.index)
-                if len(raw) >= 10:
-                    return raw, f"✓ {t} · {len(raw)} daily bars"
+            raw = _clean_price_frame(raw)
+            if raw is not None:
+                return raw, f"✓ {t} · {len(raw)} daily bars"
         except Exception:
             continue
 
     return pd.DataFrame(), f"No price data for {symbol}"
 
 
+# ── bulk loader ───────────────────────────────────────────────────────────────
+
+BULK_CHUNK_SIZE = 100  # tickers per yf.download call
+BULK_CACHE_TTL = 300.0  # seconds a bulk-loaded frame is served from memory
+BULK_RETRIES = 2  # extra attempts for a chunk whose download raised
+BULK_BACKOFF = 2.0  # seconds before the first retry, doubled after each
+
+# (symbol, days) → (monotonic load time, pristine frame); copies are handed out
+_PRICE_CACHE: dict[tuple[str, int], tuple[float, pd.DataFrame]] = {}
+_PRICE_CACHE_LOCK = threading.Lock()
+
+
+def _split_yf_batch(raw: pd.DataFrame, tickers: list[str]) -> dict[str, pd.DataFrame]:
+    """Multi-ticker yf.download frame → {ticker: cleaned frame} for tickers with data."""
+    if raw is None or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        frames = {tickers[0]: raw} if len(tickers) == 1 else {}
+    else:
+        # group_by="ticker" puts tickers on level 0; tolerate the column layout too
+        level = 0 if set(tickers) & set(raw.columns.get_level_values(0)) else 1
+        present = set(raw.columns.get_level_values(level))
+        frames = {
+            t: raw.xs(t, axis=1, level=level) for t in tickers if t in present
+        }
+    out = {}
+    for t, frame in frames.items():
+        df = _clean_price_frame(frame)
+        if df is not None:
+            out[t] = df
+    return out
+
+
+def _download_chunk(yf, tickers: list[str], start: str) -> Optional[dict[str, pd.DataFrame]]:
+    """
+    One multi-ticker yf.download → {ticker: frame}, retried BULK_RETRIES
+    times with exponential backoff. None if every attempt raised — unlike
+    {} (downloaded, no usable data), the chunk's tickers were never tried.
+    """
+    for attempt in range(BULK_RETRIES + 1):
+        try:
+            raw = yf.download(
+                tickers=tickers, start=start, interval="1d",
+                auto_adjust=True, progress=False, timeout=15,
+                threads=True, group_by="ticker",
+            )
+        except Exception as exc:
+            logging.warning(
+                "Bulk price download failed (%d tickers, attempt %d/%d): %s",
+                len(tickers), attempt + 1, BULK_RETRIES + 1, exc,
+            )
+            if attempt < BULK_RETRIES:
+                time.sleep(BULK_BACKOFF * 2 ** attempt)
+            continue
+        return _split_yf_batch(raw, tickers)
+    return None
+
+
+def get_prices_bulk(
+    symbols: list[str],
+    days: int = 365,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    max_age: float = BULK_CACHE_TTL,
+) -> dict[str, pd.DataFrame]:
+    """
+    Daily OHLCV for many symbols at once → {symbol: frame}.
+
+    Round 1 downloads every primary ticker in chunks of chunk_size. Each
+    later round batches the next _YF_FALLBACKS candidate for the symbols
+    still missing — the same try-order as get_price_daily(). A chunk whose
+    download keeps raising (see _download_chunk) is not given up on: its
+    symbols are fetched one at a time with get_price_daily() at the end.
+    Symbols with no usable data are absent from the result.
+
+    Frames loaded within max_age seconds are reused. Every call returns
+    fresh copies, so callers may add indicator columns in place.
+    """
+    try:
+        import yfinance as yf
+    except ImportError:
+        logging.warning("get_prices_bulk: yfinance not installed")
+        return {}
+
+    loaded: dict[str, pd.DataFrame] = {}
+    pending: list[str] = []
+    now = time.monotonic()
+    with _PRICE_CACHE_LOCK:
+        for sym in dict.fromkeys(symbols):
+            hit = _PRICE_CACHE.get((sym, days))
+            if hit is not None and now - hit[0] <= max_age:
+                loaded[sym] = hit[1]
+            else:
+                pending.append(sym)
+    n_cached = len(loaded)
+
+    start = (date.today() - timedelta(days=days)).isoformat()
+    candidates = {
+        sym: [_yf_ticker(sym)] + _YF_FALLBACKS.get(_yf_ticker(sym), [])
+        for sym in pending
+    }
+    fresh: dict[str, pd.DataFrame] = {}
+    failed: list[str] = []  # symbols whose chunk download kept raising
+    t0 = time.time()
+    attempt = 0
+    while pending:
+        wanted: dict[str, list[str]] = {}  # ticker → symbols waiting on it
+        for sym in pending:
+            wanted.setdefault(candidates[sym][attempt], []).append(sym)
+        tickers = list(wanted)
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i: i + chunk_size]
+            got = _download_chunk(yf, chunk, start)
+            if got is None:
+                failed.extend(sym for t in chunk for sym in wanted[t])
+                continue
+            for t, df in got.items():
+                for sym in wanted[t]:
+                    fresh[sym] = df
+        attempt += 1
+        pending = [
+            s for s in pending
+            if s not in fresh and s not in failed and len(candidates[s]) > attempt
+        ]
+
+    if failed:
+        logging.warning("get_prices_bulk: fetching %d symbols one at a time", len(failed))
+        for sym in failed:
+            df, _ = get_price_daily(sym, days)
+            if not df.empty:
+                fresh[sym] = df
+
+    if fresh:
+        stamp = time.monotonic()
+        with _PRICE_CACHE_LOCK:
+            for sym, df in fresh.items():
+                _PRICE_CACHE[(sym, days)] = (stamp, df)
+        loaded.update(fresh)
+
+    missing = len(dict.fromkeys(symbols)) - len(loaded)
+    logging.info(
+        "get_prices_bulk: %d symbols (%d cached, %d downloaded, %d missing) in %.1fs",
+        len(loaded) + missing, n_cached, len(fresh), missing, time.time() - t0,
+    )
+    return {sym: df.copy() for sym, df in loaded.items()}
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # UTILITIES
 # ══════════════════════════════════════════════════════════════════════════════
@@ -612,17 +727,9 @@ def _fetch_universe_from_nse() -> list[str]:
     NSE SESSION RULES APPLY: Firefox/82 UA, allow_redirects=False,
     cookies = dict(resp.cookies) from response (not session).
     """
-    session, cookies = _make_nse_session()
-
-    resp = session.get(
-        "https://www.nseindia.com/api/master-quote",
-        headers=_NSE_HEADER,
-        cookies=cookies,
-        allow_redirects=False,  # ← mandatory on every NSE API call
-        timeout=20,
-    )
-    _assert_json(resp)
-    raw = resp.json()
+    from modules.nse_client import get_nse_client
+
+    raw = get_nse_client().get_json("/api/master-quote", timeout=20)
 
     # master-quote returns either a list or a dict with a list under a key
     if isinstance(raw, list):
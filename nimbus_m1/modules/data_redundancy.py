@@ -7,7 +7,7 @@ Each function attempts multiple data sources in priority order
 and returns a result with a staleness/confidence indicator.
 
 Fallback chains:
-  Options:  NSE live → NSE CSV upload → last cached chain (with age discount) → None
+  Options:  NSE live → last stored snapshot (with age discount) → None
   MFI:      Stock MFI → Sector-ETF MFI proxy → None
   Spot:     Options underlying → yfinance last close → cached spot → None
   Sector:   yfinance batch → individual download → cached → None
@@ -66,9 +66,6 @@ class DataResult:
 # OPTIONS CHAIN FALLBACK
 # ══════════════════════════════════════════════════════════════════════════════
 
-_options_cache: dict[str, tuple[pd.DataFrame, float]] = {}
-
-
 def get_options_with_fallback(
     symbol: str,
     max_expiries: int = 3,
@@ -76,11 +73,14 @@ def get_options_with_fallback(
     """
     Options chain with fallback chain:
       1. NSE live download
-      2. Cached chain (if < 30 min old)
+      2. Latest stored snapshot (modules/chain_store.py):
+         CACHED if < 30 min old, FALLBACK otherwise
       3. None with clear indication
 
-    Stores successful fetches in cache for #2.
+    download_options() writes every successful fetch to the store, so #2
+    survives restarts and covers the hours the market is closed.
     """
+    from modules.chain_store import get_chain_store
     from modules.data import download_options, is_market_open
 
     # Try live download (only during market hours)
@@ -88,20 +88,28 @@ def get_options_with_fallback(
         try:
             df, msg = download_options(symbol, max_expiries=max_expiries)
             if df is not None and not df.empty:
-                _options_cache[symbol] = (df, time.time())
                 return DataResult(data=df, source="LIVE", confidence=1.0)
         except Exception as exc:
             logger.debug("Live options failed %s: %s", symbol, exc)
 
-    # Try cache
-    if symbol in _options_cache:
-        cached_df, cached_ts = _options_cache[symbol]
-        age = time.time() - cached_ts
+    # Try the snapshot store
+    try:
+        snap = get_chain_store().latest(symbol)
+    except Exception as exc:
+        logger.debug("Stored options unreadable %s: %s", symbol, exc)
+        snap = None
+    if snap is not None:
+        ts, cached_df = snap
+        age = max(0.0, time.time() - ts.timestamp())
         if age < 1800:  # 30 minutes
             return DataResult(
                 data=cached_df, source="CACHED",
                 age_seconds=age, confidence=0.85,
             )
+        return DataResult(
+            data=cached_df, source="FALLBACK",
+            age_seconds=age, confidence=0.5,
+        )
 
     return DataResult(source="NONE", error=f"No options data for {symbol}")
 
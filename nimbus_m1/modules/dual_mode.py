@@ -19,7 +19,7 @@ import logging
 from dataclasses import dataclass
 import numpy as np
 import pandas as pd
-from modules.indicators import _resample_daily
+from modules.indicators import _resample_daily, rolling_autocorr, rolling_hurst
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +32,9 @@ VOL_MIN_RATIO = 0.5   # volume vs 20d average
 PROFIT_TARGET = 5.0   # exit at +5% (WF: unanimous 5/5, was 3%)
 MAX_HOLD = 25          # max hold days (WF: 3/5 chose 25, was 30)
 MIN_DAILY_BARS = 35
+# Persistence diagnostics (not scored): rolling R/S Hurst, 5d-return autocorr
+HURST_WINDOW = 120; HURST_MAX_LAG = 20
+AC_LAG = 5; AC_WINDOW = 60
 
 # ── Signal dataclass ──────────────────────────────────────────────────────────
 @dataclass
@@ -50,6 +53,8 @@ class DualModeSignal:
     dd_from_high: float = 0.0   # % drawdown from 50d high (negative)
     red_streak: int = 0          # consecutive red candles
     bb_upper: float = 0.0; bb_lower: float = 0.0
+    hurst: float = 0.5           # < 0.5 mean-reverting, > 0.5 trending
+    ret_autocorr: float = 0.0    # lag-1 autocorr of 5d returns (negative = reverting)
 
     # Entry classification
     tier: str = "NONE"          # PRIMARY, SECONDARY, NONE
@@ -121,9 +126,7 @@ def _compute_indicators(daily: pd.DataFrame) -> pd.DataFrame:
     d["BB_Lower"] = bb_ma - 2.0 * bb_sd
     d["BBW"] = ((d["BB_Upper"] - d["BB_Lower"]) / bb_ma.replace(0, np.nan) * 100)
     d["BBW_slope"] = d["BBW"].diff(5)
-    d["BBW_pctl"] = d["BBW"].rolling(100, min_periods=20).apply(
-        lambda x: pd.Series(x).rank(pct=True).iloc[-1] * 100, raw=False
-    )
+    d["BBW_pctl"] = d["BBW"].rolling(100, min_periods=20).rank(pct=True) * 100
 
     # Volume ratio
     d["VOL_RATIO"] = v / v.rolling(20).mean().replace(0, np.nan)
@@ -136,6 +139,10 @@ def _compute_indicators(daily: pd.DataFrame) -> pd.DataFrame:
     red = (c < c.shift(1)).astype(int)
     d["RED_STREAK"] = red.groupby((red != red.shift()).cumsum()).cumsum()
 
+    # Persistence (rolling, point-in-time)
+    d["HURST"] = rolling_hurst(c.pct_change(), HURST_WINDOW, HURST_MAX_LAG)
+    d["RET_AC"] = rolling_autocorr(c, AC_LAG, AC_WINDOW)
+
     return d
 
 
@@ -172,8 +179,15 @@ def compute_dual_mode(price_df, symbol="", segment="", options_ctx=None, filing_
 
     # Compute all indicators
     df = _compute_indicators(daily)
-    last = df.iloc[-1]
+    return signal_from_row(sig, df.iloc[-1], options_ctx, filing_variance)
+
 
+def signal_from_row(sig, last, options_ctx=None, filing_variance=None):
+    """
+    Fill sig from one row of _compute_indicators() output — classify, score,
+    overlay, size. compute_dual_mode() uses the last row; the portfolio
+    backtest (backtest/portfolio.py) scores historical rows directly.
+    """
     # Extract values
     sig.close = float(last["Close"])
     sig.sma_20 = float(last["SMA"]) if not pd.isna(last["SMA"]) else 0.0
@@ -195,6 +209,8 @@ def compute_dual_mode(price_df, symbol="", segment="", options_ctx=None, filing_
     sig.red_streak = int(last["RED_STREAK"]) if not pd.isna(last["RED_STREAK"]) else 0
     sig.bb_upper = float(last["BB_Upper"]) if not pd.isna(last["BB_Upper"]) else 0.0
     sig.bb_lower = float(last["BB_Lower"]) if not pd.isna(last["BB_Lower"]) else 0.0
+    sig.hurst = float(last["HURST"]) if not pd.isna(last["HURST"]) else 0.5
+    sig.ret_autocorr = float(last["RET_AC"]) if not pd.isna(last["RET_AC"]) else 0.0
 
     # BBW exit state
     sig.bbw_contracting = sig.bbw_slope < 0
@@ -408,6 +424,7 @@ def signal_summary(sig):
         "red_streak": sig.red_streak, "vol_ratio": sig.vol_ratio,
         "bbw_slope": sig.bbw_slope, "bbw_pctl": sig.bbw_pctl,
         "pct_from_sma": sig.pct_from_sma, "above_sma": sig.above_sma,
+        "hurst": sig.hurst, "ret_autocorr": sig.ret_autocorr,
         "options_overlay": sig.options_overlay, "filing_overlay": sig.filing_overlay,
         "is_trap": sig.is_trap, "final_score": sig.dual_score,
         "label": sig.dual_label, "sizing": sig.dual_sizing,
@@ -456,28 +456,15 @@ def fetch_nav_from_nse(symbol: str) -> Optional[float]:
     """
     Fetch iNavValue from NSE /api/etf.
 
-    Uses the confirmed Firefox/82 session pattern from modules/data.py.
+    Goes through the shared NSEClient (modules/nse_client.py), which keeps
+    the confirmed Firefox/82 session pattern and paces every NSE request.
     NSE /api/etf returns ALL ETFs in a list — filtered locally by symbol.
     Do NOT pass ?index= as a query param; NSE ignores it or returns HTML.
-
-    Session rules (must match data.py pattern exactly):
-      - Warm up via option-chain page with allow_redirects=False
-      - cookies = dict(resp.cookies) from the RESPONSE (not session.cookies)
-      - Every API call also uses allow_redirects=False
     """
     try:
-        from modules.data import _make_nse_session, _NSE_HEADER, _assert_json
-
-        session, cookies = _make_nse_session()
-        resp = session.get(
-            "https://www.nseindia.com/api/etf",  # no ?index= param
-            headers=_NSE_HEADER,
-            cookies=cookies,
-            allow_redirects=False,  # ← mandatory on every NSE API call
-            timeout=15,
-        )
-        _assert_json(resp)
-        data = resp.json()
+        from modules.nse_client import get_nse_client
+
+        data = get_nse_client().get_json("/api/etf", timeout=15)  # no ?index= param
         rows = data if isinstance(data, list) else data.get("data", [])
 
         sym_upper = symbol.strip().upper()
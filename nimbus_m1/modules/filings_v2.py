@@ -40,10 +40,12 @@ import sqlite3
 import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import pandas as pd
-import requests
+
+if TYPE_CHECKING:  # requests is imported on first NSE call (startup time)
+    import requests
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +72,8 @@ def get_nifty500() -> set[str]:
     if _NIFTY500_CACHE and time.time() - _NIFTY500_TS < _NIFTY500_TTL:
         return _NIFTY500_CACHE
     try:
+        import requests
+
         sess = requests.Session()
         sess.get(_NSE_BASE, headers=_NSE_HEADERS, timeout=8)
         r = sess.get(
@@ -704,6 +708,8 @@ def _variance_for_category(
 
 def make_nse_session() -> requests.Session:
     """Return a warmed NSE session (cookie handshake required before API calls)."""
+    import requests
+
     sess = requests.Session()
     sess.headers.update(_NSE_HEADERS)
     try:
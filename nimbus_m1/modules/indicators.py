@@ -78,9 +78,14 @@ class PriceSignals:
 
 
 def add_bollinger(
-    df: pd.DataFrame, period: int = 20, std_dev: float = 1.0, col: str = "Close"
+    df: pd.DataFrame,
+    period: int = 20,
+    std_dev: float = 1.0,
+    col: str = "Close",
+    inplace: bool = False,
 ) -> pd.DataFrame:
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
     mid = df[col].rolling(period).mean()
     std = df[col].rolling(period).std()
     df["BB_Mid"] = mid
@@ -98,8 +103,10 @@ def add_williams_r(
     high_col: str = "High",
     low_col: str = "Low",
     close_col: str = "Close",
+    inplace: bool = False,
 ) -> pd.DataFrame:
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
     hh = df[high_col].rolling(period).max()
     ll = df[low_col].rolling(period).min()
     rng = (hh - ll).replace(0, np.nan)
@@ -129,7 +136,7 @@ def add_mfi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     return df
 
 
-def add_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+def add_adx(df: pd.DataFrame, period: int = 14, inplace: bool = False) -> pd.DataFrame:
     """
     Average Directional Index — trend strength (0-100).
     ADX > 20 = trending, ADX < 20 = ranging.
@@ -137,7 +144,8 @@ def add_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
     if not {"High", "Low", "Close"}.issubset(df.columns):
         return df
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
     high, low, close = df["High"], df["Low"], df["Close"]
 
     plus_dm = high.diff()
@@ -160,6 +168,212 @@ def add_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     return df
 
 
+def add_price_indicators(
+    df: pd.DataFrame,
+    bb_period: int = 20,
+    bb_std: float = 1.0,
+    wr_period: int = 50,
+    inplace: bool = False,
+) -> pd.DataFrame:
+    """
+    Bollinger + Williams %R — the chain every price view runs — with at most
+    one copy of the OHLCV frame (none with inplace=True).
+
+    inplace=True appends the indicator columns to df itself; use it when the
+    caller owns df (e.g. a frame fresh from get_price_daily). Same columns,
+    same values as add_williams_r(add_bollinger(df)).
+    """
+    if not inplace:
+        df = df.copy()
+    add_bollinger(df, period=bb_period, std_dev=bb_std, inplace=True)
+    add_williams_r(df, period=wr_period, inplace=True)
+    return df
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PANEL CALCULATORS (bars × symbols, one pass for the whole universe)
+# ══════════════════════════════════════════════════════════════════════════════
+# Each panel_* function mirrors the single-frame calculator above op for op.
+# Inputs are (bars × symbols) DataFrames (or 2-D arrays) of one OHLCV field;
+# outputs are dicts of the same-shaped DataFrames keyed by the column name the
+# single-frame version adds. pandas rolling kernels run column by column, so
+# column s of every output is bit-identical to running the single-frame
+# calculator on symbol s alone — provided the panel rows are that symbol's
+# bars (see stack_panel: padding rows for missing dates shift the windows).
+
+
+def stack_panel(
+    frames: dict[str, pd.DataFrame],
+    fields: tuple[str, ...] = ("Open", "High", "Low", "Close", "Volume"),
+) -> dict[str, pd.DataFrame]:
+    """
+    {symbol: OHLCV frame} → {field: bars × symbols panel} on the union index.
+    Fields a frame lacks are left out of that field's panel.
+    """
+    panels = {}
+    for field in fields:
+        cols = {sym: df[field] for sym, df in frames.items() if field in df.columns}
+        if cols:
+            panels[field] = pd.concat(cols, axis=1, sort=True)
+    return panels
+
+
+def _panel(x) -> pd.DataFrame:
+    return x if isinstance(x, pd.DataFrame) else pd.DataFrame(np.asarray(x, dtype=float))
+
+
+def panel_bollinger(close, period: int = 20, std_dev: float = 1.0) -> dict[str, pd.DataFrame]:
+    """add_bollinger() for every column of a close panel."""
+    close = _panel(close)
+    mid = close.rolling(period).mean()
+    std = close.rolling(period).std()
+    upper = mid + std_dev * std
+    lower = mid - std_dev * std
+    band = (upper - lower).replace(0, np.nan)
+    return {
+        "BB_Mid": mid,
+        "BB_Upper": upper,
+        "BB_Lower": lower,
+        "BB_Width": (upper - lower) / mid.replace(0, np.nan),
+        "BB_Pct": (close - lower) / band,
+    }
+
+
+def panel_williams_r(high, low, close, period: int = 50) -> dict[str, pd.DataFrame]:
+    """add_williams_r() for every column of aligned high/low/close panels."""
+    high, low, close = _panel(high), _panel(low), _panel(close)
+    hh = high.rolling(period).max()
+    ll = low.rolling(period).min()
+    rng = (hh - ll).replace(0, np.nan)
+    return {"WR": -100 * (hh - close) / rng}
+
+
+def panel_mfi(high, low, close, volume, period: int = 14) -> dict[str, pd.DataFrame]:
+    """add_mfi() for every column of aligned high/low/close/volume panels."""
+    high, low, close = _panel(high), _panel(low), _panel(close)
+    volume = _panel(volume).apply(pd.to_numeric, errors="coerce").fillna(0)
+    tp = (high + low + close) / 3
+    rmf = tp * volume
+    prev_tp = tp.shift(1)
+    pos = rmf.where(tp > prev_tp, 0.0)
+    neg = rmf.where(tp < prev_tp, 0.0)
+    pos_r = pos.rolling(period).sum()
+    neg_r = neg.rolling(period).sum()
+    mfr = pos_r / neg_r.replace(0, float("nan"))
+    return {f"MFI_{period}": (100 - (100 / (1 + mfr))).round(2)}
+
+
+def panel_adx(high, low, close, period: int = 14) -> dict[str, pd.DataFrame]:
+    """add_adx() for every column of aligned high/low/close panels."""
+    high, low, close = _panel(high), _panel(low), _panel(close)
+
+    plus_dm = high.diff()
+    minus_dm = -low.diff()
+    plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0.0)
+    minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0.0)
+
+    # Row-wise max of the three ranges, skipping NaN like DataFrame.max(axis=1)
+    prev_close = close.shift(1)
+    tr = np.fmax(
+        np.fmax(high - low, (high - prev_close).abs()),
+        (low - prev_close).abs(),
+    )
+
+    atr = tr.rolling(period).mean().replace(0, np.nan)
+    plus_di = 100 * (plus_dm.rolling(period).mean() / atr)
+    minus_di = 100 * (minus_dm.rolling(period).mean() / atr)
+
+    dx = 100 * ((plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, np.nan))
+    return {f"ADX_{period}": dx.rolling(period).mean()}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENCE ESTIMATORS (rolling Hurst / return autocorrelation)
+# ══════════════════════════════════════════════════════════════════════════════
+# Full point-in-time series in one pass: the value at bar t uses bars ≤ t
+# only, so a backtest can read mode/regime at every bar without refitting.
+# Both accept a Series (→ Series), a bars × symbols DataFrame (→ DataFrame,
+# column by column) or a 1-D array.
+
+
+def _rolling_hurst_1d(x: np.ndarray, window: int, max_lag: int) -> np.ndarray:
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    if window < 2 * max_lag:
+        out[window - 1:] = 0.5  # too short for R/S at every lag
+        return out
+
+    n_win = n - window + 1
+    nan = np.isnan(x)
+    x = np.where(nan, 0.0, x)
+    lags = np.arange(2, max_lag + 1)
+    mean_rs = np.full((n_win, len(lags)), np.nan)
+    for k, lag in enumerate(lags):
+        # R/S of the chunk starting at every bar
+        chunks = np.lib.stride_tricks.sliding_window_view(x, lag)
+        dev = np.cumsum(chunks - chunks.mean(axis=1, keepdims=True), axis=1)
+        r = dev.max(axis=1) - dev.min(axis=1)
+        s = chunks.std(axis=1, ddof=1)
+        ok = s > 0
+        rs = np.where(ok, r / np.where(ok, s, 1.0), 0.0)
+        ok = ok.astype(float)
+        # A window starting at w uses the chunks at w, w+lag, … (< w + window - lag)
+        m = (window - 1) // lag
+        step = rs.strides[0]
+        tot = np.lib.stride_tricks.as_strided(rs, (n_win, m), (step, step * lag)).sum(axis=1)
+        cnt = np.lib.stride_tricks.as_strided(ok, (n_win, m), (step, step * lag)).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_rs[:, k] = np.where(cnt > 0, np.log(tot / cnt), np.nan)
+
+    # Least-squares slope of log(R/S) on log(lag) over the lags each window has
+    valid = ~np.isnan(mean_rs)
+    lx = np.log(lags.astype(float))
+    xv = np.where(valid, lx, 0.0)
+    yv = np.where(valid, mean_rs, 0.0)
+    k = valid.sum(axis=1)
+    sx, sy = xv.sum(axis=1), yv.sum(axis=1)
+    sxx, sxy = (xv * xv).sum(axis=1), (xv * yv).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (k * sxy - sx * sy) / (k * sxx - sx * sx)
+    h = np.where(k >= 3, np.clip(slope, 0.0, 1.0), 0.5)
+
+    has_nan = np.lib.stride_tricks.sliding_window_view(nan, window).any(axis=1)
+    out[window - 1:] = np.where(has_nan, np.nan, h)
+    return out
+
+
+def rolling_hurst(returns, window: int = 250, max_lag: int = 20):
+    """
+    Hurst exponent (R/S) of the trailing `window` returns at every bar —
+    the same estimate as run_mode_backtest.hurst_exponent on that slice.
+    H < 0.5 = mean-reverting, H > 0.5 = trending. NaN until `window`
+    returns are available, or while the window contains a NaN.
+    """
+    if isinstance(returns, pd.DataFrame):
+        return returns.apply(lambda col: rolling_hurst(col, window, max_lag))
+    if isinstance(returns, pd.Series):
+        vals = _rolling_hurst_1d(returns.to_numpy(dtype=float), window, max_lag)
+        return pd.Series(vals, index=returns.index, name=returns.name)
+    return _rolling_hurst_1d(np.asarray(returns, dtype=float), window, max_lag)
+
+
+def rolling_autocorr(close, lag: int = 5, window: int = 60):
+    """
+    Lag-1 autocorrelation of `lag`-bar returns over the trailing `window`
+    returns at every bar — run_mode_backtest.return_autocorrelation on
+    close[:t+1]. Negative = mean-reverting. NaN until enough history.
+    """
+    is_array = not isinstance(close, (pd.Series, pd.DataFrame))
+    if is_array:
+        close = pd.Series(np.asarray(close, dtype=float))
+    rets = close.pct_change(lag)
+    # window returns give window-1 (r[i], r[i-1]) pairs
+    ac = rets.rolling(window - 1).corr(rets.shift(1))
+    return ac.to_numpy() if is_array else ac
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # SIGNAL EXTRACTORS (current-bar snapshots)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -240,7 +454,7 @@ def compute_price_signals(
     if price_df is None or price_df.empty:
         return ps
 
-    df = price_df.copy()
+    df = price_df  # read-only below — no copy needed
     if "BB_Upper" not in df.columns or "WR" not in df.columns:
         return ps
 
@@ -417,10 +631,8 @@ def _resample_daily(df: pd.DataFrame) -> pd.DataFrame:
         idx = df.index
         if hasattr(idx, "tz") and idx.tz is not None:
             idx = idx.tz_convert(None)
-        tmp = df.copy()
-        tmp.index = pd.DatetimeIndex(idx)
 
-        # Only aggregate columns that actually exist in df
+        # Only aggregate columns that actually exist in df — and only copy those
         _candidates = {
             "Open": ("Open", "first"),
             "High": ("High", "max"),
@@ -428,7 +640,8 @@ def _resample_daily(df: pd.DataFrame) -> pd.DataFrame:
             "Close": ("Close", "last"),
             "Volume": ("Volume", "sum"),
         }
-        agg_dict = {k: v for k, v in _candidates.items() if k in tmp.columns}
+        agg_dict = {k: v for k, v in _candidates.items() if k in df.columns}
+        tmp = df[list(agg_dict)].set_axis(pd.DatetimeIndex(idx), axis=0)
 
         daily = tmp.resample("1D").agg(**agg_dict).dropna(subset=["Close"])
         return daily[daily["Close"] > 0]
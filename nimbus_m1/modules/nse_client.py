@@ -0,0 +1,332 @@
+"""
+modules/nse_client.py
+─────────────────────
+Pooled NSE option-chain client — one warmed session, concurrent expiries.
+
+download_options() used to build a fresh requests.Session (and redo the
+cookie warm-up GET) for every symbol, then fetch expiries one by one with a
+fixed 0.4s sleep. NSEClient instead:
+
+  - keeps ONE requests.Session + cookie dict alive for the process and
+    re-warms only when the cookies are older than cookie_ttl, or NSE answers
+    403 / HTML (the stale-cookie symptoms _assert_json reports);
+  - fetches a symbol's expiries concurrently on a small thread pool;
+  - paces EVERY request (warm-ups included) through one TokenBucket
+    (modules/rate_limit.py) shared by all threads, so scanner workers
+    together stay under NSE's limit.
+
+The session pattern is the confirmed one documented in modules/data.py:
+Firefox/82 header, allow_redirects=False, cookies taken from the warm-up
+RESPONSE. Every NSE API call in nimbus_m1 goes through this client.
+
+Every response also feeds the client's AIMDController: quick successes
+grow the number of symbols the scanner analyses at once, while 401/403/429,
+timeouts or latency above target cut it. scanner.iter_scan takes its slots
+from get_nse_client().controller.
+
+base_url is configurable so tests can point the client at a local stub
+server (tests/test_nse_client.py).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.data import NSE_INDEX_SYMBOLS, _NSE_HEADER, _assert_json
+from modules.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+NSE_BASE_URL = "https://www.nseindia.com"
+
+# NSE starts answering 429 / HTML somewhere above ~3 req/s sustained
+DEFAULT_RATE = 3.0  # requests per second, all threads combined
+DEFAULT_BURST = 3
+DEFAULT_COOKIE_TTL = 240.0  # seconds; NSE session cookies last a few minutes
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ADAPTIVE CONCURRENCY
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Callers hold a slot() around each unit of network work. Outcomes are
+    reported with record(): a success under latency_target adds
+    increase/limit (≈ +increase per limit's worth of successes, like TCP
+    congestion avoidance); a throttle/timeout, or a smoothed latency above
+    target, multiplies the limit by `decrease` — at most once per
+    `cooldown` seconds, so one burst of 429s counts as one signal.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        latency_target: float = 2.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 2.0,
+        window: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("AIMDController needs 1 <= min_limit <= initial <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._clock = clock
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._last_cut = float("-inf")
+        self._latency: Optional[float] = None  # EWMA, seconds
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = error
+        self.requests = 0
+        self.errors = 0
+        self.cuts = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    # ── slots ─────────────────────────────────────────────────────────────────
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # ── feedback ──────────────────────────────────────────────────────────────
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        """Report one request: ok=False for 401/403/429, timeouts, resets."""
+        with self._cond:
+            self.requests += 1
+            self._outcomes.append(not ok)
+            if latency is not None:
+                self._latency = (
+                    latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+                )
+            if not ok:
+                self.errors += 1
+                self._cut()
+            elif self._latency is not None and self._latency > self.latency_target:
+                self._cut()
+            else:
+                self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            self._cond.notify_all()
+
+    def _cut(self) -> None:
+        now = self._clock()
+        if now - self._last_cut < self.cooldown:
+            return
+        self._last_cut = now
+        self._limit = max(float(self.min_limit), self._limit * self.decrease)
+        self.cuts += 1
+        logger.info("AIMD: concurrency cut to %d", int(self._limit))
+
+    def metrics(self) -> dict:
+        with self._cond:
+            n = len(self._outcomes)
+            return {
+                "concurrency": int(self._limit),
+                "in_flight": self._in_flight,
+                "requests": self.requests,
+                "errors": self.errors,
+                "error_rate": round(sum(self._outcomes) / n, 3) if n else 0.0,
+                "latency_s": round(self._latency, 3) if self._latency is not None else None,
+                "cuts": self.cuts,
+            }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CLIENT
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+_THROTTLE_CODES = (401, 403, 429)
+
+
+def _stale_session(resp: requests.Response) -> bool:
+    """403 or an HTML body → NSE no longer accepts our cookies."""
+    if resp.status_code in (401, 403):
+        return True
+    return resp.status_code in (200, 302) and resp.text.lstrip().startswith("<")
+
+
+class NSEClient:
+    """
+    Shared NSE session + rate limiter + expiry fetch pool.
+
+    Usage:
+        client = get_nse_client()
+        chains = client.fetch_chains("NIFTY", max_expiries=3)  # [(expiry, rows)]
+    """
+
+    def __init__(
+        self,
+        base_url: str = NSE_BASE_URL,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        cookie_ttl: float = DEFAULT_COOKIE_TTL,
+        max_workers: int = 3,
+        bucket: Optional[TokenBucket] = None,
+        controller: Optional[AIMDController] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cookie_ttl = cookie_ttl
+        self.max_workers = max_workers
+        self.bucket = bucket or TokenBucket(rate, burst)
+        self.controller = controller or AIMDController()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_workers, 1) * 2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cookies: Optional[dict] = None
+        self._cookies_at = 0.0
+        self._lock = threading.Lock()
+        self.warmups = 0  # cookie warm-ups performed (observability / tests)
+
+    # ── session ───────────────────────────────────────────────────────────────
+
+    def cookies(self) -> dict:
+        """Current NSE cookies, warming the session first if absent or expired."""
+        with self._lock:
+            expired = time.monotonic() - self._cookies_at > self.cookie_ttl
+            if self._cookies is None or expired:
+                self.bucket.acquire()
+                resp = self.session.get(
+                    f"{self.base_url}/option-chain",
+                    headers=_NSE_HEADER,
+                    allow_redirects=False,  # ← critical: do NOT follow redirects
+                    timeout=15,
+                )
+                self._cookies = dict(resp.cookies)  # ← resp.cookies, NOT session.cookies
+                self._cookies_at = time.monotonic()
+                self.warmups += 1
+                logger.debug("NSE session warmed (%d cookies)", len(self._cookies))
+            return self._cookies
+
+    def invalidate(self, used: Optional[dict] = None) -> None:
+        """
+        Drop the cookies so the next request re-warms. With `used`, only if
+        they are still the ones that failed — concurrent workers that all hit
+        a 403 trigger one warm-up, not one each.
+        """
+        with self._lock:
+            if used is None or self._cookies is used:
+                self._cookies = None
+
+    def get_json(self, path: str, timeout: float = 20):
+        """Rate-limited GET of an NSE API path; one re-warm + retry on stale cookies."""
+        for attempt in (1, 2):
+            cookies = self.cookies()
+            self.bucket.acquire()
+            t0 = time.monotonic()
+            try:
+                resp = self.session.get(
+                    f"{self.base_url}{path}",
+                    headers=_NSE_HEADER,
+                    cookies=cookies,
+                    allow_redirects=False,  # ← same pattern on every API call
+                    timeout=timeout,
+                )
+            except (requests.Timeout, requests.ConnectionError):
+                self.controller.record(False)
+                raise
+            latency = time.monotonic() - t0
+            if attempt == 1 and _stale_session(resp):
+                # first rejection is usually just expired cookies — not throttling
+                logger.info("NSE cookies rejected (HTTP %d) — re-warming", resp.status_code)
+                self.invalidate(cookies)
+                continue
+            throttled = resp.status_code in _THROTTLE_CODES or _stale_session(resp)
+            self.controller.record(not throttled, latency)
+            _assert_json(resp)
+            return resp.json()
+
+    # ── option chain ──────────────────────────────────────────────────────────
+
+    def expiry_dates(self, symbol: str) -> list[str]:
+        data = self.get_json(f"/api/option-chain-contract-info?symbol={symbol}", timeout=15)
+        return data.get("expiryDates", [])
+
+    def fetch_expiry(self, symbol: str, expiry: str) -> list[dict]:
+        chain_type = "Indices" if symbol in NSE_INDEX_SYMBOLS else "Equities"
+        data = self.get_json(
+            f"/api/option-chain-v3?type={chain_type}&symbol={symbol}&expiry={expiry}"
+        )
+        return data.get("data", []) or data.get("records", {}).get("data", []) or []
+
+    def fetch_chains(
+        self,
+        symbol: str,
+        max_expiries: int = 5,
+        progress_cb=None,
+        expiries: Optional[list[str]] = None,
+    ) -> list[tuple[str, list[dict]]]:
+        """
+        [(expiry, raw rows)] for the nearest max_expiries expiries, in expiry
+        order, fetched concurrently. The first failing expiry's error is raised.
+        """
+        if expiries is None:
+            expiries = self.expiry_dates(symbol)
+        expiries = expiries[:max_expiries]
+        if not expiries:
+            return []
+
+        workers = max(1, min(self.max_workers, len(expiries)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.fetch_expiry, symbol, exp) for exp in expiries]
+            out = []
+            for i, (exp, fut) in enumerate(zip(expiries, futures)):
+                out.append((exp, fut.result()))
+                if progress_cb:
+                    progress_cb(f"{symbol} {exp} ({i+1}/{len(expiries)})")
+        return out
+
+
+_CLIENT: Optional[NSEClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_nse_client() -> NSEClient:
+    """Process-wide NSEClient shared by download_options and the scanner."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = NSEClient()
+        return _CLIENT
@@ -0,0 +1,56 @@
+"""
+modules/rate_limit.py
+─────────────────────
+Thread-safe token bucket shared by the network clients.
+
+modules/nse_client.NSEClient paces every NSE request through one, and
+backtest/data_loader.download_batch paces its yf.download calls with
+another. Neither depends on the other's module.
+
+    bucket = TokenBucket(rate=2.0, burst=4)
+    bucket.acquire()  # blocks until a token is free
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens/s, at most `burst` banked.
+
+    acquire() reserves a token under the lock and sleeps outside it, so
+    waiting callers are served in arrival order without holding the lock.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("TokenBucket needs rate > 0 and burst >= 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available. Returns seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
@@ -12,6 +12,8 @@ Detection inputs:
   1. India VIX level (primary)
   2. NIFTY vs 20-SMA (secondary)
   3. BB width percentile of NIFTY (tertiary)
+  4. Rolling Hurst of NIFTY returns (persistence; indicators.rolling_hurst —
+     compute the series once, pass the bar's value)
 
 Regime affects:
   - Signal weight multipliers (trending amplifies WR/BB, ranging dampens)
@@ -38,6 +40,10 @@ VIX_LOW = 13.0    # below → low vol, trending environment
 VIX_MID = 18.0    # below → normal, mild range ok
 VIX_HIGH = 24.0   # above → volatile, crisis-like
 
+# ── Hurst bands (0.5 = random walk; ±0.05 dead zone for estimator noise) ─────
+HURST_TREND = 0.55
+HURST_REVERT = 0.45
+
 
 @dataclass
 class MarketRegime:
@@ -46,6 +52,7 @@ class MarketRegime:
     vix: Optional[float] = None
     nifty_vs_sma: Optional[float] = None  # % above/below 20-SMA
     bb_width_pctl: Optional[float] = None  # NIFTY BB width percentile
+    hurst: Optional[float] = None  # NIFTY rolling Hurst exponent
     confidence: float = 0.0       # 0-1 confidence in classification
 
     # Scoring multipliers (applied to signal weights)
@@ -62,6 +69,7 @@ def classify_regime(
     nifty_close: Optional[float] = None,
     nifty_sma20: Optional[float] = None,
     nifty_bb_width_pctl: Optional[float] = None,
+    nifty_hurst: Optional[float] = None,
 ) -> MarketRegime:
     """
     Classify current market regime from available inputs.
@@ -106,6 +114,14 @@ def classify_regime(
         elif nifty_bb_width_pctl > 80:
             signals.append(("VOLATILE", 0.2, "NIFTY BB expanded"))
 
+    # ── Return persistence (quaternary) ───────────────────────────────────
+    if nifty_hurst is not None and not np.isnan(nifty_hurst):
+        regime.hurst = nifty_hurst
+        if nifty_hurst > HURST_TREND:
+            signals.append(("TRENDING", 0.15, f"NIFTY Hurst {nifty_hurst:.2f} persistent"))
+        elif nifty_hurst < HURST_REVERT:
+            signals.append(("RANGING", 0.15, f"NIFTY Hurst {nifty_hurst:.2f} mean-reverting"))
+
     # ── Aggregate classification ──────────────────────────────────────────
     if not signals:
         return regime  # UNKNOWN with neutral multipliers
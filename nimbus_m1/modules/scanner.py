@@ -41,8 +41,18 @@ Patch v5.2 fixes applied (unchanged):
   FIX-8    : near_mp threshold aligned to 2.0%
   FIX-DTE0 : expiry_risk="HIGH" when DTE=0
   FIX-REGIME: Neutral GEX with resistance_pct < 1.5% → "PINNING"
-  FIX-RATE : max_workers reduced 8 → 3
-  FIX-DELAY: _INTER_SYMBOL_DELAY = 1.2s
+  FIX-RATE : max_workers reduced 8 → 3 — now adaptive by default (AIMD,
+             see iter_scan); pass max_workers to pin a fixed pool
+  FIX-DELAY: _INTER_SYMBOL_DELAY = 1.2s — since replaced by the shared
+             NSEClient token bucket (modules/nse_client.py), which paces
+             every NSE request across all workers; no per-symbol sleep.
+  BULK-PX  : scan_universe loads all daily bars up front via
+             get_prices_bulk (chunked multi-ticker yf.download) and hands
+             each frame to analyze_symbol — no per-symbol yfinance call.
+  STAGED   : iter_scan() runs the price stage for the whole universe first
+             and drops symbols failing passes_momentum (price-only) before
+             any options download; survivors are analysed on the pool and
+             yielded in price-only score order as they complete.
 """
 
 from __future__ import annotations
@@ -50,20 +60,24 @@ from __future__ import annotations
 import datetime
 import logging
 import math
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
 
 import numpy as np
 import pandas as pd
 
-from modules.data import get_price_daily, download_options, infer_spot, NSE_LOT_SIZES
+from modules.data import (
+    get_price_daily,
+    get_prices_bulk,
+    download_options,
+    infer_spot,
+    NSE_LOT_SIZES,
+)
 from modules.indicators import (
-    add_bollinger,
-    add_williams_r,
+    add_price_indicators,
     compute_price_signals,
 )
-from modules.analytics import analyze
+from modules.analytics import analyze, analyze_price_only
 from modules.setup_classifier import (
     classify_setup_v3,
     OptionsSignalState,
@@ -75,32 +89,48 @@ from modules.setup_classifier import (
 
 logger = logging.getLogger(__name__)
 
-_INTER_SYMBOL_DELAY: float = 1.2
-
 # ══════════════════════════════════════════════════════════════════════════════
 # SINGLE-SYMBOL ANALYSIS
 # ══════════════════════════════════════════════════════════════════════════════
 
 
-def analyze_symbol(symbol: str) -> Optional[dict]:
+def analyze_symbol(symbol: str, price_df: Optional[pd.DataFrame] = None) -> Optional[dict]:
+    """
+    price_df: daily bars already loaded (e.g. by get_prices_bulk). The frame
+    is modified in place. None → fetched here via get_price_daily.
+    """
     try:
-        return _analyze_symbol_inner(symbol)
+        return _analyze_symbol_inner(symbol, price_df)
     except Exception as exc:
         logger.warning(f"[scanner] {symbol} failed: {exc}")
         return None
 
 
-def _analyze_symbol_inner(symbol: str) -> Optional[dict]:
-    time.sleep(_INTER_SYMBOL_DELAY)
+def _price_stage(price_df: pd.DataFrame):
+    """Append BB/WR columns in place and compute the price signals."""
+    # Caller-owned fresh frame — append indicator columns in place
+    price_df = add_price_indicators(
+        price_df, bb_period=20, bb_std=1.0, wr_period=50, inplace=True
+    )
+    return price_df, compute_price_signals(price_df, wr_thresh=-20.0)
+
+
+def _passes_momentum(ps) -> bool:
+    """Entry filters a + b — decidable from price data alone."""
+    return ps.position_state == "RIDING_UPPER" and ps.wr_in_momentum
+
 
+def _analyze_symbol_inner(
+    symbol: str, price_df: Optional[pd.DataFrame] = None, ps=None
+) -> Optional[dict]:
     # ── Price data ────────────────────────────────────────────────────────
-    price_df, p_msg = get_price_daily(symbol, days=365)
+    if price_df is None:
+        price_df, _ = get_price_daily(symbol, days=365)
     if price_df is None or price_df.empty:
         return None
 
-    price_df = add_bollinger(price_df, period=20, std_dev=1.0)
-    price_df = add_williams_r(price_df, period=50)
-    ps = compute_price_signals(price_df, wr_thresh=-20.0)
+    if ps is None:
+        price_df, ps = _price_stage(price_df)
 
     last = price_df.iloc[-1]
     spot = float(last["Close"])
@@ -199,7 +229,7 @@ def _analyze_symbol_inner(symbol: str) -> Optional[dict]:
         near_mp = False
 
     # ── Filter booleans ───────────────────────────────────────────────────
-    passes_momentum = riding_upper and wr_above_m20
+    passes_momentum = _passes_momentum(ps)
     passes_structure = (
         pct_to_resistance is not None
         and pct_to_resistance >= 5.0
@@ -585,41 +615,159 @@ def _short_reason(
 # ══════════════════════════════════════════════════════════════════════════════
 
 
-def scan_universe(
+def iter_scan(
     symbols: list[str],
-    require_all_filters: bool = True,
-    min_viability: int = 50,
+    prices: Optional[dict[str, pd.DataFrame]] = None,
     progress_cb=None,
-    max_workers: int = 3,
-) -> list[dict]:
-    results = []
+    max_workers: Optional[int] = None,
+    momentum_gate: bool = True,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Iterator[dict]:
+    """
+    Staged scan — yields analysed rows as they become available.
+
+    Stage 1 (price only, whole universe): indicators + price signals from the
+    bulk-loaded bars; with momentum_gate, symbols failing passes_momentum stop
+    here and never trigger an options download.
+    Stage 2 (survivors): options chain + analytics on a thread pool. Rows are
+    yielded in descending price-only viability order, so the strongest
+    candidates arrive first. Score / all-filters thresholds are the caller's.
+
+    max_workers=None sizes stage 2 adaptively: each symbol holds a slot of
+    the NSE client's AIMDController, which widens while NSE answers quickly
+    and narrows on 401/403/429, timeouts or slow responses. An int fixes the
+    pool size instead.
+
+    progress_cb(done, total, symbol) counts stage-1 drops as done.
+    Closing the generator early cancels the stage-2 work not yet started.
+    should_stop() is polled before each symbol of stage 1 and before each
+    stage-2 result; once it returns True the scan ends the same way.
+    """
+    if prices is None:
+        prices = get_prices_bulk(symbols, days=365)
     total = len(symbols)
-    done = 0
 
-    with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        futures = {pool.submit(analyze_symbol, sym): sym for sym in symbols}
-        for future in as_completed(futures):
-            sym = futures[future]
+    survivors = []
+    for pos, sym in enumerate(symbols):
+        if should_stop and should_stop():
+            return
+        df = prices.get(sym)
+        if df is None or df.empty:
+            continue
+        try:
+            df, ps = _price_stage(df)
+            if momentum_gate and not _passes_momentum(ps):
+                continue
+            pre = analyze_price_only(
+                spot=float(df["Close"].iloc[-1]), price_signals=ps, room_thresh=5.0
+            ).viability.score
+        except Exception as exc:
+            logger.warning(f"[scan] {sym} price stage failed: {exc}")
+            continue
+        survivors.append((-pre, pos, sym, df, ps))
+    survivors.sort(key=lambda t: t[:2])
+    logger.info(
+        "[scan] stage 1: %d/%d symbols go on to options analysis", len(survivors), total
+    )
+
+    controller = None
+    if max_workers is None:
+        from modules.nse_client import get_nse_client
+
+        controller = get_nse_client().controller
+        max_workers = controller.max_limit
+
+    def _stage2(sym, df, ps):
+        try:
+            if controller is None:
+                return _analyze_symbol_inner(sym, df, ps)
+            with controller.slot():
+                return _analyze_symbol_inner(sym, df, ps)
+        except Exception as exc:
+            logger.warning(f"[scanner] {sym} failed: {exc}")
+            return None
+
+    done = total - len(survivors)
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            (sym, pool.submit(_stage2, sym, df, ps)) for _, _, sym, df, ps in survivors
+        ]
+        for sym, future in futures:
+            if should_stop and should_stop():
+                logger.info("[scan] stopped with %d/%d symbols done", done, total)
+                return
+            row = future.result()
             done += 1
             if progress_cb:
                 try:
                     progress_cb(done, total, sym)
                 except Exception:
                     pass
-            try:
-                row = future.result()
-            except Exception as exc:
-                logger.warning(f"[scan] {sym}: {exc}")
-                row = None
-            if row is None:
-                continue
-            if not row["passes_momentum"]:
-                continue
-            if row["viability_score"] < min_viability:
+            if row is not None:
+                yield row
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if controller is not None:
+            logger.info("[scan] network concurrency: %s", controller.metrics())
+
+
+def iter_dual_mode_scan(
+    symbols: list[str],
+    prices: Optional[dict[str, pd.DataFrame]] = None,
+    min_score: int = 50,
+    require_all_filters: bool = False,
+    progress_cb=None,
+    max_workers: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Iterator[dict]:
+    """
+    iter_scan rows filtered on the dual-mode score — the ScanWorker stream.
+
+    The momentum gate is off here: a dual-mode entry needs a close below
+    SMA20 and WR(30) < -30, which passes_momentum (riding the upper band,
+    WR(50) >= -20) rules out, so the gate would drop every candidate.
+    Rows are kept when dm_score >= min_score (and all_filters_pass, if
+    required). Closing the generator, or should_stop() returning True,
+    cancels the scan.
+    """
+    scan = iter_scan(symbols, prices=prices, progress_cb=progress_cb,
+                     max_workers=max_workers, momentum_gate=False,
+                     should_stop=should_stop)
+    try:
+        for row in scan:
+            if row.get("dm_score", row.get("viability_score", 0)) < min_score:
                 continue
             if require_all_filters and not row["all_filters_pass"]:
                 continue
-            results.append(row)
+            yield row
+    finally:
+        scan.close()
+
+
+def scan_universe(
+    symbols: list[str],
+    require_all_filters: bool = True,
+    min_viability: int = 50,
+    progress_cb=None,
+    max_workers: Optional[int] = None,
+    row_cb=None,
+) -> list[dict]:
+    """
+    Filtered, sorted scan results. row_cb(row) is called for each row that
+    passes the filters as soon as it is ready (see iter_scan).
+    """
+    results = []
+    for row in iter_scan(symbols, progress_cb=progress_cb, max_workers=max_workers):
+        if not row["passes_momentum"]:
+            continue
+        if row["viability_score"] < min_viability:
+            continue
+        if require_all_filters and not row["all_filters_pass"]:
+            continue
+        results.append(row)
+        if row_cb:
+            row_cb(row)
 
     # Sort: TRAP first (setup_priority=1), then by priority asc, then score desc
     results.sort(key=lambda r: (r.get("setup_priority", 8), -r["viability_score"]))
@@ -414,7 +414,7 @@ def _compute_sector_data() -> list[dict]:
         ps = None
         try:
             from modules.analytics import analyze_price_only
-            from modules.indicators import add_bollinger, add_williams_r
+            from modules.indicators import add_price_indicators
             from modules.indicators import compute_price_signals
 
             # Build OHLCV DataFrame from already-downloaded slices
@@ -438,8 +438,7 @@ def _compute_sector_data() -> list[dict]:
             )
 
             if not pdf.empty and has_hl and len(pdf) >= 55:
-                pdf = add_bollinger(pdf, period=20, std_dev=1.0)
-                pdf = add_williams_r(pdf, period=50)
+                add_price_indicators(pdf, bb_period=20, bb_std=1.0, wr_period=50, inplace=True)
                 ps = compute_price_signals(pdf, wr_thresh=-20.0)
                 spot = float(pdf.iloc[-1]["Close"])
                 ec = analyze_price_only(spot=spot, price_signals=ps, room_thresh=5.0)
@@ -203,15 +203,8 @@ def fetch_fii_dii() -> dict:
         return _fii_dii_cache["data"]
 
     try:
-        from modules.data import _make_nse_session, _NSE_HEADER, _assert_json
-        session, cookies = _make_nse_session()
-        resp = session.get(
-            "https://www.nseindia.com/api/fiidiiTradeReact",
-            headers=_NSE_HEADER, cookies=cookies,
-            allow_redirects=False, timeout=15,
-        )
-        _assert_json(resp)
-        raw = resp.json()
+        from modules.nse_client import get_nse_client
+        raw = get_nse_client().get_json("/api/fiidiiTradeReact", timeout=15)
 
         # Parse — NSE returns array of category objects
         result = {
@@ -0,0 +1,494 @@
+"""
+modules/streaming_indicators.py
+───────────────────────────────
+Incremental PriceSignals for live ticks — O(1) per tick, O(1) per new bar.
+
+compute_price_signals() re-runs pandas over the whole daily frame (rolling
+BB, WR, the daily resample for SMA-20/MFI, ADV) every time it is called.
+StreamingPriceSignals keeps the rolling state of the CLOSED bars instead:
+
+  Bollinger    running sum / sum of squares of the last period-1 closes
+  Williams %R  monotonic deques for the rolling high / low
+  MFI          running positive / negative money-flow sums
+  ADX          running TR / ±DM sums and a running DX sum
+  SMA-20, ADV  running sums
+  BB width     sorted window for the percentile → O(log n)
+
+and combines them with the one LIVE bar (today's, still moving) whenever a
+tick arrives. signals() returns the same PriceSignals compute_price_signals
+gives for the same bars (to float rounding).
+
+Bars are daily — the frames PriceWorker builds from get_price_daily() — so
+the daily resample inside compute_price_signals is the identity here.
+
+    stream = StreamingPriceSignals.from_frame(df, wr_thresh=-20.0)
+    stream.update(price, volume_traded, when)   # tick: today's bar moves
+    ps = stream.signals()
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.indicators import PriceSignals
+
+_NAN = float("nan")
+
+
+class _RunningWindow:
+    """Last `size` values with their sum (NaN-free) — add/evict in O(1)."""
+
+    def __init__(self, size: int):
+        self.values: deque = deque(maxlen=max(size, 0))
+        self.total = 0.0
+
+    def push(self, x: float) -> None:
+        if self.values.maxlen == 0:
+            return
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class _MonotonicWindow:
+    """Rolling max (or min) of the last `size` pushed values, amortised O(1)."""
+
+    def __init__(self, size: int, kind: str = "max"):
+        self.size = size
+        self._better = (lambda a, b: a >= b) if kind == "max" else (lambda a, b: a <= b)
+        self._q: deque = deque()  # (index, value), values monotonic
+        self._n = 0
+
+    def push(self, x: float) -> None:
+        while self._q and self._better(x, self._q[-1][1]):
+            self._q.pop()
+        self._q.append((self._n, x))
+        self._n += 1
+        while self._q and self._q[0][0] <= self._n - 1 - self.size:
+            self._q.popleft()
+
+    def best(self) -> float:
+        return self._q[0][1] if self._q else _NAN
+
+
+class StreamingPriceSignals:
+    """
+    Rolling indicator state over closed daily bars + one live bar.
+
+    update() moves the live bar (a tick) or, when `when` falls on a later
+    date, closes it and opens the next one. Parameters mirror
+    add_price_indicators() / compute_price_signals().
+    """
+
+    def __init__(
+        self,
+        bb_period: int = 20,
+        bb_std: float = 1.0,
+        wr_period: int = 50,
+        wr_thresh: float = -20.0,
+        vol_lookback: int = 100,
+        mfi_period: int = 14,
+        adx_period: int = 14,
+    ):
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.wr_period = wr_period
+        self.wr_thresh = wr_thresh
+        self.vol_lookback = vol_lookback
+        self.mfi_period = mfi_period
+        self.adx_period = adx_period
+
+        self.n_closed = 0
+        self._shift: Optional[float] = None  # first close: keeps BB sums well-conditioned
+        self._bb = _RunningWindow(bb_period - 1)
+        self._bb_sq = _RunningWindow(bb_period - 1)
+        self._hh = _MonotonicWindow(wr_period - 1, "max")
+        self._ll = _MonotonicWindow(wr_period - 1, "min")
+        self._sma = _RunningWindow(19)
+        self._recent: deque = deque(maxlen=3)  # (close, mid, upper) of closed bars
+        self._closes8: deque = deque(maxlen=8)
+
+        # BB width percentile window: insertion order + sorted copy
+        self._widths: deque = deque(maxlen=vol_lookback)
+        self._widths_sorted: list[float] = []
+
+        # WR series (NaN dropped): last two closed values, count, last -50 cross
+        self._wr_tail: deque = deque(maxlen=2)
+        self._wr_count = 0
+        self._wr_cross: Optional[int] = None  # position in the WR series
+
+        # MFI
+        self._prev_tp = _NAN
+        self._mfi_pos = _RunningWindow(mfi_period - 1)
+        self._mfi_neg = _RunningWindow(mfi_period - 1)
+        self._mfi_tail: deque = deque(maxlen=6)
+        self._mfi_count = 0
+
+        # ADV (NaN-skipping mean of Close × Volume over 20 bars)
+        self._turnover: deque = deque(maxlen=19)
+
+        # ADX
+        self._prev_hlc: Optional[tuple[float, float, float]] = None
+        self._tr = _RunningWindow(adx_period - 1)
+        self._pdm = _RunningWindow(adx_period - 1)
+        self._mdm = _RunningWindow(adx_period - 1)
+        self._dx: deque = deque(maxlen=adx_period - 1)
+
+        self.live: Optional[dict] = None  # {"date", "Open", "High", "Low", "Close", "Volume"}
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # FEED
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "StreamingPriceSignals":
+        """Seed from a daily OHLCV frame; its last row becomes the live bar."""
+        stream = cls(**kwargs)
+        vol = (
+            pd.to_numeric(df["Volume"], errors="coerce").to_numpy(np.float64)
+            if "Volume" in df.columns else np.full(len(df), _NAN)
+        )
+        cols = [df[c].to_numpy(np.float64) for c in ("Open", "High", "Low", "Close")]
+        dates = pd.DatetimeIndex(df.index)
+        for i in range(len(df)):
+            stream.open_bar(
+                cols[0][i], cols[1][i], cols[2][i], cols[3][i], vol[i], dates[i].date()
+            )
+        return stream
+
+    def open_bar(self, o, h, l, c, volume=_NAN, date: Optional[datetime.date] = None) -> None:
+        """Close the live bar (if any) and start a new one."""
+        if self.live is not None:
+            self._commit(self.live)
+        self.live = {
+            "date": date, "Open": float(o), "High": float(h), "Low": float(l),
+            "Close": float(c), "Volume": _NAN if volume is None else float(volume),
+        }
+
+    def update(
+        self,
+        price: float,
+        volume: Optional[float] = None,
+        when: Optional[datetime.datetime] = None,
+    ) -> None:
+        """
+        One tick. volume is the day's cumulative volume (Kite volume_traded),
+        i.e. the live daily bar's Volume. A tick dated after the live bar
+        opens the next day's bar.
+        """
+        live = self.live
+        day = when.date() if when is not None else None
+        if live is None or (day is not None and live["date"] is not None and day > live["date"]):
+            self.open_bar(price, price, price, price, volume, day)
+            return
+        live["High"] = max(live["High"], price)
+        live["Low"] = min(live["Low"], price)
+        live["Close"] = float(price)
+        if volume is not None:
+            live["Volume"] = float(volume)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # PER-BAR VALUES (closed state + one bar)
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _derive(self, bar: dict) -> dict:
+        h, l, c, v = bar["High"], bar["Low"], bar["Close"], bar["Volume"]
+        n = self.n_closed + 1  # bars up to and including this one
+        shift = self._shift if self._shift is not None else c
+        d: dict = {}
+
+        # ── Bollinger ─────────────────────────────────────────────────────────
+        p = self.bb_period
+        if n >= p:
+            dc = c - shift
+            s1 = self._bb.total + dc
+            s2 = self._bb_sq.total + dc * dc
+            mid = shift + s1 / p
+            var = (s2 - s1 * s1 / p) / (p - 1) if p > 1 else _NAN
+            std = math.sqrt(var) if var > 0 else 0.0
+            upper, lower = mid + self.bb_std * std, mid - self.bb_std * std
+        else:
+            mid = upper = lower = _NAN
+        d["BB_Mid"], d["BB_Upper"], d["BB_Lower"] = mid, upper, lower
+        d["BB_Width"] = (upper - lower) / mid if mid != 0 else _NAN
+        band = upper - lower
+        d["BB_Pct"] = (c - lower) / band if band != 0 else _NAN
+
+        # ── Williams %R ───────────────────────────────────────────────────────
+        if n >= self.wr_period:
+            hh = max(self._hh.best(), h) if self.wr_period > 1 else h
+            ll = min(self._ll.best(), l) if self.wr_period > 1 else l
+            rng = hh - ll
+            d["WR"] = -100 * (hh - c) / rng if rng != 0 else _NAN
+        else:
+            d["WR"] = _NAN
+
+        # ── SMA-20 of daily closes ────────────────────────────────────────────
+        d["SMA20"] = (self._sma.total + c) / 20 if n >= 20 else _NAN
+
+        # ── MFI ───────────────────────────────────────────────────────────────
+        tp = (h + l + c) / 3
+        rmf = tp * (0.0 if math.isnan(v) else v)
+        pos = rmf if tp > self._prev_tp else 0.0
+        neg = rmf if tp < self._prev_tp else 0.0
+        d["tp"], d["mfi_pos"], d["mfi_neg"] = tp, pos, neg
+        mfi = _NAN
+        if n >= self.mfi_period:
+            pos_r = self._mfi_pos.total + pos
+            neg_r = self._mfi_neg.total + neg
+            if neg_r != 0:
+                mfi = float(np.round(100 - 100 / (1 + pos_r / neg_r), 2))
+        d["MFI"] = mfi
+
+        # ── ADV turnover ──────────────────────────────────────────────────────
+        d["turnover"] = c * v
+
+        # ── ADX ───────────────────────────────────────────────────────────────
+        if self._prev_hlc is None:
+            tr, pdm, mdm = h - l, 0.0, 0.0
+        else:
+            ph, pl, pc = self._prev_hlc
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+            up, down = h - ph, pl - l
+            pdm = up if (up > down and up > 0) else 0.0
+            mdm = down if (down > pdm and down > 0) else 0.0  # add_adx compares to masked +DM
+        d["tr"], d["pdm"], d["mdm"] = tr, pdm, mdm
+        k = self.adx_period
+        dx = _NAN
+        if n >= k:
+            atr = (self._tr.total + tr) / k
+            if atr != 0:
+                plus_di = 100 * ((self._pdm.total + pdm) / k) / atr
+                minus_di = 100 * ((self._mdm.total + mdm) / k) / atr
+                if plus_di + minus_di != 0:
+                    dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        d["DX"] = dx
+        return d
+
+    def _commit(self, bar: dict) -> None:
+        d = self._derive(bar)
+        c = bar["Close"]
+        if self._shift is None:
+            self._shift = c
+        dc = c - self._shift
+        self._bb.push(dc)
+        self._bb_sq.push(dc * dc)
+        self._hh.push(bar["High"])
+        self._ll.push(bar["Low"])
+        self._sma.push(c)
+        self._recent.append((c, d["BB_Mid"], d["BB_Upper"]))
+        self._closes8.append(c)
+
+        w = d["BB_Width"]
+        if not math.isnan(w):
+            if len(self._widths) == self._widths.maxlen:
+                old = self._widths[0]
+                del self._widths_sorted[bisect.bisect_left(self._widths_sorted, old)]
+            self._widths.append(w)
+            bisect.insort(self._widths_sorted, w)
+
+        wr = d["WR"]
+        if not math.isnan(wr):
+            if self._wr_tail and wr >= -50.0 and self._wr_tail[-1] < -50.0:
+                self._wr_cross = self._wr_count
+            self._wr_tail.append(wr)
+            self._wr_count += 1
+
+        self._prev_tp = d["tp"]
+        self._mfi_pos.push(d["mfi_pos"])
+        self._mfi_neg.push(d["mfi_neg"])
+        if not math.isnan(d["MFI"]):
+            self._mfi_tail.append(d["MFI"])
+            self._mfi_count += 1
+
+        self._turnover.append(d["turnover"])
+
+        self._prev_hlc = (bar["High"], bar["Low"], c)
+        self._tr.push(d["tr"])
+        self._pdm.push(d["pdm"])
+        self._mdm.push(d["mdm"])
+        self._dx.append(d["DX"])
+
+        self.n_closed += 1
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # READ
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def indicators(self) -> dict:
+        """The live bar's indicator columns (BB_*, WR, MFI, ADX) as of now."""
+        if self.live is None:
+            return {}
+        d = self._derive(self.live)
+        out = {k: d[k] for k in ("BB_Mid", "BB_Upper", "BB_Lower", "BB_Width", "BB_Pct", "WR")}
+        out[f"MFI_{self.mfi_period}"] = d["MFI"]
+        out[f"ADX_{self.adx_period}"] = self._adx(d["DX"])
+        return out
+
+    def _adx(self, live_dx: float) -> float:
+        k = self.adx_period
+        if self.n_closed + 1 < 2 * k - 1 or len(self._dx) < k - 1:
+            return _NAN
+        window = list(self._dx) + [live_dx]
+        return _NAN if any(math.isnan(x) for x in window) else sum(window) / k
+
+    def signals(self) -> PriceSignals:
+        """PriceSignals for closed bars + the live bar (== compute_price_signals)."""
+        ps = PriceSignals()
+        if self.live is None:
+            return ps
+        live = self.live
+        d = self._derive(live)
+        close = live["Close"]
+        n = self.n_closed + 1
+        ps.last_close = close
+
+        # ── Daily bias + MFI ──────────────────────────────────────────────────
+        if n >= 20:
+            sma = d["SMA20"]
+            ps.daily_sma = sma if not math.isnan(sma) else None
+            if ps.daily_sma:
+                ps.daily_bias_pct = (close - ps.daily_sma) / ps.daily_sma * 100
+                if close > ps.daily_sma * 1.002:
+                    ps.daily_bias = "BULLISH"
+                elif close < ps.daily_sma * 0.998:
+                    ps.daily_bias = "BEARISH"
+                else:
+                    ps.daily_bias = "NEUTRAL"
+            self._mfi_signals(ps, d["MFI"], close, n)
+
+        # ── BB signals ────────────────────────────────────────────────────────
+        upper, mid, lower = d["BB_Upper"], d["BB_Mid"], d["BB_Lower"]
+        ps.upper, ps.mid, ps.lower = upper, mid, lower
+        ps.bb_pct = d["BB_Pct"] or 0.5
+        if close >= upper:
+            ps.bb_position = "above_upper"
+        elif close >= mid:
+            ps.bb_position = "riding"
+        elif close >= lower:
+            ps.bb_position = "below_mid"
+        else:
+            ps.bb_position = "near_lower"
+        ps.position_state = self._position_state(close, mid, upper, n)
+
+        cur_width = d["BB_Width"]
+        ps.bb_width_pct = cur_width * 100
+        n_widths, below = self._width_rank(cur_width)
+        if n_widths >= 20:
+            pctl = below / n_widths * 100
+            ps.bb_width_pctl = pctl
+            if pctl <= 20:
+                ps.vol_state = "SQUEEZE"
+                ps.bb_squeezing = True
+            elif pctl >= 80:
+                ps.vol_state = "EXPANDED"
+            else:
+                ps.vol_state = "NORMAL"
+
+        # ── Williams %R signals ───────────────────────────────────────────────
+        self._wr_signals(ps, d["WR"])
+
+        # ── ADV — 20-day average daily turnover Rs Cr ─────────────────────────
+        vals = [x for x in (*self._turnover, d["turnover"]) if not math.isnan(x)]
+        ps.adv_cr = float(np.round(sum(vals) / len(vals) / 1e7, 2)) if vals else 0.0
+
+        ps.entry_valid = ps.wr_in_momentum and (ps.daily_bias in ("BULLISH", "NEUTRAL"))
+        return ps
+
+    def _width_rank(self, cur: float) -> tuple[int, int]:
+        """(window size, widths < cur) over the last vol_lookback widths incl. cur."""
+        if math.isnan(cur):  # compute_price_signals: cur NaN → no width is below it
+            return len(self._widths), 0
+        ws = self._widths_sorted
+        below = bisect.bisect_left(ws, cur)
+        size = len(ws) + 1
+        if size > self.vol_lookback:  # oldest closed width falls out of the window
+            size -= 1
+            below -= self._widths[0] < cur
+        return size, below
+
+    def _position_state(self, c0: float, m0: float, u0: float, n: int) -> str:
+        if n < 3:
+            return "UNKNOWN"
+        if math.isnan(u0) or math.isnan(m0):
+            return "UNKNOWN"
+        c1, _, u1 = self._recent[-1]
+        if c0 < m0:
+            return "MID_BAND_BROKEN"
+        if c0 < u0 and c1 >= u1:
+            return "FIRST_DIP"
+        riding = c0 >= m0 and all(c >= m for c, m, _ in list(self._recent)[-3:])
+        if c0 >= u0 or riding:
+            return "RIDING_UPPER"
+        return "CONSOLIDATING"
+
+    def _wr_signals(self, ps: PriceSignals, live_wr: float) -> None:
+        tail = list(self._wr_tail)
+        count, cross = self._wr_count, self._wr_cross
+        if not math.isnan(live_wr):
+            if tail and live_wr >= -50.0 and tail[-1] < -50.0:
+                cross = count
+            tail.append(live_wr)
+            count += 1
+        if not tail:
+            return
+        last_wr = tail[-1]
+        prev_wr = tail[-2] if len(tail) > 1 else last_wr
+        ps.wr_value = last_wr
+        ps.wr_in_momentum = last_wr >= self.wr_thresh
+        diff = last_wr - prev_wr
+        ps.wr_trend = "rising" if diff > 1 else ("falling" if diff < -1 else "flat")
+
+        # _bars_since_wr_cross looks at the last 50 WR values only
+        age = count - 1 - cross if cross is not None else 99
+        ps.wr_bars_since_cross50 = age if age <= 48 else 99
+
+        if not ps.wr_in_momentum:
+            ps.wr_phase = "NONE"
+        elif ps.wr_bars_since_cross50 <= 3:
+            ps.wr_phase = "FRESH"
+        elif ps.wr_bars_since_cross50 <= 10:
+            ps.wr_phase = "DEVELOPING"
+        else:
+            ps.wr_phase = "LATE"
+
+    def _mfi_signals(self, ps: PriceSignals, live_mfi: float, close: float, n: int) -> None:
+        series = list(self._mfi_tail)
+        count = self._mfi_count
+        if not math.isnan(live_mfi):
+            series.append(live_mfi)
+            count += 1
+        if count < 3:
+            return
+        mfi_now = series[-1]
+        ps.mfi_value = mfi_now
+        if mfi_now > 70:
+            ps.mfi_state = "STRONG"
+        elif mfi_now > 55:
+            ps.mfi_state = "RISING"
+        elif mfi_now > 45:
+            ps.mfi_state = "NEUTRAL"
+        elif mfi_now > 30:
+            ps.mfi_state = "FALLING"
+        else:
+            ps.mfi_state = "WEAK"
+
+        # Evaluated before adv_cr is filled in, as in compute_price_signals
+        ps.mfi_reliable = ps.adv_cr >= 5.0 and count >= 10
+
+        last_bar_jump = count >= 2 and abs(mfi_now - series[-2]) > 20
+        if count >= 6 and n >= 9 and not last_bar_jump:
+            price_near_high = close >= max(self._closes8) * 0.98
+            trending_down = series[-1] < series[-3] and series[-3] < series[-6]
+            ps.mfi_diverge = price_near_high and mfi_now < series[-6] and trending_down
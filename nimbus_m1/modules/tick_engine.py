@@ -0,0 +1,287 @@
+"""
+modules/tick_engine.py
+──────────────────────
+Fixed-memory tick storage and multi-timeframe bar aggregation for Kite ticks.
+
+Each instrument token gets, on its first tick:
+
+  - a preallocated tick ring: timestamp (epoch ms), price and cumulative
+    volume arrays of `capacity` slots, overwritten oldest-first;
+  - one in-progress bar per timeframe plus a preallocated ring of the last
+    `history` completed bars per timeframe.
+
+Nothing grows with session length, so memory is
+tokens × (capacity × 24 B + timeframes × history × 48 B) however long the
+ticker runs (see TickAggregator.nbytes).
+
+Bars are anchored to the 09:15 IST open: 5m bars start 09:15, 09:20, …;
+15m bars start 09:15, 09:30, …; "4H" gives the NSE session halves
+09:15 → 13:15 and 13:15 → close, like the old 4H-only aggregator.
+Ticks before 09:15 (pre-open) fold into the first bar of the day.
+
+Volume: Kite's volume_traded is the day's CUMULATIVE volume. A bar's volume
+is the cumulative volume at its last tick minus the cumulative volume at
+the previous bar's last tick. The very first tick seen for a token only
+sets that baseline (volume traded before we subscribed is not attributed
+to a bar); at each new trading day the baseline resets to 0.
+
+    agg = TickAggregator()
+    for bar in agg.add_ticks(ticks):        # ticks from KiteTicker.on_ticks
+        ...                                 # {"token", "timeframe", "timestamp", OHLCV}
+    agg.bars(256265, "5m")                  # completed bars, oldest first
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+_IST_MS = 19_800_000
+_DAY_MS = 86_400_000
+_OPEN_MS = (9 * 60 + 15) * 60_000  # 09:15 IST, from IST midnight
+
+TIMEFRAMES: dict[str, int] = {  # label → bar length in ms
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "4H": 14_400_000,
+}
+
+DEFAULT_CAPACITY = 32_768  # ticks kept per token (~9h at one tick a second)
+DEFAULT_HISTORY = 500  # completed bars kept per token per timeframe
+
+# Columns of the per-timeframe bar arrays. In-progress bars hold the
+# cumulative volume at their last tick in _CUM; completed bars hold the
+# bar's own volume there.
+_START, _OPEN, _HIGH, _LOW, _CLOSE, _CUM = range(6)
+_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _to_ms(ts) -> int:
+    """Kite timestamp (naive IST datetime, aware datetime or ISO str) → epoch ms."""
+    if isinstance(ts, str):
+        ts = datetime.datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=_IST)
+    return int(ts.timestamp() * 1000)
+
+
+def _from_ms(ms: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ms / 1000, tz=_IST)
+
+
+class _TokenBook:
+    """Tick ring + bar state for one instrument token."""
+
+    def __init__(self, capacity: int, sizes: np.ndarray, history: int):
+        self.ts = np.zeros(capacity, np.int64)
+        self.price = np.zeros(capacity, np.float64)
+        self.cumvol = np.zeros(capacity, np.float64)
+        self.pos = 0  # next slot to write
+        self.count = 0
+
+        n_tf = len(sizes)
+        self.bar = np.full((n_tf, 6), np.nan)  # in-progress bar per timeframe
+        self.base = np.zeros(n_tf)  # cumulative volume before the current bar
+        self.hist = np.zeros((n_tf, history, 6))
+        self.hist_pos = np.zeros(n_tf, np.int64)
+        self.hist_count = np.zeros(n_tf, np.int64)
+        self.day = None  # IST midnight (epoch ms) of the session being built
+
+    def push_tick(self, ts_ms: int, price: float, cumvol: float) -> None:
+        self.ts[self.pos] = ts_ms
+        self.price[self.pos] = price
+        self.cumvol[self.pos] = cumvol
+        self.pos = (self.pos + 1) % len(self.ts)
+        self.count = min(self.count + 1, len(self.ts))
+
+    def push_bar(self, i: int, row: np.ndarray) -> None:
+        self.hist[i, self.hist_pos[i]] = row
+        self.hist_pos[i] = (self.hist_pos[i] + 1) % self.hist.shape[1]
+        self.hist_count[i] = min(self.hist_count[i] + 1, self.hist.shape[1])
+
+    def ordered(self, arr: np.ndarray, pos: int, count: int) -> np.ndarray:
+        """Ring contents oldest first — a view unless the ring has wrapped."""
+        if count < len(arr):
+            return arr[:count]
+        return np.concatenate([arr[pos:], arr[:pos]])
+
+
+class TickAggregator:
+    """
+    Multi-instrument, multi-timeframe OHLCV bars from Kite ticks in fixed memory.
+
+    add_tick()/add_ticks() return the bars completed by the tick(s); a bar
+    completes when the first tick of a later bar (or of the next trading day)
+    arrives for that token. Late ticks for an already-completed bar still go
+    into the tick ring but not into any bar.
+    """
+
+    def __init__(
+        self,
+        timeframes: tuple[str, ...] = tuple(TIMEFRAMES),
+        capacity: int = DEFAULT_CAPACITY,
+        history: int = DEFAULT_HISTORY,
+    ):
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown or not timeframes:
+            raise ValueError(f"TickAggregator: unknown timeframes {unknown or timeframes}")
+        if capacity < 1 or history < 1:
+            raise ValueError("TickAggregator: capacity and history must be >= 1")
+        self.timeframes = tuple(timeframes)
+        self.capacity = capacity
+        self.history = history
+        self._sizes = np.array([TIMEFRAMES[tf] for tf in self.timeframes], np.int64)
+        self._books: dict[int, _TokenBook] = {}
+        self._last_token: Optional[int] = None
+
+    # ── ingest ────────────────────────────────────────────────────────────────
+
+    def add_ticks(self, ticks: list[dict]) -> list[dict]:
+        """Process a KiteTicker on_ticks batch; returns every completed bar."""
+        done: list[dict] = []
+        for tick in ticks:
+            done.extend(self.add_tick(tick))
+        return done
+
+    def add_tick(self, tick: dict) -> list[dict]:
+        """Process one tick; returns the bars it completed (often none)."""
+        ltp = tick.get("last_price")
+        ts = tick.get("exchange_timestamp") or tick.get("timestamp")
+        if ltp is None or ts is None:
+            return []
+        token = int(tick.get("instrument_token", 0))
+        ts_ms = _to_ms(ts)
+        price = float(ltp)
+
+        book = self._books.get(token)
+        first = book is None
+        if first:
+            book = self._books[token] = _TokenBook(self.capacity, self._sizes, self.history)
+        self._last_token = token
+
+        day = (ts_ms + _IST_MS) // _DAY_MS * _DAY_MS - _IST_MS
+        done: list[dict] = []
+        if book.day is None or day > book.day:
+            if book.day is not None:  # new session: close every open bar
+                done.extend(self._flush(token, book, range(len(self._sizes))))
+            book.day = day
+            book.base[:] = 0.0
+        elif day < book.day:
+            return []  # a tick from a finished session
+
+        cumvol = float(tick.get("volume_traded") or 0)
+        if first:
+            book.base[:] = cumvol
+        book.push_tick(ts_ms, price, cumvol)
+
+        open_ms = day + _OPEN_MS
+        starts = open_ms + np.maximum(ts_ms - open_ms, 0) // self._sizes * self._sizes
+        bar = book.bar
+        empty = np.isnan(bar[:, _START])
+        later = ~empty & (starts > bar[:, _START])
+        if later.any():
+            done.extend(self._flush(token, book, np.flatnonzero(later)))
+        new = empty | later
+        same = ~new & (starts == bar[:, _START])
+
+        if new.any():
+            bar[new, _START] = starts[new]
+            bar[new, _OPEN:_CLOSE + 1] = price
+            bar[new, _CUM] = np.maximum(cumvol, book.base[new])
+        if same.any():
+            bar[same, _HIGH] = np.maximum(bar[same, _HIGH], price)
+            bar[same, _LOW] = np.minimum(bar[same, _LOW], price)
+            bar[same, _CLOSE] = price
+            bar[same, _CUM] = np.maximum(bar[same, _CUM], cumvol)
+        return done
+
+    def _flush(self, token: int, book: _TokenBook, idx) -> list[dict]:
+        """Complete the open bars of timeframes idx; record and return them."""
+        out = []
+        for i in idx:
+            row = book.bar[i]
+            if np.isnan(row[_START]):
+                continue
+            rec = self._completed(book, i)
+            book.push_bar(i, rec)
+            book.base[i] = max(book.base[i], row[_CUM])
+            book.bar[i] = np.nan
+            out.append({
+                "token": token,
+                "timeframe": self.timeframes[i],
+                "timestamp": _from_ms(int(rec[_START])),
+                **dict(zip(_COLS, rec[_OPEN:].tolist())),
+            })
+        return out
+
+    @staticmethod
+    def _completed(book: _TokenBook, i: int) -> np.ndarray:
+        """The in-progress bar of timeframe i with _CUM turned into bar volume."""
+        rec = book.bar[i].copy()
+        rec[_CUM] = max(rec[_CUM] - book.base[i], 0.0)
+        return rec
+
+    # ── read ──────────────────────────────────────────────────────────────────
+
+    def bars(self, token: int, timeframe: str, include_current: bool = False) -> pd.DataFrame:
+        """Completed bars (oldest first) as an OHLCV frame indexed by bar start."""
+        book = self._books.get(token)
+        if book is None:
+            return pd.DataFrame(columns=_COLS)
+        i = self.timeframes.index(timeframe)
+        rows = book.ordered(book.hist[i], book.hist_pos[i], book.hist_count[i])
+        if include_current and not np.isnan(book.bar[i, _START]):
+            rows = np.vstack([rows, self._completed(book, i)])
+        idx = pd.to_datetime(rows[:, _START].astype(np.int64), unit="ms", utc=True)
+        return pd.DataFrame(rows[:, _OPEN:], index=idx.tz_convert(_IST), columns=_COLS)
+
+    def current(self, token: int, timeframe: str) -> Optional[dict]:
+        """The in-progress bar for token × timeframe (volume so far), or None."""
+        book = self._books.get(token)
+        if book is None:
+            return None
+        i = self.timeframes.index(timeframe)
+        if np.isnan(book.bar[i, _START]):
+            return None
+        rec = self._completed(book, i)
+        return {"timestamp": _from_ms(int(rec[_START])), **dict(zip(_COLS, rec[_OPEN:].tolist()))}
+
+    def ticks(self, token: int) -> pd.DataFrame:
+        """The retained ticks (at most capacity), oldest first."""
+        book = self._books.get(token)
+        if book is None:
+            return pd.DataFrame(columns=["price", "volume_traded"])
+        ts = book.ordered(book.ts, book.pos, book.count)
+        idx = pd.to_datetime(ts, unit="ms", utc=True).tz_convert(_IST)
+        return pd.DataFrame({
+            "price": book.ordered(book.price, book.pos, book.count),
+            "volume_traded": book.ordered(book.cumvol, book.pos, book.count),
+        }, index=idx)
+
+    def last_price(self, token: Optional[int] = None) -> Optional[float]:
+        """Latest traded price of token (default: the last token that ticked)."""
+        book = self._books.get(self._last_token if token is None else token)
+        if book is None or book.count == 0:
+            return None
+        return float(book.price[book.pos - 1])
+
+    @property
+    def tokens(self) -> list[int]:
+        return list(self._books)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in arrays — fixed per token, independent of tick count."""
+        return sum(
+            b.ts.nbytes + b.price.nbytes + b.cumvol.nbytes + b.bar.nbytes
+            + b.base.nbytes + b.hist.nbytes + b.hist_pos.nbytes + b.hist_count.nbytes
+            for b in self._books.values()
+        )
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+run_benchmark.py — Timing benchmarks for the NIMBUS fast paths
+───────────────────────────────────────────────────────────────
+
+Each suite times a fast path against the reference implementation it
+replaces, on synthetic data (offline), and checks the outputs still match.
+
+Usage:
+  python3 run_benchmark.py replay                       # 70 symbols × 1250 bars
+  python3 run_benchmark.py replay --n 20 --slow-n 2     # quicker
+  python3 run_benchmark.py simulate                     # trade simulator
+  python3 run_benchmark.py panel --n 500                # panel indicator kernels
+  python3 run_benchmark.py memory --n 20                # peak memory, copy vs in-place
+  python3 run_benchmark.py gex --n 200                  # GEX on a 3-expiry chain
+  python3 run_benchmark.py startup --history data/startup_history.jsonl
+                                                        # -X importtime, main.py graph
+  python3 run_benchmark.py kernel --n 10                # run_* trade loops, Python vs Numba
+  python3 run_benchmark.py portfolio --n 50             # shared-capital backtest, frames vs warehouse
+
+The per-bar reference paths are O(n²); by default they run on a sample of
+--slow-n symbols and the universe total is extrapolated from that sample.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger("bench")
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def _print_table(title: str, rows: list[tuple]):
+    print()
+    print(title)
+    print("=" * 78)
+    print(f"  {'path':<28s} {'symbols':>8s} {'seconds':>10s} {'per symbol':>12s} {'speedup':>9s}")
+    print("-" * 78)
+    base = rows[0][3] if rows else 0
+    for label, n_sym, secs, per_sym in rows:
+        speed = f"{base / per_sym:8.1f}x" if per_sym > 0 else "      -"
+        print(f"  {label:<28s} {n_sym:>8d} {secs:>10.2f} {per_sym:>12.4f} {speed:>9s}")
+    print("=" * 78)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SUITES
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def bench_replay(args):
+    """signal_replay.replay_signals: per-bar vs incremental engine."""
+    from backtest.data_loader import generate_universe
+    from backtest.signal_replay import replay_signals
+
+    universe = generate_universe(n_symbols=args.n, n_bars=args.bars)
+    syms = list(universe)
+    sample = syms[: max(1, min(args.slow_n, len(syms)))]
+
+    slow_frames = {}
+    slow_secs = 0.0
+    for sym in sample:
+        slow_frames[sym], secs = _timed(
+            replay_signals, universe[sym], symbol=sym, incremental=False
+        )
+        slow_secs += secs
+
+    fast_secs = 0.0
+    mismatches = 0
+    for sym in syms:
+        fast, secs = _timed(replay_signals, universe[sym], symbol=sym)
+        fast_secs += secs
+        if sym in slow_frames and not fast.equals(slow_frames[sym]):
+            mismatches += 1
+
+    slow_per = slow_secs / len(sample)
+    _print_table(
+        f"REPLAY — {args.n} symbols × {args.bars} bars",
+        [
+            (f"per-bar (sample of {len(sample)})", len(sample), slow_secs, slow_per),
+            ("per-bar (extrapolated)", len(syms), slow_per * len(syms), slow_per),
+            ("incremental", len(syms), fast_secs, fast_secs / len(syms)),
+        ],
+    )
+    print(f"  parity: {len(sample) - mismatches}/{len(sample)} sampled symbols identical")
+    return mismatches == 0
+
+
+def bench_simulate(args):
+    """trade_simulator.simulate_trades: per-bar vs fast mode."""
+    from backtest.data_loader import generate_universe
+    from backtest.trade_simulator import simulate_trades
+
+    universe = generate_universe(n_symbols=args.n, n_bars=args.bars)
+    syms = list(universe)
+    sample = syms[: max(1, min(args.slow_n, len(syms)))]
+
+    slow_trades = {}
+    slow_secs = 0.0
+    for sym in sample:
+        slow_trades[sym], secs = _timed(
+            simulate_trades, universe[sym], symbol=sym, incremental=False
+        )
+        slow_secs += secs
+
+    fast_secs = 0.0
+    mismatches = 0
+    n_trades = 0
+    for sym in syms:
+        fast, secs = _timed(simulate_trades, universe[sym], symbol=sym)
+        fast_secs += secs
+        n_trades += len(fast)
+        if sym in slow_trades and fast != slow_trades[sym]:
+            mismatches += 1
+
+    slow_per = slow_secs / len(sample)
+    _print_table(
+        f"SIMULATE — {args.n} symbols × {args.bars} bars ({n_trades} trades)",
+        [
+            (f"per-bar (sample of {len(sample)})", len(sample), slow_secs, slow_per),
+            ("per-bar (extrapolated)", len(syms), slow_per * len(syms), slow_per),
+            ("fast", len(syms), fast_secs, fast_secs / len(syms)),
+        ],
+    )
+    print(f"  parity: {len(sample) - mismatches}/{len(sample)} sampled symbols identical")
+    return mismatches == 0
+
+
+def bench_panel(args):
+    """add_bollinger/williams_r/mfi/adx per symbol vs panel_* over the universe."""
+    import numpy as np
+
+    from backtest.data_loader import generate_universe
+    from modules import indicators as ind
+
+    universe = generate_universe(n_symbols=args.n, n_bars=args.bars)
+
+    def per_symbol():
+        out = {}
+        for sym, df in universe.items():
+            df = ind.add_williams_r(ind.add_bollinger(df))
+            out[sym] = ind.add_adx(ind.add_mfi(df))
+        return out
+
+    def panel():
+        p = ind.stack_panel(universe)
+        h, l, c = p["High"], p["Low"], p["Close"]
+        return {
+            **ind.panel_bollinger(c),
+            **ind.panel_williams_r(h, l, c),
+            **ind.panel_mfi(h, l, c, p["Volume"]),
+            **ind.panel_adx(h, l, c),
+        }
+
+    ref, loop_secs = _timed(per_symbol)
+    fast, panel_secs = _timed(panel)
+    mismatches = sum(
+        not np.array_equal(out[sym].to_numpy(), ref[sym][col].to_numpy(), equal_nan=True)
+        for col, out in fast.items()
+        for sym in universe
+    )
+
+    n = len(universe)
+    _print_table(
+        f"PANEL INDICATORS — {n} symbols × {args.bars} bars",
+        [
+            ("per-symbol add_*", n, loop_secs, loop_secs / n),
+            ("panel_* (incl. stacking)", n, panel_secs, panel_secs / n),
+        ],
+    )
+    print(f"  parity: {len(fast) * n - mismatches}/{len(fast) * n} symbol-columns identical")
+    return mismatches == 0
+
+
+def bench_memory(args):
+    """Peak traced memory per symbol: copying indicator chain vs in-place."""
+    import tracemalloc
+    from dataclasses import asdict
+
+    from backtest.data_loader import generate_universe
+    from modules import indicators as ind
+
+    universe = generate_universe(n_symbols=args.n, n_bars=args.bars)
+
+    def copying(df):
+        df = ind.add_bollinger(df, period=20, std_dev=1.0)
+        df = ind.add_williams_r(df, period=50)
+        return ind.compute_price_signals(df)
+
+    def in_place(df):
+        ind.add_price_indicators(df, inplace=True)
+        return ind.compute_price_signals(df)
+
+    rows = []
+    outputs = {}
+    for label, chain in (("copying add_* chain", copying), ("in-place chain", in_place)):
+        peaks, secs = [], 0.0
+        for sym, df in universe.items():
+            df = df.copy()  # fresh frame, as get_price_daily returns
+            tracemalloc.start()
+            ps, dt = _timed(chain, df)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            secs += dt
+            outputs.setdefault(sym, []).append(asdict(ps))
+        rows.append((label, sum(peaks) / len(peaks) / 1024, secs / len(peaks)))
+
+    print()
+    print(f"MEMORY — {args.n} symbols × {args.bars} bars (tracemalloc peak per symbol)")
+    print("=" * 78)
+    print(f"  {'path':<28s} {'peak KiB':>10s} {'ms/symbol':>10s} {'reduction':>10s}")
+    print("-" * 78)
+    base = rows[0][1]
+    for label, kib, per in rows:
+        print(f"  {label:<28s} {kib:>10.1f} {per * 1000:>10.2f} {base / kib:>9.2f}x")
+    print("=" * 78)
+    same = sum(str(a) == str(b) for a, b in outputs.values())  # str: NaN-safe
+    print(f"  parity: {same}/{len(outputs)} symbols identical PriceSignals")
+    return same == len(outputs)
+
+
+def bench_gex(args):
+    """analytics._gex: per-row iterrows loop vs vectorised, NIFTY-sized chains."""
+    import datetime
+
+    import numpy as np
+    import pandas as pd
+
+    from modules.analytics import _gex, _gex_per_row
+
+    today = datetime.date.today()
+    spot = 22000.0
+    chains = []
+    for i in range(args.n):
+        rng = np.random.default_rng(i)
+        rows = []
+        for dte in (3, 10, 31):
+            exp = (today + datetime.timedelta(days=dte)).strftime("%d-%b-%Y")
+            for k in spot + 50 * np.arange(-60, 60):
+                rows.append({
+                    "Strike": k, "Expiry": exp,
+                    "CE_OI": float(rng.integers(0, 200_000)),
+                    "PE_OI": float(rng.integers(0, 200_000)),
+                    "CE_IV": float(rng.uniform(8, 40)),
+                    "PE_IV": float(rng.uniform(8, 40)),
+                })
+        chains.append(pd.DataFrame(rows))
+
+    sample = chains[: max(1, min(args.slow_n, len(chains)))]
+    slow, slow_secs = _timed(lambda: [_gex_per_row(c, spot, 75) for c in sample])
+    fast, fast_secs = _timed(lambda: [_gex(c, spot, 75) for c in chains])
+
+    def _key(g):
+        return (g.net_gex, g.abs_gex, g.regime, g.hvl,
+                [(e[0], e[1], round(e[2], 3), e[3]) for e in g.by_expiry])
+
+    mismatches = sum(_key(a) != _key(b) for a, b in zip(fast, slow))
+    _print_table(
+        f"GEX — {len(chains)} chains × {len(chains[0])} rows",
+        [
+            (f"per-row (sample of {len(sample)})", len(sample), slow_secs, slow_secs / len(sample)),
+            ("vectorised", len(chains), fast_secs, fast_secs / len(chains)),
+        ],
+    )
+    print(f"  parity: {len(sample) - mismatches}/{len(sample)} sampled chains identical")
+    return mismatches == 0
+
+
+# Import sets for the startup suite: (label, modules). main.py imports
+# ui.main_window; the full build also imports every tab, fast start only
+# the Dashboard. Sets whose imports fail (no PyQt6) are reported as such.
+_STARTUP_SETS = (
+    ("modules/ (gate 0.2)", ("modules.analytics", "modules.indicators",
+                             "modules.data", "modules.scanner")),
+    ("main window, fast start", ("ui.main_window",)),
+    ("main window, all tabs", ("ui.main_window", "ui.scanner_tab", "ui.etf_tab",
+                               "ui.watchlist_tab", "ui.market_context_tab")),
+)
+
+
+def _importtime(modules: tuple) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Import modules in a fresh interpreter under -X importtime. Returns
+    (total ms, [(self ms, module), …] heaviest first); raises on ImportError.
+    """
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=here, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    total, own = 0.0, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header row
+        own.append((int(self_us) / 1000, name.strip()))
+        if not name.startswith("  "):  # top level: one space, no nesting
+            total += int(cum_us) / 1000
+    return total, sorted(own, reverse=True)
+
+
+def bench_startup(args):
+    """main.py import graph: every tab vs fast start, best of --repeat runs."""
+    import json
+    import platform
+    from datetime import datetime
+
+    results = {}
+    print()
+    print(f"Startup imports — best of {args.repeat} fresh interpreters")
+    print("=" * 78)
+    print(f"  {'import set':<28s} {'ms':>10s}   heaviest modules (self ms)")
+    print("-" * 78)
+    for label, modules in _STARTUP_SETS:
+        try:
+            runs = [_importtime(modules) for _ in range(args.repeat)]
+        except ImportError as exc:
+            print(f"  {label:<28s} {'-':>10s}   unavailable: {exc}")
+            continue
+        total, own = min(runs, key=lambda r: r[0])
+        results[label] = round(total, 1)
+        top = ", ".join(f"{name} {ms:.0f}" for ms, name in own[:3])
+        print(f"  {label:<28s} {total:>10.1f}   {top}")
+    print("=" * 78)
+
+    if args.history:
+        record = {
+            "when": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "import_ms": results,
+        }
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"  appended to {args.history}")
+    return bool(results)
+
+
+# One config per exit mode / entry mode the scripts sweep
+_KERNEL_CONFIGS = {
+    "run_walkforward": None,  # its own build_param_grid()
+    "run_etf_momentum": None,
+    "run_full_sweep": [
+        {"wr_period": 20, "wr_thresh": -40, "sma_period": 20, "mfi_filter": mf,
+         "bbw_filter": "not_expanded", "adx_filter": 25, "adx_mode": "below", **ex}
+        for mf in (None, "not_weak", "accumulating")
+        for ex in ({"exit_mode": "fixed", "hold_days": 10},
+                   {"exit_mode": "sma_break", "max_hold": 25},
+                   {"exit_mode": "bbw_contract", "max_hold": 30},
+                   {"exit_mode": "mfi_exit", "max_hold": 25},
+                   {"exit_mode": "adaptive", "max_hold": 30},
+                   {"exit_mode": "momentum_ride", "max_hold": 40})
+    ],
+    "run_deep_sweep": [
+        {"wr_period": 30, "wr_thresh": wt, "sma_period": 20, "mfi_filter": "not_weak",
+         "rsi_filter": None, "vol_filter": "not_dry", "dd_filter": None,
+         "streak_filter": None, **ex}
+        for wt in (-30, -40)
+        for ex in ({"exit_mode": "bbw_contract", "max_hold": 30},
+                   {"exit_mode": "bbw_pt", "max_hold": 30, "profit_target": 3},
+                   {"exit_mode": "bbw_contract", "max_hold": 30, "trail_atr": 2.0},
+                   {"exit_mode": "bbw_contract", "max_hold": 30, "stop_loss": 5},
+                   {"exit_mode": "trail_only", "max_hold": 40, "trail_atr": 2.5},
+                   {"exit_mode": "fixed", "hold_days": 15})
+    ],
+}
+
+
+def bench_kernel(args):
+    """run_* sweep scripts' simulate(): trade_kernel pure-Python fallback vs Numba."""
+    import importlib
+
+    from backtest import trade_kernel as tk
+    from backtest.data_loader import generate_universe
+
+    raw = generate_universe(n_symbols=args.n, n_bars=args.bars)
+    ok = True
+    for name, configs in _KERNEL_CONFIGS.items():
+        mod = importlib.import_module(name)
+        indicators = getattr(mod, "compute_indicators", None) or mod.compute_all_indicators
+        universe = {s: indicators(df) for s, df in raw.items()}
+        if configs is None:
+            grid = mod.build_param_grid()
+            configs = grid[:: max(1, len(grid) // 24)]
+        if name in ("run_walkforward", "run_etf_momentum"):
+            call = lambda df, cfg: mod.simulate(df, 0, len(df), cfg)  # noqa: E731
+        else:
+            call = getattr(mod, "simulate_config", None) or mod.simulate
+
+        def _sweep():
+            return [call(df, cfg) for cfg in configs for df in universe.values()]
+
+        backends = ["python"] + (["numba"] if tk.HAVE_NUMBA else [])
+        results, rows = {}, []
+        default = tk.BACKEND
+        try:
+            for backend in backends:
+                tk.BACKEND = backend
+                if backend == "numba":
+                    _sweep()  # JIT compile / load the on-disk cache
+                results[backend], secs = _timed(_sweep)
+                calls = len(configs) * len(universe)
+                rows.append((f"{backend} ({len(configs)} configs)", calls, secs, secs / calls))
+        finally:
+            tk.BACKEND = default
+        n_trades = sum(len(r) for r in results["python"])
+        _print_table(f"KERNEL {name} — {args.n} symbols × {args.bars} bars "
+                     f"({n_trades} trades, per symbol = per simulate call)", rows)
+        if "numba" in results:
+            same = results["numba"] == results["python"]
+            ok &= same
+            print(f"  parity: numba {'identical to' if same else 'DIFFERS from'} python fallback")
+        else:
+            print("  numba not installed — fallback only")
+    return ok
+
+
+def bench_portfolio(args):
+    """portfolio.run_portfolio: in-memory frames vs chunked warehouse streams."""
+    import tempfile
+    import tracemalloc
+
+    import numpy as np
+
+    from backtest.data_loader import generate_universe
+    from backtest.portfolio import run_portfolio
+    from backtest.price_warehouse import build_warehouse
+
+    universe = generate_universe(n_symbols=args.n, n_bars=args.bars)
+    with tempfile.TemporaryDirectory() as tmp:
+        wh = build_warehouse(universe, os.path.join(tmp, "wh"))
+        rows, results = [], {}
+        for label, source in (("frames (in memory)", universe), ("warehouse (streamed)", wh)):
+            tracemalloc.start()
+            results[label], secs = _timed(run_portfolio, source, max_open=10)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append((label, secs, peak))
+        del wh
+
+    print()
+    print(f"PORTFOLIO — {args.n} symbols × {args.bars} bars, max_open=10 "
+          f"({len(results['frames (in memory)'].trades)} trades)")
+    print("=" * 78)
+    print(f"  {'source':<28s} {'seconds':>10s} {'ms/symbol':>10s} {'peak MiB':>10s}")
+    print("-" * 78)
+    for label, secs, peak in rows:
+        print(f"  {label:<28s} {secs:>10.2f} {secs / args.n * 1000:>10.1f} {peak / 2**20:>10.1f}")
+    print("=" * 78)
+    a, b = results.values()
+    key = lambda r: [(t.symbol, t.entry_date, t.exit_date, t.exit_reason) for t in r.trades]  # noqa: E731
+    same = key(a) == key(b) and np.allclose(a.equity.to_numpy(), b.equity.to_numpy(), rtol=1e-12)
+    print(f"  parity: warehouse {'matches' if same else 'DIFFERS from'} in-memory run")
+    return same
+
+
+SUITES = {
+    "replay": bench_replay,
+    "simulate": bench_simulate,
+    "panel": bench_panel,
+    "memory": bench_memory,
+    "gex": bench_gex,
+    "startup": bench_startup,
+    "kernel": bench_kernel,
+    "portfolio": bench_portfolio,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NIMBUS fast-path benchmarks")
+    parser.add_argument("suite", choices=sorted(SUITES), help="Benchmark to run")
+    parser.add_argument("--n", type=int, default=70, help="Synthetic symbols")
+    parser.add_argument("--bars", type=int, default=1250, help="Bars per symbol")
+    parser.add_argument("--slow-n", type=int, default=5,
+                        help="Symbols to run through the reference path")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="startup: interpreters per import set (best is kept)")
+    parser.add_argument("--history", default=None,
+                        help="startup: JSONL file to append this run's timings to")
+    args = parser.parse_args()
+
+    ok = SUITES[args.suite](args)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ Usage: python3 run_deep_sweep.py --live --n 30
 import argparse, datetime, logging, os, sys, time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import numpy as np, pandas as pd
+from backtest import trade_kernel as tk
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger("deep")
 
@@ -59,120 +60,79 @@ def compute_indicators(df):
     d["RED_STREAK"]=red.groupby((red!=red.shift()).cumsum()).cumsum()
     return d
 
+_MODE_REASON={"bbw_contract":"BBW_CONTRACT","bbw_pt":"BBW_CONTRACT","sma_break":"SMA_BREAK"}
+
 def simulate(df, cfg):
     n=len(df)
     if n<100: return []
     c=df["Close"].values; sma=df["SMA_20"].values
     wr=df[f"WR_{cfg.get('wr_period',30)}"].values
-    adx=df["ADX"].values; mfi=df["MFI"].values; mfi_slope=df["MFI_slope"].values
+    mfi=df["MFI"].values; mfi_slope=df["MFI_slope"].values
     bbw_slope=df["BBW_slope"].values; atr=df["ATR"].values
     rsi=df["RSI"].values; vol_r=df["VOL_RATIO"].values
     dd_high=df["DD_FROM_HIGH"].values; red_str=df["RED_STREAK"].values
     
     wt=cfg["wr_thresh"]; em=cfg["exit_mode"]; mh=cfg.get("max_hold",30)
-    trades=[]; in_t=False; eb=0; ep=0.0; peak_p=0.0
     
-    for t in range(60,n):
-        if not in_t:
-            w=wr[t]; cl=c[t]; s=sma[t]
-            if np.isnan(w) or np.isnan(s) or s==0: continue
-            if w>=wt or cl>=s: continue
-            # MFI filter (base: >30)
-            mfi_f=cfg.get("mfi_filter","not_weak")
-            if mfi_f=="not_weak" and (np.isnan(mfi[t]) or mfi[t]<30): continue
-            if mfi_f=="accumulating" and (np.isnan(mfi_slope[t]) or mfi_slope[t]<=0): continue
-            # RSI filter
-            rsi_f=cfg.get("rsi_filter")
-            if rsi_f is not None and not np.isnan(rsi[t]):
-                if rsi_f=="oversold" and rsi[t]>35: continue
-                if rsi_f=="not_extreme" and rsi[t]<15: continue
-            # Volume filter
-            vol_f=cfg.get("vol_filter")
-            if vol_f is not None and not np.isnan(vol_r[t]):
-                if vol_f=="surge" and vol_r[t]<1.5: continue
-                if vol_f=="not_dry" and vol_r[t]<0.5: continue
-            # Drawdown depth filter
-            dd_f=cfg.get("dd_filter")
-            if dd_f is not None and not np.isnan(dd_high[t]):
-                if dd_f=="deep" and dd_high[t]>-10: continue  # must be >10% off high
-                if dd_f=="moderate" and dd_high[t]>-5: continue
-            # Red streak filter
-            rs_f=cfg.get("streak_filter")
-            if rs_f is not None and not np.isnan(red_str[t]):
-                if rs_f=="extended" and red_str[t]<5: continue
-                if rs_f=="any" and red_str[t]<3: continue
-            
-            in_t=True; eb=t; ep=cl; peak_p=cl
-        else:
-            bars=t-eb; cl=c[t]; s=sma[t]
-            if cl>peak_p: peak_p=cl
-            ex=False; reason=""
-            
-            # Profit target
-            pt=cfg.get("profit_target")
-            if pt is not None and ep>0:
-                pnl_pct=(cl/ep-1)*100
-                if pnl_pct>=pt: ex=True; reason="PROFIT_TARGET"
-            
-            # Trailing stop (ATR-based)
-            ts=cfg.get("trail_atr")
-            if not ex and ts is not None and not np.isnan(atr[t]) and peak_p>0:
-                trail_level=peak_p-ts*atr[t]
-                if cl<trail_level: ex=True; reason="TRAIL_STOP"
-            
-            # Stop loss
-            sl=cfg.get("stop_loss")
-            if not ex and sl is not None and ep>0:
-                loss_pct=(cl/ep-1)*100
-                if loss_pct<=-sl: ex=True; reason="STOP_LOSS"
-            
-            # BBW contraction exit (base exit from Phase 1)
-            if not ex and em=="bbw_contract":
-                if bars>=mh: ex=True; reason="MAX_HOLD"
-                elif bars>=5 and not np.isnan(bbw_slope[t]) and bbw_slope[t]<0:
-                    if not np.isnan(s) and cl>s: ex=True; reason="BBW_CONTRACT"
-            
-            # BBW + profit target combo
-            elif not ex and em=="bbw_pt":
-                if bars>=mh: ex=True; reason="MAX_HOLD"
-                elif bars>=5 and not np.isnan(bbw_slope[t]) and bbw_slope[t]<0:
-                    if not np.isnan(s) and cl>s: ex=True; reason="BBW_CONTRACT"
-            
-            # SMA break exit
-            elif not ex and em=="sma_break":
-                if bars>=mh: ex=True; reason="MAX_HOLD"
-                elif bars>=3 and not np.isnan(s) and cl>s: ex=True; reason="SMA_BREAK"
-            
-            # Fixed hold
-            elif not ex and em=="fixed":
-                if bars>=cfg.get("hold_days",10): ex=True; reason="FIXED"
-            
-            # Trailing only (no indicator exit)
-            elif not ex and em=="trail_only":
-                if bars>=mh: ex=True; reason="MAX_HOLD"
-            
-            if ex:
-                pnl=(cl/ep-1)*100
-                pk_pnl=(peak_p/ep-1)*100
-                tr=float(np.min(c[eb:t+1]))
-                dd=(tr/ep-1)*100
-                trades.append({"entry_bar":eb,"bars_held":bars,"pnl_pct":round(pnl,4),
-                    "peak_pnl":round(pk_pnl,4),"max_dd":round(dd,4),"exit_reason":reason})
-                in_t=False
-    return trades
+    # Entry mask. MFI filters reject NaN; the optional filters let NaN through.
+    with np.errstate(invalid="ignore"):
+        entry=(wr<wt)&(c<sma)&(sma!=0)
+        mfi_f=cfg.get("mfi_filter","not_weak")
+        if mfi_f=="not_weak": entry&=mfi>=30
+        if mfi_f=="accumulating": entry&=mfi_slope>0
+        rsi_f=cfg.get("rsi_filter")
+        if rsi_f=="oversold": entry&=np.isnan(rsi)|(rsi<=35)
+        if rsi_f=="not_extreme": entry&=np.isnan(rsi)|(rsi>=15)
+        vol_f=cfg.get("vol_filter")
+        if vol_f=="surge": entry&=np.isnan(vol_r)|(vol_r>=1.5)
+        if vol_f=="not_dry": entry&=np.isnan(vol_r)|(vol_r>=0.5)
+        dd_f=cfg.get("dd_filter")
+        if dd_f=="deep": entry&=np.isnan(dd_high)|(dd_high<=-10)  # must be >10% off high
+        if dd_f=="moderate": entry&=np.isnan(dd_high)|(dd_high<=-5)
+        rs_f=cfg.get("streak_filter")
+        if rs_f=="extended": entry&=np.isnan(red_str)|(red_str>=5)
+        if rs_f=="any": entry&=np.isnan(red_str)|(red_str>=3)
+        
+        # Exits in priority order: profit target, ATR trail, stop loss, then the
+        # exit mode's own max-hold / indicator exit
+        rules=[]; sig=None
+        if cfg.get("profit_target") is not None: rules.append(tk.PT)
+        if cfg.get("trail_atr") is not None: rules.append(tk.TRAIL)
+        if cfg.get("stop_loss") is not None: rules.append(tk.STOP)
+        if em in ("bbw_contract","bbw_pt"):
+            rules+=[tk.MAX_HOLD,tk.SIGNAL]; sig=(bbw_slope<0)&(c>sma); sig_min=5
+        elif em=="sma_break":
+            rules+=[tk.MAX_HOLD,tk.SIGNAL]; sig=c>sma; sig_min=3
+        elif em=="fixed":
+            rules.append(tk.MAX_HOLD); mh=cfg.get("hold_days",10)
+        elif em=="trail_only":
+            rules.append(tk.MAX_HOLD)
+    params=tk.make_params(pt=cfg.get("profit_target"),stop=cfg.get("stop_loss"),
+        trail=cfg.get("trail_atr"),max_hold=mh,sig_min=sig_min if sig is not None else 0)
+    reason_name={tk.PT:"PROFIT_TARGET",tk.TRAIL:"TRAIL_STOP",tk.STOP:"STOP_LOSS",
+        tk.MAX_HOLD:"FIXED" if em=="fixed" else "MAX_HOLD",tk.SIGNAL:_MODE_REASON.get(em,"")}
+    
+    entries,exits,reasons=tk.run_trades(c,entry,60,n,rules,params,atr=atr,sig=sig)
+    spans=[c[eb:t+1] for eb,t in zip(entries.tolist(),exits.tolist())]
+    ep=c[entries]
+    pnl=np.round((c[exits]/ep-1)*100,4)
+    pk=np.round((np.array([x.max() for x in spans])/ep-1)*100,4) if spans else pnl
+    dd=np.round((np.array([x.min() for x in spans])/ep-1)*100,4) if spans else pnl
+    return [{"entry_bar":eb,"bars_held":t-eb,"pnl_pct":r,"peak_pnl":p,"max_dd":m,"exit_reason":reason_name[why]}
+        for eb,t,r,p,m,why in zip(entries.tolist(),exits.tolist(),pnl.tolist(),pk.tolist(),dd.tolist(),reasons.tolist())]
 
-def run(use_live=False, n_symbols=30):
+def run(use_live=False, n_symbols=30, warehouse=None):
     t0=time.time()
     logger.info("="*70); logger.info("DEEP SWEEP: Phase 2"); logger.info("="*70)
     if use_live:
-        from backtest.data_loader import download_batch
+        from backtest.data_loader import load_universe
         try:
             from modules.data import NIFTY100_SYMBOLS; symbols=NIFTY100_SYMBOLS[:n_symbols]
         except: symbols=["RELIANCE","HDFCBANK","TCS","INFY","ICICIBANK","SBIN","AXISBANK",
             "BAJFINANCE","TATAMOTORS","MARUTI","TATASTEEL","JSWSTEEL","HINDALCO","WIPRO",
             "TECHM","SUNPHARMA","CIPLA","LT","NTPC","BHARTIARTL","ITC","HINDUNILVR",
             "ASIANPAINT","DRREDDY","KOTAKBANK","BAJAJ-AUTO","HEROMOTOCO","M&M","BPCL","COALINDIA"][:n_symbols]
-        raw=download_batch(symbols, years=3)
+        raw=load_universe(symbols, years=3, warehouse=warehouse)
     else:
         from backtest.data_loader import generate_universe; raw=generate_universe(n_symbols=n_symbols,n_bars=750)
     logger.info("Loaded %d symbols",len(raw))
@@ -358,4 +318,5 @@ def run(use_live=False, n_symbols=30):
 
 if __name__=="__main__":
     p=argparse.ArgumentParser(); p.add_argument("--live",action="store_true"); p.add_argument("--n",type=int,default=30)
-    a=p.parse_args(); run(use_live=a.live,n_symbols=a.n)
+    p.add_argument("--warehouse",default=None,help="Price-warehouse dir for --live (reused if built today)")
+    a=p.parse_args(); run(use_live=a.live,n_symbols=a.n,warehouse=a.warehouse)
@@ -15,6 +15,7 @@ Usage:
 import argparse, datetime, logging, os, sys, time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import numpy as np, pandas as pd
+from backtest import trade_kernel as tk
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger("etf")
@@ -137,6 +138,14 @@ def compute_indicators(df):
 # MOMENTUM SIMULATION
 # ══════════════════════════════════════════════════════════════════════════════
 
+_REASONS = {tk.TRAIL: "TRAIL", tk.PT: "PT", tk.MAX_HOLD: "MAX"}
+
+
+def _recent_min(x, lookback):
+    """nanmin of x over the `lookback` bars BEFORE each bar (NaN if all NaN)."""
+    return pd.Series(x).rolling(lookback, min_periods=1).min().shift(1).values
+
+
 def simulate(df, start_idx, end_idx, params):
     n = len(df)
     if n < 60: return []
@@ -155,89 +164,66 @@ def simulate(df, start_idx, end_idx, params):
     trail_atr = params.get("trail_atr", 2.5)
     max_hold = params.get("max_hold", 40)
 
-    trades = []; in_t = False; eb = 0; ep = 0.0; peak = 0.0
-
-    for t in range(max(60, start_idx), min(end_idx, n)):
-        if not in_t:
-            cl = c[t]; s = sma[t]; w = wr[t]; a = adx[t]; m = mfi[t]; r = roc[t]
-            if np.isnan(s) or np.isnan(w) or s == 0: continue
-
-            entered = False
-
-            if entry_mode == "sma_cross":
-                # Price above SMA + WR rising from oversold (crossed -50 recently)
-                if cl > s and w > params.get("wr_cross_level", -50):
-                    # Check WR was below threshold within last N bars
-                    lookback = min(t, params.get("cross_lookback", 10))
-                    recent_wr = wr[t-lookback:t]
-                    if len(recent_wr) > 0 and np.nanmin(recent_wr) < params.get("wr_cross_level", -50):
-                        entered = True
-
-            elif entry_mode == "breakout":
-                # Price above SMA + ADX rising + ROC positive
-                adx_min = params.get("adx_min", 20)
-                if cl > s and not np.isnan(a) and a >= adx_min and not np.isnan(r) and r > 0:
-                    entered = True
-
-            elif entry_mode == "pullback_in_trend":
-                # Above SMA(50) + WR dips below threshold then recovers
-                sma50 = df[f"SMA_50"].values[t] if "SMA_50" in df.columns else np.nan
-                if not np.isnan(sma50) and cl > sma50 and w > -30:
-                    lookback = min(t, 10)
-                    recent_wr = wr[t-lookback:t]
-                    if len(recent_wr) > 0 and np.nanmin(recent_wr) < params.get("wr_dip_level", -50):
-                        entered = True
-
-            elif entry_mode == "mfi_momentum":
-                # Above SMA + MFI > 50 (strong flow) + ADX > threshold
-                adx_min = params.get("adx_min", 15)
-                if cl > s and not np.isnan(m) and m > 50 and not np.isnan(a) and a >= adx_min:
-                    entered = True
-
-            if entered:
-                in_t = True; eb = t; ep = cl; peak = cl
-
-        else:
-            bars = t - eb; cl = c[t]; s = sma[t]; ex = False; reason = ""
-            if cl > peak: peak = cl
-
-            # Exit: trailing stop
-            if exit_mode in ("trail", "trail_sma"):
-                if not np.isnan(atr[t]) and atr[t] > 0:
-                    trail_level = peak - trail_atr * atr[t]
-                    if cl < trail_level:
-                        ex = True; reason = "TRAIL"
-
-            # Exit: SMA break
-            if not ex and exit_mode in ("sma_break", "trail_sma"):
-                if not np.isnan(s) and cl < s and bars >= 3:
-                    ex = True; reason = "SMA_BREAK"
-
-            # Exit: BBW contraction (momentum fading)
-            if not ex and exit_mode == "bbw_fade":
-                if bars >= 5 and not np.isnan(bbw_slope[t]) and bbw_slope[t] < -0.5:
-                    ex = True; reason = "BBW_FADE"
-
-            # Exit: profit target
-            pt = params.get("profit_target")
-            if not ex and pt is not None and ep > 0:
-                if (cl / ep - 1) * 100 >= pt:
-                    ex = True; reason = "PT"
-
-            # Exit: max hold
-            if not ex and bars >= max_hold:
-                ex = True; reason = "MAX"
-
-            if ex:
-                pnl = (cl / ep - 1) * 100
-                trades.append({
-                    "entry_bar": eb, "bars_held": bars, "pnl_pct": round(pnl, 4),
-                    "peak_pnl": round((peak/ep-1)*100, 4),
-                    "exit_reason": reason,
-                    "entry_date": str(df.index[eb].date()) if hasattr(df.index[eb], 'date') else "",
-                })
-                in_t = False
-    return trades
+    with np.errstate(invalid="ignore"):
+        base = ~np.isnan(sma) & ~np.isnan(wr) & (sma != 0)
+        entry = np.zeros(n, bool)
+
+        if entry_mode == "sma_cross":
+            # Price above SMA + WR rising from oversold (crossed below the level
+            # within the last cross_lookback bars)
+            level = params.get("wr_cross_level", -50)
+            recent = _recent_min(wr, params.get("cross_lookback", 10))
+            entry = (c > sma) & (wr > level) & (recent < level)
+
+        elif entry_mode == "breakout":
+            # Price above SMA + ADX rising + ROC positive
+            entry = (c > sma) & (adx >= params.get("adx_min", 20)) & (roc > 0)
+
+        elif entry_mode == "pullback_in_trend":
+            # Above SMA(50) + WR dips below threshold then recovers
+            sma50 = df["SMA_50"].values if "SMA_50" in df.columns else np.full(n, np.nan)
+            recent = _recent_min(wr, 10)
+            entry = (c > sma50) & (wr > -30) & (recent < params.get("wr_dip_level", -50))
+
+        elif entry_mode == "mfi_momentum":
+            # Above SMA + MFI > 50 (strong flow) + ADX > threshold
+            entry = (c > sma) & (mfi > 50) & (adx >= params.get("adx_min", 15))
+        entry &= base
+
+        # Exits in priority order: ATR trail, SMA break / BBW fade, PT, max hold
+        rules = []; sig = None; sig_min = 0
+        if exit_mode in ("trail", "trail_sma"):
+            rules.append(tk.TRAIL)
+        if exit_mode in ("sma_break", "trail_sma"):
+            rules.append(tk.SIGNAL); sig = c < sma; sig_min = 3
+        elif exit_mode == "bbw_fade":
+            # momentum fading
+            rules.append(tk.SIGNAL); sig = bbw_slope < -0.5; sig_min = 5
+        if params.get("profit_target") is not None:
+            rules.append(tk.PT)
+        rules.append(tk.MAX_HOLD)
+        trail_atr_arr = np.where(atr > 0, atr, np.nan)
+
+    entries, exits, reasons = tk.run_trades(
+        c, entry, max(60, start_idx), end_idx, rules,
+        tk.make_params(pt=params.get("profit_target"), trail=trail_atr,
+                       max_hold=max_hold, sig_min=sig_min),
+        atr=trail_atr_arr, sig=sig,
+    )
+    sig_reason = "BBW_FADE" if exit_mode == "bbw_fade" else "SMA_BREAK"
+
+    ep = c[entries]
+    pnl = np.round((c[exits] / ep - 1) * 100, 4)
+    peak = np.array([c[eb:t + 1].max() for eb, t in zip(entries.tolist(), exits.tolist())], float)
+    peak_pnl = np.round((peak / ep - 1) * 100, 4)
+    return [
+        {"entry_bar": eb, "bars_held": t - eb, "pnl_pct": r, "peak_pnl": pk,
+         "exit_reason": sig_reason if why == tk.SIGNAL else _REASONS[why],
+         "entry_date": d}
+        for eb, t, r, pk, why, d in zip(
+            entries.tolist(), exits.tolist(), pnl.tolist(), peak_pnl.tolist(),
+            reasons.tolist(), tk.entry_dates(df.index, entries))
+    ]
 
 
 def calc_stats(pnls):
@@ -7,6 +7,7 @@ Usage: python3 run_full_sweep.py --live --n 30
 import argparse, datetime, logging, os, sys, time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import numpy as np, pandas as pd
+from backtest import trade_kernel as tk
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger("sweep")
 
@@ -39,6 +40,28 @@ def compute_all_indicators(df):
     d["MFI"] = 100-(100/(1+mr)); d["MFI_slope"] = d["MFI"].diff(3)
     return d
 
+def _exit_spec(cfg, c, sma, mfi, mfi_slope, bbw_slope):
+    """Exit mode → (rules, param vector, sig, sig2) for trade_kernel.run_trades."""
+    em=cfg["exit_mode"]; mh=cfg.get("max_hold",25)
+    if em=="fixed":
+        return (tk.MAX_HOLD,), tk.make_params(max_hold=cfg.get("hold_days",10)), None, None
+    with np.errstate(invalid="ignore"):
+        if em=="sma_break":
+            return (tk.MAX_HOLD,tk.SIGNAL), tk.make_params(max_hold=mh,sig_min=3), c>sma, None
+        if em=="bbw_contract":
+            return (tk.MAX_HOLD,tk.SIGNAL), tk.make_params(max_hold=mh,sig_min=5), (bbw_slope<0)&(c>sma), None
+        if em=="mfi_exit":
+            return (tk.MAX_HOLD,tk.SIGNAL), tk.make_params(max_hold=mh,sig_min=5), (mfi<30)|(mfi_slope<-15), None
+        if em=="adaptive":
+            # below SMA with BBW or MFI fading, or >3% up and back above SMA
+            weak=(c<sma)&((bbw_slope<0)|(mfi<35))
+            return ((tk.MAX_HOLD,tk.SIGNAL,tk.SIGNAL2),
+                tk.make_params(max_hold=mh,sig_min=5,sig2_min=5,sig2_pnl=3), weak, c>sma)
+        if em=="momentum_ride":
+            return ((tk.MAX_HOLD,tk.SIGNAL,tk.SIGNAL2),
+                tk.make_params(max_hold=mh,sig_min=5,sig2_min=10), c<sma, bbw_slope<-0.5)
+    return (), tk.make_params(), None, None
+
 def simulate_config(df, cfg):
     n = len(df)
     if n < 80: return []
@@ -49,57 +72,28 @@ def simulate_config(df, cfg):
     bbw_pctl=df["BBW_pctl"].values; bbw_slope=df["BBW_slope"].values
     wt=cfg["wr_thresh"]; af=cfg.get("adx_filter"); am=cfg.get("adx_mode")
     mf=cfg.get("mfi_filter"); bf=cfg.get("bbw_filter")
-    em=cfg["exit_mode"]; hd=cfg.get("hold_days",10); mh=cfg.get("max_hold",25)
-    trades=[]; in_t=False; eb=0; ep=0.0
-    for t in range(60, n):
-        if not in_t:
-            w=wr[t]; c=closes[t]; s=sma[t]
-            if np.isnan(w) or np.isnan(s) or s==0: continue
-            if w>=wt or c>=s: continue
-            if af is not None and not np.isnan(adx[t]):
-                if am=="below" and adx[t]>af: continue
-                elif am=="above" and adx[t]<af: continue
-            if mf is not None and not np.isnan(mfi[t]):
-                if mf=="not_weak" and mfi[t]<30: continue
-                elif mf=="strong" and mfi[t]<50: continue
-                elif mf=="accumulating" and mfi_slope[t]<=0: continue
-            if bf is not None and not np.isnan(bbw_pctl[t]):
-                if bf=="squeeze" and bbw_pctl[t]>30: continue
-                elif bf=="not_expanded" and bbw_pctl[t]>70: continue
-            in_t=True; eb=t; ep=c
-        else:
-            bars=t-eb; c=closes[t]; s=sma[t]; ex=False
-            if em=="fixed": ex=bars>=hd
-            elif em=="sma_break":
-                if bars>=mh: ex=True
-                elif bars>=3 and not np.isnan(s) and c>s: ex=True
-            elif em=="bbw_contract":
-                if bars>=mh: ex=True
-                elif bars>=5 and not np.isnan(bbw_slope[t]) and bbw_slope[t]<0 and not np.isnan(s) and c>s: ex=True
-            elif em=="mfi_exit":
-                if bars>=mh: ex=True
-                elif bars>=5:
-                    if not np.isnan(mfi[t]) and mfi[t]<30: ex=True
-                    elif not np.isnan(mfi_slope[t]) and mfi_slope[t]<-15: ex=True
-            elif em=="adaptive":
-                if bars>=mh: ex=True
-                elif bars>=5:
-                    bs=not np.isnan(s) and c<s; bf2=not np.isnan(bbw_slope[t]) and bbw_slope[t]<0
-                    mw=not np.isnan(mfi[t]) and mfi[t]<35
-                    if bs and (bf2 or mw): ex=True
-                    pnl=(c/ep-1)*100
-                    if pnl>3 and not np.isnan(s) and c>s: ex=True
-            elif em=="momentum_ride":
-                if bars>=mh: ex=True
-                elif bars>=5:
-                    if not np.isnan(s) and c<s: ex=True
-                    elif bars>=10 and not np.isnan(bbw_slope[t]) and bbw_slope[t]<-0.5: ex=True
-            if ex:
-                pnl=(c/ep-1)*100; pk=float(np.max(closes[eb:t+1])); tr=float(np.min(closes[eb:t+1]))
-                trades.append({"entry_bar":eb,"bars_held":bars,"pnl_pct":round(pnl,4),
-                    "peak_pnl":round((pk/ep-1)*100,4),"max_dd":round((tr/ep-1)*100,4)})
-                in_t=False
-    return trades
+    # Entry mask — a filter whose indicator is NaN lets the bar through
+    with np.errstate(invalid="ignore"):
+        entry=(wr<wt)&(closes<sma)&(sma!=0)
+        if af is not None:
+            if am=="below": entry&=np.isnan(adx)|(adx<=af)
+            elif am=="above": entry&=np.isnan(adx)|(adx>=af)
+        if mf is not None:
+            if mf=="not_weak": entry&=np.isnan(mfi)|(mfi>=30)
+            elif mf=="strong": entry&=np.isnan(mfi)|(mfi>=50)
+            elif mf=="accumulating": entry&=np.isnan(mfi)|~(mfi_slope<=0)
+        if bf is not None:
+            if bf=="squeeze": entry&=np.isnan(bbw_pctl)|(bbw_pctl<=30)
+            elif bf=="not_expanded": entry&=np.isnan(bbw_pctl)|(bbw_pctl<=70)
+    rules,params,sig,sig2=_exit_spec(cfg,closes,sma,mfi,mfi_slope,bbw_slope)
+    entries,exits,_=tk.run_trades(closes,entry,60,n,rules,params,sig=sig,sig2=sig2)
+    spans=[closes[eb:t+1] for eb,t in zip(entries.tolist(),exits.tolist())]
+    ep=closes[entries]
+    pnl=np.round((closes[exits]/ep-1)*100,4)
+    pk=np.round((np.array([x.max() for x in spans])/ep-1)*100,4) if spans else pnl
+    dd=np.round((np.array([x.min() for x in spans])/ep-1)*100,4) if spans else pnl
+    return [{"entry_bar":eb,"bars_held":t-eb,"pnl_pct":r,"peak_pnl":p,"max_dd":m}
+        for eb,t,r,p,m in zip(entries.tolist(),exits.tolist(),pnl.tolist(),pk.tolist(),dd.tolist())]
 
 def run(use_live=False, n_symbols=30):
     t0=time.time()
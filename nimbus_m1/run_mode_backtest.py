@@ -16,6 +16,12 @@ Also tests a 5th approach:
   5. BENCHMARK:  compare stock returns vs equal-weighted basket,
                  stocks that revert toward the basket → Mode B
 
+and point-in-time versions of 2 and 3, re-deciding the mode at every bar
+from trailing data only (indicators.rolling_hurst / rolling_autocorr —
+one vectorised pass per symbol, no refit per evaluation date):
+  6. HURST_PIT:    rolling Hurst of the last HURST_PIT_WINDOW returns
+  7. AUTOCORR_PIT: rolling 5d-return autocorrelation (60-bar window)
+
 Usage:
     python3 run_mode_backtest.py                    # synthetic (offline)
     python3 run_mode_backtest.py --live --n 30      # live NSE data
@@ -35,6 +41,8 @@ import pandas as pd
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger("mode_bt")
 
+HURST_PIT_WINDOW = 250  # trailing returns per point-in-time Hurst estimate
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CLASSIFICATION METHODS
@@ -107,6 +115,22 @@ def classify_autocorr(symbol: str, daily_df: pd.DataFrame) -> str:
     return "A" if ac > 0.05 else "B"
 
 
+def classify_hurst_pit(symbol: str, daily_df: pd.DataFrame) -> np.ndarray:
+    """classify_hurst at every bar from trailing returns only (NaN → B)."""
+    from modules.indicators import rolling_hurst
+
+    h = rolling_hurst(daily_df["Close"].pct_change().to_numpy(), window=HURST_PIT_WINDOW)
+    return np.where(h > 0.5, "A", "B")
+
+
+def classify_autocorr_pit(symbol: str, daily_df: pd.DataFrame) -> np.ndarray:
+    """classify_autocorr at every bar from trailing closes only (NaN → B)."""
+    from modules.indicators import rolling_autocorr
+
+    ac = rolling_autocorr(daily_df["Close"].to_numpy())
+    return np.where(ac > 0.05, "A", "B")
+
+
 def classify_best_score(symbol: str, daily_df: pd.DataFrame) -> str:
     """Compute both modes, pick whichever scores higher."""
     from modules.dual_mode import DualModeSignal, _score_mode_a, _score_mode_b
@@ -274,6 +298,16 @@ def compute_entry_and_returns(
     return records
 
 
+def _entries_point_in_time(daily_df: pd.DataFrame, modes: np.ndarray) -> list:
+    """Entries of whichever mode modes[bar] assigns at each entry bar."""
+    records = [
+        e for mode in ("A", "B")
+        for e in compute_entry_and_returns(daily_df, mode)
+        if modes[e["bar"]] == mode
+    ]
+    return sorted(records, key=lambda e: e["bar"])
+
+
 def _compute_entries_custom_wr(
     daily_df: pd.DataFrame,
     wr_period: int,
@@ -333,7 +367,7 @@ def _compute_entries_custom_wr(
 # ══════════════════════════════════════════════════════════════════════════════
 
 
-def run(use_live: bool = False, n_symbols: int = 20):
+def run(use_live: bool = False, n_symbols: int = 20, warehouse: str | None = None):
     from modules.indicators import _resample_daily
 
     t0 = time.time()
@@ -343,7 +377,7 @@ def run(use_live: bool = False, n_symbols: int = 20):
 
     # Load data
     if use_live:
-        from backtest.data_loader import download_batch
+        from backtest.data_loader import load_universe
         try:
             from modules.data import NIFTY100_SYMBOLS
             symbols = NIFTY100_SYMBOLS[:n_symbols]
@@ -356,7 +390,7 @@ def run(use_live: bool = False, n_symbols: int = 20):
                 "ITC", "HINDUNILVR", "ASIANPAINT", "DRREDDY", "KOTAKBANK",
                 "BAJAJ-AUTO", "HEROMOTOCO", "M&M", "BPCL", "COALINDIA",
             ][:n_symbols]
-        universe = download_batch(symbols, years=3)
+        universe = load_universe(symbols, years=3, warehouse=warehouse)
     else:
         from backtest.data_loader import generate_universe
         universe = generate_universe(n_symbols=n_symbols, n_bars=750)
@@ -374,6 +408,8 @@ def run(use_live: bool = False, n_symbols: int = 20):
         "AUTOCORR": lambda sym, df: classify_autocorr(sym, df),
         "BEST_SCORE": lambda sym, df: classify_best_score(sym, df),
         "BENCHMARK": lambda sym, df: classify_benchmark(sym, df, basket_rets),
+        "HURST_PIT": lambda sym, df: classify_hurst_pit(sym, df),
+        "AUTOCORR_PIT": lambda sym, df: classify_autocorr_pit(sym, df),
     }
 
     # Also test WR period variants (daily-equivalent of 4H lookbacks)
@@ -402,13 +438,17 @@ def run(use_live: bool = False, n_symbols: int = 20):
             if len(df) < 100:
                 continue
 
-            # Classify
+            # Classify, then compute entries with the assigned mode — or,
+            # for the point-in-time methods, with each bar's mode
             mode = classifier(sym, df)
+            if isinstance(mode, str):
+                entries = compute_entry_and_returns(df, mode)
+            else:
+                entries = _entries_point_in_time(df, mode)
+                mode = str(mode[-1])  # split counts the latest mode
             mode_counts[mode] += 1
             class_map[sym] = mode
 
-            # Compute entries with assigned mode
-            entries = compute_entry_and_returns(df, mode)
             for e in entries:
                 e["symbol"] = sym
                 e["method"] = method_name
@@ -677,5 +717,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--live", action="store_true")
     parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--warehouse", default=None,
+                        help="Price-warehouse dir for --live (reused if built today)")
     args = parser.parse_args()
-    run(use_live=args.live, n_symbols=args.n)
+    run(use_live=args.live, n_symbols=args.n, warehouse=args.warehouse)
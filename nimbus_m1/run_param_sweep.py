@@ -9,6 +9,7 @@ OR downloads fresh data for specified symbols.
 Usage:
   python3 run_param_sweep.py                    # use existing replay data
   python3 run_param_sweep.py --fresh --n 10     # fresh synthetic data
+  python3 run_param_sweep.py --workers 16       # process pool, resumable
 
 Output: data/backtest_results/param_sweep_results.csv
         data/backtest_results/param_sweep_report.txt
@@ -42,6 +43,11 @@ def main():
     parser.add_argument("--n", type=int, default=10, help="Synthetic symbols")
     parser.add_argument("--live", action="store_true", help="Use live NSE data")
     parser.add_argument("--symbols", nargs="+", help="Specific symbols")
+    parser.add_argument("--workers", type=int, default=1, help="Sweep worker processes")
+    parser.add_argument("--warehouse", default=None,
+                        help="Price-warehouse dir for --live (reused if built today)")
+    parser.add_argument("--checkpoint", default=os.path.join(_OUTPUT_DIR, "param_sweep.ckpt.jsonl"),
+                        help="Resume file for --workers > 1 ('' to disable)")
     args = parser.parse_args()
 
     from backtest.param_sweep import run_sweep, sweep_report
@@ -51,12 +57,12 @@ def main():
     # Load or generate data
     if args.fresh or args.live:
         if args.live and args.symbols:
-            from backtest.data_loader import download_batch
-            universe = download_batch(args.symbols, years=3)
+            from backtest.data_loader import load_universe
+            universe = load_universe(args.symbols, years=3, warehouse=args.warehouse)
         elif args.live:
-            from backtest.data_loader import download_batch
+            from backtest.data_loader import load_universe
             from modules.data import NIFTY100_SYMBOLS
-            universe = download_batch(NIFTY100_SYMBOLS[:30], years=3)
+            universe = load_universe(NIFTY100_SYMBOLS[:30], years=3, warehouse=args.warehouse)
         else:
             from backtest.data_loader import generate_universe
             universe = generate_universe(n_symbols=args.n, n_bars=750)
@@ -93,7 +99,12 @@ def main():
     }
 
     # Run sweep
-    results = run_sweep(universe, param_grid)
+    checkpoint = args.checkpoint if args.workers > 1 and args.checkpoint else None
+    if checkpoint:
+        os.makedirs(os.path.dirname(checkpoint) or ".", exist_ok=True)
+    warehouse = args.warehouse if args.live else None
+    results = run_sweep(universe, param_grid, workers=args.workers, checkpoint=checkpoint,
+                        warehouse=warehouse)
 
     if results.empty:
         logger.error("Sweep produced no results")
@@ -12,16 +12,30 @@ This answers:
   - What's the true OOS edge with honest parameter selection?
   - How many OOS trades across all folds?
 
+The per-fold sweep runs through GridEvaluator — the whole grid per window
+in one pass — and writes IS/OOS Sharpe for every combo × fold to
+wf_grid_sharpe.csv. Folds are independent once indicators are computed:
+--workers N spreads (fold, param-chunk) units over a process pool, and
+each symbol's results per window are cached on disk (FoldCache), so a
+rerun with an extra fold or new symbols only computes what is new. After
+each run the cache is pruned: entries unused for --cache-max-age days go,
+then the least recently used until it fits in --cache-max-mb.
+
 Usage:
     python3 run_walkforward.py --live --n 70 --years 5
+    python3 run_walkforward.py --live --workers 8     # parallel folds, cached
+    python3 run_walkforward.py --prune-cache --cache-max-mb 0   # empty the cache
 """
-import argparse, datetime, itertools, logging, os, sys, time
+import argparse, datetime, hashlib, itertools, json, logging, os, sys, time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import numpy as np, pandas as pd
+from backtest import trade_kernel as tk
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger("wf")
 
+_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "backtest_results")
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # INDICATORS
@@ -54,6 +68,9 @@ def compute_indicators(df):
 # SIMULATION (parameterized)
 # ══════════════════════════════════════════════════════════════════════════════
 
+_REASONS = {tk.PT: "PT", tk.SIGNAL: "BBW", tk.MAX_HOLD: "MAX"}
+
+
 def simulate(df, start_idx, end_idx, params):
     """Run entry/exit simulation with given params between start_idx and end_idx."""
     n = len(df)
@@ -64,52 +81,35 @@ def simulate(df, start_idx, end_idx, params):
     if wr_col not in df.columns or sma_col not in df.columns: return []
 
     c = df["Close"].values; sma = df[sma_col].values; wr = df[wr_col].values
-    mfi = df["MFI"].values; vol_r = df["VOL_RATIO"].values
-    dd = df["DD"].values; streak = df["RED_STREAK"].values
-    bbw_slope = df["BBW_slope"].values
-
-    wt = params["wr_thresh"]; mfi_min = params["mfi_min"]
-    dd_thresh = params["dd_thresh"]; streak_min = params["streak_min"]
-    pt = params["profit_target"]; max_hold = params["max_hold"]
-
-    trades = []; in_t = False; eb = 0; ep = 0.0; tier = ""
-
-    for t in range(max(60, start_idx), min(end_idx, n)):
-        if not in_t:
-            w = wr[t]; cl = c[t]; s = sma[t]; m = mfi[t]
-            if np.isnan(w) or np.isnan(s) or s == 0 or np.isnan(m): continue
-            if w >= wt or cl >= s or m < mfi_min: continue
-
-            d_val = dd[t] if not np.isnan(dd[t]) else 0
-            r_val = streak[t] if not np.isnan(streak[t]) else 0
-            v_val = vol_r[t] if not np.isnan(vol_r[t]) else 1.0
-
-            if d_val <= dd_thresh and r_val >= streak_min and v_val >= 0.5:
-                tier = "PRIMARY"
-            else:
-                tier = "SECONDARY"
-            in_t = True; eb = t; ep = cl
-
-        else:
-            bars = t - eb; cl = c[t]; s = sma[t]; ex = False; reason = ""
-
-            if ep > 0 and (cl / ep - 1) * 100 >= pt:
-                ex = True; reason = "PT"
-            if not ex and bars >= 5 and not np.isnan(bbw_slope[t]) and bbw_slope[t] < 0:
-                if not np.isnan(s) and cl > s:
-                    ex = True; reason = "BBW"
-            if not ex and bars >= max_hold:
-                ex = True; reason = "MAX"
-
-            if ex:
-                pnl = (cl / ep - 1) * 100
-                trades.append({
-                    "entry_bar": eb, "bars_held": bars, "pnl_pct": round(pnl, 4),
-                    "tier": tier, "exit_reason": reason,
-                    "entry_date": str(df.index[eb].date()) if hasattr(df.index[eb], 'date') else "",
-                })
-                in_t = False
-    return trades
+    mfi = df["MFI"].values
+
+    # Entry: WR oversold, below SMA, MFI not weak (NaN → no entry)
+    with np.errstate(invalid="ignore"):
+        entry = (wr < params["wr_thresh"]) & (c < sma) & (sma != 0) & (mfi >= params["mfi_min"])
+        # Tier at entry: NaN DD / streak / vol ratio count as 0 / 0 / 1.0
+        primary = (
+            (np.nan_to_num(df["DD"].values, nan=0) <= params["dd_thresh"])
+            & (np.nan_to_num(df["RED_STREAK"].values, nan=0) >= params["streak_min"])
+            & (np.nan_to_num(df["VOL_RATIO"].values, nan=1.0) >= 0.5)
+        )
+        bbw_exit = (df["BBW_slope"].values < 0) & (c > sma)
+
+    entries, exits, reasons = tk.run_trades(
+        c, entry, max(60, start_idx), end_idx,
+        rules=(tk.PT, tk.SIGNAL, tk.MAX_HOLD),
+        params=tk.make_params(pt=params["profit_target"], max_hold=params["max_hold"], sig_min=5),
+        sig=bbw_exit,
+    )
+
+    pnl = np.round((c[exits] / c[entries] - 1) * 100, 4)
+    return [
+        {"entry_bar": eb, "bars_held": t - eb, "pnl_pct": r,
+         "tier": "PRIMARY" if pri else "SECONDARY", "exit_reason": _REASONS[why],
+         "entry_date": d}
+        for eb, t, r, pri, why, d in zip(
+            entries.tolist(), exits.tolist(), pnl.tolist(), primary[entries].tolist(),
+            reasons.tolist(), tk.entry_dates(df.index, entries))
+    ]
 
 
 def calc_stats(pnls):
@@ -155,11 +155,341 @@ def param_label(p):
             f"PT{p['profit_target']}% MH{p['max_hold']}")
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# GRID EVALUATOR (whole param grid per window, no per-combo simulate)
+# ══════════════════════════════════════════════════════════════════════════════
+
+_ENTRY_KEYS = ("wr_period", "wr_thresh", "sma_period", "mfi_min")
+_EXIT_KEYS = ("sma_period", "profit_target", "max_hold")
+
+
+class GridEvaluator:
+    """
+    simulate() for every combo of a param grid at once, trade-for-trade.
+
+    dd_thresh / streak_min only label tiers, so a grid's trades depend on
+    just two sub-keys per combo:
+
+      entry key (wr_period, wr_thresh, sma_period, mfi_min) — every entry
+          mask per symbol is one slice of a boolean tensor built by
+          broadcasting WR × threshold × SMA × MFI conditions;
+      exit key (sma_period, profit_target, max_hold) — for every bar, the
+          bar a trade entered there would exit, from a shared
+          [bar, bars-ahead] matrix of forward returns.
+
+    A window's trades per (entry, exit) pair are then a walk over entry
+    bars only: enter, jump to the precomputed exit, next entry after it.
+    Pairs are evaluated once per window and shared by the combos that map
+    to them — 144 walks instead of 864 simulations for build_param_grid().
+
+    Results are kept per (symbol, window) as one pnl array per pair (see
+    window()); a symbol's tensors are only built when one is computed, so
+    windows filled from the fold cache (set_window) cost nothing here.
+    """
+
+    def __init__(self, universe, grid):
+        self.grid = grid
+        self.symbols = list(universe)
+        self._universe = universe
+        self._len = {s: len(df) for s, df in universe.items()}
+        vals = {k: sorted({p[k] for p in grid}) for k in set(_ENTRY_KEYS) | set(_EXIT_KEYS)}
+        self._vals = vals
+        self._entry_keys = list(itertools.product(*(vals[k] for k in _ENTRY_KEYS)))
+        self._exit_keys = list(itertools.product(*(vals[k] for k in _EXIT_KEYS)))
+        self._entry_id = {k: i for i, k in enumerate(self._entry_keys)}
+        self._exit_id = {k: i for i, k in enumerate(self._exit_keys)}
+        self._horizon = max(vals["max_hold"])
+        # Distinct (entry id, exit id) pairs of the grid, in first-use order
+        self.pairs = list(dict.fromkeys(self._pair_of(p) for p in grid))
+        self._pair_idx = {pair: i for i, pair in enumerate(self.pairs)}
+        self._close = {}; self._entries = {}; self._exits = {}  # built on first use
+        self._windows = {}  # (sym, lo, hi) → pnl array per pair
+        self._memo = {}
+
+    def _pair_of(self, params):
+        return (self._entry_id[tuple(params[k] for k in _ENTRY_KEYS)],
+                self._exit_id[tuple(params[k] for k in _EXIT_KEYS)])
+
+    def pair_params(self, pair):
+        """(entry key values, exit key values) of a pair — what its trades depend on."""
+        ei, xi = pair
+        return self._entry_keys[ei], self._exit_keys[xi]
+
+    def _load(self, sym):
+        if sym in self._close: return
+        df = self._universe[sym]
+        self._close[sym] = df["Close"].values
+        entry = self._entry_tensor(df, self._vals).reshape(len(self._entry_keys), len(df))
+        self._entries[sym] = [np.flatnonzero(row) for row in entry]
+        self._exits[sym] = self._exit_bars(df, self._exit_keys, self._horizon)
+
+    @staticmethod
+    def _entry_tensor(df, vals):
+        """bool[wr_period, wr_thresh, sma_period, mfi_min, bar] — simulate()'s entry test."""
+        c = df["Close"].values
+        wr = np.stack([df[f"WR_{p}"].values for p in vals["wr_period"]])
+        sma = np.stack([df[f"SMA_{p}"].values for p in vals["sma_period"]])
+        mfi = df["MFI"].values
+        with np.errstate(invalid="ignore"):
+            wr_ok = wr[:, None, :] < np.array(vals["wr_thresh"], float)[None, :, None]
+            sma_ok = (c < sma) & (sma != 0)
+            mfi_ok = mfi[None, :] >= np.array(vals["mfi_min"], float)[:, None]
+        return (wr_ok[:, :, None, None, :] & sma_ok[None, None, :, None, :]
+                & mfi_ok[None, None, None, :, :])
+
+    @staticmethod
+    def _exit_bars(df, exit_keys, horizon):
+        """int[exit key, bar]: exit bar of a trade entered at bar (len(df) → never)."""
+        c = df["Close"].values; n = len(c)
+        k = np.arange(1, horizon + 1)
+        ahead = np.arange(n)[:, None] + k[None, :]
+        valid = ahead < n
+        ahead = np.minimum(ahead, n - 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fwd = (c[ahead] / c[:, None] - 1) * 100  # simulate()'s pnl expression
+            ep_ok = (c > 0)[:, None]
+            bbw_neg = df["BBW_slope"].values < 0
+            sig = {sp: (bbw_neg & (c > df[f"SMA_{sp}"].values))[ahead] & (k >= 5)
+                   for sp in {key[0] for key in exit_keys}}
+        out = np.empty((len(exit_keys), n), np.int64)
+        for i, (sp, pt, mh) in enumerate(exit_keys):
+            # simulate()'s order (PT, BBW, MAX) only picks the reason, not the bar
+            hit = valid & ((ep_ok & (fwd >= pt)) | sig[sp] | (k >= mh))
+            first = hit.argmax(axis=1)
+            out[i] = np.where(hit.any(axis=1), np.arange(n) + first + 1, n)
+        return out
+
+    def _walk(self, sym, ei, xi, lo, hi):
+        """(entry bars, exit bars) of one symbol over [lo, hi), like simulate()."""
+        self._load(sym)
+        pos = self._entries[sym][ei]; exits = self._exits[sym][xi]
+        hi = min(hi, self._len[sym])
+        t = max(60, lo); eb = []; xb = []
+        i = int(np.searchsorted(pos, t))
+        while i < len(pos) and pos[i] < hi:
+            e = int(pos[i]); x = int(exits[e])
+            if x >= hi: break
+            eb.append(e); xb.append(x)
+            i = int(np.searchsorted(pos, x + 1, side="left"))
+        return eb, xb
+
+    def pair_pnls(self, sym, pair, lo, hi):
+        """pnl_pct of one symbol's trades for one (entry, exit) pair over [lo, hi)."""
+        eb, xb = self._walk(sym, *pair, lo, hi)
+        c = self._close[sym]
+        return np.round((c[xb] / c[eb] - 1) * 100, 4)
+
+    def window(self, sym, lo, hi):
+        """One symbol's pnl arrays over [lo, hi), one per entry of self.pairs."""
+        key = (sym, lo, hi)
+        if key not in self._windows:
+            self._windows[key] = [self.pair_pnls(sym, pair, lo, hi) for pair in self.pairs]
+        return self._windows[key]
+
+    def set_window(self, sym, lo, hi, arrays):
+        """Install results computed elsewhere (fold cache, pool worker)."""
+        self._windows[(sym, lo, hi)] = arrays
+
+    def pnls(self, params, lo, hi, min_len=0):
+        """pnl_pct of every trade simulate() would take — symbol order, then time."""
+        pair = self._pair_of(params)
+        key = (*pair, lo, hi, min_len)
+        if key not in self._memo:
+            pi = self._pair_idx.get(pair)
+            parts = [
+                self.window(sym, lo, hi)[pi] if pi is not None
+                else self.pair_pnls(sym, pair, lo, hi)
+                for sym in self.symbols
+                if self._len[sym] >= min_len and self._len[sym] >= 60
+            ]
+            self._memo[key] = np.concatenate(parts) if parts else np.empty(0)
+        return self._memo[key]
+
+    def evaluate(self, lo, hi, min_len=0):
+        """pnl arrays for every grid combo over [lo, hi), in grid order."""
+        return [self.pnls(p, lo, hi, min_len) for p in self.grid]
+
+
+def sharpe_of(pnls):
+    """run()'s selection Sharpe (unrounded, 0 when flat)."""
+    if len(pnls) == 0: return 0
+    avg = float(np.mean(pnls)); std = float(np.std(pnls))
+    return avg / std * np.sqrt(252/10) if std > 0 else 0
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FOLD SCHEDULER (process pool + content-addressed window cache)
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Bump when GridEvaluator's trade logic changes — old cache entries go stale
+_CACHE_VERSION = 1
+CACHE_MAX_MB = 2048       # fold cache size cap (least recently used go first)
+CACHE_MAX_AGE_DAYS = 60   # entries unused this long are dropped
+
+
+class FoldCache:
+    """
+    On-disk store of GridEvaluator.window() results, one .npz per
+    (symbol, window), named by the SHA-1 of what the result depends on:
+
+      - the symbol's indicator rows [0, hi) — values, columns and dates.
+        Indicators are backward-looking and trades past hi are dropped, so
+        bars appended later leave an existing window's key unchanged;
+      - the window (lo, hi);
+      - the grid's (entry, exit) pairs — the params trades depend on.
+
+    The symbol name is not part of the key: same rows, same trades. A new
+    fold or new symbols therefore only miss on the (symbol, window) units
+    that are actually new.
+
+    A hit touches the file's mtime, so mtime is "last used" for prune().
+    """
+
+    def __init__(self, root, universe, evaluator):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._rows = {s: pd.util.hash_pandas_object(df, index=True).to_numpy()
+                      for s, df in universe.items()}
+        self._cols = {s: str(list(df.columns)).encode() for s, df in universe.items()}
+        pairs = [evaluator.pair_params(p) for p in evaluator.pairs]
+        self._grid = hashlib.sha1(json.dumps(pairs, default=str).encode()).hexdigest()
+        self._n_pairs = len(pairs)
+
+    def key(self, sym, lo, hi):
+        h = hashlib.sha1(f"{_CACHE_VERSION}|{self._grid}|{lo}|{hi}|".encode())
+        h.update(self._cols[sym])
+        h.update(self._rows[sym][:hi].tobytes())
+        return h.hexdigest()
+
+    def _path(self, sym, lo, hi):
+        return os.path.join(self.root, self.key(sym, lo, hi) + ".npz")
+
+    def load(self, sym, lo, hi):
+        """Cached pnl arrays (one per pair), or None on a miss / unreadable file."""
+        path = self._path(sym, lo, hi)
+        if not os.path.exists(path): return None
+        try:
+            with np.load(path) as z:
+                pnl, offsets = z["pnl"], z["offsets"]
+        except Exception as exc:
+            logger.warning("Fold cache read failed %s: %s — recomputing", path, exc)
+            return None
+        if len(offsets) != self._n_pairs + 1: return None
+        try: os.utime(path)
+        except OSError: pass
+        return [pnl[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def save(self, sym, lo, hi, arrays):
+        path = self._path(sym, lo, hi)
+        offsets = np.cumsum([0] + [len(a) for a in arrays])
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, pnl=np.concatenate(arrays) if arrays else np.empty(0), offsets=offsets)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def prune(root, max_mb=CACHE_MAX_MB, max_age_days=CACHE_MAX_AGE_DAYS, now=None):
+        """
+        Delete entries unused for max_age_days, leftover temp files, then the
+        least recently used entries until the rest fit in max_mb.
+        Returns (files removed, bytes freed).
+        """
+        if not os.path.isdir(root): return 0, 0
+        now = time.time() if now is None else now
+        entries = []
+        for name in os.listdir(root):
+            if not name.endswith(".npz"): continue
+            path = os.path.join(root, name)
+            try: st = os.stat(path)
+            except OSError: continue
+            entries.append((st.st_mtime, st.st_size, path, name.endswith(".tmp.npz")))
+        entries.sort()  # least recently used first
+        total = sum(e[1] for e in entries)
+        removed = freed = 0
+        for mtime, size, path, tmp in entries:
+            if not (tmp or now - mtime > max_age_days * 86400 or total > max_mb * 1024 ** 2):
+                continue
+            try: os.remove(path)
+            except OSError: continue
+            total -= size; removed += 1; freed += size
+        return removed, freed
+
+
+_WORKER = {}
+
+
+def _init_worker(universe, grid):
+    _WORKER["ev"] = GridEvaluator(universe, grid)
+
+
+def _run_unit(unit):
+    """One (window, pair chunk) over the symbols missing from the cache."""
+    lo, hi, chunk, symbols = unit
+    ev = _WORKER["ev"]
+    return unit, {s: [ev.pair_pnls(s, ev.pairs[i], lo, hi) for i in chunk] for s in symbols}
+
+
+def fill_windows(evaluator, universe, windows, workers=1, cache_dir=None):
+    """
+    Make every symbol's results for each (lo, hi) window available to
+    evaluator (so evaluate() is just concatenation), reading the fold
+    cache first and computing only the misses.
+
+    workers > 1 fans the misses out as (window, pair-chunk) units over a
+    process pool — folds in parallel, and each fold's grid split across
+    workers. Output is identical to workers=1. Returns counts for logging.
+    """
+    cache = FoldCache(cache_dir, universe, evaluator) if cache_dir else None
+    todo = {}  # (lo, hi) → symbols to compute
+    counts = {"cached": 0, "computed": 0}
+    for lo, hi in dict.fromkeys(windows):
+        for sym in evaluator.symbols:
+            arrays = cache.load(sym, lo, hi) if cache else None
+            if arrays is not None:
+                evaluator.set_window(sym, lo, hi, arrays)
+                counts["cached"] += 1
+            else:
+                todo.setdefault((lo, hi), []).append(sym)
+    counts["computed"] = sum(len(s) for s in todo.values())
+
+    def _done(sym, lo, hi, arrays):
+        evaluator.set_window(sym, lo, hi, arrays)
+        if cache: cache.save(sym, lo, hi, arrays)
+
+    if workers <= 1 or not todo:
+        for (lo, hi), syms in todo.items():
+            for sym in syms:
+                _done(sym, lo, hi, evaluator.window(sym, lo, hi))
+        return counts
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    n_pairs = len(evaluator.pairs)
+    n_chunks = max(1, min(n_pairs, -(-4 * workers // len(todo))))  # ~4 units per worker
+    bounds = np.linspace(0, n_pairs, n_chunks + 1).astype(int)
+    chunks = [tuple(range(a, b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    units = [(lo, hi, ch, tuple(syms)) for (lo, hi), syms in todo.items() for ch in chunks]
+    needed = {s for syms in todo.values() for s in syms}
+    parts = {}  # (sym, lo, hi) → [array per pair]; saved once every chunk has landed
+    left = {w: len(chunks) for w in todo}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=({s: universe[s] for s in needed}, evaluator.grid)) as pool:
+        for fut in as_completed([pool.submit(_run_unit, u) for u in units]):
+            (lo, hi, chunk, _), result = fut.result()
+            for sym, arrays in result.items():
+                slot = parts.setdefault((sym, lo, hi), [None] * n_pairs)
+                for i, arr in zip(chunk, arrays): slot[i] = arr
+            left[(lo, hi)] -= 1
+            if left[(lo, hi)] == 0:
+                for sym in todo[(lo, hi)]:
+                    _done(sym, lo, hi, parts.pop((sym, lo, hi)))
+    return counts
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # WALK-FORWARD ENGINE
 # ══════════════════════════════════════════════════════════════════════════════
 
-def run(use_live=False, n_symbols=70, years=5):
+def run(use_live=False, n_symbols=70, years=5, warehouse=None, workers=1, cache_dir=None,
+        cache_max_mb=CACHE_MAX_MB, cache_max_age=CACHE_MAX_AGE_DAYS):
     t0 = time.time()
     logger.info("=" * 70)
     logger.info("WALK-FORWARD OPTIMIZATION + VALIDATION")
@@ -167,7 +497,7 @@ def run(use_live=False, n_symbols=70, years=5):
 
     # ── Load data ─────────────────────────────────────────────────────────
     if use_live:
-        from backtest.data_loader import download_batch
+        from backtest.data_loader import load_universe
         try:
             from modules.data import NIFTY100_SYMBOLS
             symbols = NIFTY100_SYMBOLS[:n_symbols]
@@ -186,7 +516,7 @@ def run(use_live=False, n_symbols=70, years=5):
                 "ABB","SIEMENS","GODREJCP","COLPAL","HAVELLS","VOLTAS",
                 "MFSL","VBL","MUTHOOTFIN","IDFCFIRSTB",
             ][:n_symbols]
-        raw = download_batch(symbols, years=years)
+        raw = load_universe(symbols, years=years, warehouse=warehouse)
     else:
         from backtest.data_loader import generate_universe
         raw = generate_universe(n_symbols=n_symbols, n_bars=int(years * 252))
@@ -233,18 +563,33 @@ def run(use_live=False, n_symbols=70, years=5):
 
     param_grid = build_param_grid()
     logger.info("Param grid: %d combinations per fold", len(param_grid))
+    evaluator = GridEvaluator(universe, param_grid)
+    folds = []
+    for fold in range(n_folds):
+        train_start = fold * TEST_BARS
+        train_end = train_start + TRAIN_BARS
+        test_end = train_end + TEST_BARS
+        if test_end > max_bars: break
+        folds.append((train_start, train_end, test_end))
+    t_grid = time.time()
+    counts = fill_windows(evaluator, universe,
+                          [w for a, b, c in folds for w in ((a, b), (b, c))],
+                          workers=workers, cache_dir=cache_dir)
+    logger.info("Fold windows: %d symbol-windows cached, %d computed (%d workers) in %.1fs",
+                counts["cached"], counts["computed"], max(workers, 1), time.time() - t_grid)
+    if cache_dir:
+        removed, freed = FoldCache.prune(cache_dir, cache_max_mb, cache_max_age)
+        if removed:
+            logger.info("Fold cache: pruned %d entries (%.1f MB)", removed, freed / 1024 ** 2)
+    grid_table = []  # IS/OOS n + Sharpe for every combo × fold
 
     # ── Run each fold ─────────────────────────────────────────────────────
     fold_results = []
     all_oos_trades = []
     chosen_params_log = []
 
-    for fold in range(n_folds):
-        train_start = fold * TEST_BARS
-        train_end = train_start + TRAIN_BARS
+    for fold, (train_start, train_end, test_end) in enumerate(folds):
         test_start = train_end
-        test_end = test_start + TEST_BARS
-        if test_end > max_bars: break
 
         sample_df = list(universe.values())[0]
         train_dates = f"{sample_df.index[train_start].date()} → {sample_df.index[train_end-1].date()}"
@@ -254,17 +599,16 @@ def run(use_live=False, n_symbols=70, years=5):
 
         # ── Phase 1: Sweep params on training window ──────────────────────
         best_sharpe = -999; best_params = None; best_is_stats = None
+        is_grid = evaluator.evaluate(train_start, train_end, min_len=test_end)
+        oos_grid = evaluator.evaluate(test_start, test_end, min_len=test_end)
+        for params, is_p, oos_p in zip(param_grid, is_grid, oos_grid):
+            grid_table.append({"fold": fold + 1, **params,
+                               "is_n": len(is_p), "is_sharpe": round(sharpe_of(is_p), 2),
+                               "oos_n": len(oos_p), "oos_sharpe": round(sharpe_of(oos_p), 2)})
 
-        for pi, params in enumerate(param_grid):
-            is_trades = []
-            for sym, df in universe.items():
-                if len(df) < test_end: continue
-                is_trades.extend(simulate(df, train_start, train_end, params))
-
-            if len(is_trades) < 15: continue
-            pnls = np.array([t["pnl_pct"] for t in is_trades])
-            avg = float(np.mean(pnls)); std = float(np.std(pnls))
-            sharpe = avg / std * np.sqrt(252/10) if std > 0 else 0
+        for params, pnls in zip(param_grid, is_grid):
+            if len(pnls) < 15: continue
+            sharpe = sharpe_of(pnls)
 
             if sharpe > best_sharpe:
                 best_sharpe = sharpe
@@ -382,11 +726,12 @@ def run(use_live=False, n_symbols=70, years=5):
                      r, cnt, cnt/len(all_oos_trades)*100, rs["win"], rs["avg"])
 
     # ── Save ──────────────────────────────────────────────────────────────
-    out = os.path.join(os.path.dirname(__file__), "data", "backtest_results")
+    out = _OUTPUT_DIR
     os.makedirs(out, exist_ok=True)
 
     pd.DataFrame(all_oos_trades).to_csv(os.path.join(out, "wf_oos_trades.csv"), index=False)
     params_df.to_csv(os.path.join(out, "wf_chosen_params.csv"), index=False)
+    pd.DataFrame(grid_table).to_csv(os.path.join(out, "wf_grid_sharpe.csv"), index=False)
 
     lines = [
         "WALK-FORWARD OPTIMIZATION REPORT",
@@ -432,5 +777,23 @@ if __name__ == "__main__":
     p.add_argument("--live", action="store_true")
     p.add_argument("--n", type=int, default=70)
     p.add_argument("--years", type=int, default=5)
+    p.add_argument("--warehouse", default=None,
+                   help="Price-warehouse dir for --live (reused if built today)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes for the per-fold grid sweep (folds × param chunks)")
+    p.add_argument("--cache-dir", default=os.path.join(_OUTPUT_DIR, "wf_cache"),
+                   help="Per-fold window cache; reruns only compute new folds/symbols ('' to disable)")
+    p.add_argument("--cache-max-mb", type=float, default=CACHE_MAX_MB,
+                   help="Fold cache size cap; least recently used entries are pruned past it")
+    p.add_argument("--cache-max-age", type=float, default=CACHE_MAX_AGE_DAYS,
+                   help="Days an unused fold cache entry is kept")
+    p.add_argument("--prune-cache", action="store_true",
+                   help="Only prune the fold cache to the caps above, then exit")
     a = p.parse_args()
-    run(use_live=a.live, n_symbols=a.n, years=a.years)
+    if a.prune_cache:
+        removed, freed = FoldCache.prune(a.cache_dir, a.cache_max_mb, a.cache_max_age)
+        logger.info("Fold cache %s: pruned %d entries (%.1f MB)", a.cache_dir, removed, freed / 1024 ** 2)
+        sys.exit(0)
+    run(use_live=a.live, n_symbols=a.n, years=a.years, warehouse=a.warehouse,
+        workers=a.workers, cache_dir=a.cache_dir or None,
+        cache_max_mb=a.cache_max_mb, cache_max_age=a.cache_max_age)
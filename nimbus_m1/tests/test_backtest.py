@@ -0,0 +1,1071 @@
+"""
+tests/test_backtest.py
+──────────────────────
+Offline tests for the backtest/ fast paths.
+
+Every fast path in backtest/ is checked against the reference per-bar
+implementation it replaces — the output must be identical, not just close.
+
+Run:
+    pytest tests/test_backtest.py -v
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.data_loader import generate_synthetic
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HELPERS
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _awkward_daily(n_bars: int = 320, seed: int = 7) -> pd.DataFrame:
+    """Synthetic daily OHLCV with the edge cases the fast paths must reproduce."""
+    df = generate_synthetic(n_bars=n_bars, seed=seed)
+    col = df.columns.get_loc
+    # Flat stretch longer than the WR window → WR NaN mid-series
+    for c in ("Open", "High", "Low", "Close"):
+        df.iloc[110:170, col(c)] = 500.0
+    # Zero volume → MFI negative flow 0 → MFI NaN
+    df.iloc[200:210, col("Volume")] = 0.0
+    df.iloc[215:217, col("Volume")] = np.nan
+    # Missing close (dropped by the daily resample)
+    df.iloc[240, col("Close")] = np.nan
+    return df
+
+
+def _assert_same_signals(got, expected, label: str = "") -> None:
+    """Field-by-field PriceSignals equality where NaN == NaN."""
+    from dataclasses import asdict
+
+    for name, want in asdict(expected).items():
+        have = getattr(got, name)
+        if isinstance(want, float) and np.isnan(want):
+            assert isinstance(have, float) and np.isnan(have), f"{label} {name}"
+        else:
+            assert have == want, f"{label} {name}: {have!r} != {want!r}"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. INCREMENTAL SIGNAL REPLAY
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestIncrementalReplay:
+
+    @pytest.mark.parametrize("seed", [3, 11])
+    def test_parity_with_per_bar_replay(self, seed):
+        """Incremental replay frame is identical to the per-bar reference."""
+        from backtest.signal_replay import replay_signals
+
+        df = generate_synthetic(n_bars=300, seed=seed)
+        slow = replay_signals(df, symbol="SYN", incremental=False)
+        fast = replay_signals(df, symbol="SYN")
+        pd.testing.assert_frame_equal(slow, fast, check_exact=True)
+
+    def test_parity_edge_cases_and_params(self):
+        """NaN WR/MFI runs, missing closes, non-default params, step > 1."""
+        from backtest.signal_replay import replay_signals
+
+        df = _awkward_daily()
+        kw = dict(bb_period=15, bb_std=2.0, wr_period=14, wr_thresh=-40.0, step=3)
+        slow = replay_signals(df, incremental=False, **kw)
+        fast = replay_signals(df, **kw)
+        pd.testing.assert_frame_equal(slow, fast, check_exact=True)
+
+    def test_parity_tz_aware_index(self):
+        """tz-aware index uses the same day boundaries as _resample_daily."""
+        from backtest.signal_replay import replay_signals
+
+        df = generate_synthetic(n_bars=260, seed=5)
+        df.index = df.index.tz_localize("Asia/Kolkata")
+        slow = replay_signals(df, incremental=False)
+        fast = replay_signals(df)
+        pd.testing.assert_frame_equal(slow, fast, check_exact=True)
+
+    def test_signal_frame_rows_match_compute_price_signals(self):
+        """Row T of the signal frame == compute_price_signals(history[:T+1])."""
+        from modules.indicators import add_bollinger, add_williams_r, compute_price_signals
+        from backtest.signal_frame import compute_signal_frame, signals_at
+
+        df = add_williams_r(add_bollinger(_awkward_daily()), period=50)
+        frame = compute_signal_frame(df)
+        for t in [0, 1, 2, 25, 60, 115, 175, 205, 241, len(df) - 1]:
+            expected = compute_price_signals(df.iloc[: t + 1])
+            _assert_same_signals(signals_at(frame, t), expected, f"bar {t}")
+
+    def test_intraday_falls_back_to_per_bar(self):
+        """Several bars per day → supports_frame False, per-bar path used."""
+        from backtest.signal_frame import supports_frame, compute_signal_frame
+
+        idx = pd.date_range("2024-01-01", periods=50, freq="4h")
+        df = pd.DataFrame({"Close": np.linspace(100, 110, 50)}, index=idx)
+        assert supports_frame(df) is False
+        with pytest.raises(ValueError):
+            compute_signal_frame(df)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. FAST TRADE SIMULATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestFastSimulation:
+
+    @staticmethod
+    def _trade_frame(trades) -> pd.DataFrame:
+        return pd.DataFrame([t.to_dict() for t in trades])
+
+    @pytest.mark.parametrize("seed", [9, 21])
+    def test_trades_match_per_bar_simulation(self, seed):
+        """Fast mode produces the same Trade objects as the per-bar loop."""
+        from backtest.trade_simulator import simulate_trades
+
+        df = generate_synthetic(n_bars=360, seed=seed)
+        slow = simulate_trades(df, symbol="SYN", incremental=False)
+        fast = simulate_trades(df, symbol="SYN")
+        assert slow, "fixture should generate trades"
+        assert fast == slow
+        assert [t._entry_bar for t in fast] == [t._entry_bar for t in slow]
+
+    def test_trades_match_on_edge_cases(self):
+        """NaN closes / flat stretches / custom params still match exactly."""
+        from backtest.trade_simulator import simulate_trades
+
+        df = _awkward_daily(n_bars=340, seed=4)
+        kw = dict(bb_period=15, wr_period=30, wr_thresh=-30.0, cooldown_bars=1)
+        slow = simulate_trades(df, incremental=False, **kw)
+        fast = simulate_trades(df, **kw)
+        pd.testing.assert_frame_equal(
+            self._trade_frame(slow), self._trade_frame(fast), check_exact=True
+        )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. PARALLEL PARAMETER SWEEP
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+_SMALL_GRID = {
+    "wr_period": [14, 50],
+    "wr_thresh": [-50, -20],
+    "bb_period": [20],
+    "bb_std": [1.0, 2.0],
+    "entry_mode": ["momentum", "mean_revert"],
+    "use_adx": [False, True],
+}
+
+
+@pytest.fixture(scope="module")
+def universe():
+    from backtest.data_loader import generate_universe
+
+    u = generate_universe(n_symbols=4, n_bars=500, seed=3)
+    u["SYN000"].index = u["SYN000"].index.tz_localize("Asia/Kolkata")
+    return u
+
+
+class TestParallelSweep:
+
+    def test_process_pool_matches_serial(self, universe):
+        """Pooled sweep aggregates to the identical ranked table."""
+        from backtest.param_sweep import run_sweep
+
+        serial = run_sweep(universe, _SMALL_GRID)
+        pooled = run_sweep(universe, _SMALL_GRID, workers=2)
+        pd.testing.assert_frame_equal(serial, pooled, check_exact=True)
+
+    def test_shared_memory_roundtrip(self, universe):
+        """Frames rebuilt from the shared block equal the originals."""
+        from backtest.sweep_executor import _pack_universe, _unpack_symbol
+
+        shm, layout = _pack_universe(universe)
+        try:
+            for sym, df in universe.items():
+                pd.testing.assert_frame_equal(
+                    _unpack_symbol(shm.buf, layout[sym]), df, check_freq=False,
+                )
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_checkpoint_resume_skips_finished_units(self, universe, tmp_path, monkeypatch):
+        """A torn checkpoint resumes: only missing units are recomputed."""
+        import backtest.param_sweep as ps
+
+        ckpt = tmp_path / "sweep.jsonl"
+        full = ps.run_sweep(universe, _SMALL_GRID, checkpoint=str(ckpt))
+        lines = ckpt.read_text().splitlines()
+        n_units = len(lines) - 1  # minus header
+        ckpt.write_text("\n".join(lines[:11]) + "\n" + lines[11][:25])  # crash mid-write
+
+        calls = []
+        real = ps.evaluate_combo
+        monkeypatch.setattr(ps, "evaluate_combo", lambda df, p, **kw: calls.append(1) or real(df, p, **kw))
+        resumed = ps.run_sweep(universe, _SMALL_GRID, checkpoint=str(ckpt))
+
+        assert len(calls) == n_units - 10
+        pd.testing.assert_frame_equal(full, resumed, check_exact=True)
+
+    def test_checkpoint_for_other_grid_is_ignored(self, universe, tmp_path):
+        from backtest.param_sweep import run_sweep
+
+        ckpt = tmp_path / "sweep.jsonl"
+        run_sweep(universe, _SMALL_GRID, checkpoint=str(ckpt))
+        other = dict(_SMALL_GRID, bb_std=[1.5])
+        assert run_sweep(universe, other, checkpoint=str(ckpt)).equals(run_sweep(universe, other))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. INDICATOR CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestIndicatorCache:
+
+    def test_cached_sweep_matches_uncached(self, universe):
+        """Each distinct indicator setting is computed once per symbol."""
+        from backtest.indicator_cache import IndicatorCache
+        from backtest.param_sweep import evaluate_combo, sweep_combos
+
+        cache = IndicatorCache()
+        for p in sweep_combos(_SMALL_GRID):
+            for sym, df in universe.items():
+                assert evaluate_combo(df, p, cache=cache, symbol=sym) == evaluate_combo(df, p)
+
+        # bollinger: 2 bb_std, williams_r: 2 periods, adx: 1 → 5 keys per symbol
+        assert len(cache) == cache.misses == 5 * len(universe)
+        assert cache.hits > cache.misses
+
+    def test_cache_without_symbol_is_rejected(self, universe):
+        from backtest.indicator_cache import IndicatorCache
+        from backtest.param_sweep import evaluate_combo, sweep_combos
+
+        with pytest.raises(ValueError, match="symbol"):
+            evaluate_combo(next(iter(universe.values())), sweep_combos(_SMALL_GRID)[0],
+                           cache=IndicatorCache())
+
+    def test_lru_eviction_under_budget(self):
+        from backtest.indicator_cache import IndicatorCache
+
+        cache = IndicatorCache(max_mb=2 * 8000 / 1024 / 1024)  # room for two 1000-float arrays
+        make = lambda: {"x": np.zeros(1000)}
+        cache.get("A", "ind", (1,), make)
+        cache.get("B", "ind", (1,), make)
+        cache.get("A", "ind", (1,), make)  # A now most recent
+        cache.get("C", "ind", (1,), make)  # evicts B
+        assert cache.evictions == 1
+        cache.get("A", "ind", (1,), make)
+        cache.get("B", "ind", (1,), make)
+        st = cache.stats()
+        assert (st["hits"], st["misses"]) == (2, 4)
+        assert cache.nbytes <= cache.max_bytes
+
+    def test_cached_arrays_are_read_only(self):
+        from backtest.indicator_cache import IndicatorCache
+
+        cols = IndicatorCache().get("A", "ind", (), lambda: {"x": np.arange(3.0)})
+        with pytest.raises(ValueError):
+            cols["x"][0] = 1.0
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 5. INCREMENTAL OHLCV CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class _FakeYF:
+    """yf.download stand-in serving a fixed series from `start` onwards."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.starts: list[str] = []
+
+    def download(self, tickers, start=None, interval="1d", **kw):
+        self.starts.append(start)
+        return self.df[self.df.index >= start].copy()
+
+
+class TestIncrementalCache:
+
+    @pytest.fixture
+    def series(self):
+        idx = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=400)
+        return generate_synthetic(n_bars=400, seed=5).set_axis(idx)
+
+    def test_merge_tail_appends_after_matching_overlap(self, series):
+        from backtest.data_loader import _merge_tail
+
+        merged = _merge_tail(series.iloc[:300], series.iloc[295:])
+        pd.testing.assert_frame_equal(merged, series)
+
+    def test_merge_tail_rejects_adjusted_history(self, series):
+        from backtest.data_loader import _merge_tail
+
+        split = series.iloc[295:].copy()
+        split[["Open", "High", "Low", "Close"]] /= 2  # 2:1 split, back-adjusted
+        assert _merge_tail(series.iloc[:300], split) is None
+        # a changed LAST cached bar (partial intraday bar) is not a break
+        tail = series.iloc[295:].copy()
+        tail.iloc[4, tail.columns.get_loc("Close")] *= 1.01
+        assert _merge_tail(series.iloc[:300], tail) is not None
+        assert _merge_tail(series.iloc[:300], series.iloc[350:]) is None  # gap
+
+    def test_download_history_fetches_only_the_tail(self, series, tmp_path, monkeypatch):
+        pytest.importorskip("pyarrow")
+        import sys
+        import backtest.data_loader as dl
+
+        monkeypatch.setattr(dl, "_CACHE_DIR", str(tmp_path))
+        yf = _FakeYF(series.iloc[:300])
+        monkeypatch.setitem(sys.modules, "yfinance", yf)
+
+        assert len(dl.download_history("SBIN", years=2)) == 300
+        assert len(dl.download_history("SBIN", years=2)) == 300
+        assert len(yf.starts) == 1  # checked today → no network
+
+        meta = dl._load_meta("SBIN")
+        dl._save_meta({**meta, "checked": "2000-01-01"}, "SBIN")
+        yf.df = series
+        df = dl.download_history("SBIN", years=2)
+        assert yf.starts[-1] == series.index[295].date().isoformat()
+        pd.testing.assert_frame_equal(df, series, check_freq=False)
+        pd.testing.assert_frame_equal(dl._load_cache("SBIN"), series, check_freq=False)
+
+        dl._save_meta({**meta, "checked": "2000-01-01"}, "SBIN")
+        yf.df = series.assign(Close=series["Close"] / 2)
+        df = dl.download_history("SBIN", years=2)
+        assert yf.starts[-2:] == [series.index[395].date().isoformat(), meta["start"]]
+        assert df["Close"].iloc[0] == series["Close"].iloc[0] / 2
+
+
+    def test_failed_tail_keeps_cache_unchecked(self, series, tmp_path, monkeypatch):
+        pytest.importorskip("pyarrow")
+        import sys
+        import backtest.data_loader as dl
+
+        monkeypatch.setattr(dl, "_CACHE_DIR", str(tmp_path))
+        yf = _FakeYF(series.iloc[:300])
+        monkeypatch.setitem(sys.modules, "yfinance", yf)
+        dl.download_history("SBIN", years=2)
+        meta = dl._load_meta("SBIN")
+        dl._save_meta({**meta, "checked": "2000-01-01"}, "SBIN")
+
+        yf.df = series.iloc[:0]  # yfinance answers an outage with an empty frame
+        assert len(dl.download_history("SBIN", years=2)) == 300  # stale cache served
+        assert dl._load_meta("SBIN")["checked"] == "2000-01-01"
+        yf.df = series
+        assert len(dl.download_history("SBIN", years=2)) == 400  # retried, not skipped
+        assert len(yf.starts) == 3
+
+    def test_topped_up_cache_is_trimmed_to_years(self, series, tmp_path, monkeypatch):
+        pytest.importorskip("pyarrow")
+        import sys
+        import backtest.data_loader as dl
+
+        monkeypatch.setattr(dl, "_CACHE_DIR", str(tmp_path))
+        monkeypatch.setitem(sys.modules, "yfinance", _FakeYF(series))
+        dl.download_history("SBIN", years=2)
+        dl._save_meta({**dl._load_meta("SBIN"), "checked": "2000-01-01"}, "SBIN")
+
+        df = dl.download_history("SBIN", years=1)
+        start = (pd.Timestamp.today().normalize() - pd.Timedelta(days=365))
+        assert df.index[0] >= start and df.index[-1] == series.index[-1]
+        pd.testing.assert_frame_equal(dl._load_cache("SBIN"), df, check_freq=False)
+        assert dl._load_meta("SBIN")["start"] == start.date().isoformat()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 6. PRICE WAREHOUSE
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestPriceWarehouse:
+
+    @pytest.fixture
+    def ragged(self):
+        """Naive-index universe with a late listing and a suspension gap."""
+        from backtest.data_loader import generate_universe
+
+        u = generate_universe(n_symbols=4, n_bars=400, seed=9)
+        u["SYN001"] = u["SYN001"].iloc[120:]
+        u["SYN002"] = u["SYN002"].drop(u["SYN002"].index[200:204])
+        return u
+
+    def test_frames_roundtrip_as_views(self, ragged, tmp_path):
+        from backtest.price_warehouse import build_warehouse
+
+        wh = build_warehouse(ragged, str(tmp_path / "wh"))
+        close = wh.block("Close")
+        for sym, df in ragged.items():
+            got = wh.frame(sym)
+            pd.testing.assert_frame_equal(got, df, check_freq=False)
+            assert np.shares_memory(got["Close"].to_numpy(), close) == (sym != "SYN002")
+        assert len(wh.frame("SYN002", keep_gaps=True)) == len(ragged["SYN002"]) + 4
+
+    def test_window_is_aligned_date_by_symbol(self, ragged, tmp_path):
+        from backtest.price_warehouse import build_warehouse
+
+        wh = build_warehouse(ragged, str(tmp_path / "wh"))
+        dates = ragged["SYN000"].index
+        closes = wh.window(dates[100], dates[149], fields=["Close"])["Close"]
+        assert closes.shape == (50, 4)
+        assert np.shares_memory(closes.to_numpy(), wh.block("Close"))
+        assert closes["SYN001"].isna().sum() == 20  # listed at bar 120
+        assert closes["SYN003"].equals(ragged["SYN003"]["Close"].iloc[100:150])
+
+    def test_rebuild_replaces_atomically(self, ragged, tmp_path):
+        from backtest.price_warehouse import PriceWarehouse, build_warehouse
+
+        path = str(tmp_path / "wh")
+        build_warehouse(ragged, path)
+        build_warehouse({"SYN003": ragged["SYN003"]}, path, meta={"years": 3})
+        wh = PriceWarehouse(path)
+        assert wh.symbols == ["SYN003"] and wh.manifest["meta"] == {"years": 3}
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["wh"]
+
+    def test_load_universe_same_window_built_or_reused(self, tmp_path, monkeypatch):
+        import backtest.data_loader as dl
+        from backtest.data_loader import generate_universe
+
+        end = pd.Timestamp.today().normalize()
+        full = {s: df.set_axis(pd.bdate_range(end=end, periods=len(df)))
+                for s, df in generate_universe(n_symbols=3, n_bars=400, seed=9).items()}
+        calls = []
+        monkeypatch.setattr(dl, "download_batch",
+                            lambda syms, years, interval: calls.append(syms) or full)
+
+        path = str(tmp_path / "wh")
+        built = dl.load_universe(list(full), years=1, warehouse=path)
+        reused = dl.load_universe(list(full), years=1, warehouse=path)
+        assert len(calls) == 1
+        assert list(built) == list(reused) == list(full)
+        for sym in full:
+            pd.testing.assert_frame_equal(built[sym], reused[sym], check_freq=False)
+            assert len(built[sym]) < len(full[sym])  # trimmed to the last year
+
+    def test_pooled_sweep_reads_warehouse(self, ragged, tmp_path):
+        from backtest.param_sweep import run_sweep
+        from backtest.price_warehouse import build_warehouse
+
+        path = str(tmp_path / "wh")
+        u = {s: df.iloc[30:] for s, df in build_warehouse(ragged, path).to_universe().items()}
+        pooled = run_sweep(u, _SMALL_GRID, workers=2, warehouse=path)
+        pd.testing.assert_frame_equal(run_sweep(u, _SMALL_GRID), pooled, check_exact=True)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 7. CONCURRENT BATCH DOWNLOAD
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class _FlakyYF:
+    """
+    Thread-safe yf.download stand-in: `flaky` tickers fail their first
+    n calls (empty frame, like yfinance), `dead` tickers always fail.
+    """
+
+    def __init__(self, flaky=None, dead=(), delay=0.05):
+        import threading
+
+        self.flaky = dict(flaky or {})
+        self.dead = set(dead)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.calls: list[tuple[str, float]] = []
+        self.in_flight = self.max_in_flight = 0
+
+    def download(self, tickers, start=None, interval="1d", **kw):
+        import time
+
+        with self.lock:
+            self.calls.append((tickers, time.monotonic()))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = tickers in self.dead or self.flaky.get(tickers, 0) > 0
+            if tickers in self.flaky:
+                self.flaky[tickers] -= 1
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if fail:
+            return pd.DataFrame()
+        return generate_synthetic(n_bars=120, seed=len(tickers))
+
+
+class TestConcurrentBatch:
+
+    @pytest.fixture
+    def fake(self, monkeypatch):
+        import sys
+
+        def _install(**kw):
+            yf = _FlakyYF(**kw)
+            monkeypatch.setitem(sys.modules, "yfinance", yf)
+            return yf
+
+        return _install
+
+    def test_concurrent_with_retries_and_partial_results(self, fake):
+        from backtest.data_loader import download_batch
+
+        yf = fake(flaky={"TCS.NS": 2}, dead={"DEAD.NS"})
+        events = []
+        syms = ["SBIN", "TCS", "DEAD", "INFY", "ITC", "LT"]
+        out = download_batch(syms, use_cache=False, workers=4, rate=100.0,
+                             retries=2, backoff=0.01, progress_cb=events.append)
+
+        assert list(out) == ["SBIN", "TCS", "INFY", "ITC", "LT"]  # input order, DEAD dropped
+        assert yf.max_in_flight > 1
+        ev = {e["symbol"]: e for e in events}
+        assert ev["TCS"]["attempts"] == 3 and ev["TCS"]["ok"]
+        assert ev["DEAD"]["attempts"] == 3 and ev["DEAD"]["source"] == "failed"
+        assert ev["SBIN"]["source"] == "full" and ev["SBIN"]["bytes"] > 0
+        assert sorted(e["done"] for e in events) == list(range(1, 7))
+        assert all(e["total"] == 6 and e["latency_s"] >= 0.05 for e in events)
+
+    def test_global_rate_limit(self, fake):
+        from backtest.data_loader import download_batch
+
+        yf = fake(delay=0.0)
+        download_batch([f"S{i}" for i in range(9)], use_cache=False,
+                       workers=3, rate=20.0)
+        stamps = sorted(t for _, t in yf.calls)
+        # burst of 3, then 6 more calls at 20/s → at least 0.3s end to end
+        assert stamps[-1] - stamps[0] >= 6 / 20.0 * 0.9
+
+    def test_missing_yfinance_is_not_retried(self, monkeypatch):
+        import sys
+        from backtest.data_loader import download_batch
+
+        monkeypatch.setitem(sys.modules, "yfinance", None)  # import → ImportError
+        events = []
+        assert download_batch(["SBIN"], use_cache=False, backoff=10.0,
+                              progress_cb=events.append) == {}
+        assert events[0]["attempts"] == 1 and events[0]["source"] == "failed"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 8. SHARED TRADE-LOOP KERNEL
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _wf_reference(df, start_idx, end_idx, p):
+    """run_walkforward.simulate's original per-bar loop (trade tuples only)."""
+    c = df["Close"].values; sma = df[f"SMA_{p['sma_period']}"].values
+    wr = df[f"WR_{p['wr_period']}"].values; mfi = df["MFI"].values
+    bbw_slope = df["BBW_slope"].values
+    out = []; in_t = False; eb = 0; ep = 0.0
+    for t in range(max(60, start_idx), min(end_idx, len(df))):
+        if not in_t:
+            w = wr[t]; cl = c[t]; s = sma[t]; m = mfi[t]
+            if np.isnan(w) or np.isnan(s) or s == 0 or np.isnan(m): continue
+            if w >= p["wr_thresh"] or cl >= s or m < p["mfi_min"]: continue
+            in_t = True; eb = t; ep = cl
+        else:
+            bars = t - eb; cl = c[t]; s = sma[t]; reason = ""
+            if ep > 0 and (cl / ep - 1) * 100 >= p["profit_target"]:
+                reason = "PT"
+            elif bars >= 5 and not np.isnan(bbw_slope[t]) and bbw_slope[t] < 0 \
+                    and not np.isnan(s) and cl > s:
+                reason = "BBW"
+            elif bars >= p["max_hold"]:
+                reason = "MAX"
+            if reason:
+                out.append((eb, bars, round((cl / ep - 1) * 100, 4), reason))
+                in_t = False
+    return out
+
+
+def _deep_reference(df, cfg):
+    """run_deep_sweep.simulate's original per-bar loop (trade tuples only)."""
+    n = len(df)
+    if n < 100: return []
+    c = df["Close"].values; sma = df["SMA_20"].values
+    wr = df[f"WR_{cfg.get('wr_period', 30)}"].values
+    mfi = df["MFI"].values; mfi_slope = df["MFI_slope"].values
+    bbw_slope = df["BBW_slope"].values; atr = df["ATR"].values
+    rsi = df["RSI"].values; vol_r = df["VOL_RATIO"].values
+    dd_high = df["DD_FROM_HIGH"].values; red_str = df["RED_STREAK"].values
+    wt = cfg["wr_thresh"]; em = cfg["exit_mode"]; mh = cfg.get("max_hold", 30)
+    out = []; in_t = False; eb = 0; ep = 0.0; peak_p = 0.0
+    for t in range(60, n):
+        if not in_t:
+            w = wr[t]; cl = c[t]; s = sma[t]
+            if np.isnan(w) or np.isnan(s) or s == 0: continue
+            if w >= wt or cl >= s: continue
+            mfi_f = cfg.get("mfi_filter", "not_weak")
+            if mfi_f == "not_weak" and (np.isnan(mfi[t]) or mfi[t] < 30): continue
+            if mfi_f == "accumulating" and (np.isnan(mfi_slope[t]) or mfi_slope[t] <= 0): continue
+            rsi_f = cfg.get("rsi_filter")
+            if rsi_f is not None and not np.isnan(rsi[t]):
+                if rsi_f == "oversold" and rsi[t] > 35: continue
+                if rsi_f == "not_extreme" and rsi[t] < 15: continue
+            vol_f = cfg.get("vol_filter")
+            if vol_f is not None and not np.isnan(vol_r[t]):
+                if vol_f == "surge" and vol_r[t] < 1.5: continue
+                if vol_f == "not_dry" and vol_r[t] < 0.5: continue
+            dd_f = cfg.get("dd_filter")
+            if dd_f is not None and not np.isnan(dd_high[t]):
+                if dd_f == "deep" and dd_high[t] > -10: continue
+                if dd_f == "moderate" and dd_high[t] > -5: continue
+            rs_f = cfg.get("streak_filter")
+            if rs_f is not None and not np.isnan(red_str[t]):
+                if rs_f == "extended" and red_str[t] < 5: continue
+                if rs_f == "any" and red_str[t] < 3: continue
+            in_t = True; eb = t; ep = cl; peak_p = cl
+        else:
+            bars = t - eb; cl = c[t]; s = sma[t]; reason = ""
+            if cl > peak_p: peak_p = cl
+            pt = cfg.get("profit_target"); ts = cfg.get("trail_atr"); sl = cfg.get("stop_loss")
+            if pt is not None and ep > 0 and (cl / ep - 1) * 100 >= pt:
+                reason = "PROFIT_TARGET"
+            elif ts is not None and not np.isnan(atr[t]) and peak_p > 0 and cl < peak_p - ts * atr[t]:
+                reason = "TRAIL_STOP"
+            elif sl is not None and ep > 0 and (cl / ep - 1) * 100 <= -sl:
+                reason = "STOP_LOSS"
+            elif em in ("bbw_contract", "bbw_pt"):
+                if bars >= mh: reason = "MAX_HOLD"
+                elif bars >= 5 and not np.isnan(bbw_slope[t]) and bbw_slope[t] < 0 \
+                        and not np.isnan(s) and cl > s: reason = "BBW_CONTRACT"
+            elif em == "sma_break":
+                if bars >= mh: reason = "MAX_HOLD"
+                elif bars >= 3 and not np.isnan(s) and cl > s: reason = "SMA_BREAK"
+            elif em == "fixed":
+                if bars >= cfg.get("hold_days", 10): reason = "FIXED"
+            elif em == "trail_only":
+                if bars >= mh: reason = "MAX_HOLD"
+            if reason:
+                out.append((eb, bars, round((cl / ep - 1) * 100, 4), round((peak_p / ep - 1) * 100, 4),
+                            round((float(np.min(c[eb:t + 1])) / ep - 1) * 100, 4), reason))
+                in_t = False
+    return out
+
+
+def _full_reference(df, cfg):
+    """run_full_sweep.simulate_config's original per-bar loop (trade tuples only)."""
+    n = len(df)
+    if n < 80: return []
+    wr = df[f"WR_{cfg['wr_period']}"].values; sma = df[f"SMA_{cfg['sma_period']}"].values
+    closes = df["Close"].values; adx = df["ADX"].values
+    mfi = df["MFI"].values; mfi_slope = df["MFI_slope"].values
+    bbw_pctl = df["BBW_pctl"].values; bbw_slope = df["BBW_slope"].values
+    wt = cfg["wr_thresh"]; af = cfg.get("adx_filter"); am = cfg.get("adx_mode")
+    mf = cfg.get("mfi_filter"); bf = cfg.get("bbw_filter")
+    em = cfg["exit_mode"]; hd = cfg.get("hold_days", 10); mh = cfg.get("max_hold", 25)
+    out = []; in_t = False; eb = 0; ep = 0.0
+    for t in range(60, n):
+        if not in_t:
+            w = wr[t]; c = closes[t]; s = sma[t]
+            if np.isnan(w) or np.isnan(s) or s == 0: continue
+            if w >= wt or c >= s: continue
+            if af is not None and not np.isnan(adx[t]):
+                if am == "below" and adx[t] > af: continue
+                elif am == "above" and adx[t] < af: continue
+            if mf is not None and not np.isnan(mfi[t]):
+                if mf == "not_weak" and mfi[t] < 30: continue
+                elif mf == "strong" and mfi[t] < 50: continue
+                elif mf == "accumulating" and mfi_slope[t] <= 0: continue
+            if bf is not None and not np.isnan(bbw_pctl[t]):
+                if bf == "squeeze" and bbw_pctl[t] > 30: continue
+                elif bf == "not_expanded" and bbw_pctl[t] > 70: continue
+            in_t = True; eb = t; ep = c
+        else:
+            bars = t - eb; c = closes[t]; s = sma[t]; ex = False
+            if em == "fixed": ex = bars >= hd
+            elif bars >= mh: ex = True
+            elif em == "sma_break":
+                ex = bars >= 3 and not np.isnan(s) and c > s
+            elif em == "bbw_contract":
+                ex = bars >= 5 and not np.isnan(bbw_slope[t]) and bbw_slope[t] < 0 \
+                    and not np.isnan(s) and c > s
+            elif em == "mfi_exit" and bars >= 5:
+                ex = (not np.isnan(mfi[t]) and mfi[t] < 30) \
+                    or (not np.isnan(mfi_slope[t]) and mfi_slope[t] < -15)
+            elif em == "adaptive" and bars >= 5:
+                bs = not np.isnan(s) and c < s
+                bf2 = not np.isnan(bbw_slope[t]) and bbw_slope[t] < 0
+                mw = not np.isnan(mfi[t]) and mfi[t] < 35
+                ex = (bs and (bf2 or mw)) or ((c / ep - 1) * 100 > 3 and not np.isnan(s) and c > s)
+            elif em == "momentum_ride" and bars >= 5:
+                ex = (not np.isnan(s) and c < s) \
+                    or (bars >= 10 and not np.isnan(bbw_slope[t]) and bbw_slope[t] < -0.5)
+            if ex:
+                out.append((eb, bars, round((c / ep - 1) * 100, 4),
+                            round((float(np.max(closes[eb:t + 1])) / ep - 1) * 100, 4),
+                            round((float(np.min(closes[eb:t + 1])) / ep - 1) * 100, 4)))
+                in_t = False
+    return out
+
+
+def _etf_reference(df, start_idx, end_idx, params):
+    """run_etf_momentum.simulate's original per-bar loop (trade tuples only)."""
+    import warnings
+
+    n = len(df)
+    if n < 60: return []
+    c = df["Close"].values; sma = df[f"SMA_{params['sma_period']}"].values
+    wr = df[f"WR_{params['wr_period']}"].values
+    adx = df["ADX"].values; mfi = df["MFI"].values; atr = df["ATR"].values
+    bbw_slope = df["BBW_slope"].values
+    roc_col = f"ROC_{params.get('roc_period', 10)}"
+    roc = df[roc_col].values if roc_col in df.columns else df["ROC_10"].values
+    sma50 = df["SMA_50"].values if "SMA_50" in df.columns else np.full(n, np.nan)
+    entry_mode = params["entry_mode"]; exit_mode = params["exit_mode"]
+    trail_atr = params.get("trail_atr", 2.5); max_hold = params.get("max_hold", 40)
+    pt = params.get("profit_target")
+
+    def dipped(t, lookback, level):
+        recent = wr[t - min(t, lookback):t]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN window
+            return len(recent) > 0 and np.nanmin(recent) < level
+
+    out = []; in_t = False; eb = 0; ep = 0.0; peak = 0.0
+    for t in range(max(60, start_idx), min(end_idx, n)):
+        if not in_t:
+            cl = c[t]; s = sma[t]; w = wr[t]; a = adx[t]; m = mfi[t]; r = roc[t]
+            if np.isnan(s) or np.isnan(w) or s == 0: continue
+            if entry_mode == "sma_cross":
+                level = params.get("wr_cross_level", -50)
+                entered = cl > s and w > level and dipped(t, params.get("cross_lookback", 10), level)
+            elif entry_mode == "breakout":
+                entered = cl > s and not np.isnan(a) and a >= params.get("adx_min", 20) \
+                    and not np.isnan(r) and r > 0
+            elif entry_mode == "pullback_in_trend":
+                entered = not np.isnan(sma50[t]) and cl > sma50[t] and w > -30 \
+                    and dipped(t, 10, params.get("wr_dip_level", -50))
+            else:  # mfi_momentum
+                entered = cl > s and not np.isnan(m) and m > 50 \
+                    and not np.isnan(a) and a >= params.get("adx_min", 15)
+            if entered:
+                in_t = True; eb = t; ep = cl; peak = cl
+        else:
+            bars = t - eb; cl = c[t]; s = sma[t]; reason = ""
+            if cl > peak: peak = cl
+            if exit_mode in ("trail", "trail_sma") and not np.isnan(atr[t]) and atr[t] > 0 \
+                    and cl < peak - trail_atr * atr[t]:
+                reason = "TRAIL"
+            elif exit_mode in ("sma_break", "trail_sma") and not np.isnan(s) and cl < s and bars >= 3:
+                reason = "SMA_BREAK"
+            elif exit_mode == "bbw_fade" and bars >= 5 and not np.isnan(bbw_slope[t]) \
+                    and bbw_slope[t] < -0.5:
+                reason = "BBW_FADE"
+            elif pt is not None and ep > 0 and (cl / ep - 1) * 100 >= pt:
+                reason = "PT"
+            elif bars >= max_hold:
+                reason = "MAX"
+            if reason:
+                out.append((eb, bars, round((cl / ep - 1) * 100, 4), round((peak / ep - 1) * 100, 4),
+                            reason, str(df.index[eb].date())))
+                in_t = False
+    return out
+
+
+class TestTradeKernel:
+
+    def test_walkforward_matches_per_bar_loop(self):
+        import run_walkforward as wf
+
+        df = wf.compute_indicators(generate_synthetic(n_bars=900, seed=3))
+        for p in wf.build_param_grid()[::37]:
+            for lo, hi in [(0, 378), (378, 504), (0, 900)]:
+                got = [(t["entry_bar"], t["bars_held"], t["pnl_pct"], t["exit_reason"])
+                       for t in wf.simulate(df, lo, hi, p)]
+                assert got == _wf_reference(df, lo, hi, p), (p, lo, hi)
+
+    def test_deep_sweep_matches_per_bar_loop(self):
+        import run_deep_sweep as ds
+
+        df = ds.compute_indicators(generate_synthetic(n_bars=900, seed=3))
+        exits = [{"exit_mode": "bbw_contract", "max_hold": 30},
+                 {"exit_mode": "bbw_pt", "max_hold": 30, "profit_target": 3},
+                 {"exit_mode": "bbw_contract", "max_hold": 30, "trail_atr": 2.0},
+                 {"exit_mode": "sma_break", "max_hold": 20, "stop_loss": 5},
+                 {"exit_mode": "trail_only", "max_hold": 40, "trail_atr": 2.5},
+                 {"exit_mode": "fixed", "hold_days": 15}]
+        filters = [{"mfi_filter": "not_weak"},
+                   {"mfi_filter": "accumulating", "rsi_filter": "oversold"},
+                   {"mfi_filter": None, "rsi_filter": "not_extreme", "vol_filter": "surge"},
+                   {"vol_filter": "not_dry", "dd_filter": "deep", "streak_filter": "any"},
+                   {"dd_filter": "moderate", "streak_filter": "extended"}]
+        for ex in exits:
+            for f in filters:
+                for wt in (-20, -40):
+                    cfg = {"wr_period": 30, "wr_thresh": wt, **f, **ex}
+                    got = [(t["entry_bar"], t["bars_held"], t["pnl_pct"], t["peak_pnl"],
+                            t["max_dd"], t["exit_reason"]) for t in ds.simulate(df, cfg)]
+                    assert got == _deep_reference(df, cfg), cfg
+
+    def test_full_sweep_matches_per_bar_loop(self):
+        import run_full_sweep as fs
+
+        df = fs.compute_all_indicators(generate_synthetic(n_bars=900, seed=3))
+        exits = [{"exit_mode": "fixed", "hold_days": 10},
+                 {"exit_mode": "sma_break", "max_hold": 25},
+                 {"exit_mode": "bbw_contract", "max_hold": 30},
+                 {"exit_mode": "mfi_exit", "max_hold": 25},
+                 {"exit_mode": "adaptive", "max_hold": 30},
+                 {"exit_mode": "momentum_ride", "max_hold": 40}]
+        filters = [{},
+                   {"adx_filter": 25, "adx_mode": "below", "mfi_filter": "not_weak"},
+                   {"adx_filter": 20, "adx_mode": "above", "mfi_filter": "strong",
+                    "bbw_filter": "squeeze"},
+                   {"mfi_filter": "accumulating", "bbw_filter": "not_expanded"}]
+        for ex in exits:
+            for f in filters:
+                cfg = {"wr_period": 20, "wr_thresh": -30, "sma_period": 20, **f, **ex}
+                got = [(t["entry_bar"], t["bars_held"], t["pnl_pct"], t["peak_pnl"], t["max_dd"])
+                       for t in fs.simulate_config(df, cfg)]
+                assert got == _full_reference(df, cfg), cfg
+
+    def test_etf_momentum_matches_per_bar_loop(self):
+        import run_etf_momentum as em
+
+        df = em.compute_indicators(generate_synthetic(n_bars=900, seed=3))
+        for p in em.build_param_grid()[::23]:
+            for lo, hi in [(0, 378), (378, 504), (0, 900)]:
+                got = [(t["entry_bar"], t["bars_held"], t["pnl_pct"], t["peak_pnl"],
+                        t["exit_reason"], t["entry_date"]) for t in em.simulate(df, lo, hi, p)]
+                assert got == _etf_reference(df, lo, hi, p), (p, lo, hi)
+
+    def test_rule_order_sets_reason(self):
+        from backtest import trade_kernel as tk
+
+        close = np.array([100.0, 101, 102, 104, 103, 99, 98])
+        entry = np.array([True, False, False, False, False, True, False])
+        params = tk.make_params(pt=4.0, max_hold=3)
+        # bar 3: +4% and 3 bars held — whichever rule is listed first wins
+        _, xb, why = tk.run_trades(close, entry, 0, 7, [tk.PT, tk.MAX_HOLD], params)
+        assert xb.tolist() == [3] and why.tolist() == [tk.PT]
+        _, xb, why = tk.run_trades(close, entry, 0, 7, [tk.MAX_HOLD, tk.PT], params)
+        assert why.tolist() == [tk.MAX_HOLD]
+        # a trade still open at hi is discarded; the exit bar can't re-enter
+        eb, _, _ = tk.run_trades(close, entry, 0, 7, [tk.MAX_HOLD], tk.make_params(max_hold=5))
+        assert eb.tolist() == [0]
+
+    def test_trail_stop_and_gated_signal(self):
+        from backtest import trade_kernel as tk
+
+        close = np.array([100.0, 110, 108, 104, 103])
+        entry = np.array([True, False, False, False, False])
+        atr = np.array([np.nan, 1.0, 1.0, 2.0, 2.0])
+        _, xb, _ = tk.run_trades(close, entry, 0, 5, [tk.TRAIL], tk.make_params(trail=2.5), atr=atr)
+        assert xb.tolist() == [3]  # 104 < 110 - 2.5 × 2
+
+        sig = np.ones(5, bool)
+        params = tk.make_params(sig_min=1, sig_pnl=5.0)  # signal counts only when > +5%
+        _, xb, why = tk.run_trades(close, entry, 0, 5, [tk.SIGNAL], params, sig=sig)
+        assert xb.tolist() == [1] and why.tolist() == [tk.SIGNAL]
+        params = tk.make_params(sig_min=2, sig_pnl=9.0)
+        assert len(tk.run_trades(close, entry, 0, 5, [tk.SIGNAL], params, sig=sig)[0]) == 0
+
+    def test_backends_agree(self):
+        from backtest import trade_kernel as tk
+
+        if not tk.HAVE_NUMBA:
+            pytest.skip("numba not installed")
+        rng = np.random.default_rng(5)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 2000)))
+        entry = rng.random(2000) < 0.1
+        atr = np.abs(rng.normal(1.5, 0.5, 2000))
+        sig = rng.random(2000) < 0.2
+        rules = [tk.PT, tk.TRAIL, tk.STOP, tk.MAX_HOLD, tk.SIGNAL]
+        params = tk.make_params(pt=5, stop=4, trail=2.0, max_hold=20, sig_min=5)
+        py = tk.run_trades(close, entry, 60, 2000, rules, params, atr=atr, sig=sig, backend="python")
+        jit = tk.run_trades(close, entry, 60, 2000, rules, params, atr=atr, sig=sig, backend="numba")
+        for a, b in zip(py, jit):
+            assert np.array_equal(a, b)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 9. WALK-FORWARD GRID EVALUATOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestGridEvaluator:
+
+    def test_matches_simulate_for_every_combo(self):
+        import run_walkforward as wf
+
+        universe = {
+            f"S{i}": wf.compute_indicators(generate_synthetic(n_bars=700, seed=20 + i))
+            for i in range(3)
+        }
+        grid = wf.build_param_grid()
+        ev = wf.GridEvaluator(universe, grid)
+        for lo, hi in [(0, 378), (378, 504), (600, 900)]:
+            for p, got in zip(grid, ev.evaluate(lo, hi)):
+                ref = [t["pnl_pct"] for df in universe.values() for t in wf.simulate(df, lo, hi, p)]
+                assert got.tolist() == ref, (p, lo, hi)
+
+    def test_tier_only_params_share_results(self):
+        import run_walkforward as wf
+
+        universe = {"S": wf.compute_indicators(generate_synthetic(n_bars=500, seed=4))}
+        grid = wf.build_param_grid()
+        ev = wf.GridEvaluator(universe, grid)
+        a = ev.pnls(grid[0], 0, 378)
+        b = ev.pnls({**grid[0], "dd_thresh": -8, "streak_min": 3}, 0, 378)
+        assert a is b  # dd_thresh / streak_min only relabel tiers
+        assert ev.pnls(grid[0], 0, 378, min_len=501).size == 0
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 10. WALK-FORWARD FOLD SCHEDULER
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestFoldScheduler:
+
+    WINDOWS = [(0, 378), (378, 504)]
+
+    @staticmethod
+    def _universe(n_bars=700, symbols=(0, 1, 2)):
+        import run_walkforward as wf
+
+        return {
+            f"S{i}": wf.compute_indicators(generate_synthetic(n_bars=800, seed=30 + i).iloc[:n_bars])
+            for i in symbols
+        }
+
+    def test_pool_and_cache_match_serial(self, tmp_path):
+        import run_walkforward as wf
+
+        universe = self._universe()
+        grid = wf.build_param_grid()
+        ref = wf.GridEvaluator(universe, grid)
+        for workers in (2, 1):  # cold cache through the pool, then warm in-process
+            ev = wf.GridEvaluator(universe, grid)
+            counts = wf.fill_windows(ev, universe, self.WINDOWS, workers=workers,
+                                     cache_dir=str(tmp_path))
+            for lo, hi in self.WINDOWS:
+                for got, want in zip(ev.evaluate(lo, hi), ref.evaluate(lo, hi)):
+                    assert np.array_equal(got, want)
+        assert counts == {"cached": 6, "computed": 0}
+
+    def test_rerun_only_computes_new_folds_and_symbols(self, tmp_path):
+        import run_walkforward as wf
+
+        grid = wf.build_param_grid()
+        universe = self._universe()
+        wf.fill_windows(wf.GridEvaluator(universe, grid), universe, self.WINDOWS,
+                        cache_dir=str(tmp_path))
+
+        # Bars appended to every symbol, one new symbol, one new fold
+        grown = self._universe(n_bars=800, symbols=(0, 1, 2, 3))
+        ev = wf.GridEvaluator(grown, grid)
+        counts = wf.fill_windows(ev, grown, self.WINDOWS + [(504, 630)], cache_dir=str(tmp_path))
+        assert counts == {"cached": 6, "computed": 6}
+        fresh = wf.GridEvaluator(grown, grid)
+        for lo, hi in self.WINDOWS + [(504, 630)]:
+            for got, want in zip(ev.evaluate(lo, hi), fresh.evaluate(lo, hi)):
+                assert np.array_equal(got, want)
+
+
+    def test_prune_drops_stale_then_least_recently_used(self, tmp_path):
+        import os
+        import run_walkforward as wf
+
+        universe = self._universe()
+        grid = wf.build_param_grid()
+        wf.fill_windows(wf.GridEvaluator(universe, grid), universe, self.WINDOWS,
+                        cache_dir=str(tmp_path))
+        files = sorted(tmp_path.glob("*.npz"))
+        now = files[0].stat().st_mtime
+        for i, f in enumerate(files):  # files[0] unused for 100 days, then oldest → newest
+            os.utime(f, (now, now - (100 * 86400 if i == 0 else 600 - i)))
+        (tmp_path / "x.tmp.npz").write_bytes(b"partial")
+
+        assert wf.FoldCache.prune(str(tmp_path), max_age_days=60, now=now)[0] == 2
+        assert not files[0].exists()
+
+        # A hit marks the oldest remaining entry as used; the size cap evicts the rest
+        cache = wf.FoldCache(str(tmp_path), universe, wf.GridEvaluator(universe, grid))
+        sym, (lo, hi) = next((s, w) for s in universe for w in self.WINDOWS
+                             if cache._path(s, *w) == str(files[1]))
+        assert cache.load(sym, lo, hi) is not None
+        wf.FoldCache.prune(str(tmp_path), max_mb=files[1].stat().st_size / 1024 ** 2, now=now)
+        assert list(tmp_path.glob("*.npz")) == [files[1]]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 11. PORTFOLIO BACKTESTER
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestPortfolio:
+
+    @pytest.fixture
+    def universe(self):
+        """Ragged universe: a late listing and a suspension gap."""
+        from backtest.data_loader import generate_universe
+
+        u = generate_universe(n_symbols=5, n_bars=700, seed=11)
+        u["SYN001"] = u["SYN001"].iloc[150:]
+        u["SYN002"] = u["SYN002"].drop(u["SYN002"].index[300:306])
+        return u
+
+    @staticmethod
+    def _decisions(events):
+        return [
+            (e.date, e.symbol, e.close, e.bbw_contracting, e.above_sma,
+             None if e.signal is None else
+             (e.signal.entry_triggered, e.signal.dual_sizing, e.signal.dual_score,
+              e.signal.tier, e.signal.entry_reason))
+            for e in events
+        ]
+
+    def test_stream_matches_compute_dual_mode_per_bar(self):
+        from backtest.portfolio import _frame_reader, symbol_events
+        from modules.dual_mode import compute_dual_mode
+
+        df = _awkward_daily(n_bars=400, seed=5)
+        events = list(symbol_events("X", *_frame_reader(df), chunk=90))
+        assert len(events) == df["Close"].notna().sum()
+        for ev in events[250::3]:
+            ref = compute_dual_mode(df.loc[:ev.date], "X")
+            assert (ev.signal is not None) == ref.entry_triggered
+            assert (ev.above_sma, ev.bbw_contracting) == (ref.above_sma, ref.bbw_contracting)
+            if ev.signal is not None:
+                assert (ev.signal.dual_score, ev.signal.dual_sizing) == (ref.dual_score, ref.dual_sizing)
+
+    def test_chunking_does_not_change_decisions(self, universe):
+        from backtest.portfolio import universe_events
+
+        whole = self._decisions(universe_events(universe, chunk=10_000))
+        assert whole == self._decisions(universe_events(universe, chunk=97))
+        assert [e[0] for e in whole] == sorted(e[0] for e in whole)
+        assert any(e[5] is not None for e in whole)
+
+    def test_warehouse_source_matches_frames(self, universe, tmp_path):
+        from backtest.portfolio import run_portfolio
+        from backtest.price_warehouse import build_warehouse
+
+        wh = build_warehouse(universe, str(tmp_path / "wh"))
+        ref = run_portfolio(universe, max_open=3)
+        got = run_portfolio(wh, max_open=3, chunk=120)
+        assert [(t.symbol, t.entry_date, t.exit_date, t.exit_reason) for t in got.trades] == \
+               [(t.symbol, t.entry_date, t.exit_date, t.exit_reason) for t in ref.trades]
+        np.testing.assert_allclose(got.equity.to_numpy(), ref.equity.to_numpy(), rtol=1e-12)
+
+    def test_capacity_and_accounting(self, universe):
+        from backtest.portfolio import SIZING_WEIGHT, portfolio_summary, run_portfolio
+
+        res = run_portfolio(universe, max_open=1, capital=100_000, cost_bps=0)
+        assert res.trades and res.skipped["capacity"] > 0
+        spans = sorted((t.entry_date, t.exit_date) for t in res.trades)
+        assert all(nxt[0] >= prev[1] for prev, nxt in zip(spans, spans[1:]))
+
+        # No costs, one position at a time: equity compounds trade by trade
+        # (a HALF signal puts half of equity at risk)
+        growth = np.prod([1 + SIZING_WEIGHT[t.sizing] * t.pnl_pct / 100 for t in res.trades])
+        assert res.equity.iloc[-1] == pytest.approx(100_000 * growth, rel=1e-9)
+        assert res.exposure.between(0, 1).all()
+        summary = portfolio_summary(res)
+        assert summary["n_days"] == len(res.equity)
+        assert summary["trades"]["n_trades"] == len(res.trades)
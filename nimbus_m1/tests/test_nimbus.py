@@ -12,7 +12,7 @@ Coverage:
     analytics.py  — _walls, _gex, _regime_classify, _viability, analyze
     scanner.py    — filter booleans, near_mp, expiry_risk, _short_reason,
                     no-opts path score bug (documents + regression)
-    data.py       — NIFTY100_SYMBOLS count
+    data.py       — NIFTY100_SYMBOLS count, get_prices_bulk (fake yfinance)
     sector_rotation (classify_rotation helper, if present)
 """
 
@@ -20,6 +20,7 @@ from __future__ import annotations
 
 import datetime
 import math
+import os
 from dataclasses import dataclass, field
 from typing import Optional
 from unittest.mock import patch, MagicMock
@@ -1414,3 +1415,834 @@ class TestAnalyzeIntegration:
             "BB State",
         ):
             assert expected in items, f"Missing checklist item: {expected}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Panel (multi-symbol) indicator kernels
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestPanelIndicators:
+    """panel_* over a bars × symbols panel == add_* per symbol, bit for bit."""
+
+    @pytest.fixture
+    def frames(self):
+        from backtest.data_loader import generate_universe
+
+        u = generate_universe(n_symbols=6, n_bars=300, seed=2)
+        flat = u["SYN000"]
+        flat.iloc[100:160, :4] = 500.0  # zero range → WR / ADX NaN
+        flat.iloc[200:220, flat.columns.get_loc("Volume")] = 0.0  # MFI NaN
+        u["SYN001"].iloc[50, u["SYN001"].columns.get_loc("Close")] = np.nan
+        return u
+
+    def test_panel_matches_per_symbol(self, frames):
+        from modules import indicators as ind
+
+        p = ind.stack_panel(frames)
+        panel = {
+            **ind.panel_bollinger(p["Close"], period=15, std_dev=2.0),
+            **ind.panel_williams_r(p["High"], p["Low"], p["Close"], period=30),
+            **ind.panel_mfi(p["High"], p["Low"], p["Close"], p["Volume"]),
+            **ind.panel_adx(p["High"], p["Low"], p["Close"]),
+        }
+        for sym, df in frames.items():
+            ref = ind.add_bollinger(df, period=15, std_dev=2.0)
+            ref = ind.add_williams_r(ref, period=30)
+            ref = ind.add_adx(ind.add_mfi(ref))
+            for col, out in panel.items():
+                np.testing.assert_array_equal(out[sym].to_numpy(), ref[col].to_numpy(),
+                                              err_msg=f"{sym} {col}")
+
+    def test_accepts_plain_arrays(self, frames):
+        from modules.indicators import add_williams_r, panel_williams_r, stack_panel
+
+        p = stack_panel(frames)
+        wr = panel_williams_r(p["High"].to_numpy(), p["Low"].to_numpy(), p["Close"].to_numpy())
+        assert wr["WR"].shape == p["Close"].shape
+        np.testing.assert_array_equal(
+            wr["WR"][2].to_numpy(), add_williams_r(frames["SYN002"])["WR"].to_numpy()
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# In-place indicator pipeline
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestInPlaceIndicators:
+
+    @pytest.fixture
+    def ohlcv(self):
+        from backtest.data_loader import generate_synthetic
+
+        return generate_synthetic(n_bars=300, seed=8)
+
+    def test_inplace_matches_copying_chain(self, ohlcv):
+        from modules.indicators import (
+            add_adx, add_bollinger, add_price_indicators, add_williams_r,
+        )
+
+        ref = add_adx(add_williams_r(add_bollinger(ohlcv, 15, 2.0), 30))
+        df = ohlcv.copy()
+        out = add_price_indicators(df, bb_period=15, bb_std=2.0, wr_period=30, inplace=True)
+        assert out is df
+        assert add_adx(df, inplace=True) is df
+        pd.testing.assert_frame_equal(df, ref, check_exact=True)
+
+    def test_default_leaves_input_untouched(self, ohlcv):
+        from modules.indicators import add_price_indicators, compute_price_signals
+
+        cols = list(ohlcv.columns)
+        df = add_price_indicators(ohlcv)
+        assert list(ohlcv.columns) == cols
+        before = df.copy()
+        compute_price_signals(df)
+        pd.testing.assert_frame_equal(df, before)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# analytics._gex — vectorised vs per-row reference
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestVectorisedGex:
+
+    @staticmethod
+    def _chain(seed: int) -> pd.DataFrame:
+        """Multi-expiry chain with the rows the per-row loop skips or zeroes."""
+        rng = np.random.default_rng(seed)
+        rows = []
+        for dte in (2, 9, 30, 120, -1):
+            for k in 22000.0 + 50 * np.arange(-40, 40):
+                rows.append({
+                    "Strike": k,
+                    "Expiry": _expiry_str(dte),
+                    "CE_OI": float(rng.integers(0, 200_000)),
+                    "PE_OI": float(rng.integers(0, 200_000)),
+                    "CE_IV": float(rng.uniform(0, 40)),
+                    "PE_IV": float(rng.choice([0.0, np.nan, 0.005, 0.25, 18.0])),
+                })
+        df = pd.DataFrame(rows)
+        df.loc[3, "Expiry"] = np.nan
+        df.loc[4, "Expiry"] = "not a date"
+        df.loc[5, "CE_OI"] = np.nan
+        df.loc[6, "Strike"] = 0.0
+        return df
+
+    @staticmethod
+    def _assert_same(got, want):
+        assert (got.net_gex, got.abs_gex, got.regime, got.hvl, got.spot) == (
+            want.net_gex, want.abs_gex, want.regime, want.hvl, want.spot
+        )
+        assert len(got.by_expiry) == len(want.by_expiry)
+        for g, w in zip(got.by_expiry, want.by_expiry):
+            assert (g[0], g[1], g[3]) == (w[0], w[1], w[3])
+            assert g[2] == pytest.approx(w[2], rel=1e-12)
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_per_row(self, seed):
+        from modules.analytics import _gex, _gex_per_row
+
+        df = self._chain(seed)
+        self._assert_same(_gex(df, 22000.0, 75), _gex_per_row(df, 22000.0, 75))
+
+    def test_fixture_chain_and_empty(self):
+        from modules.analytics import GEX, _gex, _gex_per_row
+
+        df = _make_options_df(dte=10)
+        self._assert_same(_gex(df, 1000.0, 75), _gex_per_row(df, 1000.0, 75))
+        assert _gex(df.iloc[:0], 1000.0, 75) == GEX(spot=1000.0)
+        assert _gex(_make_options_df(dte=0), 1000.0, 75) == GEX(spot=1000.0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# data.get_prices_bulk — chunked multi-ticker loader (fake yfinance)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestBulkPrices:
+
+    class _FakeYF:
+        """yf.download stand-in: records calls, answers group_by='ticker' frames."""
+
+        def __init__(self, dead=(), fail_bulk=0):
+            self.dead = set(dead)
+            self.fail_bulk = fail_bulk  # multi-ticker calls that raise first
+            self.calls: list[list[str]] = []
+
+        def download(self, tickers, start=None, group_by="column", **kw):
+            single = isinstance(tickers, str)
+            tickers = [tickers] if single else list(tickers)
+            self.calls.append(tickers)
+            if not single and self.fail_bulk > 0:
+                self.fail_bulk -= 1
+                raise ConnectionError("simulated Yahoo outage")
+            idx = pd.bdate_range(end=datetime.date.today(), periods=30)
+            parts = {}
+            for i, t in enumerate(tickers):
+                close = np.nan if t in self.dead else 100.0 + i + np.arange(30.0)
+                parts[t] = pd.DataFrame(
+                    {"Open": close, "High": close, "Low": close,
+                     "Close": close, "Volume": 1000.0},
+                    index=idx,
+                )
+            return parts[tickers[0]] if single else pd.concat(parts, axis=1)
+
+    @pytest.fixture
+    def fake_yf(self, monkeypatch):
+        import sys
+        import modules.data as data
+
+        monkeypatch.setattr(data, "_PRICE_CACHE", {})
+        monkeypatch.setattr(data, "BULK_BACKOFF", 0.0)
+
+        def _install(**kw):
+            yf = self._FakeYF(**kw)
+            monkeypatch.setitem(sys.modules, "yfinance", yf)
+            return yf
+
+        return _install
+
+    def test_chunks_and_splits(self, fake_yf):
+        from modules.data import get_prices_bulk
+
+        yf = fake_yf()
+        syms = ["SBIN", "TCS", "INFY", "ITC", "HDFCBANK"]
+        prices = get_prices_bulk(syms, chunk_size=2)
+
+        assert [len(c) for c in yf.calls] == [2, 2, 1]
+        assert list(prices) == syms
+        assert prices["TCS"]["Close"].iloc[0] == 101.0  # second column of chunk 1
+        assert list(prices["ITC"].columns) == ["Open", "High", "Low", "Close", "Volume"]
+
+    def test_fallbacks_only_for_failed_symbols(self, fake_yf):
+        from modules.data import get_prices_bulk
+
+        yf = fake_yf(dead={"^NSEI", "NIFTY_50.NS", "DEAD.NS"})
+        prices = get_prices_bulk(["NIFTY", "SBIN", "DEAD"])
+
+        assert yf.calls == [["^NSEI", "SBIN.NS", "DEAD.NS"], ["NIFTY_50.NS"], ["^CNXNIFTY"]]
+        assert set(prices) == {"NIFTY", "SBIN"}
+
+    def test_failed_chunk_is_retried(self, fake_yf):
+        from modules.data import get_prices_bulk
+
+        yf = fake_yf(fail_bulk=1)
+        prices = get_prices_bulk(["SBIN", "TCS", "INFY"], chunk_size=2)
+
+        assert yf.calls == [["SBIN.NS", "TCS.NS"], ["SBIN.NS", "TCS.NS"], ["INFY.NS"]]
+        assert list(prices) == ["SBIN", "TCS", "INFY"]
+
+    def test_chunk_that_keeps_failing_falls_back_to_single_downloads(self, fake_yf):
+        from modules.data import BULK_RETRIES, get_prices_bulk
+
+        yf = fake_yf(fail_bulk=BULK_RETRIES + 1)
+        prices = get_prices_bulk(["SBIN", "TCS", "INFY"], chunk_size=2)
+
+        assert yf.calls[BULK_RETRIES + 1:] == [["INFY.NS"], ["SBIN.NS"], ["TCS.NS"]]
+        assert set(prices) == {"SBIN", "TCS", "INFY"}
+        assert prices["TCS"]["Close"].iloc[0] == 100.0
+
+    def test_cache_hands_out_copies(self, fake_yf):
+        from modules.data import get_prices_bulk
+
+        yf = fake_yf()
+        first = get_prices_bulk(["SBIN"])
+        first["SBIN"]["BB_Upper"] = 0.0
+        second = get_prices_bulk(["SBIN", "TCS"])
+
+        assert yf.calls == [["SBIN.NS"], ["TCS.NS"]]
+        assert "BB_Upper" not in second["SBIN"].columns
+        assert get_prices_bulk(["SBIN"], max_age=0.0) and len(yf.calls) == 3
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# scanner.iter_scan — price stage gates the options download
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestStagedScanner:
+
+    @staticmethod
+    def _bars(drift: float, seed: int) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        idx = pd.bdate_range("2024-01-01", periods=260)
+        c = 100 * np.exp(np.cumsum(drift + 0.004 * rng.standard_normal(260)))
+        return pd.DataFrame(
+            {"Open": c, "High": c * 1.01, "Low": c * 0.99, "Close": c, "Volume": 1e6},
+            index=idx,
+        )
+
+    @pytest.fixture
+    def prices(self):
+        return {
+            "UP1": self._bars(0.004, 1),
+            "DOWN": self._bars(-0.005, 1),
+            "UP2": self._bars(0.010, 1),
+            "FLAT": self._bars(0.0, 1),
+        }
+
+    @pytest.fixture
+    def options_calls(self, monkeypatch):
+        import modules.scanner as scanner
+
+        calls = []
+        monkeypatch.setattr(
+            scanner, "download_options",
+            lambda sym, max_expiries=3: calls.append(sym) or (None, "no chain"),
+        )
+        return calls
+
+    def test_only_momentum_survivors_fetch_options(self, prices, options_calls):
+        from modules.scanner import analyze_symbol, iter_scan
+
+        progress = []
+        rows = list(iter_scan(list(prices), prices={k: v.copy() for k, v in prices.items()},
+                              progress_cb=lambda d, t, s: progress.append(d)))
+
+        assert sorted(options_calls) == ["UP1", "UP2"]
+        assert {r["symbol"] for r in rows} == {"UP1", "UP2"}
+        assert all(r["passes_momentum"] for r in rows)
+        assert progress == [3, 4]  # two price-stage drops count as done
+
+        # identical rows to the unstaged single-symbol path
+        for r in rows:
+            ref = analyze_symbol(r["symbol"], prices[r["symbol"]].copy())
+            for k in ("viability_score", "dm_score", "setup_type", "all_filters_pass"):
+                assert r[k] == ref[k]
+
+    @staticmethod
+    def _oversold() -> pd.DataFrame:
+        """Uptrend, then a sharp pullback below SMA20 bought on up-day volume."""
+        idx = pd.bdate_range("2024-01-01", periods=260)
+        c = 100 * np.exp(np.cumsum(np.full(260, 0.003)))
+        v = np.full(260, 1e6)
+        steps = [0.97, 1.01] * 5 + [0.97, 0.97]
+        for k, f in enumerate(steps):
+            i = 260 - len(steps) + k
+            c[i] = c[i - 1] * f
+            v[i] = 3e6 if f > 1 else 0.6e6
+        return pd.DataFrame(
+            {"Open": c, "High": c * 1.01, "Low": c * 0.99, "Close": c, "Volume": v},
+            index=idx,
+        )
+
+    def test_dual_mode_scan_keeps_oversold_below_sma(self, prices, options_calls):
+        from modules.dual_mode import compute_dual_mode
+        from modules.scanner import _passes_momentum, _price_stage, iter_dual_mode_scan
+
+        prices = dict(prices, DIP=self._oversold())
+        sig = compute_dual_mode(prices["DIP"].copy(), symbol="DIP")
+        assert sig.core_met and not sig.above_sma and sig.dual_score >= 50
+        assert not _passes_momentum(_price_stage(prices["DIP"].copy())[1])
+
+        rows = list(iter_dual_mode_scan(
+            list(prices), prices={k: v.copy() for k, v in prices.items()}, min_score=50,
+        ))
+        assert "DIP" in {r["symbol"] for r in rows}
+        assert all(r["dm_score"] >= 50 for r in rows)
+
+    def test_should_stop_ends_scan_without_yielded_rows(self, prices, options_calls):
+        from modules.scanner import iter_dual_mode_scan
+
+        universe = {f"S{i}": self._bars(0.004, i) for i in range(8)}
+        rows = list(iter_dual_mode_scan(
+            list(universe), prices=universe, min_score=101, max_workers=1,
+            should_stop=lambda: len(options_calls) >= 1,
+        ))
+        assert rows == []
+        assert 1 <= len(options_calls) <= 2  # the one that tripped it, at most one in flight
+
+        options_calls.clear()
+        list(iter_dual_mode_scan(list(universe), prices=universe, should_stop=lambda: True))
+        assert options_calls == []  # stopped in stage 1
+
+    def test_rows_arrive_in_price_score_order(self, prices, options_calls):
+        from modules.analytics import analyze_price_only
+        from modules.scanner import _price_stage, iter_scan
+
+        rows = list(iter_scan(list(prices), prices={k: v.copy() for k, v in prices.items()},
+                              momentum_gate=False))
+        pre = []
+        for r in rows:
+            df, ps = _price_stage(prices[r["symbol"]].copy())
+            pre.append(analyze_price_only(float(df["Close"].iloc[-1]), ps).viability.score)
+        assert len(rows) == 4 and pre == sorted(pre, reverse=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# chain_store — on-disk option-chain snapshots
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestChainStore:
+
+    T0 = datetime.datetime(2025, 1, 6, 10, 0)
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        from modules.chain_store import ChainStore
+
+        return ChainStore(str(tmp_path / "chains"), min_interval=300)
+
+    def test_round_trip_latest_as_of_range(self, store):
+        first = _make_options_df(pe_oi_support=40_000)
+        second = _make_options_df(pe_oi_support=90_000)
+        second.loc[len(second)] = {**second.iloc[0].to_dict(), "Expiry": _expiry_str(17)}
+        ts1 = store.write("nifty", first, ts=self.T0)
+        ts2 = store.write("NIFTY", second, ts=self.T0 + datetime.timedelta(minutes=10))
+        assert ts1 == self.T0
+
+        ts, latest = store.latest("NIFTY")
+        assert ts == ts2
+        got = latest.sort_values(["Expiry", "Strike"]).reset_index(drop=True)
+        want = second.sort_values(["Expiry", "Strike"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(got[want.columns], want, check_dtype=False)
+
+        ts, chain = store.as_of("NIFTY", self.T0 + datetime.timedelta(minutes=5))
+        assert ts == self.T0 and len(chain) == len(first)  # no mixing with the later snapshot
+        assert store.as_of("NIFTY", self.T0 - datetime.timedelta(seconds=1)) is None
+        assert store.latest("BANKNIFTY") is None
+
+        hist = store.range("NIFTY", self.T0, ts2)
+        assert hist["Snapshot"].nunique() == 2 and len(hist) == len(first) + len(second)
+
+        pcr = store.pcr_trend("NIFTY", self.T0, ts2)
+        assert list(pcr.index) == [ts1, ts2] and pcr.iloc[1] > pcr.iloc[0]
+
+    def test_strike_codes_stable_as_dictionary_grows(self, store):
+        import os
+
+        chain = _make_options_df()
+        store.write("SBIN", chain, ts=self.T0)
+        wider = _make_options_df(n_strikes=12, resistance_strike=1300.0)
+        store.write("SBIN", wider, ts=self.T0 + datetime.timedelta(hours=1))
+
+        exp_dir = os.path.join(store.root, "SBIN", chain["Expiry"].iloc[0])
+        strikes = np.load(os.path.join(exp_dir, "strikes.npy"))
+        assert len(strikes) == len(set(chain["Strike"]) | set(wider["Strike"]))
+        _, old = store.as_of("SBIN", self.T0)
+        assert sorted(old["Strike"]) == sorted(chain["Strike"])
+
+    def test_min_interval_throttles_unless_forced(self, store):
+        chain = _make_options_df()
+        assert store.write("SBIN", chain, ts=self.T0)
+        assert store.write("SBIN", chain, ts=self.T0 + datetime.timedelta(minutes=2)) is None
+        assert store.write("SBIN", chain, ts=self.T0 + datetime.timedelta(minutes=2), force=True)
+        assert store.write("SBIN", pd.DataFrame(), force=True) is None
+        assert store.range("SBIN", self.T0, self.T0 + datetime.timedelta(hours=1))[
+            "Snapshot"].nunique() == 2
+
+    def test_prune_drops_old_snapshots(self, store):
+        chain = _make_options_df()
+        expired = _make_options_df(dte=3)  # contract only in the old snapshot
+        old = pd.concat([chain, expired], ignore_index=True)
+        store.write("SBIN", old, ts=datetime.datetime.now() - datetime.timedelta(days=40))
+        store.write("SBIN", chain)
+        sym_dir = os.path.join(store.root, "SBIN")
+        assert store.prune(keep_days=30) == 2
+        ts, _ = store.latest("SBIN")
+        assert (datetime.datetime.now() - ts).days == 0
+        # the expired contract's directory (strikes.npy included) is gone
+        assert sorted(os.listdir(sym_dir)) == [_expiry_str(10), "index.json"]
+
+    def test_write_prunes_once_a_day(self, store):
+        chain = _make_options_df()
+        store.write("SBIN", chain, ts=datetime.datetime.now() - datetime.timedelta(days=40))
+        store.write("TCS", chain)  # pruned at this process's first write only
+        assert len(store.snapshots("SBIN")) == 1
+
+        store._last_prune -= 2 * 86400
+        store.write("TCS", chain, force=True)
+        assert store.snapshots("SBIN") == [] and store.latest("SBIN") is None
+
+    def test_half_written_snapshot_is_invisible(self, store, monkeypatch):
+        first = _make_options_df(pe_oi_support=40_000)
+        store.write("NIFTY", first, ts=self.T0)
+
+        second = _make_options_df(pe_oi_support=90_000)
+        second.loc[len(second)] = {**second.iloc[0].to_dict(), "Expiry": _expiry_str(17)}
+        calls = []
+        real = np.savez_compressed
+
+        def crash_on_second_expiry(f, **arrays):
+            calls.append(1)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            real(f, **arrays)
+
+        monkeypatch.setattr(np, "savez_compressed", crash_on_second_expiry)
+        with pytest.raises(OSError):
+            store.write("NIFTY", second, ts=self.T0 + datetime.timedelta(minutes=10))
+
+        ts, chain = store.latest("NIFTY")
+        assert ts == self.T0 and len(chain) == len(first)
+
+    def test_reads_use_the_cached_index(self, store, monkeypatch):
+        import os
+
+        store.write("SBIN", _make_options_df(), ts=self.T0)
+        monkeypatch.setattr(os, "listdir", lambda *a: pytest.fail("listed a directory"))
+        assert store.latest("SBIN")[0] == self.T0
+        assert store.snapshots("SBIN") == [self.T0]
+
+    def test_fallback_serves_stored_chain_with_age(self, store, monkeypatch):
+        import modules.chain_store as cs
+        import modules.data as data
+        from modules.data_redundancy import get_options_with_fallback
+
+        monkeypatch.setattr(cs, "_STORE", store)
+        monkeypatch.setattr(data, "is_market_open", lambda: False)
+        assert get_options_with_fallback("SBIN").source == "NONE"
+
+        chain = _make_options_df()
+        store.write("SBIN", chain, ts=datetime.datetime.now() - datetime.timedelta(minutes=5))
+        res = get_options_with_fallback("SBIN")
+        assert res.source == "CACHED" and 250 < res.age_seconds < 400
+        assert len(res.data) == len(chain)
+
+        store.write("TCS", chain, ts=datetime.datetime.now() - datetime.timedelta(hours=3))
+        res = get_options_with_fallback("TCS")
+        assert res.source == "FALLBACK" and res.confidence == 0.5 and res.age_seconds > 10_000
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# tick_engine — ring-buffered multi-timeframe bars from Kite ticks
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestTickEngine:
+
+    @staticmethod
+    def _tick(token, hh, mm, ss, price, cumvol, day=6):
+        return {
+            "instrument_token": token,
+            "last_price": price,
+            "volume_traded": cumvol,
+            "exchange_timestamp": datetime.datetime(2025, 1, day, hh, mm, ss),  # naive IST
+        }
+
+    def test_bars_and_volume_from_cumulative(self):
+        from modules.tick_engine import TickAggregator
+
+        agg = TickAggregator(timeframes=("1m", "5m"))
+        t = self._tick
+        assert agg.add_tick(t(1, 9, 15, 5, 100.0, 1_000)) == []  # baseline only
+        agg.add_tick(t(1, 9, 15, 30, 102.0, 1_300))
+        agg.add_tick(t(1, 9, 15, 50, 99.0, 1_500))
+        done = agg.add_tick(t(1, 9, 16, 10, 101.0, 1_800))
+        assert [(b["timeframe"], b["Volume"]) for b in done] == [("1m", 500.0)]
+        bar = done[0]
+        assert (bar["Open"], bar["High"], bar["Low"], bar["Close"]) == (100.0, 102.0, 99.0, 99.0)
+        assert bar["timestamp"].strftime("%H:%M") == "09:15"
+
+        agg.add_tick(t(1, 9, 15, 59, 98.0, 1_700))  # late for 1m, still inside 5m
+        done = agg.add_tick(t(1, 9, 20, 0, 103.0, 2_500))
+        by_tf = {b["timeframe"]: b for b in done}
+        assert by_tf["1m"]["Volume"] == 300.0 and by_tf["1m"]["Low"] == 101.0
+        assert by_tf["5m"]["Volume"] == 800.0  # 1_800 − 1_000 baseline
+        assert by_tf["5m"]["Low"] == 98.0
+
+        cur = agg.current(1, "5m")
+        assert cur["Open"] == 103.0 and cur["Volume"] == 700.0
+        assert list(agg.bars(1, "1m")["Volume"]) == [500.0, 300.0]
+        assert agg.last_price() == 103.0
+
+    def test_tokens_independent_and_4h_session_halves(self):
+        from modules.tick_engine import TickAggregator
+
+        agg = TickAggregator(timeframes=("4H",))
+        t = self._tick
+        ticks = [t(1, 9, 16, 0, 10.0, 0), t(2, 9, 16, 0, 500.0, 0),
+                 t(1, 13, 14, 59, 12.0, 40), t(2, 11, 0, 0, 505.0, 9),
+                 t(1, 13, 15, 0, 11.0, 60)]
+        done = agg.add_ticks(ticks)
+        assert [(b["token"], b["timestamp"].strftime("%H:%M"), b["Volume"]) for b in done] \
+            == [(1, "09:15", 40.0)]
+        # next session closes every open bar; its cumulative volume restarts
+        done = agg.add_ticks([t(1, 9, 15, 2, 13.0, 5, day=7), t(2, 9, 15, 2, 510.0, 7, day=7)])
+        assert [(b["token"], b["timestamp"].strftime("%H:%M"), b["Volume"]) for b in done] \
+            == [(1, "13:15", 20.0), (2, "09:15", 9.0)]
+        assert agg.current(1, "4H")["Volume"] == 5.0
+        assert agg.last_price(2) == 510.0 and sorted(agg.tokens) == [1, 2]
+
+    def test_memory_is_fixed(self):
+        from modules.tick_engine import TickAggregator
+
+        agg = TickAggregator(capacity=100, history=10)
+        base = datetime.datetime(2025, 1, 6, 9, 15)
+        agg.add_tick({"instrument_token": 7, "last_price": 1.0, "volume_traded": 0,
+                      "exchange_timestamp": base})
+        size = agg.nbytes
+        for k in range(1, 3_000):
+            agg.add_tick({"instrument_token": 7, "last_price": 1.0 + k % 7,
+                          "volume_traded": k, "exchange_timestamp":
+                          base + datetime.timedelta(seconds=7 * k)})
+        assert agg.nbytes == size
+        ticks = agg.ticks(7)
+        assert len(ticks) == 100 and ticks["volume_traded"].iloc[-1] == 2_999
+        assert ticks.index.is_monotonic_increasing
+        assert len(agg.bars(7, "1m")) == 10  # history ring keeps the latest 10
+
+    def test_rejects_unknown_timeframe(self):
+        from modules.tick_engine import TickAggregator
+
+        with pytest.raises(ValueError):
+            TickAggregator(timeframes=("2m",))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# streaming_indicators — O(1) PriceSignals updates for live ticks
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestStreamingIndicators:
+
+    @staticmethod
+    def _daily(n: int, seed: int) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        c = 100 * np.exp(np.cumsum(0.002 + 0.02 * rng.standard_normal(n)))
+        return pd.DataFrame(
+            {
+                "Open": c,
+                "High": c * (1 + 0.01 * rng.random(n)),
+                "Low": c * (1 - 0.01 * rng.random(n)),
+                "Close": c,
+                "Volume": rng.integers(100_000, 10_000_000, n).astype(float),
+            },
+            index=pd.bdate_range("2024-01-01", periods=n),
+        )
+
+    @staticmethod
+    def _assert_same(ref, got):
+        import dataclasses
+
+        for f in dataclasses.fields(ref):
+            a, b = getattr(ref, f.name), getattr(got, f.name)
+            if isinstance(a, float) and isinstance(b, float):
+                assert a == pytest.approx(b, rel=1e-9, abs=1e-9, nan_ok=True), f.name
+            else:
+                assert a == b, f.name
+
+    @pytest.mark.parametrize("n,seed", [(365, 0), (365, 1), (365, 7), (120, 3), (25, 4)])
+    def test_matches_compute_price_signals(self, n, seed):
+        from modules.indicators import add_price_indicators, compute_price_signals
+        from modules.streaming_indicators import StreamingPriceSignals
+
+        df = self._daily(n, seed)
+        ref = compute_price_signals(add_price_indicators(df))
+        self._assert_same(ref, StreamingPriceSignals.from_frame(df).signals())
+
+    def test_ticks_and_new_day_match_full_recompute(self):
+        from modules.indicators import add_adx, add_price_indicators, compute_price_signals
+        from modules.streaming_indicators import StreamingPriceSignals
+
+        df = self._daily(300, 11)
+        stream = StreamingPriceSignals.from_frame(df, wr_thresh=-30.0)
+        today = df.index[-1]
+        for price, vol in [(df["Close"].iloc[-1] * 1.03, 12e6), (df["Close"].iloc[-1] * 0.97, 15e6)]:
+            stream.update(price, vol, today.to_pydatetime())
+            df.loc[today, "High"] = max(df.loc[today, "High"], price)
+            df.loc[today, "Low"] = min(df.loc[today, "Low"], price)
+            df.loc[today, ["Close", "Volume"]] = [price, vol]
+            ref = compute_price_signals(add_price_indicators(df), wr_thresh=-30.0)
+            self._assert_same(ref, stream.signals())
+
+        # first tick of the next session opens a new daily bar
+        nxt = today + pd.offsets.BDay(1)
+        stream.update(101.0, 50_000, nxt.to_pydatetime())
+        df.loc[nxt] = [101.0, 101.0, 101.0, 101.0, 50_000.0]
+        full = add_price_indicators(df)
+        self._assert_same(compute_price_signals(full, wr_thresh=-30.0), stream.signals())
+        live = stream.indicators()
+        assert live["WR"] == pytest.approx(full["WR"].iloc[-1])
+        assert live["ADX_14"] == pytest.approx(add_adx(df)["ADX_14"].iloc[-1])
+        assert stream.n_closed == len(df) - 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# refresh_scheduler — DataManager dedupe / debounce / TTL cache (Qt-free)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestRefreshScheduler:
+
+    def _sched(self, **kw):
+        from ui.refresh_scheduler import RefreshScheduler
+
+        now = [0.0]
+        return RefreshScheduler(clock=lambda: now[0], **kw), now
+
+    def test_dedupe_then_cache_then_expiry(self):
+        sched, now = self._sched(ttl=60.0)
+        w = object()
+        assert sched.begin("SBIN", "price") == "start"
+        sched.attach("SBIN", "price", w)
+        assert sched.begin("SBIN", "price") == "joined"
+        assert sched.complete("SBIN", "price", "df", handle=w)
+        assert sched.begin("SBIN", "price") == "cached"
+        assert sched.cached("SBIN", "price") == "df"
+        assert sched.begin("SBIN", "price", force=True) == "start"
+        sched.complete("SBIN", "price", "df2", handle=None)
+        now[0] = 61.0
+        assert sched.begin("SBIN", "price") == "start"
+        assert sched.stats["started"] == 3
+        assert sched.stats["joined"] == 1 and sched.stats["cached"] == 1
+
+    def test_superseded_results_are_dropped(self):
+        sched, _ = self._sched()
+        old, new = object(), object()
+        sched.begin("SBIN", "price")
+        sched.attach("SBIN", "price", old)
+        sched.begin("SBIN", "options")  # never attached
+        sched.begin("INFY", "price")
+        sched.attach("INFY", "price", new)
+        assert sched.supersede("INFY") == [old]
+        assert not sched.in_flight("SBIN", "options")
+        assert not sched.complete("SBIN", "price", "stale", handle=old)
+        assert sched.cached("SBIN", "price") is None
+        assert not sched.fail("INFY", "price", handle=old)  # wrong handle
+        assert sched.complete("INFY", "price", "df", handle=new)
+        assert sched.stats["superseded"] == 2 and sched.stats["dropped"] == 2
+
+    def test_leading_edge_debounce(self):
+        sched, now = self._sched(debounce=0.25)
+        assert sched.debounce_delay() == 0.0  # first change dispatches at once
+        sched.mark_dispatched()
+        now[0] = 0.1
+        assert sched.debounce_delay() == pytest.approx(0.15)
+        now[0] = 0.2
+        assert sched.debounce_delay() == pytest.approx(0.05)
+        now[0] = 0.25
+        sched.mark_dispatched()  # trailing dispatch
+        now[0] = 1.0
+        assert sched.debounce_delay() == 0.0
+        assert sched.stats["requests"] == 4 and sched.stats["debounced"] == 2
+
+    def test_expired_and_least_recent_entries_are_evicted(self):
+        sched, now = self._sched(ttl=60.0, max_entries=2)
+        for sym in ("SBIN", "INFY"):
+            sched.begin(sym, "price")
+            sched.complete(sym, "price", sym)
+        assert sched.begin("SBIN", "price") == "cached"  # INFY is now least recent
+        sched.begin("TCS", "price")
+        sched.complete("TCS", "price", "TCS")
+        assert sched.cached("INFY", "price") is None
+        assert sched.cached("SBIN", "price") == "SBIN"
+
+        now[0] = 61.0
+        assert sched.begin("HDFC", "options") == "start"  # expired results go too
+        assert sched._cache == {}
+        assert sched.stats["evicted"] == 3
+
+    def test_invalidate_by_kind(self):
+        sched, _ = self._sched()
+        for sym in ("SBIN", "INFY"):
+            for kind in ("price", "options"):
+                sched.begin(sym, kind)
+                sched.complete(sym, kind, (sym, kind))
+        sched.invalidate(kind="price")
+        assert sched.cached("SBIN", "price") is None
+        assert sched.cached("INFY", "options") == ("INFY", "options")
+
+
+class TestDataManagerDispatch:
+    """ui.data_manager.DataManager runs analytics once per refresh (needs PyQt6)."""
+
+    @pytest.fixture
+    def dm(self, monkeypatch):
+        pytest.importorskip("PyQt6")
+        from PyQt6.QtCore import QCoreApplication
+
+        import ui.data_manager as udm
+
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        monkeypatch.setattr(udm, "is_market_open", lambda: False)
+        monkeypatch.setattr(udm, "compute_price_signals", lambda df, **kw: None)
+        monkeypatch.setattr(udm.StreamingPriceSignals, "from_frame",
+                            classmethod(lambda cls, df, **kw: None))
+        dm = udm.DataManager(prewarm=False)
+        dm.runs = []
+        monkeypatch.setattr(dm, "_run_analytics",
+                            lambda: dm.runs.append((dm._price_df, dm._options_df)))
+        monkeypatch.setattr(dm, "_start_worker", lambda symbol, kind: None)
+        return dm
+
+    RESULTS = {
+        "price": (pd.DataFrame({"Close": [100.0, 101.0]}), "ok"),
+        "options": (_make_options_df(), "ok"),
+    }
+
+    def _cache(self, dm, symbol, kinds):
+        for kind in kinds:
+            dm._scheduler.begin(symbol, kind)
+            dm._scheduler.complete(symbol, kind, self.RESULTS[kind])
+
+    def test_both_kinds_cached_run_analytics_once(self, dm):
+        self._cache(dm, "SBIN", ("price", "options"))
+        dm.refresh("SBIN")
+        assert len(dm.runs) == 1
+        price_df, options_df = dm.runs[0]
+        assert price_df is not None and options_df is not None
+
+    def test_cached_options_wait_for_the_price_fetch(self, dm):
+        self._cache(dm, "SBIN", ("options",))
+        dm.refresh("SBIN")
+        assert dm.runs == []  # options served, price still in flight
+        dm._deliver("price", self.RESULTS["price"])
+        assert dm.runs == [(self.RESULTS["price"][0], self.RESULTS["options"][0])]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Rolling persistence estimators (Hurst R/S, return autocorrelation)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestRollingPersistence:
+    """rolling_* at bar t == the run_mode_backtest point estimate on data ≤ t."""
+
+    @pytest.fixture
+    def close(self):
+        from backtest.data_loader import generate_synthetic
+
+        return generate_synthetic(n_bars=400, seed=11)["Close"]
+
+    def test_hurst_matches_point_estimate(self, close):
+        from modules.indicators import rolling_hurst
+        from run_mode_backtest import hurst_exponent
+
+        r = close.pct_change().dropna()
+        h = rolling_hurst(r, window=90)
+        assert h.iloc[:89].isna().all()
+        for t in range(89, len(r), 7):
+            assert h.iloc[t] == pytest.approx(hurst_exponent(r.iloc[t - 89:t + 1]), abs=1e-12)
+
+    def test_autocorr_matches_point_estimate(self, close):
+        from modules.indicators import rolling_autocorr
+        from run_mode_backtest import return_autocorrelation
+
+        ac = rolling_autocorr(close, lag=5, window=60)
+        assert ac.iloc[:64].isna().all() and not np.isnan(ac.iloc[64])
+        for t in range(64, len(close), 7):
+            ref = return_autocorrelation(close.iloc[:t + 1], lag=5, window=60)
+            assert ac.iloc[t] == pytest.approx(ref, abs=1e-12)
+
+    def test_panel_is_per_column_and_nan_windows_blank(self, close):
+        from modules.indicators import rolling_hurst
+
+        r = close.pct_change()
+        r2 = r * 1.5 + 0.001
+        r2.iloc[200] = np.nan
+        panel = rolling_hurst(pd.DataFrame({"A": r, "B": r2}), window=60)
+        np.testing.assert_array_equal(panel["A"].to_numpy(), rolling_hurst(r.to_numpy(), 60))
+        assert panel["B"].iloc[200:260].isna().all()
+        assert not np.isnan(panel["B"].iloc[260])
+
+    def test_regime_hurst_vote(self):
+        from modules.regime_filter import classify_regime
+
+        assert classify_regime(nifty_hurst=0.62).regime == "TRENDING"
+        assert classify_regime(nifty_hurst=0.38).regime == "RANGING"
+        assert classify_regime(nifty_hurst=0.5).regime == "UNKNOWN"
+        assert classify_regime(nifty_hurst=float("nan")).hurst is None
@@ -0,0 +1,309 @@
+"""
+tests/test_nse_client.py
+────────────────────────
+Offline tests for modules/nse_client.py against a local stub NSE server,
+plus the token bucket it paces requests with (modules/rate_limit.py) and
+the AIMD concurrency controller.
+
+The stub mimics the three endpoints the client uses — the cookie warm-up
+page, contract-info and option-chain-v3 — and answers 403 to API calls
+without a cookie it issued, like NSE does.
+
+Run:
+    pytest tests/test_nse_client.py -v
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STUB SERVER
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class _StubNSE:
+    """State shared by the handler threads."""
+
+    def __init__(self, expiries=("02-Jan-2025", "09-Jan-2025", "30-Jan-2025"), delay=0.15):
+        self.expiries = list(expiries)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.valid: set[str] = set()
+        self.warmups = 0
+        self.api_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.hits: list[float] = []
+        self.throttle = False  # answer 429 to every API call
+
+    def revoke_cookies(self):
+        with self.lock:
+            self.valid.clear()
+
+
+def _handler(stub: _StubNSE):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, headers=()):
+            data = body.encode()
+            self.send_response(code)
+            for k, v in headers:
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            with stub.lock:
+                stub.hits.append(time.monotonic())
+
+            if url.path == "/option-chain":
+                with stub.lock:
+                    stub.warmups += 1
+                    token = f"tok{stub.warmups}"
+                    stub.valid.add(token)
+                self._send(200, "<html>option chain</html>", [("Set-Cookie", f"nsit={token}")])
+                return
+
+            cookie = self.headers.get("Cookie", "")
+            tokens = {c.split("=", 1)[1] for c in cookie.split("; ") if c.startswith("nsit=")}
+            with stub.lock:
+                authorised = bool(tokens & stub.valid)
+                stub.api_calls += 1
+            if stub.throttle:
+                self._send(429, "<html>Too Many Requests</html>")
+                return
+            if not authorised:
+                self._send(403, "<html>Access Denied</html>")
+                return
+
+            if url.path == "/api/option-chain-contract-info":
+                self._send(200, json.dumps({"expiryDates": stub.expiries}))
+            elif url.path == "/api/option-chain-v3":
+                with stub.lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                strike0 = 100 * (stub.expiries.index(q["expiry"]) + 1)
+                rows = [
+                    {
+                        "strikePrice": strike0 + k,
+                        "CE": {"openInterest": 10 + k, "impliedVolatility": 20.0,
+                               "underlyingValue": 150.0},
+                        "PE": {"openInterest": 20 + k, "impliedVolatility": 22.0},
+                    }
+                    for k in range(3)
+                ]
+                self._send(200, json.dumps({"data": rows}))
+            else:
+                self._send(404, "{}")
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    state = _StubNSE()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _client(stub, **kw):
+    from modules.nse_client import NSEClient
+
+    kw.setdefault("rate", 100.0)
+    kw.setdefault("burst", 10)
+    return NSEClient(base_url=stub.base_url, **kw)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. TOKEN BUCKET
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestTokenBucket:
+
+    def test_burst_then_paced(self):
+        from modules.rate_limit import TokenBucket
+
+        now = [0.0]
+        slept = []
+
+        def _sleep(s):
+            slept.append(s)
+
+        bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0], sleep=_sleep)
+        waits = [bucket.acquire() for _ in range(4)]
+        # two banked tokens, then each caller queues 0.5s behind the previous
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+        now[0] = 10.0  # long idle refills to burst, never beyond
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+    def test_rejects_bad_config(self):
+        from modules.rate_limit import TokenBucket
+
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. CLIENT AGAINST THE STUB SERVER
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestNSEClient:
+
+    def test_download_options_one_warmup_concurrent_expiries(self, stub, monkeypatch, tmp_path):
+        """Two symbols → one cookie warm-up; expiries overlap; order preserved."""
+        import modules.chain_store as cs
+        import modules.nse_client as nc
+        from modules.data import download_options
+
+        monkeypatch.setattr(nc, "_CLIENT", _client(stub))
+        monkeypatch.setattr(cs, "_STORE", cs.ChainStore(str(tmp_path)))
+        t0 = time.monotonic()
+        df, msg = download_options("NIFTY", max_expiries=3)
+        elapsed = time.monotonic() - t0
+        df2, _ = download_options("SBIN", max_expiries=2)
+
+        assert msg.startswith("✓ 3 expiries")
+        assert list(df["Expiry"].unique()) == stub.expiries
+        assert df["Strike"].tolist()[:3] == [100, 101, 102]
+        assert df2["Expiry"].nunique() == 2
+        assert stub.warmups == 1
+        assert stub.max_in_flight > 1
+        assert elapsed < 3 * stub.delay  # sequential would need 3 × delay
+        assert len(cs._STORE.latest("NIFTY")[1]) == len(df)  # snapshot stored
+
+    def test_rejected_cookies_rewarm_once(self, stub):
+        client = _client(stub)
+        assert client.fetch_chains("NIFTY", max_expiries=1)
+        stub.revoke_cookies()
+        chains = client.fetch_chains("NIFTY", max_expiries=3)
+        assert [e for e, _ in chains] == stub.expiries
+        assert stub.warmups == 2  # concurrent 403s share one re-warm
+
+    def test_cookie_ttl_expiry_rewarms(self, stub):
+        client = _client(stub, cookie_ttl=0.05)
+        client.expiry_dates("NIFTY")
+        client.expiry_dates("NIFTY")
+        assert stub.warmups == 1
+        time.sleep(0.1)
+        client.expiry_dates("NIFTY")
+        assert stub.warmups == 2
+
+    def test_global_rate_limit_across_threads(self, stub):
+        """All requests, from every thread, respect the shared bucket."""
+        stub.delay = 0.0
+        client = _client(stub, rate=20.0, burst=1, max_workers=3)
+        client.cookies()
+        threads = [
+            threading.Thread(target=client.fetch_chains, args=("NIFTY", 3))
+            for _ in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        hits = sorted(stub.hits)
+        assert len(hits) == 1 + 3 * 4  # warm-up + 3 × (contract-info + 3 expiries)
+        # 13 requests at 20/s with no burst → at least 12 × 50ms end to end
+        assert hits[-1] - hits[0] >= 12 / 20.0 * 0.9
+
+    def test_http_errors_surface_as_value_error(self, stub):
+        client = _client(stub)
+        with pytest.raises(ValueError, match="HTTP 404"):
+            client.get_json("/api/unknown")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. ADAPTIVE CONCURRENCY
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class TestAIMDController:
+
+    def _ctl(self, **kw):
+        from modules.nse_client import AIMDController
+
+        now = [0.0]
+        ctl = AIMDController(clock=lambda: now[0], **kw)
+        return ctl, now
+
+    def test_additive_increase_to_cap(self):
+        ctl, _ = self._ctl(initial=2, max_limit=4, latency_target=1.0)
+        for _ in range(2 + 3):  # ≈ one limit's worth of successes per +1
+            ctl.record(True, 0.1)
+        assert ctl.limit == 3
+        for _ in range(50):
+            ctl.record(True, 0.1)
+        assert ctl.limit == 4
+
+    def test_multiplicative_decrease_once_per_cooldown(self):
+        ctl, now = self._ctl(initial=8, max_limit=8, cooldown=2.0)
+        for _ in range(5):
+            ctl.record(False)  # one burst of 429s
+        assert ctl.limit == 4 and ctl.cuts == 1
+        now[0] = 3.0
+        ctl.record(False)
+        assert ctl.limit == 2
+        now[0] = 6.0
+        ctl.record(False)
+        now[0] = 9.0
+        ctl.record(False)
+        assert ctl.limit == 1  # floor
+        m = ctl.metrics()
+        assert m["errors"] == 8 and m["error_rate"] == 1.0 and m["concurrency"] == 1
+
+    def test_rising_latency_backs_off(self):
+        ctl, _ = self._ctl(initial=6, max_limit=8, latency_target=1.0)
+        for _ in range(10):
+            ctl.record(True, 5.0)
+        assert ctl.limit == 3 and ctl.errors == 0
+
+    def test_slots_bound_in_flight(self):
+        ctl, _ = self._ctl(initial=2, max_limit=4)
+        peak, lock = [0], threading.Lock()
+
+        def _work():
+            with ctl.slot():
+                with lock:
+                    peak[0] = max(peak[0], ctl.metrics()["in_flight"])
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=_work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 2
+
+    def test_client_reports_throttling(self, stub):
+        client = _client(stub)
+        client.expiry_dates("NIFTY")
+        assert client.controller.metrics()["requests"] == 1
+        stub.throttle = True
+        with pytest.raises(ValueError):
+            client.expiry_dates("NIFTY")
+        m = client.controller.metrics()
+        assert m["errors"] == 1 and m["concurrency"] == 1
@@ -5,6 +5,12 @@ Changes vs original:
   2. _run_analytics() — for ETF symbols calls analyze_etf() instead of analytics.analyze()
                         emits ETFContext via context_updated (same signal, different type)
   ZERO other changes.
+
+refresh() goes through ui/refresh_scheduler.RefreshScheduler: symbol
+changes inside the debounce window coalesce into one dispatch, a fetch
+already in flight is joined rather than duplicated, results younger than
+_CACHE_TTL are served without a worker, and results of superseded workers
+are dropped instead of being applied to whichever symbol is active.
 """
 
 from __future__ import annotations
@@ -19,10 +25,12 @@ import pandas as pd
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 
 from modules.indicators import compute_price_signals, PriceSignals
+from modules.streaming_indicators import StreamingPriceSignals
 from modules.analytics import analyze, OptionsContext
 from modules.data import infer_spot, NSE_LOT_SIZES, is_market_open
 from modules.etf_analyzer import analyze_etf, NSE_ETF_SYMBOLS  # ← NEW
 
+from ui.refresh_scheduler import RefreshScheduler
 from ui.workers import (
     PriceWorker,
     OptionsWorker,
@@ -35,6 +43,8 @@ logger = logging.getLogger(__name__)
 _LIVE_THRESHOLD = 300
 _STALE_THRESHOLD = 900
 _REFRESH_MS = 300_000
+_CACHE_TTL = 60  # seconds a fetched price/options result is served from cache
+_DEBOUNCE_MS = 250
 
 
 class DataManager(QObject):
@@ -49,13 +59,15 @@ class DataManager(QObject):
     filing_ready = pyqtSignal(str, object)
     dual_mode_updated = pyqtSignal(str, object)  # DualModeSignal
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, prewarm: bool = True):
         super().__init__(parent)
         self._active_symbol: str = ""
         self._price_df: Optional[pd.DataFrame] = None
         self._options_df: Optional[pd.DataFrame] = None
         self._ctx = None
         self._ps: Optional[PriceSignals] = None
+        # Rolling indicator state for live ticks (apply_tick) — seeded per price load
+        self._stream: Optional[StreamingPriceSignals] = None
         self._spot: float = 0.0
         self._last_refresh: Optional[float] = None
         self._freshness: DataFreshnessState = DataFreshnessState.STALE
@@ -67,9 +79,14 @@ class DataManager(QObject):
         self._price_worker: Optional[PriceWorker] = None
         self._options_worker: Optional[OptionsWorker] = None
         self._universe_worker: Optional[UniverseWorker] = None
-        # Options cache: {symbol: (DataFrame, timestamp)} — survives symbol changes
-        # Used to show last-known options data when market is closed
-        self._options_cache: dict[str, tuple] = {}
+        # In-flight dedupe, TTL cache, debounce + counters (refresh_stats())
+        self._scheduler = RefreshScheduler(ttl=_CACHE_TTL, debounce=_DEBOUNCE_MS / 1000)
+        self._pending: Optional[tuple[str, bool, bool]] = None  # (symbol, fetch_options, force)
+        self._awaiting: set[str] = set()  # kinds still due for the active symbol
+        self._retired: set = set()  # superseded QThreads, kept alive until finished
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self._dispatch)
         self._refresh_timer = QTimer(self)
         self._refresh_timer.setInterval(_REFRESH_MS)
         self._refresh_timer.timeout.connect(self._on_auto_refresh)
@@ -77,12 +94,17 @@ class DataManager(QObject):
         self._freshness_timer.setInterval(30_000)
         self._freshness_timer.timeout.connect(self._check_freshness)
         self._freshness_timer.start()
-        self._prewarm_nifty500()
+        if prewarm:  # fast start defers this until after the first paint
+            self._prewarm_nifty500()
         self._filing_worker = None
         self._filing_fv = None  # last filing variance for dual-mode overlay
         logger.info("DataManager initialised")
 
     # ── PUBLIC API ─────────────────────────────────────────────────────────────
+    def start_prewarm(self):
+        """Start the NIFTY500 pre-warm skipped by DataManager(prewarm=False)."""
+        self._prewarm_nifty500()
+
     def _prewarm_nifty500(self):
         """
         Pre-populate the NIFTY500 cache in filings_v2.py on DataManager startup.
@@ -118,7 +140,11 @@ class DataManager(QObject):
         # Re-emit dual-mode with filing overlay now available
         self._emit_dual_mode()
 
-    def refresh(self, symbol: str, fetch_options: bool = True):
+    def refresh(self, symbol: str, fetch_options: bool = True, force: bool = False):
+        """
+        Load symbol. force skips the TTL cache (manual refresh) but still
+        joins a fetch already in flight.
+        """
         symbol = symbol.strip().upper()
         logger.info("DataManager.refresh: %s", symbol)
         self._active_symbol = symbol
@@ -126,29 +152,55 @@ class DataManager(QObject):
         self._options_df = None
         self._ctx = None
         self._ps = None
+        self._stream = None
         self._filing_fv = None
         self.lot_size = NSE_LOT_SIZES.get(symbol, 75)
 
-        market_open = is_market_open()
+        pending = self._pending
+        if pending is not None and pending[0] == symbol:
+            fetch_options = fetch_options or pending[1]
+            force = force or pending[2]
+        self._pending = (symbol, fetch_options, force)
+        delay = self._scheduler.debounce_delay()
+        if delay > 0:
+            self._debounce_timer.start(max(1, int(delay * 1000)))
+            return
+        self._debounce_timer.stop()
+        self._dispatch()
 
-        self._price_worker = PriceWorker(
-            symbol=symbol,
-            bb_period=self.bb_period,
-            bb_std=self.bb_std,
-            wr_period=self.wr_period,
-        )
-        self._price_worker.price_ready.connect(self._on_price_ready)
-        self._price_worker.error.connect(self._on_price_error)
-        self._price_worker.start()
+    def _dispatch(self):
+        """Start, join or serve from cache the fetches of the pending refresh."""
+        if self._pending is None:
+            return
+        symbol, fetch_options, force = self._pending
+        self._pending = None
+        self._scheduler.mark_dispatched()
+        for worker in self._scheduler.supersede(symbol):
+            self._retire(worker)
+
+        market_open = is_market_open()
 
         # ── Always fetch options (NSE returns last trading day's EOD data
         # even after hours and weekends). Only skip for ETFs.
-        is_etf = symbol in NSE_ETF_SYMBOLS
-        if fetch_options and not is_etf:
-            self._options_worker = OptionsWorker(symbol=symbol, max_expiries=3)
-            self._options_worker.options_ready.connect(self._on_options_ready)
-            self._options_worker.error.connect(self._on_options_error)
-            self._options_worker.start()
+        kinds = ["price"]
+        if fetch_options and symbol not in NSE_ETF_SYMBOLS:
+            kinds.append("options")
+
+        # Every kind is due until delivered — cached ones included — so the
+        # first delivery never runs analytics without the other kind
+        cached = []
+        self._awaiting = set(kinds)
+        for kind in kinds:
+            decision = self._scheduler.begin(symbol, kind, force=force)
+            if decision == "cached":
+                cached.append(kind)
+                continue
+            if decision == "start":
+                self._start_worker(symbol, kind)
+        logger.debug("Refresh %s: %s — stats %s", symbol, kinds, self._scheduler.stats)
+
+        for kind in cached:
+            self._deliver(kind, self._scheduler.cached(symbol, kind))
 
         # Only auto-refresh timer during market hours (no point polling after close)
         if market_open:
@@ -156,8 +208,42 @@ class DataManager(QObject):
         else:
             self._refresh_timer.stop()
 
+    def _start_worker(self, symbol: str, kind: str):
+        if kind == "price":
+            w = PriceWorker(
+                symbol=symbol,
+                bb_period=self.bb_period,
+                bb_std=self.bb_std,
+                wr_period=self.wr_period,
+            )
+            w.price_ready.connect(lambda df, msg, w=w: self._on_fetched(w, symbol, kind, (df, msg)))
+            self._price_worker = w
+        else:
+            w = OptionsWorker(symbol=symbol, max_expiries=3)
+            w.options_ready.connect(lambda df, msg, w=w: self._on_fetched(w, symbol, kind, (df, msg)))
+            self._options_worker = w
+        w.error.connect(lambda msg, w=w: self._on_fetch_failed(w, symbol, kind, msg))
+        self._scheduler.attach(symbol, kind, w)
+        w.start()
+
+    def _retire(self, worker):
+        """
+        Cancel a superseded worker. QThreads can't be killed mid-request, so
+        it runs to completion and its result is dropped by the scheduler; the
+        reference is held until then so Qt doesn't destroy a running thread.
+        """
+        worker.requestInterruption()
+        if worker.isFinished():
+            return
+        self._retired.add(worker)
+        worker.finished.connect(lambda w=worker: self._retired.discard(w))
+
+    def refresh_stats(self) -> dict[str, int]:
+        """How often each refresh path was taken (started, joined, cached, …)."""
+        return dict(self._scheduler.stats)
+
     def fetch_universe(self):
-        self._universe_worker = UniverseWorker()
+        self._universe_worker = UniverseWorker(prefetch_prices=True)
         self._universe_worker.universe_ready.connect(self._on_universe_ready)
         self._universe_worker.error.connect(
             lambda msg: logger.warning("Universe fetch failed: %s", msg)
@@ -208,6 +294,31 @@ class DataManager(QObject):
 
     # ── WORKER CALLBACKS ───────────────────────────────────────────────────────
 
+    def _on_fetched(self, worker, symbol: str, kind: str, result: tuple):
+        if not self._scheduler.complete(symbol, kind, result, handle=worker):
+            logger.debug("Dropped superseded %s result for %s", kind, symbol)
+            return
+        if symbol == self._active_symbol:
+            self._deliver(kind, result)
+
+    def _on_fetch_failed(self, worker, symbol: str, kind: str, msg: str):
+        if not self._scheduler.fail(symbol, kind, handle=worker):
+            return
+        if symbol != self._active_symbol:
+            return
+        self._awaiting.discard(kind)
+        if kind == "price":
+            self._on_price_error(msg)
+        else:
+            self._on_options_error(msg)
+
+    def _deliver(self, kind: str, result: tuple):
+        self._awaiting.discard(kind)
+        if kind == "price":
+            self._on_price_ready(*result)
+        else:
+            self._on_options_ready(*result)
+
     def _on_price_ready(self, df: pd.DataFrame, msg: str):
         symbol = self._active_symbol
         logger.info("Price ready: %s — %s", symbol, msg)
@@ -224,11 +335,41 @@ class DataManager(QObject):
             self._spot = float(df.iloc[-1]["Close"])
             self.spot_updated.emit(symbol, self._spot)
         self._ps = compute_price_signals(df, wr_thresh=self.wr_thresh)
+        self._stream = None
+        if not df.empty:
+            self._stream = StreamingPriceSignals.from_frame(
+                df, bb_period=self.bb_period, bb_std=self.bb_std,
+                wr_period=self.wr_period, wr_thresh=self.wr_thresh,
+            )
         self.price_updated.emit(symbol, df)
         self.ps_updated.emit(symbol, self._ps)
 
-        # Dual-mode runs after _run_analytics (needs options ctx)
-        self._run_analytics()
+        # Dual-mode runs after _run_analytics (needs options ctx). With options
+        # still due, _on_options_ready runs it once both are in.
+        if "options" not in self._awaiting:
+            self._run_analytics()
+
+    def apply_tick(
+        self,
+        symbol: str,
+        price: float,
+        volume: Optional[float] = None,
+        when: Optional[datetime.datetime] = None,
+    ):
+        """
+        Live tick (e.g. from kite_manager.TickerWorker) for the active symbol.
+        Updates spot + PriceSignals from the streaming state in O(1) — no
+        PriceWorker refetch, no pandas pass over the daily history.
+        volume is the day's cumulative volume (Kite volume_traded).
+        """
+        symbol = symbol.strip().upper()
+        if symbol != self._active_symbol or self._stream is None or price is None:
+            return
+        self._stream.update(float(price), volume, when)
+        self._spot = float(price)
+        self._ps = self._stream.signals()
+        self.spot_updated.emit(symbol, self._spot)
+        self.ps_updated.emit(symbol, self._ps)
 
     def _on_price_error(self, msg: str):
         symbol = self._active_symbol
@@ -240,20 +381,16 @@ class DataManager(QObject):
         symbol = self._active_symbol
         logger.info("Options ready: %s — %s", symbol, msg)
         self._options_df = df
-        # Cache for after-hours use
-        if df is not None and not df.empty:
-            import time as _t
-            self._options_cache[symbol] = (df, _t.time())
-            logger.info("Options cached: %s (%d rows)", symbol, len(df))
         self.options_updated.emit(symbol, df)
-        if self._price_df is not None:
+        # With price still due, _on_price_ready runs analytics once it lands
+        if "price" not in self._awaiting and self._price_df is not None:
             self._run_analytics()
 
     def _on_options_error(self, msg: str):
         symbol = self._active_symbol
         logger.warning("Options error: %s — %s", symbol, msg)
         self.error_occurred.emit(symbol, f"Options: {msg}")
-        if self._price_df is not None and self._ctx is None:
+        if "price" not in self._awaiting and self._price_df is not None and self._ctx is None:
             self._run_analytics()
 
     def _on_universe_ready(self, symbols: list):
@@ -392,14 +529,19 @@ class DataManager(QObject):
 
     # ── PARAMETER UPDATES ─────────────────────────────────────────────────────
 
+    # Cached price results carry indicators computed with the old settings.
+
     def set_bb_period(self, val: int):
         self.bb_period = val
+        self._scheduler.invalidate(kind="price")
 
     def set_bb_std(self, val: float):
         self.bb_std = val
+        self._scheduler.invalidate(kind="price")
 
     def set_wr_period(self, val: int):
         self.wr_period = val
+        self._scheduler.invalidate(kind="price")
 
     def set_wr_threshold(self, val: float):
         self.wr_thresh = val
@@ -13,6 +13,8 @@ KiteSessionManager:
 TickerWorker:
     - QThread running KiteTicker WebSocket
     - Emits tick_received(list) for real-time price updates
+    - Feeds every tick to a TickAggregator (modules/tick_engine.py) and
+      emits bars_completed(list) with the 1m/5m/15m/4H bars each batch closed
     - Emits connected/disconnected signals
 
 Credentials are NEVER hardcoded. Stored in data/.kite_session (gitignored).
@@ -25,11 +27,12 @@ import logging
 import os
 import time
 import webbrowser
-from collections import deque
 from typing import Optional
 
 from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
 
+from modules.tick_engine import TickAggregator
+
 logger = logging.getLogger(__name__)
 
 _SESSION_PATH = os.path.join(
@@ -254,22 +257,26 @@ class TickerWorker(QThread):
 
     Signals:
         tick_received(list)   — raw tick dicts from Kite
+        bars_completed(list)  — bar dicts closed by a tick batch (see tick_engine)
         connected()           — WebSocket connected
         disconnected(str)     — WebSocket disconnected with reason
     """
 
     tick_received  = pyqtSignal(list)
+    bars_completed = pyqtSignal(list)
     connected      = pyqtSignal()
     disconnected   = pyqtSignal(str)
 
     def __init__(self, api_key: str, access_token: str,
-                 instrument_tokens: list[int] = None, parent=None):
+                 instrument_tokens: list[int] = None, parent=None,
+                 aggregator: Optional[TickAggregator] = None):
         super().__init__(parent)
         self._api_key      = api_key
         self._access_token = access_token
         self._tokens       = instrument_tokens or [256265]  # NIFTY by default
         self._kt           = None
         self._running       = True
+        self.aggregator    = aggregator or TickAggregator()
 
     def run(self):
         if not _kite_available():
@@ -287,6 +294,9 @@ class TickerWorker(QThread):
             def on_ticks(ws, ticks):
                 if self._running:
                     self.tick_received.emit(ticks)
+                    bars = self.aggregator.add_ticks(ticks)
+                    if bars:
+                        self.bars_completed.emit(bars)
 
             def on_connect(ws, response):
                 logger.info("KiteTicker connected")
@@ -331,83 +341,3 @@ class TickerWorker(QThread):
                 self._kt.set_mode(self._kt.MODE_FULL, tokens)
             except Exception as exc:
                 logger.warning("Could not update tokens: %s", exc)
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# TICK AGGREGATOR (4H bar construction)
-# ══════════════════════════════════════════════════════════════════════════════
-
-class TickAggregator:
-    """
-    Accumulates ticks into 4H OHLCV bars.
-    Emits bar_complete signal when a 4H boundary is crossed.
-
-    4H boundaries for NSE (IST):
-        09:15 → 13:15 (bar 1)
-        13:15 → 15:30 (bar 2, truncated)
-    """
-
-    def __init__(self):
-        self._ticks: deque = deque(maxlen=100000)
-        self._current_bar: Optional[dict] = None
-        self._bar_start: Optional[datetime.datetime] = None
-
-    def add_tick(self, tick: dict) -> Optional[dict]:
-        """
-        Process a tick. Returns a completed 4H bar dict if boundary crossed,
-        else None.
-        """
-        ltp = tick.get("last_price")
-        ts  = tick.get("exchange_timestamp") or tick.get("timestamp")
-        vol = tick.get("volume_traded", 0)
-
-        if ltp is None or ts is None:
-            return None
-
-        if isinstance(ts, str):
-            ts = datetime.datetime.fromisoformat(ts)
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=_IST)
-
-        self._ticks.append({"price": ltp, "ts": ts, "volume": vol})
-
-        # Determine which 4H bucket this tick belongs to
-        hour = ts.hour
-        if hour < 13:
-            bar_boundary = ts.replace(hour=13, minute=15, second=0, microsecond=0)
-        else:
-            bar_boundary = ts.replace(hour=15, minute=30, second=0, microsecond=0)
-
-        completed_bar = None
-
-        if self._current_bar is None:
-            # Start a new bar
-            self._current_bar = {
-                "Open": ltp, "High": ltp, "Low": ltp, "Close": ltp,
-                "Volume": vol,
-            }
-            self._bar_start = bar_boundary
-        elif bar_boundary != self._bar_start:
-            # Boundary crossed — complete the old bar
-            completed_bar = dict(self._current_bar)
-            completed_bar["timestamp"] = self._bar_start
-            # Start new bar
-            self._current_bar = {
-                "Open": ltp, "High": ltp, "Low": ltp, "Close": ltp,
-                "Volume": vol,
-            }
-            self._bar_start = bar_boundary
-        else:
-            # Same bar — update OHLCV
-            self._current_bar["High"]   = max(self._current_bar["High"], ltp)
-            self._current_bar["Low"]    = min(self._current_bar["Low"], ltp)
-            self._current_bar["Close"]  = ltp
-            self._current_bar["Volume"] = vol  # Kite gives cumulative volume
-
-        return completed_bar
-
-    @property
-    def last_price(self) -> Optional[float]:
-        if self._current_bar:
-            return self._current_bar["Close"]
-        return None
@@ -5,11 +5,17 @@ NIMBUS QMainWindow: sidebar (fixed 220px) + QTabWidget (3 tabs).
 
 Phase 1: DataManager wired, sidebar signals connected, status bar live.
 Symbol change → immediate pipeline execution (Lesson 8.6).
+
+fast_start=True (main.py --fast-start): only the Dashboard is built up
+front. The other tabs — and the module graphs behind them — are imported
+when first shown, and no network call is made until main() calls
+start_background_work() after the first paint.
 """
 
 from __future__ import annotations
 
 import datetime
+import importlib
 import logging
 from typing import Optional
 
@@ -42,16 +48,48 @@ from ui.theme import (
 from ui.sidebar import Sidebar
 from ui.data_manager import DataManager
 from ui.dashboard_tab import DashboardTab
-from ui.scanner_tab import ScannerTab
-from ui.watchlist_tab import WatchlistTab
-from ui.market_context_tab import MarketContextTab
-from ui.etf_tab import ETFMomentumTab
 from ui.watchlist_db import init_watchlist
 
 # KiteTicker removed — yfinance polling is the sole data source
 
 logger = logging.getLogger(__name__)
 
+# Tabs after the Dashboard, in tab-bar order: (attribute, label, module, class).
+# Their modules are imported by _LazyTab.build(), never at import time here.
+_TABS = (
+    ("_scanner_tab", "Scanner", "ui.scanner_tab", "ScannerTab"),
+    ("_etf_tab", "ETF Momentum", "ui.etf_tab", "ETFMomentumTab"),
+    ("_watchlist_tab", "Watchlist", "ui.watchlist_tab", "WatchlistTab"),
+    ("_context_tab", "Market Context", "ui.market_context_tab", "MarketContextTab"),
+)
+
+
+class _LazyTab(QWidget):
+    """Tab-page container that imports and builds its real tab on first show."""
+
+    def __init__(self, module: str, cls_name: str, owner: QWidget, on_built):
+        super().__init__()
+        self._module = module
+        self._cls_name = cls_name
+        self._owner = owner
+        self._on_built = on_built
+        self.widget: Optional[QWidget] = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def build(self) -> QWidget:
+        if self.widget is None:
+            cls = getattr(importlib.import_module(self._module), self._cls_name)
+            self.widget = cls(self._owner)
+            self.layout().addWidget(self.widget)
+            logger.info("Tab built: %s", self._cls_name)
+            self._on_built(self.widget)
+        return self.widget
+
+    def showEvent(self, event):
+        self.build()
+        super().showEvent(event)
+
 
 class MainWindow(QMainWindow):
     """
@@ -68,8 +106,10 @@ class MainWindow(QMainWindow):
         └──────────────────────────────────────────────────────┘
     """
 
-    def __init__(self):
+    def __init__(self, fast_start: bool = False):
         super().__init__()
+        self._fast_start = fast_start
+        self._signals_connected = False
         self.setWindowTitle("Nimbus Terminal")
         self.setMinimumSize(QSize(1200, 760))
         self.resize(1480, 900)
@@ -78,7 +118,7 @@ class MainWindow(QMainWindow):
         self.setStyleSheet(QSS)
 
         # ── Data manager ──────────────────────────────────────────────────────
-        self.data_mgr = DataManager(parent=self)
+        self.data_mgr = DataManager(parent=self, prewarm=not fast_start)
 
         # ── Watchlist SQLite init ─────────────────────────────────────────────
         init_watchlist()
@@ -91,13 +131,9 @@ class MainWindow(QMainWindow):
         self._build_ui()
         self._connect_signals()
 
-        # ── Fetch universe on startup ─────────────────────────────────────────
-        self.data_mgr.fetch_universe()
-
-        # ── Auto-load initial symbol after window shows ───────────────────────
-        from PyQt6.QtCore import QTimer
-
-        QTimer.singleShot(500, self._auto_load_initial)
+        # ── Network: now, or after first paint in fast-start mode ─────────────
+        if not fast_start:
+            self.start_background_work()
 
         # ── Keyboard shortcuts (§6.2) ─────────────────────────────────────────
         self._setup_shortcuts()
@@ -107,6 +143,19 @@ class MainWindow(QMainWindow):
 
         logger.info("MainWindow initialised — yfinance polling active")
 
+    def start_background_work(self):
+        """Universe fetch, NIFTY500 pre-warm and the initial symbol load."""
+        from PyQt6.QtCore import QTimer
+
+        if self._fast_start:
+            self.data_mgr.start_prewarm()
+
+        # ── Fetch universe on startup ─────────────────────────────────────────
+        self.data_mgr.fetch_universe()
+
+        # ── Auto-load initial symbol after window shows ───────────────────────
+        QTimer.singleShot(500, self._auto_load_initial)
+
     def _auto_load_initial(self):
         """Trigger pipeline for the default symbol on startup."""
         symbol = self.sidebar.current_symbol()
@@ -140,16 +189,15 @@ class MainWindow(QMainWindow):
 
         # Phase 2: real Dashboard tab
         self._dashboard_tab = DashboardTab(self)
-        self._scanner_tab = ScannerTab(self)
-        self._watchlist_tab = WatchlistTab(self)
-        self._context_tab = MarketContextTab(self)
-        self._etf_tab = ETFMomentumTab(self)
-
         self.tabs.addTab(self._dashboard_tab, "Dashboard")
-        self.tabs.addTab(self._scanner_tab, "Scanner")
-        self.tabs.addTab(self._etf_tab, "ETF Momentum")
-        self.tabs.addTab(self._watchlist_tab, "Watchlist")
-        self.tabs.addTab(self._context_tab, "Market Context")
+
+        # Other tabs: placeholders, built now or on first show (fast start)
+        for attr, label, module, cls_name in _TABS:
+            setattr(self, attr, None)
+            page = _LazyTab(module, cls_name, self, self._make_tab_hook(attr))
+            self.tabs.addTab(page, label)
+            if not self._fast_start:
+                page.build()
 
         root.addWidget(self.tabs, stretch=1)
 
@@ -214,22 +262,38 @@ class MainWindow(QMainWindow):
         self.data_mgr.context_updated.connect(self._on_context_updated)
         self.data_mgr.ps_updated.connect(self._on_ps_updated)
 
-        # Scanner → Dashboard navigation (Lesson 8.7)
-        self._scanner_tab.row_clicked.connect(self.open_symbol_in_dashboard)
-
-        # Scanner → populate sidebar (single click, no tab switch)
-        self._scanner_tab.symbol_selected.connect(
-            lambda sym: self.sidebar._symbol_combo.setCurrentText(sym)
-        )
-
-        # ETF tab → Dashboard navigation
-        self._etf_tab.symbol_selected.connect(self.open_symbol_in_dashboard)
-
-        # Watchlist → Dashboard navigation
-        self._watchlist_tab.view_symbol.connect(self.open_symbol_in_dashboard)
-
-        # Market Context → Dashboard navigation
-        self._context_tab.view_symbol.connect(self.open_symbol_in_dashboard)
+        # Tabs built before this point; later ones are wired as they build
+        for attr, *_ in _TABS:
+            if getattr(self, attr) is not None:
+                self._connect_tab(attr, getattr(self, attr))
+        self._signals_connected = True
+
+    def _make_tab_hook(self, attr: str):
+        def _built(tab):
+            setattr(self, attr, tab)
+            if self._signals_connected:
+                self._connect_tab(attr, tab)
+
+        return _built
+
+    def _connect_tab(self, attr: str, tab):
+        """Wire one secondary tab's navigation signals."""
+        if attr == "_scanner_tab":
+            # Scanner → Dashboard navigation (Lesson 8.7)
+            tab.row_clicked.connect(self.open_symbol_in_dashboard)
+            # Scanner → populate sidebar (single click, no tab switch)
+            tab.symbol_selected.connect(
+                lambda sym: self.sidebar._symbol_combo.setCurrentText(sym)
+            )
+        elif attr == "_etf_tab":
+            # ETF tab → Dashboard navigation
+            tab.symbol_selected.connect(self.open_symbol_in_dashboard)
+        elif attr == "_watchlist_tab":
+            # Watchlist → Dashboard navigation
+            tab.view_symbol.connect(self.open_symbol_in_dashboard)
+        elif attr == "_context_tab":
+            # Market Context → Dashboard navigation
+            tab.view_symbol.connect(self.open_symbol_in_dashboard)
 
     # ──────────────────────────────────────────────────────────────────────────
     # SLOTS: Sidebar actions
@@ -263,7 +327,7 @@ class MainWindow(QMainWindow):
         logger.info("Manual refresh: %s", symbol)
         self.sidebar.set_refresh_enabled(False)
         self._set_status("LIVE", f"Refreshing {symbol}…")
-        self.data_mgr.refresh(symbol, fetch_options=True)
+        self.data_mgr.refresh(symbol, fetch_options=True, force=True)
 
     # ──────────────────────────────────────────────────────────────────────────
     # SLOTS: DataManager callbacks
@@ -0,0 +1,146 @@
+"""
+ui/refresh_scheduler.py
+───────────────────────
+Bookkeeping behind DataManager.refresh(): which fetches to start, join,
+serve from cache or drop. Qt-free — DataManager owns the QThreads and the
+debounce QTimer; this class only decides and counts.
+
+Per (symbol, kind) — kind is "price" or "options":
+
+  begin()      "cached"  a result younger than ttl exists → serve it
+               "joined"  the same fetch is already in flight → wait for it
+               "start"   nothing usable → caller starts a worker, attach()es it
+  supersede()  in-flight fetches for other symbols are cancelled; their
+               results are dropped by complete()/fail() when they land
+  complete()   caches the result; True only for the current fetch
+
+The cache holds at most max_entries results. begin() and complete() evict
+entries older than ttl; past the cap the least recently used goes.
+
+Debounce is leading-edge: a refresh right after a quiet period dispatches
+at once (symbol change → immediate pipeline, Lesson 8.6); refreshes inside
+the window are coalesced into one trailing dispatch.
+
+stats counts every path taken: requests, debounced, started, joined,
+cached, superseded, dropped, failed, evicted.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Optional
+
+Key = tuple[str, str]  # (symbol, kind)
+
+
+class RefreshScheduler:
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        debounce: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+        max_entries: int = 64,
+    ):
+        self.ttl = ttl
+        self.debounce = debounce
+        self.max_entries = max_entries
+        self._clock = clock
+        self._in_flight: dict[Key, Any] = {}  # key → worker handle (None until attach)
+        self._cache: dict[Key, tuple[float, Any]] = {}  # key → (fetched_at, result), LRU first
+        self._last_dispatch: Optional[float] = None
+        self.stats: dict[str, int] = dict.fromkeys(
+            ("requests", "debounced", "started", "joined", "cached",
+             "superseded", "dropped", "failed", "evicted"), 0
+        )
+
+    # ── debounce ──────────────────────────────────────────────────────────────
+
+    def debounce_delay(self) -> float:
+        """Seconds to hold a new refresh back (0 → dispatch now)."""
+        self.stats["requests"] += 1
+        if self._last_dispatch is None:
+            return 0.0
+        wait = self.debounce - (self._clock() - self._last_dispatch)
+        if wait <= 0:
+            return 0.0
+        self.stats["debounced"] += 1
+        return wait
+
+    def mark_dispatched(self) -> None:
+        self._last_dispatch = self._clock()
+
+    # ── fetch lifecycle ───────────────────────────────────────────────────────
+
+    def begin(self, symbol: str, kind: str, force: bool = False) -> str:
+        key = (symbol, kind)
+        self._evict()
+        hit = self._cache.get(key)
+        if not force and hit is not None:
+            self._cache[key] = self._cache.pop(key)  # most recently used
+            self.stats["cached"] += 1
+            return "cached"
+        if key in self._in_flight:
+            self.stats["joined"] += 1
+            return "joined"
+        self._in_flight[key] = None
+        self.stats["started"] += 1
+        return "start"
+
+    def attach(self, symbol: str, kind: str, handle: Any) -> None:
+        self._in_flight[(symbol, kind)] = handle
+
+    def supersede(self, active_symbol: str) -> list:
+        """Cancel every in-flight fetch for another symbol; returns their handles."""
+        stale = [k for k in self._in_flight if k[0] != active_symbol]
+        self.stats["superseded"] += len(stale)
+        return [h for h in (self._in_flight.pop(k) for k in stale) if h is not None]
+
+    def _finish(self, symbol: str, kind: str, handle: Any) -> bool:
+        key = (symbol, kind)
+        if key not in self._in_flight or self._in_flight[key] is not handle:
+            self.stats["dropped"] += 1
+            return False
+        del self._in_flight[key]
+        return True
+
+    def complete(self, symbol: str, kind: str, result: Any, handle: Any = None) -> bool:
+        """Record a finished fetch. False → superseded; caller ignores result."""
+        if not self._finish(symbol, kind, handle):
+            return False
+        self._cache.pop((symbol, kind), None)
+        self._cache[(symbol, kind)] = (self._clock(), result)
+        self._evict()
+        return True
+
+    def fail(self, symbol: str, kind: str, handle: Any = None) -> bool:
+        """Record a failed fetch. False → superseded; caller ignores the error."""
+        if not self._finish(symbol, kind, handle):
+            return False
+        self.stats["failed"] += 1
+        return True
+
+    # ── cache ─────────────────────────────────────────────────────────────────
+
+    def _evict(self) -> None:
+        """Drop results older than ttl, then the least recently used past max_entries."""
+        now = self._clock()
+        for key in [k for k, (at, _) in self._cache.items() if now - at >= self.ttl]:
+            del self._cache[key]
+            self.stats["evicted"] += 1
+        for key in list(self._cache)[: max(0, len(self._cache) - self.max_entries)]:
+            del self._cache[key]
+            self.stats["evicted"] += 1
+
+    def cached(self, symbol: str, kind: str) -> Any:
+        hit = self._cache.get((symbol, kind))
+        return hit[1] if hit is not None else None
+
+    def in_flight(self, symbol: str, kind: str) -> bool:
+        return (symbol, kind) in self._in_flight
+
+    def invalidate(self, kind: Optional[str] = None, symbol: Optional[str] = None) -> None:
+        """Forget cached results (all, or one kind and/or symbol)."""
+        for key in list(self._cache):
+            if (kind is None or key[1] == kind) and (symbol is None or key[0] == symbol):
+                del self._cache[key]
@@ -21,18 +21,18 @@ from PyQt6.QtCore import QThread, pyqtSignal
 
 from modules.data import (
     get_price_daily,
+    get_prices_bulk,
     download_options,
     get_universe,
     NSE_LOT_SIZES,
 )
 from modules.indicators import (
-    add_bollinger,
-    add_williams_r,
+    add_price_indicators,
     compute_price_signals,
 )
 from modules.analytics import analyze
 from ui.watchlist_db import load_watchlist
-from modules.scanner import analyze_symbol
+from modules.scanner import iter_dual_mode_scan
 
 logger = logging.getLogger(__name__)
 
@@ -82,8 +82,9 @@ class PriceWorker(QThread):
         try:
             df, msg = get_price_daily(self.symbol)
             if df is not None and not df.empty:
-                df = add_bollinger(df, self.bb_period, self.bb_std)
-                df = add_williams_r(df, self.wr_period)
+                df = add_price_indicators(
+                    df, self.bb_period, self.bb_std, self.wr_period, inplace=True
+                )
                 logger.info(
                     "PriceWorker done: %s in %.1fs (%d bars)",
                     self.symbol,
@@ -147,12 +148,15 @@ class OptionsWorker(QThread):
 
 class ScanWorker(QThread):
     """
-    Run analyze_symbol() over a list of symbols.
+    Run the staged dual-mode scanner (modules.scanner.iter_dual_mode_scan)
+    over a list of symbols.
+
+    Rows are filtered on the dual-mode (mean-reversion) score, so the
+    price-stage momentum gate is off: its riding-the-upper-band test rules
+    out every dual-mode entry.
 
-    HARD GATE: passes_momentum is checked unconditionally before emitting
-    any row. This is the lesson from Bug B (ADANIPORTS with W%R=-92).
-    A symbol not riding the upper BB or with W%R <= -20 has no trade thesis
-    and must never appear in scanner output.
+    Rows are emitted via row_ready as they complete, strongest price-only
+    setups first.
     """
 
     row_ready = pyqtSignal(dict)  # single result row
@@ -192,32 +196,35 @@ class ScanWorker(QThread):
         results = []
         total = len(self.symbols)
 
-        for i, sym in enumerate(self.symbols):
-            if self._cancelled:
-                logger.info("ScanWorker cancelled at %d/%d", i, total)
-                break
-
-            self.progress.emit(i + 1, total, sym)
-
-            try:
-                row = analyze_symbol(sym)
-            except Exception as exc:
-                logger.warning("ScanWorker: %s failed: %s", sym, exc)
-                continue
-
-            if row is None:
-                continue
-
-            # ── Score filter (dual-mode score) ───────────────────────────
-            dm_sc = row.get("dm_score", row.get("viability_score", 0))
-            if dm_sc < self.min_score:
-                continue
+        # Whole-universe price load up front (chunked yf.download); served
+        # from memory if UniverseWorker prefetched it moments ago
+        self.progress.emit(0, total, "prices…")
+        prices = get_prices_bulk(self.symbols, days=365)
+        logger.info(
+            "ScanWorker prices: %d/%d symbols in %.1fs",
+            len(prices),
+            total,
+            time.time() - t0,
+        )
 
-            if self.require_all_filters and not row["all_filters_pass"]:
-                continue
+        scan = iter_dual_mode_scan(
+            self.symbols,
+            prices=prices,
+            min_score=self.min_score,
+            require_all_filters=self.require_all_filters,
+            progress_cb=lambda done, n, sym: self.progress.emit(done, n, sym),
+            should_stop=lambda: self._cancelled,  # also stops between filtered-out rows
+        )
+        try:
+            for row in scan:
+                if self._cancelled:
+                    logger.info("ScanWorker cancelled after %d rows", len(results))
+                    break
 
-            results.append(row)
-            self.row_ready.emit(row)
+                results.append(row)
+                self.row_ready.emit(row)
+        finally:
+            scan.close()  # cancels analysis not yet started
 
         self.total_scanned = total
         results.sort(key=lambda r: (r.get("setup_priority", 8), -r.get("dm_score", 0)))
@@ -402,11 +409,21 @@ class FilingsWorker(QThread):
 
 
 class UniverseWorker(QThread):
-    """Fetch F&O symbol universe from NSE (or cache/fallback)."""
+    """
+    Fetch F&O symbol universe from NSE (or cache/fallback).
+
+    With prefetch_prices=True the universe's daily bars are then bulk-loaded
+    (get_prices_bulk) so a ScanWorker started soon after hits the cache.
+    """
 
     universe_ready = pyqtSignal(list)  # list of symbol strings
+    prices_ready = pyqtSignal(int)  # number of symbols with price data
     error = pyqtSignal(str)
 
+    def __init__(self, prefetch_prices: bool = False, parent=None):
+        super().__init__(parent)
+        self.prefetch_prices = prefetch_prices
+
     def run(self):
         logger.info("UniverseWorker start")
         t0 = time.time()
@@ -421,6 +438,21 @@ class UniverseWorker(QThread):
         except Exception as exc:
             logger.error("UniverseWorker error: %s", exc)
             self.error.emit(str(exc))
+            return
+
+        if self.prefetch_prices:
+            t0 = time.time()
+            try:
+                prices = get_prices_bulk(symbols, days=365)
+                logger.info(
+                    "UniverseWorker prefetched prices: %d/%d in %.1fs",
+                    len(prices),
+                    len(symbols),
+                    time.time() - t0,
+                )
+                self.prices_ready.emit(len(prices))
+            except Exception as exc:
+                logger.warning("UniverseWorker price prefetch failed: %s", exc)
 
 
 # ══════════════════════════════════════════════════════════════════════════════